@@ -0,0 +1,39 @@
+"""add scheduled_at and timezone to campaign_recipients
+
+Revision ID: add_campaign_recipient_schedule
+Revises: add_campaign_recipients
+Create Date: 2026-10-18 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_campaign_recipient_schedule'
+down_revision: Union[str, None] = 'add_campaign_recipients'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_COLUMNS = [
+    ('timezone', sa.String()),
+    ('scheduled_at', sa.DateTime()),
+]
+
+
+def upgrade() -> None:
+    # Check if columns already exist (in case migration was already run)
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = [col['name'] for col in inspector.get_columns('campaign_recipients')]
+    for name, column_type in _COLUMNS:
+        if name not in columns:
+            op.add_column('campaign_recipients', sa.Column(name, column_type, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(_COLUMNS):
+        op.drop_column('campaign_recipients', name)
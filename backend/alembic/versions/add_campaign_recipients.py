@@ -0,0 +1,84 @@
+"""add campaign run columns and campaign_recipients table
+
+Revision ID: add_campaign_recipients
+Revises: add_outbox_table
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_campaign_recipients'
+down_revision: Union[str, None] = 'add_outbox_table'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_CAMPAIGN_COLUMNS = [
+    ('channels', sa.String()),
+    ('parameters', postgresql.JSON(astext_type=sa.Text())),
+    ('last_error', sa.Text()),
+    ('started_at', sa.DateTime()),
+    ('completed_at', sa.DateTime()),
+    ('updated_at', sa.DateTime()),
+]
+
+
+def upgrade() -> None:
+    # Check if columns/table already exist (in case migration was already run)
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = [col['name'] for col in inspector.get_columns('campaigns')]
+    for name, column_type in _CAMPAIGN_COLUMNS:
+        if name not in columns:
+            op.add_column('campaigns', sa.Column(name, column_type, nullable=True))
+
+    tables = inspector.get_table_names()
+    if 'campaign_recipients' not in tables:
+        op.create_table(
+            'campaign_recipients',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('campaign_id', sa.Integer(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('recruiter', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+            sa.Column('name', sa.String(), nullable=True),
+            sa.Column('email', sa.String(), nullable=True),
+            sa.Column('linkedin_url', sa.String(), nullable=True),
+            sa.Column('job_url', sa.String(), nullable=True),
+            sa.Column('job_title', sa.String(), nullable=True),
+            sa.Column('company_name', sa.String(), nullable=True),
+            sa.Column('stage', sa.String(), nullable=False, server_default='enrich'),
+            sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+            sa.Column('email_status', sa.String(), nullable=True),
+            sa.Column('linkedin_status', sa.String(), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('email_subject', sa.String(), nullable=True),
+            sa.Column('email_body', sa.Text(), nullable=True),
+            sa.Column('linkedin_message', sa.Text(), nullable=True),
+            sa.Column('locked_at', sa.DateTime(), nullable=True),
+            sa.Column('locked_by', sa.String(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('completed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # The engine claims a campaign's unfinished recipients by (campaign_id, stage)
+    indexes = [idx['name'] for idx in inspector.get_indexes('campaign_recipients')] if 'campaign_recipients' in tables else []
+    if 'ix_campaign_recipients_campaign_stage' not in indexes:
+        op.create_index(
+            'ix_campaign_recipients_campaign_stage', 'campaign_recipients', ['campaign_id', 'stage'], unique=False
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_campaign_recipients_campaign_stage', table_name='campaign_recipients')
+    op.drop_table('campaign_recipients')
+    for name, _ in reversed(_CAMPAIGN_COLUMNS):
+        op.drop_column('campaigns', name)
@@ -0,0 +1,38 @@
+"""add updated_at to email_templates
+
+Revision ID: add_email_template_updated_at
+Revises: add_resume_pdf_hash
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_email_template_updated_at'
+down_revision: Union[str, None] = 'add_resume_pdf_hash'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add updated_at so compiled templates can be cached by (id, updated_at)
+    # Check if column already exists to avoid errors
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = [col['name'] for col in inspector.get_columns('email_templates')]
+
+    if 'updated_at' not in columns:
+        op.add_column('email_templates',
+            sa.Column('updated_at', sa.DateTime(), nullable=True)
+        )
+        # Existing templates were last changed when they were created
+        op.execute("UPDATE email_templates SET updated_at = COALESCE(created_at, NOW())")
+
+
+def downgrade() -> None:
+    # Remove updated_at column
+    op.drop_column('email_templates', 'updated_at')
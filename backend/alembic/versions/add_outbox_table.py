@@ -0,0 +1,73 @@
+"""add outbox table
+
+Revision ID: add_outbox_table
+Revises: add_email_template_updated_at
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_outbox_table'
+down_revision: Union[str, None] = 'add_email_template_updated_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Check if table already exists (in case migration was already run)
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    tables = inspector.get_table_names()
+
+    if 'outbox' not in tables:
+        op.create_table(
+            'outbox',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('channel', sa.String(), nullable=False),
+            sa.Column('status', sa.String(), nullable=False, server_default='pending'),
+            sa.Column('recipient_name', sa.String(), nullable=True),
+            sa.Column('recipient_email', sa.String(), nullable=True),
+            sa.Column('recipient_linkedin_url', sa.String(), nullable=True),
+            sa.Column('job_title', sa.String(), nullable=True),
+            sa.Column('company_name', sa.String(), nullable=True),
+            sa.Column('email_subject', sa.String(), nullable=True),
+            sa.Column('email_body', sa.Text(), nullable=True),
+            sa.Column('linkedin_message', sa.Text(), nullable=True),
+            sa.Column('email_account_id', sa.Integer(), nullable=True),
+            sa.Column('draft_id', sa.Integer(), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('available_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('locked_at', sa.DateTime(), nullable=True),
+            sa.Column('locked_by', sa.String(), nullable=True),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('result', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+            sa.Column('sent_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.ForeignKeyConstraint(['email_account_id'], ['email_accounts.id'], ondelete='SET NULL'),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+    # Check if indexes exist before creating
+    indexes = [idx['name'] for idx in inspector.get_indexes('outbox')] if 'outbox' in tables else []
+    if 'ix_outbox_user_id' not in indexes:
+        op.create_index(op.f('ix_outbox_user_id'), 'outbox', ['user_id'], unique=False)
+    if 'ix_outbox_draft_id' not in indexes:
+        op.create_index(op.f('ix_outbox_draft_id'), 'outbox', ['draft_id'], unique=False)
+    # Workers claim due rows by (status, available_at)
+    if 'ix_outbox_status_available_at' not in indexes:
+        op.create_index('ix_outbox_status_available_at', 'outbox', ['status', 'available_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_status_available_at', table_name='outbox')
+    op.drop_index(op.f('ix_outbox_draft_id'), table_name='outbox')
+    op.drop_index(op.f('ix_outbox_user_id'), table_name='outbox')
+    op.drop_table('outbox')
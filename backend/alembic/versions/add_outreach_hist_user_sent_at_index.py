@@ -0,0 +1,38 @@
+"""add (user_id, sent_at DESC) index to outreach_history
+
+Revision ID: add_outreach_hist_user_sent_at
+Revises: add_campaign_recipient_schedule
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_outreach_hist_user_sent_at'
+down_revision: Union[str, None] = 'add_campaign_recipient_schedule'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Check if index already exists (in case migration was already run)
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    indexes = [idx['name'] for idx in inspector.get_indexes('outreach_history')]
+
+    # Range reads of one user's recent history (the campaign scheduler's daily counts)
+    if 'ix_outreach_history_user_sent_at' not in indexes:
+        op.create_index(
+            'ix_outreach_history_user_sent_at',
+            'outreach_history',
+            ['user_id', sa.text('sent_at DESC')],
+            unique=False
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outreach_history_user_sent_at', table_name='outreach_history')
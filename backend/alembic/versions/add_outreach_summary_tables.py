@@ -0,0 +1,90 @@
+"""add outreach summary tables
+
+Revision ID: add_outreach_summary_tables
+Revises: add_outreach_hist_user_sent_at
+Create Date: 2026-10-18 23:30:00.000000
+
+Backfill existing history afterwards with
+``python -m app.services.outreach_stats_service``.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_outreach_summary_tables'
+down_revision: Union[str, None] = 'add_outreach_hist_user_sent_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Check if tables already exist (in case migration was already run)
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    tables = inspector.get_table_names()
+
+    if 'outreach_summary_entries' not in tables:
+        op.create_table(
+            'outreach_summary_entries',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('recipient_key', sa.String(), nullable=False),
+            sa.Column('job_key', sa.String(), nullable=False),
+            sa.Column('company_key', sa.String(), nullable=False),
+            sa.Column('history_id', sa.Integer(), nullable=False),
+            sa.Column('recipient_name', sa.String(), nullable=True),
+            sa.Column('job_title', sa.String(), nullable=True),
+            sa.Column('company_name', sa.String(), nullable=True),
+            sa.Column('last_sent_at', sa.DateTime(), nullable=False),
+            sa.Column('email', sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column('linkedin', sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint(
+                'user_id', 'recipient_key', 'job_key', 'company_key', name='uq_outreach_summary_entries_key'
+            )
+        )
+        # GET /user-stats reads a user's latest entries
+        op.create_index(
+            'ix_outreach_summary_entries_user_last_sent',
+            'outreach_summary_entries',
+            ['user_id', sa.text('last_sent_at DESC')],
+            unique=False
+        )
+
+    if 'outreach_reached' not in tables:
+        op.create_table(
+            'outreach_reached',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('company_key', sa.String(), nullable=False),
+            sa.Column('role_key', sa.String(), nullable=False, server_default=''),
+            sa.Column('company_name', sa.String(), nullable=False),
+            sa.Column('role', sa.String(), nullable=False, server_default=''),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('user_id', 'company_key', 'role_key', name='uq_outreach_reached_key')
+        )
+
+    if 'outreach_daily_counts' not in tables:
+        op.create_table(
+            'outreach_daily_counts',
+            sa.Column('user_id', sa.String(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('emails', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('linkedin', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('combined', sa.Integer(), nullable=False, server_default='0'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id', 'day')
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('outreach_daily_counts')
+    op.drop_table('outreach_reached')
+    op.drop_index('ix_outreach_summary_entries_user_last_sent', table_name='outreach_summary_entries')
+    op.drop_table('outreach_summary_entries')
@@ -0,0 +1,36 @@
+"""add recruiter_scoring_spec to user_settings
+
+Revision ID: add_recruiter_scoring_spec
+Revises: add_linkedin_premium_status
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_recruiter_scoring_spec'
+down_revision: Union[str, None] = 'add_linkedin_premium_status'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add per-user recruiter scoring rules (NULL = use the default spec)
+    # Check if column already exists to avoid errors
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = [col['name'] for col in inspector.get_columns('user_settings')]
+
+    if 'recruiter_scoring_spec' not in columns:
+        op.add_column('user_settings',
+            sa.Column('recruiter_scoring_spec', sa.JSON(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    # Remove recruiter_scoring_spec column
+    op.drop_column('user_settings', 'recruiter_scoring_spec')
@@ -0,0 +1,41 @@
+"""add content_hash and digest to resume_content
+
+Revision ID: add_resume_digest
+Revises: add_recruiter_scoring_spec
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_resume_digest'
+down_revision: Union[str, None] = 'add_recruiter_scoring_spec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add the derived resume digest and the hash of the content it was built from
+    # Check if columns already exist to avoid errors
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = [col['name'] for col in inspector.get_columns('resume_content')]
+
+    if 'content_hash' not in columns:
+        op.add_column('resume_content',
+            sa.Column('content_hash', sa.String(length=64), nullable=True)
+        )
+    if 'digest' not in columns:
+        op.add_column('resume_content',
+            sa.Column('digest', sa.JSON(), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    # Remove resume digest columns
+    op.drop_column('resume_content', 'digest')
+    op.drop_column('resume_content', 'content_hash')
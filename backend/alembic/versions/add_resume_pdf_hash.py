@@ -0,0 +1,36 @@
+"""add pdf_hash to resume_content
+
+Revision ID: add_resume_pdf_hash
+Revises: add_resume_digest
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_resume_pdf_hash'
+down_revision: Union[str, None] = 'add_resume_digest'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add the hash of the uploaded PDF so re-uploading the same file skips parsing
+    # Check if column already exists to avoid errors
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    columns = [col['name'] for col in inspector.get_columns('resume_content')]
+
+    if 'pdf_hash' not in columns:
+        op.add_column('resume_content',
+            sa.Column('pdf_hash', sa.String(length=64), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    # Remove pdf_hash column
+    op.drop_column('resume_content', 'pdf_hash')
@@ -14,6 +14,9 @@ from app.api.v1 import (
     drafts,
     user_stats,
     onboarding,
+    metrics,
+    outbox,
+    campaigns,
 )
 
 api_router = APIRouter()
@@ -32,4 +35,7 @@ api_router.include_router(linkedin_accounts.router, tags=["linkedin-accounts"])
 api_router.include_router(drafts.router, tags=["drafts"])
 api_router.include_router(user_stats.router, tags=["user-stats"])
 api_router.include_router(onboarding.router, tags=["onboarding"])
+api_router.include_router(metrics.router, tags=["metrics"])
+api_router.include_router(outbox.router, tags=["outbox"])
+api_router.include_router(campaigns.router, tags=["campaigns"])
 
@@ -0,0 +1,82 @@
+"""Campaign endpoints - progress, pause and resume of outreach campaigns."""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from app.api.deps import get_current_user
+from app.db.base import get_db
+from app.db.models.campaign import Campaign
+from app.db.models.user import User
+from app.services.campaign_engine import COMPLETED, PAUSED, SENDING, campaign_engine, campaign_progress, campaigns_progress
+
+router = APIRouter()
+
+
+async def _get_campaign(campaign_id: int, user_id: str, db: AsyncSession) -> Campaign:
+    campaign = await db.get(Campaign, campaign_id)
+    if not campaign or campaign.owner_id != user_id:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return campaign
+
+
+@router.get("/campaigns")
+async def list_campaigns(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """The user's most recent campaigns with their progress."""
+    result = await db.execute(
+        select(Campaign)
+        .where(Campaign.owner_id == current_user.id)
+        .order_by(Campaign.id.desc())
+        .limit(limit)
+    )
+    return {"campaigns": await campaigns_progress(db, result.scalars().all())}
+
+
+@router.get("/campaigns/{campaign_id}")
+async def get_campaign(
+    campaign_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Recipients per stage and outcome, and throughput of the current run."""
+    campaign = await _get_campaign(campaign_id, current_user.id, db)
+    return await campaign_progress(db, campaign)
+
+
+@router.post("/campaigns/{campaign_id}/pause")
+async def pause_campaign(
+    campaign_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Pause a running campaign; recipients in flight stop after their current stage."""
+    campaign = await _get_campaign(campaign_id, current_user.id, db)
+    if campaign.status != SENDING:
+        raise HTTPException(status_code=409, detail=f"Campaign is {campaign.status}, not sending")
+    campaign.status = PAUSED
+    campaign.updated_at = datetime.utcnow()
+    await db.commit()
+    campaign_engine.pause(campaign.id)
+    return await campaign_progress(db, campaign)
+
+
+@router.post("/campaigns/{campaign_id}/resume")
+async def resume_campaign(
+    campaign_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Resume a paused campaign from where each recipient stopped."""
+    campaign = await _get_campaign(campaign_id, current_user.id, db)
+    if campaign.status == COMPLETED:
+        raise HTTPException(status_code=409, detail="Campaign has already completed")
+    if campaign.status != SENDING:
+        campaign.status = SENDING
+        campaign.last_error = None
+        campaign.updated_at = datetime.utcnow()
+        await db.commit()
+    campaign_engine.launch(campaign.id)
+    return await campaign_progress(db, campaign)
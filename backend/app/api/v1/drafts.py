@@ -1,16 +1,25 @@
 """Draft management endpoints."""
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, update
 from datetime import datetime
+import json
 from app.api.deps import get_current_user
+from app.core.config import settings
 from app.db.models.user import User
 from app.db.models.draft import Draft
-from app.db.models.email_account import EmailAccount
 from app.db.base import get_db
-from app.services.unified_messenger.adapter import send_invitation, send_email
+from app.services.outbox import (
+    enqueue_email,
+    enqueue_linkedin,
+    get_sending_account,
+    outbox_status,
+    outbox_workers,
+    queued_channels,
+)
 from app.services.job_context_service import get_job_context_by_url
 
 router = APIRouter()
@@ -47,6 +56,20 @@ class DraftSendRequest(BaseModel):
     send_linkedin: Optional[bool] = False
 
 
+class DraftBatchSendRequest(BaseModel):
+    draft_ids: List[int]
+    channels: Optional[List[str]] = None  # Subset of ["email", "linkedin"]; defaults to both
+
+
+class DraftBatchGenerateRequest(BaseModel):
+    mapping: List[Dict[str, Any]]  # "mapping" entries from /search/map
+    recruiters: Optional[List[Dict[str, Any]]] = None  # Recruiter objects (with extracted_email if available)
+    job_type: Optional[str] = "full_time"
+    channels: Optional[List[str]] = None  # Subset of ["email", "linkedin"]; defaults to both
+    # Concurrent model calls; defaults to DRAFT_BATCH_CONCURRENCY
+    concurrency: Optional[int] = Field(default=None, ge=1, le=settings.draft_batch_max_concurrency)
+
+
 @router.post("/drafts")
 async def create_draft(
     request: DraftCreateRequest,
@@ -92,6 +115,70 @@ async def create_draft(
     }
 
 
+@router.post("/drafts/generate-batch")
+async def generate_drafts_batch_endpoint(
+    request: DraftBatchGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Generate and save drafts for all mapped job/recruiter pairs in one request.
+    
+    Streams newline-delimited JSON: one "item" event per pair as its messages
+    finish, then a "done" event with the ids of the drafts saved (all drafts
+    are inserted together once generation finishes).
+    """
+    from app.services.draft_generation_service import (
+        CHANNELS,
+        generate_drafts_batch,
+        load_batch_context,
+        pair_mapping_with_recruiters,
+    )
+    from app.services.resume_digest_service import get_resume_digest
+    
+    channels = request.channels or list(CHANNELS)
+    unknown = [c for c in channels if c not in CHANNELS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown channels: {', '.join(unknown)}. Use {', '.join(CHANNELS)}."
+        )
+    if not request.mapping:
+        raise HTTPException(status_code=400, detail="mapping must contain at least one job/recruiter pair")
+    if len(request.mapping) > settings.draft_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many pairs ({len(request.mapping)}); the limit is {settings.draft_batch_max_items} per batch"
+        )
+    
+    resume_digest = await get_resume_digest(current_user.id, db)
+    if not resume_digest:
+        raise HTTPException(status_code=404, detail="No resume content found. Please upload a resume first.")
+    
+    pairs = pair_mapping_with_recruiters(request.mapping, request.recruiters or [])
+    try:
+        ctx = await load_batch_context(
+            current_user.id, db, resume_digest, [pair['job_url'] for pair in pairs], channels
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def event_stream():
+        async for event in generate_drafts_batch(
+            current_user.id, pairs, request.job_type or "full_time", channels, ctx, request.concurrency
+        ):
+            yield json.dumps(event, default=str) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 @router.get("/drafts")
 async def list_drafts(
     include_sent: Optional[bool] = False,
@@ -249,88 +336,74 @@ async def update_draft(
     }
 
 
-@router.post("/drafts/{draft_id}/send")
+@router.post("/drafts/{draft_id}/send", status_code=202)
 async def send_draft(
     draft_id: int,
     request: DraftSendRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Send a draft (email and/or LinkedIn)."""
+    """
+    Queue a draft for sending (email and/or LinkedIn).
+    
+    Both parts are queued in one transaction and 202 is returned; outbox
+    workers send them and mark the draft parts sent (see app.services.outbox).
+    """
     import logging
     logger = logging.getLogger(__name__)
     
+    # Locked until the commit, so a concurrent batch send cannot claim the same parts
     result = await db.execute(
         select(Draft)
         .where(Draft.id == draft_id)
         .where(Draft.owner_id == current_user.id)
+        .with_for_update()
     )
     draft = result.scalar_one_or_none()
     
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
     
-    logger.info(f"Sending draft {draft_id}: send_email={request.send_email}, send_linkedin={request.send_linkedin}")
+    logger.info(f"Queueing draft {draft_id}: send_email={request.send_email}, send_linkedin={request.send_linkedin}")
     
-    # Check if the specific part being sent is already sent
+    # Check if the specific part being sent is already sent or queued
     if request.send_email and draft.email_sent:
         raise HTTPException(status_code=400, detail="Email has already been sent")
     if request.send_linkedin and draft.linkedin_sent:
         raise HTTPException(status_code=400, detail="LinkedIn message has already been sent")
+    queued = await queued_channels(db, draft.id)
+    if request.send_email and "email" in queued:
+        raise HTTPException(status_code=409, detail="Email is already queued for sending")
+    if request.send_linkedin and "linkedin" in queued:
+        raise HTTPException(status_code=409, detail="LinkedIn message is already queued for sending")
     
     results = {
         "email": None,
         "linkedin": None
     }
+    messages = {}
     
-    # Send email if requested and draft has email content
     if request.send_email and draft.email_subject and draft.email_body and draft.recipient_email:
-        try:
-            # Get user's default active email account
-            result = await db.execute(
-                select(EmailAccount)
-                .where(EmailAccount.owner_id == current_user.id)
-                .where(EmailAccount.is_active == True)
-                .where(EmailAccount.is_default == True)
-                .limit(1)
-            )
-            email_account = result.scalar_one_or_none()
-            
-            # If no default, get any active account
-            if not email_account:
-                result = await db.execute(
-                    select(EmailAccount)
-                    .where(EmailAccount.owner_id == current_user.id)
-                    .where(EmailAccount.is_active == True)
-                    .limit(1)
-                )
-                email_account = result.scalar_one_or_none()
-            
-            if not email_account:
-                results["email"] = {
-                    "success": False,
-                    "error": "No linked email account found. Please link an email account in Settings."
-                }
-            else:
-                # Update last_used_at
-                email_account.last_used_at = datetime.utcnow()
-                await db.commit()
-                
-                email_result = await send_email(
-                    draft.recipient_email,
-                    draft.email_subject,
-                    draft.email_body,
-                    email_account=email_account,
-                    db=db
-                )
-                results["email"] = email_result
-        except Exception as e:
+        email_account = await get_sending_account(current_user.id, db)
+        if not email_account:
             results["email"] = {
                 "success": False,
-                "error": str(e)
+                "error": "No linked email account found. Please link an email account in Settings."
             }
+        else:
+            messages["email"] = enqueue_email(
+                db,
+                current_user.id,
+                draft.recipient_email,
+                draft.email_subject,
+                draft.email_body,
+                email_account_id=email_account.id,
+                draft_id=draft.id,
+                recipient_name=draft.recipient_name,
+                job_title=draft.job_title,
+                company_name=draft.company_name
+            )
     
-    # Send LinkedIn if requested and draft has LinkedIn content
     if request.send_linkedin:
         if not draft.linkedin_message:
             logger.warning(f"Draft {draft_id} requested LinkedIn send but has no linkedin_message")
@@ -338,185 +411,30 @@ async def send_draft(
             logger.warning(f"Draft {draft_id} requested LinkedIn send but has no recipient_linkedin_url")
     
     if request.send_linkedin and draft.linkedin_message and draft.recipient_linkedin_url:
-        try:
-            # First, get the user's active Unipile account ID (needed for URL conversion)
-            from app.db.models.linkedin_account import LinkedInAccount
-            from app.core.config import settings
-            from app.services.unified_messenger.adapter import linkedin_url_to_provider_id
-            
-            unipile_account_id = None
-            result = await db.execute(
-                select(LinkedInAccount)
-                .where(LinkedInAccount.owner_id == current_user.id)
-                .where(LinkedInAccount.is_active == True)
-                .where(LinkedInAccount.unipile_account_id.isnot(None))
-                .order_by(LinkedInAccount.is_default.desc(), LinkedInAccount.created_at.desc())
-                .limit(1)
-            )
-            linkedin_account = result.scalar_one_or_none()
-            
-            if linkedin_account and linkedin_account.unipile_account_id:
-                unipile_account_id = linkedin_account.unipile_account_id
-                logger.info(f"Using user's Unipile account for URL conversion: {unipile_account_id}")
-            else:
-                # Fall back to default
-                unipile_account_id = settings.unipile_account_id
-                logger.info(f"Using default Unipile account for URL conversion: {unipile_account_id}")
-            
-            # Convert LinkedIn URL to provider_id
-            logger.info(f"Converting LinkedIn URL to provider_id: {draft.recipient_linkedin_url}")
-            provider_result = await linkedin_url_to_provider_id(draft.recipient_linkedin_url, account_id=unipile_account_id)
-            provider_id = provider_result.get("provider_id")
-            
-            if not provider_id:
-                error_msg = provider_result.get("error", "Could not convert LinkedIn URL to Provider ID")
-                logger.error(f"Failed to convert LinkedIn URL to provider_id: {draft.recipient_linkedin_url}. Error: {error_msg}")
-                results["linkedin"] = {
-                    "success": False,
-                    "error": f"{error_msg}. Please check the LinkedIn URL is valid and try again."
-                }
-            else:
-                logger.info(f"Successfully converted to provider_id: {provider_id}")
-                
-                # Now send the invitation with the provider_id
-                linkedin_result = await send_invitation(
-                    provider_id=provider_id,
-                    text=draft.linkedin_message,
-                    user_id=current_user.id,
-                    db=db,
-                    linkedin_url=draft.recipient_linkedin_url
-                )
-                results["linkedin"] = linkedin_result
-        except Exception as e:
-            import traceback
-            logger.error(f"Error sending LinkedIn message from draft: {str(e)}")
-            logger.error(traceback.format_exc())
-            results["linkedin"] = {
-                "success": False,
-                "error": str(e)
-            }
-    
-    # Mark individual parts as sent if they were sent successfully
-    email_success = results["email"] and results["email"].get("success")
-    linkedin_success = results["linkedin"] and results["linkedin"].get("success")
-    
-    if email_success:
-        draft.email_sent = True
-        draft.email_sent_at = datetime.utcnow()
-    
-    if linkedin_success:
-        draft.linkedin_sent = True
-        draft.linkedin_sent_at = datetime.utcnow()
-    
-    # Mark draft as fully sent only if all applicable parts are sent
-    email_needed = draft.draft_type in ['email', 'both'] and draft.email_subject and draft.email_body and draft.recipient_email
-    linkedin_needed = draft.draft_type in ['linkedin', 'both'] and draft.linkedin_message and draft.recipient_linkedin_url
-    
-    if email_needed and linkedin_needed:
-        # Both email and LinkedIn are needed - mark as sent only when both are sent
-        draft.is_sent = draft.email_sent and draft.linkedin_sent
-    elif email_needed:
-        # Only email is needed
-        draft.is_sent = draft.email_sent
-    elif linkedin_needed:
-        # Only LinkedIn is needed
-        draft.is_sent = draft.linkedin_sent
-    else:
-        # Neither is needed (shouldn't happen, but handle it)
-        draft.is_sent = False
-    
-    # Update sent_at timestamp if the draft is now fully sent
-    if draft.is_sent and not draft.sent_at:
-        draft.sent_at = datetime.utcnow()
-    
-    draft.updated_at = datetime.utcnow()
-    await db.commit()
-    
-    # Create permanent history records for sent messages
-    from app.db.models.outreach_history import OutreachHistory
-    
-    if email_success:
-        history = OutreachHistory(
-            user_id=current_user.id,
+        messages["linkedin"] = enqueue_linkedin(
+            db,
+            current_user.id,
+            draft.recipient_linkedin_url,
+            draft.linkedin_message,
+            draft_id=draft.id,
             recipient_name=draft.recipient_name,
-            recipient_email=draft.recipient_email,
             job_title=draft.job_title,
-            company_name=draft.company_name,
-            channel="email",
-            email_subject=draft.email_subject,
-            email_body=draft.email_body,
-            sent_at=draft.email_sent_at or datetime.utcnow(),
-            draft_id=draft.id
+            company_name=draft.company_name
         )
-        db.add(history)
     
-    if linkedin_success:
-        history = OutreachHistory(
-            user_id=current_user.id,
-            recipient_name=draft.recipient_name,
-            recipient_linkedin_url=draft.recipient_linkedin_url,
-            job_title=draft.job_title,
-            company_name=draft.company_name,
-            channel="linkedin",
-            linkedin_message=draft.linkedin_message,
-            sent_at=draft.linkedin_sent_at or datetime.utcnow(),
-            draft_id=draft.id
-        )
-        db.add(history)
+    if messages:
+        await db.commit()
+        outbox_workers.wake()
+    for channel, message in messages.items():
+        results[channel] = {"success": True, "queued": True, "outbox": outbox_status(message)}
     
-    # If both were sent, create a combined "both" record
-    if email_success and linkedin_success:
-        history = OutreachHistory(
-            user_id=current_user.id,
-            recipient_name=draft.recipient_name,
-            recipient_email=draft.recipient_email,
-            recipient_linkedin_url=draft.recipient_linkedin_url,
-            job_title=draft.job_title,
-            company_name=draft.company_name,
-            channel="both",
-            email_subject=draft.email_subject,
-            email_body=draft.email_body,
-            linkedin_message=draft.linkedin_message,
-            sent_at=draft.sent_at or datetime.utcnow(),
-            draft_id=draft.id
-        )
-        db.add(history)
-    
-    await db.commit()
-    
-    # Increment user stats for sent messages
-    from app.services.user_settings_service import increment_linkedin_invites, increment_emails_sent
-    if email_success:
-        try:
-            await increment_emails_sent(current_user.id, db)
-        except Exception as e:
-            logger.warning(f"Failed to increment email stats: {e}")
-    
-    if linkedin_success:
-        try:
-            await increment_linkedin_invites(current_user.id, db)
-        except Exception as e:
-            logger.warning(f"Failed to increment LinkedIn stats: {e}")
-    
-    # Determine overall success - if any requested send failed, return success=False
-    email_needed = draft.draft_type in ['email', 'both'] and draft.email_subject and draft.email_body and draft.recipient_email
-    linkedin_needed = draft.draft_type in ['linkedin', 'both'] and draft.linkedin_message and draft.recipient_linkedin_url
-    
-    overall_success = True
     error_messages = []
-    
-    if email_needed and results.get("email"):
-        if not results["email"].get("success"):
-            overall_success = False
-            error_messages.append(f"Email: {results['email'].get('error', 'Failed to send email')}")
-    
-    if linkedin_needed and results.get("linkedin"):
-        if not results["linkedin"].get("success"):
-            overall_success = False
-            error_messages.append(f"LinkedIn: {results['linkedin'].get('error', 'Failed to send LinkedIn message')}")
+    if results["email"] and not results["email"].get("success"):
+        error_messages.append(f"Email: {results['email'].get('error')}")
     
     return {
-        "success": overall_success,
+        "success": not error_messages,
+        "queued": bool(messages),
         "results": results,
         "error": " | ".join(error_messages) if error_messages else None,
         "draft": {
@@ -531,6 +449,53 @@ async def send_draft(
     }
 
 
+@router.post("/drafts/send-batch")
+async def send_drafts_batch_endpoint(
+    request: DraftBatchSendRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Send many drafts in one request.
+    
+    Streams newline-delimited JSON: one "item" event per draft as its email
+    and/or LinkedIn sends finish, then a "done" event once history, draft
+    status and stats are recorded. The parts are claimed in the outbox before
+    sending; drafts another request is sending are reported as errors.
+    """
+    from app.services.draft_send_service import CHANNELS, claim_drafts, send_drafts_batch
+    
+    channels = request.channels or list(CHANNELS)
+    unknown = [c for c in channels if c not in CHANNELS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown channels: {', '.join(unknown)}. Use {', '.join(CHANNELS)}."
+        )
+    if not request.draft_ids:
+        raise HTTPException(status_code=400, detail="draft_ids must contain at least one draft id")
+    if len(request.draft_ids) > settings.draft_batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many drafts ({len(request.draft_ids)}); the limit is {settings.draft_batch_max_items} per batch"
+        )
+    
+    ctx = await claim_drafts(current_user.id, db, request.draft_ids, channels)
+    
+    async def event_stream():
+        async for event in send_drafts_batch(current_user.id, channels, ctx):
+            yield json.dumps(event, default=str) + "\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 @router.delete("/drafts/{draft_id}")
 async def delete_draft(
     draft_id: int,
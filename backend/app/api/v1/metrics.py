@@ -0,0 +1,72 @@
+"""Runtime metrics endpoints for sizing worker pools."""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user
+from app.db.base import get_db
+from app.db.models.user import User
+from app.services.campaign_engine import campaign_engine
+from app.services.cpu_pool import cpu_pool
+from app.services.executors import executor_metrics
+from app.services.outbox import outbox_workers
+from app.services.smtp_pool import smtp_pool
+from app.services.token_refresh import token_refresher
+from app.services.unified_messenger.resume_cache import get_resume_cache
+
+router = APIRouter()
+
+
+@router.get("/metrics/cpu-pool")
+async def get_cpu_pool_metrics(
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Queue depth and task durations of the CPU process pool."""
+    return cpu_pool.metrics()
+
+
+@router.get("/metrics/executors")
+async def get_executor_metrics(
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Active/queued task counts and wait times per named executor."""
+    return {"executors": executor_metrics()}
+
+
+@router.get("/metrics/smtp-pool")
+async def get_smtp_pool_metrics(
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Pooled SMTP sessions: opened vs reused and average handshake time."""
+    return smtp_pool.metrics()
+
+
+@router.get("/metrics/resume-cache")
+async def get_resume_cache_metrics(
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Size and hit rate of the extracted resume text cache."""
+    return get_resume_cache().metrics()
+
+
+@router.get("/metrics/outbox")
+async def get_outbox_metrics(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Outbox queue depth per status and this process's send throughput."""
+    return await outbox_workers.metrics(db)
+
+
+@router.get("/metrics/token-refresh")
+async def get_token_refresh_metrics(
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """OAuth token refreshes: scheduled vs on the send path, and single-flight joins."""
+    return token_refresher.metrics()
+
+
+@router.get("/metrics/campaigns")
+async def get_campaign_engine_metrics(
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Campaign engine: running campaigns, recipients active per stage and claims."""
+    return campaign_engine.metrics()
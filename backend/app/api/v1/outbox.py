@@ -0,0 +1,43 @@
+"""Outbox endpoints - status of queued sends."""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_current_user
+from app.db.base import get_db
+from app.db.models.outbox_message import OutboxMessage
+from app.db.models.user import User
+from app.services.outbox import outbox_status
+
+router = APIRouter()
+
+
+@router.get("/outbox")
+async def list_outbox(
+    status: Optional[str] = Query(None, description="pending, sending, sent or failed"),
+    draft_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """The user's most recent queued sends."""
+    query = select(OutboxMessage).where(OutboxMessage.user_id == current_user.id)
+    if status:
+        query = query.where(OutboxMessage.status == status)
+    if draft_id is not None:
+        query = query.where(OutboxMessage.draft_id == draft_id)
+    result = await db.execute(query.order_by(OutboxMessage.id.desc()).limit(limit))
+    return {"messages": [outbox_status(message) for message in result.scalars().all()]}
+
+
+@router.get("/outbox/{message_id}")
+async def get_outbox_message(
+    message_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Status of one queued send."""
+    message = await db.get(OutboxMessage, message_id)
+    if not message or message.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Outbox message not found")
+    return outbox_status(message)
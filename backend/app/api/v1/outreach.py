@@ -1,27 +1,56 @@
 """Outreach endpoints."""
-from fastapi import APIRouter, Depends, BackgroundTasks, HTTPException
+import json
+from contextlib import aclosing
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.db.models.user import User
 from app.db.base import get_db
-from app.db.models.email_account import EmailAccount
-from sqlalchemy import select
 from app.services.unified_messenger.adapter import (
     extract_emails_for_recruiters,
     generate_email,
-    send_email,
-    email_only_outreach,
-    enhanced_dual_outreach,
     generate_linkedin_message,
-    send_linkedin_invitation
+    send_linkedin_invitation,
+    stream_email,
+    stream_linkedin_message
 )
-from app.services.unified_messenger.resume_content_loader import get_resume_content_from_db
+from app.services.campaign_engine import campaign_engine, campaign_progress, create_campaign
+from app.services.campaign_scheduler import resolve_timezone
+from app.services.outbox import enqueue_email, enqueue_linkedin, get_sending_account, outbox_status, outbox_workers
+from app.services.resume_digest_service import get_resume_digest
+from app.services.llm_runtime import ClientDisconnectedError, LLMTimeoutError, cancel_on_disconnect
 
 router = APIRouter()
 
 
+async def _sse_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Format generation events as Server-Sent Events; a failure becomes an error event."""
+    # Closing the event iterator cancels the model stream when the client goes away
+    async with aclosing(events):
+        try:
+            async for event in events:
+                yield f"data: {json.dumps(event)}\n\n"
+        except LLMTimeoutError as e:
+            yield f"data: {json.dumps({'type': 'error', 'status': 504, 'error': str(e)})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'status': 500, 'error': f'Message generation failed: {e}'})}\n\n"
+
+
+def _sse_response(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(events),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 class ExtractEmailsRequest(BaseModel):
     recruiters: List[dict]
 
@@ -46,12 +75,16 @@ class EmailOnlyCampaignRequest(BaseModel):
     recruiters: List[dict]
     job_titles: List[str]
     job_type: str
+    name: Optional[str] = None
+    timezone: Optional[str] = None  # IANA name; sending window of recruiters without their own 'timezone'
 
 
 class DualOutreachCampaignRequest(BaseModel):
     recruiters: List[dict]
     job_titles: List[str]
     job_type: str
+    name: Optional[str] = None
+    timezone: Optional[str] = None  # IANA name; sending window of recruiters without their own 'timezone'
 
 
 @router.post("/outreach/emails/extract")
@@ -67,145 +100,148 @@ async def extract_emails(
 @router.post("/outreach/email/generate")
 async def generate_email_endpoint(
     request: GenerateEmailRequest,
+    http_request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Generate email content."""
-    # Get resume content from database (just the text content)
-    resume_content = await get_resume_content_from_db(current_user.id, db)
+    """Generate email content (cancelled if the client disconnects)."""
+    # Resume digest from the database (prompt-ready resume + sender name)
+    resume_digest = await get_resume_digest(current_user.id, db)
     
-    return await generate_email(
+    return await cancel_on_disconnect(http_request, generate_email(
         request.job_titles,
         request.job_type,
         request.recruiter,
-        resume_content,
+        None,
         request.job_url,
-    )
+        resume_digest=resume_digest,
+    ))
+
+
+@router.post("/outreach/email/generate/stream")
+async def stream_email_endpoint(
+    request: GenerateEmailRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Generate email content, streamed as Server-Sent Events.
+    
+    Events (JSON in ``data:``): ``token`` with ``field`` (subject/body) and
+    ``text`` as the model writes; then ``final`` with the finished ``subject``
+    and ``body``; or ``error`` with ``status`` and ``error``.
+    """
+    resume_digest = await get_resume_digest(current_user.id, db)
+    
+    return _sse_response(stream_email(
+        request.job_titles,
+        request.job_type,
+        request.recruiter,
+        None,
+        request.job_url,
+        resume_digest=resume_digest,
+    ))
 
 
-@router.post("/outreach/email/send")
+@router.post("/outreach/email/send", status_code=202)
 async def send_email_endpoint(
     request: SendEmailRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Send email using the user's linked email account."""
-    try:
-        # Get user's default active email account
-        result = await db.execute(
-            select(EmailAccount)
-            .where(EmailAccount.owner_id == current_user.id)
-            .where(EmailAccount.is_active == True)
-            .where(EmailAccount.is_default == True)
-            .limit(1)
+    """
+    Queue an email from the user's linked email account.
+    
+    Returns 202 with the outbox entry; an outbox worker sends it, records
+    history and updates stats (poll GET /outbox/{id} for the outcome).
+    """
+    email_account = await get_sending_account(current_user.id, db)
+    if not email_account:
+        raise HTTPException(
+            status_code=400,
+            detail="No linked email account found. Please link an email account in Settings."
         )
-        email_account = result.scalar_one_or_none()
-        
-        # If no default, get any active account
-        if not email_account:
-            result = await db.execute(
-                select(EmailAccount)
-                .where(EmailAccount.owner_id == current_user.id)
-                .where(EmailAccount.is_active == True)
-                .limit(1)
-            )
-            email_account = result.scalar_one_or_none()
-        
-        if not email_account:
-            raise HTTPException(
-                status_code=400,
-                detail="No linked email account found. Please link an email account in Settings."
-            )
-        
-        # Update last_used_at
-        from datetime import datetime
-        email_account.last_used_at = datetime.utcnow()
-        await db.commit()
-        
-        result = await send_email(
-            request.to,
-            request.subject,
-            request.body,
-            email_account=email_account,
-            db=db
+    
+    message = enqueue_email(
+        db,
+        current_user.id,
+        request.to,
+        request.subject,
+        request.body,
+        email_account_id=email_account.id,
+        recipient_name=request.recipient_name,
+        job_title=request.job_title,
+        company_name=request.company_name
+    )
+    await db.commit()
+    outbox_workers.wake()
+    
+    return {"success": True, "queued": True, "outbox": outbox_status(message)}
+
+
+async def _launch_campaign(
+    request: Union[EmailOnlyCampaignRequest, DualOutreachCampaignRequest],
+    channels: List[str],
+    current_user: User,
+    db: AsyncSession
+) -> dict:
+    """Store the campaign and its recipients, then start it on the campaign engine."""
+    from app.core.config import settings
+    
+    if not request.recruiters:
+        raise HTTPException(status_code=400, detail="At least one recruiter is required")
+    if len(request.recruiters) > settings.campaign_max_recipients:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A campaign can have at most {settings.campaign_max_recipients} recruiters"
         )
-        
-        # If successful, create permanent history record and increment stats
-        if result.get("success"):
-            from app.db.models.outreach_history import OutreachHistory
-            from datetime import datetime
-            
-            # Create permanent history record
-            history = OutreachHistory(
-                user_id=current_user.id,
-                recipient_name=request.recipient_name,
-                recipient_email=request.to,
-                job_title=request.job_title,
-                company_name=request.company_name,
-                channel="email",
-                email_subject=request.subject,
-                email_body=request.body,
-                sent_at=datetime.utcnow()
-            )
-            db.add(history)
-            await db.commit()
-            
-            # Increment stats
-            from app.services.user_settings_service import increment_emails_sent
-            try:
-                await increment_emails_sent(current_user.id, db)
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f"Failed to increment email stats: {e}")
-        
-        # Ensure we return the proper format
-        return result
-        
-    except HTTPException:
-        # Re-raise HTTP exceptions as-is
-        raise
-    except Exception as e:
-        # Log the error and return a proper error response
-        import traceback
-        print(f"Error sending email: {str(e)}")
-        print(traceback.format_exc())
+    if request.timezone and not resolve_timezone(request.timezone):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {request.timezone}")
+    if not await get_sending_account(current_user.id, db):
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to send email: {str(e)}"
+            status_code=400,
+            detail="No linked email account found. Please link an email account in Settings."
         )
+    
+    campaign = await create_campaign(
+        db,
+        current_user.id,
+        request.recruiters,
+        request.job_titles,
+        request.job_type,
+        channels,
+        name=request.name,
+        timezone=request.timezone
+    )
+    await db.commit()
+    campaign_engine.launch(campaign.id)
+    
+    return {"success": True, "campaign": await campaign_progress(db, campaign)}
 
 
-@router.post("/outreach/campaign/email-only")
+@router.post("/outreach/campaign/email-only", status_code=202)
 async def email_only_campaign(
     request: EmailOnlyCampaignRequest,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Execute email-only outreach campaign."""
-    # TODO: In production, track campaign in DB and use background tasks properly
-    summary = await email_only_outreach(
-        request.recruiters,
-        request.job_titles,
-        request.job_type
-    )
-    return summary
+    """
+    Start an email-only outreach campaign.
+    
+    Returns 202 with the campaign; the campaign engine enriches, writes and
+    sends in the background (poll GET /campaigns/{id} for progress).
+    """
+    return await _launch_campaign(request, ["email"], current_user, db)
 
 
-@router.post("/outreach/campaign/dual")
+@router.post("/outreach/campaign/dual", status_code=202)
 async def dual_outreach_campaign(
     request: DualOutreachCampaignRequest,
-    background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Execute enhanced dual outreach campaign."""
-    # TODO: In production, track campaign in DB and use background tasks properly
-    summary = await enhanced_dual_outreach(
-        request.recruiters,
-        request.job_titles,
-        request.job_type
-    )
-    return summary
+    """Start an outreach campaign sending both an email and a LinkedIn invitation (see email-only)."""
+    return await _launch_campaign(request, ["email", "linkedin"], current_user, db)
 
 
 class GenerateLinkedInMessageRequest(BaseModel):
@@ -226,141 +262,88 @@ class SendLinkedInInvitationRequest(BaseModel):
 @router.post("/outreach/linkedin/generate")
 async def generate_linkedin_message_endpoint(
     request: GenerateLinkedInMessageRequest,
+    http_request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Generate LinkedIn message for a recruiter-job pair."""
+    """Generate LinkedIn message for a recruiter-job pair (cancelled if the client disconnects)."""
     try:
-        # Get resume content from database (user's edited version)
-        resume_content = await get_resume_content_from_db(current_user.id, db)
+        # Resume digest of the user's edited resume (prepared once per content hash)
+        resume_digest = await get_resume_digest(current_user.id, db)
         
-        message = await generate_linkedin_message(
+        result = await cancel_on_disconnect(http_request, generate_linkedin_message(
             request.recruiter,
             request.job_title,
             request.company_name,
-            resume_content=resume_content,
             resume_file=request.resume_file,  # Fallback if DB content not available
             user_id=current_user.id,  # Pass user_id to fetch premium status
-            db=db  # Pass db session to fetch premium status
-        )
+            db=db,  # Pass db session to fetch premium status
+            return_details=True,
+            resume_digest=resume_digest
+        ))
         return {
-            "message": message,
-            "length": len(message)
+            "message": result.text,
+            "length": len(result.text),
+            "attempts": result.attempts,
+            "candidates": result.candidates,
+            "adjustments": result.adjustments,
         }
+    except (ClientDisconnectedError, LLMTimeoutError):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Message generation failed: {str(e)}")
 
 
-@router.post("/outreach/linkedin/send")
+@router.post("/outreach/linkedin/generate/stream")
+async def stream_linkedin_message_endpoint(
+    request: GenerateLinkedInMessageRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Generate a LinkedIn message, streamed as Server-Sent Events.
+    
+    Events (JSON in ``data:``): ``token`` with ``text`` as the model writes;
+    ``retry`` when no candidate fitted the length and a re-prompt starts; then
+    ``final`` with the length-checked ``message``, ``length``, ``attempts``,
+    ``candidates`` and ``adjustments``; or ``error`` with ``status`` and ``error``.
+    """
+    resume_digest = await get_resume_digest(current_user.id, db)
+    
+    return _sse_response(stream_linkedin_message(
+        request.recruiter,
+        request.job_title,
+        request.company_name,
+        resume_file=request.resume_file,
+        user_id=current_user.id,
+        db=db,
+        resume_digest=resume_digest
+    ))
+
+
+@router.post("/outreach/linkedin/send", status_code=202)
 async def send_linkedin_invitation_endpoint(
     request: SendLinkedInInvitationRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ) -> dict:
-    """Send LinkedIn connection invitation. Uses LinkedIn OAuth if available, otherwise falls back to Unipile."""
-    import logging
-    logger = logging.getLogger(__name__)
+    """
+    Queue a LinkedIn connection invitation.
     
-    try:
-        # First, get the user's active Unipile account ID (needed for URL conversion)
-        from app.db.models.linkedin_account import LinkedInAccount
-        from sqlalchemy import select
-        from app.core.config import settings
-        
-        unipile_account_id = None
-        result = await db.execute(
-            select(LinkedInAccount)
-            .where(LinkedInAccount.owner_id == current_user.id)
-            .where(LinkedInAccount.is_active == True)
-            .where(LinkedInAccount.unipile_account_id.isnot(None))
-            .order_by(LinkedInAccount.is_default.desc(), LinkedInAccount.created_at.desc())
-            .limit(1)
-        )
-        linkedin_account = result.scalar_one_or_none()
-        
-        if linkedin_account and linkedin_account.unipile_account_id:
-            unipile_account_id = linkedin_account.unipile_account_id
-            logger.info(f"Using user's Unipile account for URL conversion: {unipile_account_id}")
-        else:
-            # Fall back to default
-            unipile_account_id = settings.unipile_account_id
-            logger.info(f"Using default Unipile account for URL conversion: {unipile_account_id}")
-        
-        # Convert LinkedIn URL to provider_id using Unipile
-        from app.services.unified_messenger.adapter import linkedin_url_to_provider_id
-        logger.info(f"Converting LinkedIn URL to provider_id: {request.linkedin_url}")
-        provider_result = await linkedin_url_to_provider_id(request.linkedin_url, account_id=unipile_account_id)
-        provider_id = provider_result.get("provider_id")
-        
-        if not provider_id:
-            error_msg = provider_result.get("error", "Could not convert LinkedIn URL to Provider ID")
-            logger.error(f"Failed to convert LinkedIn URL to provider_id: {request.linkedin_url}. Error: {error_msg}")
-            raise HTTPException(
-                status_code=404, 
-                detail=f"{error_msg}. Please check the LinkedIn URL is valid and try again."
-            )
-        
-        logger.info(f"Successfully converted to provider_id: {provider_id}")
-        
-        # Use the send_invitation function which handles OAuth fallback
-        from app.services.unified_messenger.adapter import send_invitation
-        logger.info(f"Sending LinkedIn invitation to provider_id: {provider_id} for user: {current_user.id}")
-        result = await send_invitation(
-            provider_id,
-            request.message,
-            user_id=current_user.id,
-            db=db,
-            linkedin_url=request.linkedin_url
-        )
-        
-        # Check if the result indicates failure
-        if not result.get("success", False):
-            error_msg = result.get("error", "Unknown error")
-            logger.error(f"Failed to send LinkedIn invitation: {error_msg}")
-            # Return proper error response
-            raise HTTPException(
-                status_code=400,
-                detail=error_msg
-            )
-        
-        logger.info(f"Successfully sent LinkedIn invitation")
-        
-        # If successful, create permanent history record and increment stats
-        if result.get("success"):
-            from app.db.models.outreach_history import OutreachHistory
-            from datetime import datetime
-            
-            # Create permanent history record
-            history = OutreachHistory(
-                user_id=current_user.id,
-                recipient_name=request.recipient_name,
-                recipient_linkedin_url=request.linkedin_url,
-                job_title=request.job_title,
-                company_name=request.company_name,
-                channel="linkedin",
-                linkedin_message=request.message,
-                sent_at=datetime.utcnow()
-            )
-            db.add(history)
-            await db.commit()
-            
-            # Increment stats
-            from app.services.user_settings_service import increment_linkedin_invites
-            try:
-                await increment_linkedin_invites(current_user.id, db)
-            except Exception as e:
-                logger.warning(f"Failed to increment LinkedIn stats: {e}")
-        
-        return result
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error sending LinkedIn invitation: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Invitation sending failed: {str(e)}"
-        )
-
+    Returns 202 with the outbox entry; an outbox worker resolves the profile,
+    sends via the user's Unipile account (or the default), records history and
+    updates stats (poll GET /outbox/{id} for the outcome).
+    """
+    message = enqueue_linkedin(
+        db,
+        current_user.id,
+        request.linkedin_url,
+        request.message,
+        recipient_name=request.recipient_name,
+        job_title=request.job_title,
+        company_name=request.company_name
+    )
+    await db.commit()
+    outbox_workers.wake()
+    
+    return {"success": True, "queued": True, "outbox": outbox_status(message)}
@@ -1,6 +1,8 @@
 """Resume upload endpoints."""
+import hashlib
 import os
 import shutil
+import uuid
 from pathlib import Path
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
@@ -12,6 +14,7 @@ from app.db.models.user import User
 from app.db.models.resume_content import ResumeContent
 from app.db.base import get_db
 from app.services.unified_messenger.clients import get_messenger
+from app.services.resume_digest_service import clear_resume_digest
 
 router = APIRouter()
 
@@ -23,6 +26,21 @@ class ResumeContentUpdate(BaseModel):
 RESUMES_DIR = Path("uploads/resumes")
 RESUMES_DIR.mkdir(parents=True, exist_ok=True)
 
+MAX_RESUME_SIZE = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _publish_compat_path(file_path: Path, compat_path: Path) -> None:
+    """Expose the upload at a legacy location via a hard link (copy only if linking fails)."""
+    compat_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if compat_path.exists() and os.path.samefile(file_path, compat_path):
+            return
+        compat_path.unlink(missing_ok=True)
+        os.link(file_path, compat_path)
+    except OSError:
+        shutil.copyfile(file_path, compat_path)
+
 
 @router.post("/resume/upload")
 async def upload_resume(
@@ -30,59 +48,85 @@ async def upload_resume(
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Upload a resume PDF file."""
+    """
+    Upload a resume PDF file.
+    
+    The file is streamed to disk while its SHA-256 is computed. If it matches
+    the PDF the stored resume content was parsed from, extraction and the LLM
+    parse are skipped; otherwise the text is extracted in the CPU pool and
+    parsed once (bullets are derived from the structured data).
+    """
+    from app.services.cpu_pool import cpu_pool
+    from app.services.executors import LLM, run_in_executor
+    from app.services.unified_messenger.resume_message_generator import extract_pdf_text
+    from app.services.unified_messenger.resume_parser import ResumeParser
     
     # Validate file type
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
     
-    # Validate file size (10MB limit)
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File size must be less than 10MB")
-    
     # Save file with user-specific name
     # Use a standard name so it can be found later
     filename = "Resume-Tulsi,Shreyas.pdf"  # Keep same name for compatibility
     file_path = RESUMES_DIR / filename
     
-    # Save the file
-    with open(file_path, "wb") as buffer:
-        buffer.write(contents)
+    # Stream to a temp file, hashing as we go; enforce the 10MB limit without buffering the upload
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = RESUMES_DIR / f".{filename}.{uuid.uuid4().hex}.part"
+    try:
+        with open(tmp_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_RESUME_SIZE:
+                    raise HTTPException(status_code=400, detail="File size must be less than 10MB")
+                digest.update(chunk)
+                buffer.write(chunk)
+        os.replace(tmp_path, file_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    pdf_hash = digest.hexdigest()
+    
+    # Existing code looks for the PDF in ananya/ and backend/ as well; link rather than copy
+    for compat_dir in (Path("ananya"), Path("backend")):
+        try:
+            _publish_compat_path(file_path, compat_dir / filename)
+        except OSError as e:
+            print(f"⚠️  Could not publish resume to {compat_dir}: {e}")
+    
+    result = await db.execute(
+        select(ResumeContent).where(ResumeContent.owner_id == current_user.id)
+    )
+    existing = result.scalar_one_or_none()
     
-    # Also save to ananya folder for compatibility with existing code
-    ananya_path = Path("ananya") / filename
-    ananya_path.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(file_path, ananya_path)
+    messenger = get_messenger()
+    if messenger and messenger.resume_generator:
+        # The user's resume changed; drop only their cached text
+        messenger.resume_generator.clear_resume_cache(current_user.id)
     
-    # Also save to backend root for immediate access
-    backend_path = Path("backend") / filename
-    backend_path.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(file_path, backend_path)
+    if existing and existing.content and existing.pdf_hash == pdf_hash:
+        print(f"✅ Resume PDF unchanged ({pdf_hash[:12]}), keeping parsed content for user {current_user.id}")
+        return {
+            "message": "Resume uploaded successfully",
+            "filename": filename,
+            "size": size,
+            "path": str(file_path),
+            "content_extracted": True,
+            "content_length": len(existing.content),
+            "parsed": False,
+        }
     
-    # Extract resume content from PDF and parse into key bullets
+    # Extract resume content from PDF and parse it once into structured data and key bullets
     extracted_content = None
+    structured_data = None
     try:
-        messenger = get_messenger()
-        if messenger and messenger.resume_generator:
-            # First, load raw text from PDF
-            raw_resume_content = messenger.resume_generator.load_resume(str(file_path))
-            print(f"✅ Loaded raw resume content ({len(raw_resume_content)} characters)")
-            
-            # Then, extract key bullets using ResumeParser
-            from app.services.unified_messenger.resume_parser import ResumeParser
-            resume_parser = ResumeParser()
-            extracted_content = resume_parser.extract_key_bullets(raw_resume_content)
-            print(f"✅ Extracted resume bullets ({len(extracted_content)} characters)")
-            
-            # Also extract structured data (parse once and store)
-            structured_data = resume_parser.extract_structured_data(raw_resume_content)
-            print(f"✅ Parsed resume into structured data:")
-            import json
-            print(json.dumps(structured_data, indent=2))
-            
-            # Clear cache so it doesn't interfere
-            messenger.resume_generator.clear_resume_cache()
+        raw_resume_content, page_count = await cpu_pool.run(extract_pdf_text, str(file_path))
+        print(f"✅ Loaded raw resume content ({len(raw_resume_content)} characters, {page_count} pages)")
+        
+        structured_data, extracted_content = await run_in_executor(
+            LLM, ResumeParser().parse_resume, raw_resume_content
+        )
+        print(f"✅ Parsed resume into structured data and bullets ({len(extracted_content)} characters)")
     except Exception as e:
         print(f"⚠️  Could not extract resume content: {e}")
         import traceback
@@ -92,17 +136,12 @@ async def upload_resume(
     # Save or update resume content in database
     if extracted_content:
         try:
-            # Check if resume content already exists for this user
-            result = await db.execute(
-                select(ResumeContent).where(ResumeContent.owner_id == current_user.id)
-            )
-            existing = result.scalar_one_or_none()
-            
             if existing:
                 # Update existing content and structured data
                 existing.content = extracted_content
-                existing.structured_data = structured_data if 'structured_data' in locals() else None
-                from datetime import datetime
+                existing.structured_data = structured_data
+                existing.pdf_hash = pdf_hash
+                clear_resume_digest(existing)
                 existing.updated_at = datetime.utcnow()
                 print(f"✅ Updated existing resume content for user {current_user.id}")
             else:
@@ -110,7 +149,8 @@ async def upload_resume(
                 resume_content = ResumeContent(
                     owner_id=current_user.id,
                     content=extracted_content,
-                    structured_data=structured_data if 'structured_data' in locals() else None
+                    structured_data=structured_data,
+                    pdf_hash=pdf_hash,
                 )
                 db.add(resume_content)
                 print(f"✅ Created new resume content for user {current_user.id}")
@@ -125,10 +165,11 @@ async def upload_resume(
     return {
         "message": "Resume uploaded successfully",
         "filename": filename,
-        "size": len(contents),
+        "size": size,
         "path": str(file_path),
         "content_extracted": extracted_content is not None,
-        "content_length": len(extracted_content) if extracted_content else 0
+        "content_length": len(extracted_content) if extracted_content else 0,
+        "parsed": extracted_content is not None,
     }
 
 
@@ -188,6 +229,9 @@ async def update_resume_content(
         # Update existing
         resume_content.content = request.content
         resume_content.structured_data = structured_data
+        clear_resume_digest(resume_content)
+        # Edited content no longer matches the uploaded PDF; re-uploading it must re-parse
+        resume_content.pdf_hash = None
         from datetime import datetime
         resume_content.updated_at = datetime.utcnow()
     
@@ -305,7 +349,10 @@ async def get_structured_resume_data(
         if not messenger or not messenger.resume_generator:
             raise HTTPException(status_code=500, detail="Resume generator not available")
         
-        raw_resume_content = messenger.resume_generator.load_resume(str(pdf_path))
+        from app.services.executors import CPU, run_in_executor
+        raw_resume_content = await run_in_executor(
+            CPU, messenger.resume_generator.load_resume, str(pdf_path), current_user.id
+        )
         
         # Parse structured data
         from app.services.unified_messenger.resume_parser import ResumeParser
@@ -1,7 +1,7 @@
 """Search endpoints."""
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.db.models.user import User
@@ -13,6 +13,14 @@ from app.services.unified_messenger.adapter import (
     map_jobs_to_recruiters,
     filter_jobs
 )
+from app.services.unified_messenger.recruiter_matching import ASSIGNMENT_GREEDY, ASSIGNMENT_MODES
+from app.services.unified_messenger.scoring_spec import (
+    DEFAULT_SCORING_SPEC,
+    ScoringSpecError,
+    compile_scoring_spec,
+    resolve_scoring_spec,
+)
+from app.services.user_settings_service import get_or_create_user_settings, set_recruiter_scoring_spec
 
 router = APIRouter()
 
@@ -43,6 +51,13 @@ class MapRequest(BaseModel):
     jobs: List[dict]
     recruiters: List[dict]
     max_pairs: Optional[int] = 5
+    debug_scoring: Optional[bool] = False
+    assignment: Optional[str] = "greedy"  # "greedy" or "optimal"
+    scoring_spec: Optional[Dict[str, Any]] = None  # One-off override of the user's scoring rules
+
+
+class ScoringSpecRequest(BaseModel):
+    spec: Optional[Dict[str, Any]] = None  # None reverts to the default rules
 
 
 class FilterJobsRequest(BaseModel):
@@ -120,14 +135,14 @@ async def filter_jobs_endpoint(
             logger.error("❌ DEBUG: No jobs in request")
             raise HTTPException(status_code=400, detail="No jobs provided in request")
         
-        # Get resume content from database (user's edited version)
-        from app.services.unified_messenger.resume_content_loader import get_resume_content_from_db
-        resume_content = await get_resume_content_from_db(current_user.id, db)
+        # Rank against the digest of the user's edited resume (prepared once per content hash)
+        from app.services.resume_digest_service import get_resume_digest
+        resume_digest = await get_resume_digest(current_user.id, db)
         
         result = await filter_jobs(
             request.jobs,
             request.resume_file,
-            resume_content
+            resume_digest.short_form if resume_digest else None
         )
         
         logger.info(f"🔍 DEBUG: filter_jobs returned. Has error: {'error' in result}, Has filtered_jobs: {'filtered_jobs' in result}")
@@ -154,7 +169,8 @@ async def filter_jobs_endpoint(
 @router.post("/search/map")
 async def map_jobs_to_recruiters_endpoint(
     request: MapRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ) -> dict:
     """Map jobs to best recruiters."""
     import logging
@@ -176,6 +192,19 @@ async def map_jobs_to_recruiters_endpoint(
             logger.error("❌ DEBUG: No recruiters provided in request")
             raise HTTPException(status_code=400, detail="No recruiters provided. Please search for recruiters first.")
         
+        assignment = request.assignment or ASSIGNMENT_GREEDY
+        if assignment not in ASSIGNMENT_MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown assignment mode '{assignment}'. Expected one of: {', '.join(ASSIGNMENT_MODES)}"
+            )
+        
+        user_settings = await get_or_create_user_settings(current_user.id, db)
+        try:
+            scoring_spec = resolve_scoring_spec(request.scoring_spec, user_settings.recruiter_scoring_spec)
+        except ScoringSpecError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid scoring spec: {e}")
+        
         # Log first job and recruiter structure for debugging
         if request.jobs:
             logger.info(f"🔍 DEBUG: First job structure: {list(request.jobs[0].keys()) if isinstance(request.jobs[0], dict) else type(request.jobs[0])}")
@@ -188,7 +217,10 @@ async def map_jobs_to_recruiters_endpoint(
         result = await map_jobs_to_recruiters(
             request.jobs,
             request.recruiters,
-            request.max_pairs
+            request.max_pairs,
+            debug_scoring=bool(request.debug_scoring),
+            assignment=assignment,
+            scoring_spec=scoring_spec
         )
         
         logger.info(f"🔍 DEBUG: map_jobs_to_recruiters returned")
@@ -215,3 +247,41 @@ async def map_jobs_to_recruiters_endpoint(
             detail=f"Mapping failed: {str(e)}. Check server logs for details.",
             headers={"X-Debug-Traceback": traceback_str}
         )
+
+
+@router.get("/search/scoring-spec")
+async def get_scoring_spec_endpoint(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Get the recruiter scoring rules used for this user's mappings."""
+    user_settings = await get_or_create_user_settings(current_user.id, db)
+    return {
+        "spec": user_settings.recruiter_scoring_spec,
+        "source": "user" if user_settings.recruiter_scoring_spec else "default",
+        "default_spec": DEFAULT_SCORING_SPEC,
+    }
+
+
+@router.put("/search/scoring-spec")
+async def update_scoring_spec_endpoint(
+    request: ScoringSpecRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Validate and save the user's recruiter scoring rules (null resets to the default)."""
+    if request.spec:
+        try:
+            compiled = compile_scoring_spec(request.spec)
+        except ScoringSpecError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid scoring spec: {e}")
+        rule_names = compiled.rule_names
+    else:
+        rule_names = []
+
+    user_settings = await set_recruiter_scoring_spec(current_user.id, request.spec or None, db)
+    return {
+        "success": True,
+        "spec": user_settings.recruiter_scoring_spec,
+        "rules": rule_names,
+    }
@@ -1,10 +1,13 @@
 """Email templates endpoints."""
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
-from typing import Optional, List
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.api.deps import get_current_user
+from app.core.config import settings
 from app.db.base import get_db
 from app.db.models.user import User
 from app.db.models.email_template import EmailTemplate
@@ -19,6 +22,23 @@ class CreateTemplateRequest(BaseModel):
     variables: Optional[dict] = None
 
 
+class UpdateTemplateRequest(BaseModel):
+    name: Optional[str] = None
+    subject: Optional[str] = None
+    body_markdown: Optional[str] = None
+    variables: Optional[dict] = None
+
+
+class TemplateMergeRequest(BaseModel):
+    recipients: List[Dict[str, Any]]  # Recruiter objects (name, company, email/extracted_email, job_url, job_title)
+    job_title: Optional[str] = None  # Used for recipients without a job_title
+    job_type: Optional[str] = "full_time"
+    personalize: bool = False  # Generate the {{ personalized_sentence }} slot (one model call per recipient)
+    save_drafts: bool = False
+    # Concurrent model calls when personalizing; defaults to DRAFT_BATCH_CONCURRENCY
+    concurrency: Optional[int] = Field(default=None, ge=1, le=settings.draft_batch_max_concurrency)
+
+
 class TemplateResponse(BaseModel):
     id: int
     name: str
@@ -87,3 +107,165 @@ async def create_template(
         "created_at": template.created_at.isoformat() if template.created_at else None
     }
 
+
+
+async def _get_owned_template(template_id: int, user_id: str, db: AsyncSession) -> EmailTemplate:
+    result = await db.execute(
+        select(EmailTemplate)
+        .where(EmailTemplate.id == template_id)
+        .where(EmailTemplate.owner_id == user_id)
+    )
+    template = result.scalar_one_or_none()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return template
+
+
+@router.put("/email/templates/{template_id}")
+async def update_template(
+    template_id: int,
+    request: UpdateTemplateRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """Update an email template (recompiled on next use)."""
+    import json
+    
+    template = await _get_owned_template(template_id, current_user.id, db)
+    
+    if request.name is not None:
+        template.name = request.name
+    if request.subject is not None:
+        template.subject = request.subject
+    if request.body_markdown is not None:
+        template.body_markdown = request.body_markdown
+    if request.variables is not None:
+        template.variables = json.dumps(request.variables) if request.variables else None
+    
+    template.updated_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(template)
+    
+    return {
+        "id": template.id,
+        "name": template.name,
+        "subject": template.subject,
+        "body_markdown": template.body_markdown,
+        "variables": json.loads(template.variables) if template.variables else None,
+        "created_at": template.created_at.isoformat() if template.created_at else None,
+        "updated_at": template.updated_at.isoformat() if template.updated_at else None
+    }
+
+
+@router.post("/email/templates/{template_id}/merge")
+async def merge_template_endpoint(
+    template_id: int,
+    request: TemplateMergeRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> dict:
+    """
+    Render a template for many recipients without the LLM (mail merge).
+    
+    Placeholders ({{ recruiter_first_name }}, {{ company_name }},
+    {{ matching_skills }}, {{ sender_name }}, ...) are filled from each
+    recipient, the stored job context of its job_url and the resume digest.
+    With personalize, the {{ personalized_sentence }} slot gets one generated
+    sentence per recipient. With save_drafts, the emails are saved as drafts
+    in one INSERT.
+    """
+    from app.services.draft_generation_service import insert_drafts
+    from app.services.job_context_service import get_job_contexts_by_urls, job_context_to_dict
+    from app.services.resume_digest_service import get_resume_digest
+    from app.services.template_engine import TEMPLATE_VARIABLES, get_compiled_template, merge_template
+    
+    if not request.recipients:
+        raise HTTPException(status_code=400, detail="recipients must contain at least one recruiter")
+    if len(request.recipients) > settings.template_merge_max_recipients:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many recipients ({len(request.recipients)}); the limit is {settings.template_merge_max_recipients}"
+        )
+    
+    template = await _get_owned_template(template_id, current_user.id, db)
+    compiled = get_compiled_template(template)
+    
+    personalize = request.personalize and compiled.has_personalized_slot
+    if personalize and len(request.recipients) > settings.template_merge_max_personalized:
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Too many recipients to personalize ({len(request.recipients)}); "
+                f"the limit is {settings.template_merge_max_personalized}"
+            )
+        )
+    
+    resume_digest = await get_resume_digest(current_user.id, db)
+    if personalize and not resume_digest:
+        raise HTTPException(status_code=404, detail="No resume content found. Please upload a resume first.")
+    
+    job_urls = {r.get('job_url') for r in request.recipients if r.get('job_url')}
+    records = await get_job_contexts_by_urls(db, list(job_urls)) if job_urls else {}
+    job_contexts = {url: job_context_to_dict(record) for url, record in records.items()}
+    
+    started = time.perf_counter()
+    try:
+        rendered = await merge_template(
+            compiled,
+            request.recipients,
+            job_contexts,
+            resume_digest,
+            request.job_title,
+            request.job_type,
+            personalize=request.personalize,
+            concurrency=min(request.concurrency or settings.draft_batch_concurrency, settings.draft_batch_max_concurrency),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    render_ms = (time.perf_counter() - started) * 1000
+    
+    emails = [
+        {
+            "index": index,
+            "recipient_name": recipient.get('name'),
+            "recipient_email": recipient.get('extracted_email') or recipient.get('email'),
+            "subject": email.subject,
+            "body": email.body,
+            "missing": email.missing,
+        }
+        for index, (recipient, email) in enumerate(zip(request.recipients, rendered))
+    ]
+    
+    draft_ids = None
+    if request.save_drafts:
+        rows = [
+            {
+                'owner_id': current_user.id,
+                'draft_type': 'email',
+                'recipient_name': recipient.get('name'),
+                'recipient_email': recipient.get('extracted_email') or recipient.get('email'),
+                'recipient_linkedin_url': recipient.get('profile_url'),
+                'email_subject': email.subject,
+                'email_body': email.body,
+                'job_title': recipient.get('job_title') or request.job_title,
+                'company_name': recipient.get('company') or recipient.get('company_name'),
+                'recruiter_info': recipient,
+            }
+            for recipient, email in zip(request.recipients, rendered)
+        ]
+        try:
+            draft_ids = await insert_drafts(db, rows)
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=500, detail=f"Failed to save drafts: {e}")
+    
+    unknown = [name for name in compiled.variables if name not in TEMPLATE_VARIABLES and name not in compiled.defaults]
+    return {
+        "template_id": template.id,
+        "count": len(emails),
+        "render_ms": round(render_ms, 2),
+        "personalized": personalize,
+        "unknown_variables": unknown,
+        "emails": emails,
+        "draft_ids": draft_ids,
+    }
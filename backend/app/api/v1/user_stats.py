@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_current_user
 from app.db.models.user import User
 from app.db.base import get_db
+from app.services.outreach_stats_service import daily_activity, latest_attempts, reached_companies, reached_roles
 from app.services.user_settings_service import (
     get_or_create_user_stats,
     increment_linkedin_invites,
@@ -25,117 +26,13 @@ async def get_user_stats(
 ) -> dict:
     """Get user statistics for dashboard including latest attempts."""
     try:
-        from app.db.models.outreach_history import OutreachHistory
-        from sqlalchemy import select
-        
         user_stats = await get_or_create_user_stats(current_user.id, db)
         
-        # Get all outreach history records (we'll consolidate and limit later)
-        result = await db.execute(
-            select(OutreachHistory)
-            .where(OutreachHistory.user_id == current_user.id)
-            .order_by(OutreachHistory.sent_at.desc())
-        )
-        history_records = result.scalars().all()
-        
-        # Consolidate records by recipient + job + company
-        # If same person/job has both email and linkedin, combine into one entry
-        consolidated = {}
-        
-        for record in history_records:
-            # Create a key based on recipient, job, company
-            key = (
-                (record.recipient_name or "").lower().strip(),
-                (record.job_title or "").lower().strip(),
-                (record.company_name or "").lower().strip()
-            )
-            
-            if key in consolidated:
-                # Already have an entry for this person/job - combine channels
-                existing = consolidated[key]
-                
-                # Collect all channels
-                existing_channels = set(existing['channels'])
-                new_channel = record.channel
-                
-                # Add new channel(s)
-                if new_channel == 'both':
-                    existing_channels.add('email')
-                    existing_channels.add('linkedin')
-                else:
-                    existing_channels.add(new_channel)
-                
-                existing['channels'] = existing_channels
-                
-                # Keep the most recent timestamp
-                if record.sent_at > existing['sent_at']:
-                    existing['sent_at'] = record.sent_at
-            else:
-                # New entry
-                channels = set()
-                if record.channel == 'both':
-                    channels.add('email')
-                    channels.add('linkedin')
-                else:
-                    channels.add(record.channel)
-                
-                consolidated[key] = {
-                    'id': record.id,
-                    'sent_at': record.sent_at,
-                    'recruiter': record.recipient_name or "Unknown",
-                    'company': record.company_name or "Company",
-                    'title': record.job_title or "Position",
-                    'channels': channels
-                }
-        
-        # Convert to list and sort by timestamp
-        consolidated_list = sorted(
-            consolidated.values(),
-            key=lambda x: x['sent_at'],
-            reverse=True
-        )
-        
-        # Take top 20
-        consolidated_list = consolidated_list[:20]
-        
-        # Build latest attempts with consolidated data
-        latest_attempts = []
-        roles_reached = set()
-        companies_reached = set()
-        
-        for entry in consolidated_list:
-            # Format channel display
-            channels = sorted(entry['channels'])  # Sort for consistent display
-            if 'email' in channels and 'linkedin' in channels:
-                channel_display = "Email + LinkedIn"
-            elif 'email' in channels:
-                channel_display = "Email"
-            elif 'linkedin' in channels:
-                channel_display = "LinkedIn"
-            else:
-                channel_display = " + ".join([c.title() for c in channels])
-            
-            latest_attempts.append({
-                "id": entry['id'],
-                "time": entry['sent_at'].isoformat(),
-                "recruiter": entry['recruiter'],
-                "company": entry['company'],
-                "title": entry['title'],
-                "channel": channel_display,
-                "status": "sent"
-            })
-            
-            # Track unique roles reached
-            if entry['title'] and entry['title'] != "Position" and entry['company'] and entry['company'] != "Company":
-                roles_reached.add((entry['title'], entry['company']))
-            if entry['company'] and entry['company'] != "Company":
-                companies_reached.add(entry['company'])
-        
-        # Convert roles to list of dicts
-        roles_list = [
-            {"role": role, "company": company}
-            for role, company in roles_reached
-        ]
+        # Read from the incrementally maintained outreach summary
+        latest = await latest_attempts(db, current_user.id, limit=20)
+        companies = await reached_companies(db, current_user.id)
+        roles_list = await reached_roles(db, current_user.id)
+        activity = await daily_activity(db, current_user.id, days=30)
         
         return {
             "linkedin_invites_sent": user_stats.linkedin_invites_sent,
@@ -145,10 +42,11 @@ async def get_user_stats(
             "last_linkedin_invite_at": user_stats.last_linkedin_invite_at.isoformat() if user_stats.last_linkedin_invite_at else None,
             "last_email_sent_at": user_stats.last_email_sent_at.isoformat() if user_stats.last_email_sent_at else None,
             "last_application_at": user_stats.last_application_at.isoformat() if user_stats.last_application_at else None,
-            "latest_attempts": latest_attempts,
+            "latest_attempts": latest,
             "roles_reached_list": roles_list,
-            "unique_companies_reached": len(companies_reached),
-            "unique_companies_list": sorted(companies_reached),
+            "unique_companies_reached": len(companies),
+            "unique_companies_list": companies,
+            "daily_activity": activity,
         }
     except Exception as e:
         logger.error(f"Error getting user stats: {str(e)}")
@@ -38,11 +38,122 @@ class Settings:
     smtp_port: int = int(os.getenv("SMTP_PORT", "587"))
     smtp_username: str = os.getenv("SMTP_USERNAME", "")
     smtp_password: str = os.getenv("SMTP_PASSWORD", "")
+    
+    # SMTP session pool (see app.services.smtp_pool): sessions per (server, port, username)
+    # are reused; idle ones close after the timeout and are NOOP-checked before reuse
+    smtp_pool_idle_timeout_seconds: float = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT_SECONDS", "60"))
+    smtp_pool_noop_after_seconds: float = float(os.getenv("SMTP_POOL_NOOP_AFTER_SECONDS", "15"))
+    smtp_pool_max_messages_per_session: int = int(os.getenv("SMTP_POOL_MAX_MESSAGES_PER_SESSION", "50"))
+    smtp_pool_max_sessions_per_key: int = int(os.getenv("SMTP_POOL_MAX_SESSIONS_PER_KEY", "4"))
+    smtp_connect_timeout_seconds: float = float(os.getenv("SMTP_CONNECT_TIMEOUT_SECONDS", "30"))
+
+    # Gmail API / Microsoft Graph sending (see app.services.email_providers)
+    provider_http_max_connections: int = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "20"))
+    provider_send_concurrency: int = int(os.getenv("PROVIDER_SEND_CONCURRENCY", "8"))
+    gmail_batch_size: int = int(os.getenv("GMAIL_BATCH_SIZE", "50"))
     from_email: str = os.getenv("FROM_EMAIL", "")
     
     # OpenAI (for ResumeMessageGenerator)
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     
+    # CPU process pool (parsing, PDF extraction); 0 workers runs tasks inline
+    cpu_pool_workers: int = int(os.getenv("CPU_POOL_WORKERS", "2"))
+    cpu_pool_start_method: str = os.getenv("CPU_POOL_START_METHOD", "spawn")
+    
+    # Named thread pools per workload class (see app.services.executors).
+    # Rejection policy is "wait" (backpressure) or "reject" (HTTP 503).
+    upstream_io_workers: int = int(os.getenv("UPSTREAM_IO_WORKERS", "16"))
+    upstream_io_queue_limit: int = int(os.getenv("UPSTREAM_IO_QUEUE_LIMIT", "64"))
+    upstream_io_rejection_policy: str = os.getenv("UPSTREAM_IO_REJECTION_POLICY", "reject")
+    llm_workers: int = int(os.getenv("LLM_WORKERS", "8"))
+    llm_queue_limit: int = int(os.getenv("LLM_QUEUE_LIMIT", "32"))
+    llm_rejection_policy: str = os.getenv("LLM_REJECTION_POLICY", "wait")
+    smtp_workers: int = int(os.getenv("SMTP_WORKERS", "4"))
+    smtp_queue_limit: int = int(os.getenv("SMTP_QUEUE_LIMIT", "100"))
+    smtp_rejection_policy: str = os.getenv("SMTP_REJECTION_POLICY", "wait")
+    cpu_workers: int = int(os.getenv("CPU_WORKERS", "4"))
+    cpu_queue_limit: int = int(os.getenv("CPU_QUEUE_LIMIT", "16"))
+    cpu_rejection_policy: str = os.getenv("CPU_REJECTION_POLICY", "reject")
+    
+    # Async LLM calls: per-call timeout (0 disables) and how often request
+    # handlers check for a disconnected client to cancel generation
+    llm_call_timeout_seconds: float = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "45"))
+    llm_disconnect_poll_seconds: float = float(os.getenv("LLM_DISCONNECT_POLL_SECONDS", "0.5"))
+    
+    # Batch draft generation: concurrent model calls per batch (default and the
+    # most a request may ask for) and max pairs per request
+    draft_batch_concurrency: int = int(os.getenv("DRAFT_BATCH_CONCURRENCY", "4"))
+    draft_batch_max_concurrency: int = int(os.getenv("DRAFT_BATCH_MAX_CONCURRENCY", "8"))
+    draft_batch_max_items: int = int(os.getenv("DRAFT_BATCH_MAX_ITEMS", "100"))
+    
+    # Batch draft sending (POST /drafts/send-batch): sends in flight per account
+    draft_send_email_concurrency: int = int(os.getenv("DRAFT_SEND_EMAIL_CONCURRENCY", "4"))
+    draft_send_linkedin_concurrency: int = int(os.getenv("DRAFT_SEND_LINKEDIN_CONCURRENCY", "2"))
+    
+    # Outbox (see app.services.outbox): send endpoints enqueue rows that async
+    # workers claim with SELECT ... FOR UPDATE SKIP LOCKED. OUTBOX_WORKERS=0 runs
+    # no workers in the API process (use `python -m app.services.outbox` instead).
+    outbox_workers: int = int(os.getenv("OUTBOX_WORKERS", "4"))
+    outbox_batch_size: int = int(os.getenv("OUTBOX_BATCH_SIZE", "10"))
+    # Deliveries in flight across all workers (each holds a database connection)
+    outbox_send_concurrency: int = int(os.getenv("OUTBOX_SEND_CONCURRENCY", "8"))
+    outbox_poll_interval_seconds: float = float(os.getenv("OUTBOX_POLL_INTERVAL_SECONDS", "2"))
+    outbox_lock_timeout_seconds: float = float(os.getenv("OUTBOX_LOCK_TIMEOUT_SECONDS", "300"))
+    outbox_max_attempts: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "3"))
+    outbox_retry_backoff_seconds: float = float(os.getenv("OUTBOX_RETRY_BACKOFF_SECONDS", "30"))
+    # Minimum spacing between sends from one email account / one LinkedIn user
+    outbox_email_interval_seconds: float = float(os.getenv("OUTBOX_EMAIL_INTERVAL_SECONDS", "2"))
+    outbox_linkedin_interval_seconds: float = float(os.getenv("OUTBOX_LINKEDIN_INTERVAL_SECONDS", "10"))
+    
+    # OAuth token refresh (see app.services.token_refresh): the scheduler runs every
+    # interval (0 disables it) and refreshes tokens expiring within the lead time
+    token_refresh_interval_seconds: float = float(os.getenv("TOKEN_REFRESH_INTERVAL_SECONDS", "60"))
+    token_refresh_lead_seconds: float = float(os.getenv("TOKEN_REFRESH_LEAD_SECONDS", "600"))
+    token_refresh_concurrency: int = int(os.getenv("TOKEN_REFRESH_CONCURRENCY", "4"))
+    
+    # Campaign engine (see app.services.campaign_engine): recipients in flight per
+    # stage across all campaigns, claim batch, and retries of a failed stage
+    campaign_enrich_concurrency: int = int(os.getenv("CAMPAIGN_ENRICH_CONCURRENCY", "4"))
+    campaign_generate_concurrency: int = int(os.getenv("CAMPAIGN_GENERATE_CONCURRENCY", "4"))
+    campaign_send_concurrency: int = int(os.getenv("CAMPAIGN_SEND_CONCURRENCY", "2"))
+    campaign_claim_batch: int = int(os.getenv("CAMPAIGN_CLAIM_BATCH", "16"))
+    campaign_lock_timeout_seconds: float = float(os.getenv("CAMPAIGN_LOCK_TIMEOUT_SECONDS", "600"))
+    campaign_poll_interval_seconds: float = float(os.getenv("CAMPAIGN_POLL_INTERVAL_SECONDS", "2"))
+    campaign_max_attempts: int = int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", "3"))
+    campaign_retry_backoff_seconds: float = float(os.getenv("CAMPAIGN_RETRY_BACKOFF_SECONDS", "10"))
+    campaign_max_recipients: int = int(os.getenv("CAMPAIGN_MAX_RECIPIENTS", "500"))
+    
+    # Campaign send scheduling (see app.services.campaign_scheduler): per-account
+    # caps per channel (0 = unlimited), sending window in the recipient's local
+    # hours, and how often running campaigns are replanned
+    campaign_email_daily_cap: int = int(os.getenv("CAMPAIGN_EMAIL_DAILY_CAP", "100"))
+    campaign_email_hourly_cap: int = int(os.getenv("CAMPAIGN_EMAIL_HOURLY_CAP", "20"))
+    campaign_linkedin_daily_cap: int = int(os.getenv("CAMPAIGN_LINKEDIN_DAILY_CAP", "20"))
+    campaign_linkedin_hourly_cap: int = int(os.getenv("CAMPAIGN_LINKEDIN_HOURLY_CAP", "5"))
+    campaign_send_window_start_hour: int = int(os.getenv("CAMPAIGN_SEND_WINDOW_START_HOUR", "9"))
+    campaign_send_window_end_hour: int = int(os.getenv("CAMPAIGN_SEND_WINDOW_END_HOUR", "17"))
+    campaign_default_timezone: str = os.getenv("CAMPAIGN_DEFAULT_TIMEZONE", "UTC")
+    campaign_schedule_interval_seconds: float = float(os.getenv("CAMPAIGN_SCHEDULE_INTERVAL_SECONDS", "60"))
+    
+    # Template mail merge: max recipients per request, and per request that
+    # personalizes (one model call per recipient)
+    template_merge_max_recipients: int = int(os.getenv("TEMPLATE_MERGE_MAX_RECIPIENTS", "5000"))
+    template_merge_max_personalized: int = int(os.getenv("TEMPLATE_MERGE_MAX_PERSONALIZED", "100"))
+    
+    # Extracted resume text cache, keyed by (user, PDF hash): LRU bounded by
+    # the memory held by cached text and by entry count
+    resume_cache_max_bytes: int = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    resume_cache_max_entries: int = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "256"))
+    
+    # LinkedIn note length control: candidates requested per model call, and
+    # how many times to re-prompt when no candidate can be fitted locally
+    linkedin_message_candidates: int = int(os.getenv("LINKEDIN_MESSAGE_CANDIDATES", "3"))
+    linkedin_message_max_reprompts: int = int(os.getenv("LINKEDIN_MESSAGE_MAX_REPROMPTS", "1"))
+    
+    # Recruiter scoring rules: inline JSON or a path to a JSON file (see
+    # app.services.unified_messenger.scoring_spec); empty uses the built-in rules
+    recruiter_scoring_spec: str = os.getenv("RECRUITER_SCORING_SPEC", "")
+    
     # API
     api_v1_prefix: str = "/api/v1"
     cors_origins: list = None
@@ -3,6 +3,7 @@ from .user import User
 from .recruiter_contact import RecruiterContact
 from .outreach_attempt import OutreachAttempt
 from .campaign import Campaign
+from .campaign_recipient import CampaignRecipient
 from .email_template import EmailTemplate
 from .job import Job
 from .candidate import Candidate
@@ -16,12 +17,17 @@ from .draft import Draft
 from .user_settings import UserSettings
 from .user_stats import UserStats
 from .outreach_history import OutreachHistory
+from .outbox_message import OutboxMessage
+from .outreach_summary_entry import OutreachSummaryEntry
+from .outreach_reached import OutreachReached
+from .outreach_daily_count import OutreachDailyCount
 
 __all__ = [
     "User",
     "RecruiterContact",
     "OutreachAttempt",
     "Campaign",
+    "CampaignRecipient",
     "EmailTemplate",
     "Job",
     "Candidate",
@@ -35,5 +41,9 @@ __all__ = [
     "UserSettings",
     "UserStats",
     "OutreachHistory",
+    "OutboxMessage",
+    "OutreachSummaryEntry",
+    "OutreachReached",
+    "OutreachDailyCount",
 ]
 
@@ -1,7 +1,8 @@
 """Campaign model."""
-from sqlalchemy import String, ForeignKey, DateTime, Text, Integer
+from sqlalchemy import String, ForeignKey, DateTime, Text, Integer, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from datetime import datetime
+from typing import Optional, Dict, Any
 from app.db.base import Base
 
 
@@ -18,6 +19,13 @@ class Campaign(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     owner_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False)
     
+    # Run settings and progress (see app.services.campaign_engine)
+    channels: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # "email" or "email,linkedin"
+    parameters: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)  # job_titles, job_type
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    
     def __repr__(self):
         return f"<Campaign(id={self.id}, name={self.name}, status={self.status})>"
-
@@ -0,0 +1,60 @@
+"""Campaign recipient model - per-recipient progress of a campaign run."""
+from datetime import datetime
+from typing import Optional, Dict, Any
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class CampaignRecipient(Base):
+    """
+    One recruiter of a campaign and how far the campaign engine got with them.
+
+    Stage is the next step to run: 'enrich' -> 'generate' -> 'send' -> 'done'.
+    Each completed stage is committed, so a paused or interrupted campaign
+    resumes where it stopped. Rows are claimed with SELECT ... FOR UPDATE
+    SKIP LOCKED (see app.services.campaign_engine).
+    Status once done: 'sent', 'partial' (one channel failed), 'failed' or 'skipped'.
+    """
+    __tablename__ = "campaign_recipients"
+    __table_args__ = (
+        Index("ix_campaign_recipients_campaign_stage", "campaign_id", "stage"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    campaign_id: Mapped[int] = mapped_column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False)
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # Recruiter as submitted, plus the fields the stages use
+    recruiter: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False)
+    name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    email: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    linkedin_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    job_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    job_title: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    company_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    timezone: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # IANA name for the sending window
+
+    # Progress
+    stage: Mapped[str] = mapped_column(String, nullable=False, default="enrich")
+    status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
+    email_status: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # 'sending', 'sent', 'failed', 'skipped'
+    linkedin_status: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Generated content
+    email_subject: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    email_body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    linkedin_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Planned send slot (see app.services.campaign_scheduler); the send stage waits for it
+    scheduled_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<CampaignRecipient(id={self.id}, campaign_id={self.campaign_id}, stage={self.stage}, status={self.status})>"
@@ -16,6 +16,7 @@ class EmailTemplate(Base):
     body_markdown: Mapped[Text] = mapped_column(Text, nullable=False)
     variables: Mapped[str] = mapped_column(Text)  # JSON string of variables
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Compiled-template cache key
     owner_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False)
     
     def __repr__(self):
@@ -0,0 +1,54 @@
+"""Outbox model - queued outreach sends processed by the outbox workers."""
+from datetime import datetime
+from typing import Optional, Dict, Any
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class OutboxMessage(Base):
+    """
+    One queued send (an email or a LinkedIn invitation).
+
+    Rows are written by the send endpoints and claimed by the outbox workers
+    (see app.services.outbox) with SELECT ... FOR UPDATE SKIP LOCKED.
+    Status: 'pending' -> 'sending' -> 'sent' or 'failed' (retries go back to 'pending').
+    """
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_status_available_at", "status", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False, index=True)
+
+    channel: Mapped[str] = mapped_column(String, nullable=False)  # 'email' or 'linkedin'
+    status: Mapped[str] = mapped_column(String, nullable=False, default="pending")
+
+    # Recipient and message
+    recipient_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    recipient_email: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    recipient_linkedin_url: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    job_title: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    company_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    email_subject: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    email_body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    linkedin_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    # Sending account (None: the user's default account at send time) and source draft
+    email_account_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("email_accounts.id", ondelete="SET NULL"), nullable=True)
+    draft_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+
+    # Delivery bookkeeping
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    locked_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<OutboxMessage(id={self.id}, user_id={self.user_id}, channel={self.channel}, status={self.status})>"
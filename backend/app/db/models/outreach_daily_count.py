@@ -0,0 +1,25 @@
+"""Outreach daily count model - history rows recorded per user, day and channel."""
+from datetime import date
+from sqlalchemy import String, Date, Integer, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class OutreachDailyCount(Base):
+    """
+    Outreach history rows per user and UTC day of sent_at, by channel.
+
+    'combined' counts the 'both' rows: records written when both parts of a
+    recipient were sent, in addition to their email and LinkedIn rows.
+    Maintained incrementally as history is recorded (see app.services.outreach_stats_service).
+    """
+    __tablename__ = "outreach_daily_counts"
+
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    emails: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    linkedin: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    combined: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # 'both' rows
+
+    def __repr__(self):
+        return f"<OutreachDailyCount(user_id={self.user_id}, day={self.day}, emails={self.emails}, linkedin={self.linkedin})>"
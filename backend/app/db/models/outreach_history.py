@@ -1,6 +1,6 @@
 """Outreach History model - permanent record of all sent messages."""
 from datetime import datetime
-from sqlalchemy import String, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Text, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
@@ -11,6 +11,10 @@ class OutreachHistory(Base):
     This table is independent of drafts - deleting drafts doesn't affect history.
     """
     __tablename__ = "outreach_history"
+    __table_args__ = (
+        # Recent sends of a user (today's send counts in app.services.campaign_scheduler)
+        Index("ix_outreach_history_user_sent_at", "user_id", text("sent_at DESC")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False, index=True)
@@ -0,0 +1,27 @@
+"""Outreach reached model - distinct companies and roles a user has contacted."""
+from sqlalchemy import String, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class OutreachReached(Base):
+    """
+    A company (role_key '') or a (role, company) pair the user has sent outreach to.
+
+    Keys are the lowercased, stripped names; display names are the first seen.
+    Maintained incrementally as history is recorded (see app.services.outreach_stats_service).
+    """
+    __tablename__ = "outreach_reached"
+    __table_args__ = (
+        UniqueConstraint("user_id", "company_key", "role_key", name="uq_outreach_reached_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    company_key: Mapped[str] = mapped_column(String, nullable=False)
+    role_key: Mapped[str] = mapped_column(String, nullable=False, default="")
+    company_name: Mapped[str] = mapped_column(String, nullable=False)
+    role: Mapped[str] = mapped_column(String, nullable=False, default="")
+
+    def __repr__(self):
+        return f"<OutreachReached(user_id={self.user_id}, company={self.company_name}, role={self.role})>"
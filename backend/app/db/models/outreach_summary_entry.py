@@ -0,0 +1,41 @@
+"""Outreach summary entry model - consolidated dashboard row per recipient/job/company."""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Boolean, Index, UniqueConstraint, text
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class OutreachSummaryEntry(Base):
+    """
+    All outreach history of one user to one (recipient, job, company), merged.
+
+    Keys are the lowercased, stripped names. Maintained incrementally as history
+    is recorded (see app.services.outreach_stats_service); display fields and
+    history_id come from the most recent history row.
+    """
+    __tablename__ = "outreach_summary_entries"
+    __table_args__ = (
+        UniqueConstraint("user_id", "recipient_key", "job_key", "company_key", name="uq_outreach_summary_entries_key"),
+        Index("ix_outreach_summary_entries_user_last_sent", "user_id", text("last_sent_at DESC")),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    recipient_key: Mapped[str] = mapped_column(String, nullable=False)
+    job_key: Mapped[str] = mapped_column(String, nullable=False)
+    company_key: Mapped[str] = mapped_column(String, nullable=False)
+
+    # From the most recent history row
+    history_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    recipient_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    job_title: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    company_name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    last_sent_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    # Channels used across all history rows ('both' sets both)
+    email: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    linkedin: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f"<OutreachSummaryEntry(id={self.id}, user_id={self.user_id}, recipient={self.recipient_name})>"
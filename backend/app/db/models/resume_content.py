@@ -15,6 +15,9 @@ class ResumeContent(Base):
     owner_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False, unique=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)  # Extracted resume text
     structured_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # Parsed resume data (name, education, experience, technologies, etc.)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # SHA-256 of content the digest was built from
+    digest: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # Derived resume digest (see resume_digest_service)
+    pdf_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # SHA-256 of the uploaded PDF the content was parsed from
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
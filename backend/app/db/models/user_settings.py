@@ -1,8 +1,8 @@
 """User settings model to track active accounts and preferences."""
-from sqlalchemy import String, ForeignKey, Integer, DateTime
+from sqlalchemy import String, ForeignKey, Integer, DateTime, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Any
 from app.db.base import Base
 
 
@@ -19,6 +19,10 @@ class UserSettings(Base):
     active_email_account_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("email_accounts.id", ondelete='SET NULL'), nullable=True)
     active_linkedin_account_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("linkedin_accounts.id", ondelete='SET NULL'), nullable=True)
     
+    # Per-user recruiter scoring rules (see app.services.unified_messenger.scoring_spec);
+    # NULL uses the RECRUITER_SCORING_SPEC setting / built-in rules
+    recruiter_scoring_spec: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
+    
     # Metadata
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, onupdate=datetime.utcnow)
@@ -1,13 +1,47 @@
 """FastAPI application entry point."""
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.router import api_router
 from app.core.config import settings
+from app.services.campaign_engine import campaign_engine
+from app.services.cpu_pool import cpu_pool
+from app.services.email_providers import close_provider_clients
+from app.services.executors import ExecutorRejectedError, shutdown_executors
+from app.services.llm_runtime import ClientDisconnectedError, LLMTimeoutError
+from app.services.outbox import outbox_workers
+from app.services.smtp_pool import smtp_pool
+from app.services.token_refresh import token_refresher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared worker pools on startup and stop them on shutdown."""
+    cpu_pool.start()
+    await cpu_pool.warm()
+    smtp_pool.start()
+    token_refresher.start()
+    outbox_workers.start()
+    campaign_engine.start()
+    try:
+        yield
+    finally:
+        await campaign_engine.shutdown()
+        await outbox_workers.shutdown()
+        await token_refresher.shutdown()
+        await close_provider_clients()
+        smtp_pool.shutdown()
+        shutdown_executors()
+        cpu_pool.shutdown()
+
 
 app = FastAPI(
     title="Cold Email API",
     description="Full-stack cold email outreach platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware - MUST be added before other middleware
@@ -26,6 +60,26 @@ app.add_middleware(
     max_age=3600,
 )
 
+@app.exception_handler(ExecutorRejectedError)
+async def executor_rejected_handler(request: Request, exc: ExecutorRejectedError):
+    """A saturated executor with the reject policy means the server is busy."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "executor": exc.name},
+        headers={"Retry-After": "5"},
+    )
+
+@app.exception_handler(LLMTimeoutError)
+async def llm_timeout_handler(request: Request, exc: LLMTimeoutError):
+    """A model call exceeded LLM_CALL_TIMEOUT_SECONDS."""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(ClientDisconnectedError)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnectedError):
+    """Generation was cancelled because the client went away; nobody reads this."""
+    return JSONResponse(status_code=499, content={"detail": "Client closed request"})
+
 # Health check endpoint
 @app.get("/healthz")
 async def health_check():
@@ -0,0 +1,905 @@
+"""Campaign execution engine for ``/outreach/campaign/*``.
+
+The campaign endpoints used to run ``UnifiedMessenger.email_only_outreach`` /
+``enhanced_dual_outreach`` on an executor thread. Those are CLI loops: they
+ask for confirmation with ``input()`` - on a server that blocks the thread
+forever - handle one recruiter at a time and keep no record of progress.
+
+A campaign is now a ``Campaign`` row plus one ``CampaignRecipient`` row per
+recruiter, and ``CampaignEngine`` moves each recipient through three async
+stages:
+
+- enrich: look up a missing email address from the LinkedIn profile (Apollo)
+- generate: write the email and/or LinkedIn note
+- send: deliver them, then record history and stats
+
+Each stage has its own concurrency limit, shared by every campaign in the
+process, so lookups, model calls and sends for different recipients overlap.
+A recipient's progress is committed after every stage: pausing stops at the
+next stage boundary and resuming (or a restart) continues from there.
+Recipients are claimed with ``FOR UPDATE SKIP LOCKED``, so several processes
+can work on one campaign; a claim held by a process that died is taken over
+after ``CAMPAIGN_LOCK_TIMEOUT_SECONDS``. Campaigns still marked ``sending``
+are resumed when the engine starts.
+
+A send re-asserts the recipient's claim and commits its parts as ``sending``
+before delivering them, and commits the outcome right after. A part is never
+sent twice: a failure while recording history and stats retries only the
+recording, and a part still ``sending`` when its process died is marked failed
+rather than sent again.
+
+Sends are spread over time by app.services.campaign_scheduler: a recipient is
+only sent once its planned ``scheduled_at`` slot has passed, and the user's
+running campaigns are replanned every ``CAMPAIGN_SCHEDULE_INTERVAL_SECONDS``.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.models.campaign import Campaign
+from app.db.models.campaign_recipient import CampaignRecipient
+from app.db.models.email_account import EmailAccount
+from app.db.models.outreach_history import OutreachHistory
+from app.db.models.user_stats import UserStats
+from app.services.campaign_scheduler import campaign_schedules, resolve_timezone, send_scheduler
+from app.services.outreach_stats_service import record_history
+
+logger = logging.getLogger(__name__)
+
+# Campaign status
+DRAFT = "draft"
+SENDING = "sending"
+PAUSED = "paused"
+COMPLETED = "completed"
+
+# Recipient stage (the next step to run)
+ENRICH = "enrich"
+GENERATE = "generate"
+SEND = "send"
+DONE = "done"
+STAGES = (ENRICH, GENERATE, SEND)
+
+CHANNELS = ("email", "linkedin")
+
+# Recipient channel status while its send is in progress ('sent', 'failed' or 'skipped' once settled)
+IN_FLIGHT = "sending"
+
+_THROUGHPUT_WINDOW_SECONDS = 60.0
+_KEPT_RUNS = 100
+
+
+class CampaignError(Exception):
+    """A problem that stops the whole campaign until the user fixes it (no resume, no account, ...)."""
+
+
+class ClaimLost(Exception):
+    """Another process took over the recipient; this one must leave it alone."""
+
+
+def _recipient(
+    recruiter: Dict[str, Any], position: int, job_titles: Sequence[str], timezone: Optional[str], now: datetime
+) -> CampaignRecipient:
+    from app.services.unified_messenger.recruiter_matching import recruiter_company_name
+
+    return CampaignRecipient(
+        position=position,
+        recruiter=recruiter,
+        name=recruiter.get('name'),
+        email=recruiter.get('email') or recruiter.get('extracted_email'),
+        linkedin_url=recruiter.get('profile_url') or recruiter.get('linkedin_url'),
+        job_url=recruiter.get('job_url'),
+        job_title=recruiter.get('job_title') or (job_titles[0] if job_titles else None),
+        company_name=recruiter_company_name(recruiter) or recruiter.get('company_name'),
+        timezone=resolve_timezone(recruiter.get('timezone')) or timezone,
+        stage=ENRICH,
+        status="pending",
+        attempts=0,
+        updated_at=now,
+    )
+
+
+async def create_campaign(
+    db: AsyncSession,
+    user_id: str,
+    recruiters: Sequence[Dict[str, Any]],
+    job_titles: List[str],
+    job_type: str,
+    channels: Sequence[str],
+    name: Optional[str] = None,
+    timezone: Optional[str] = None,
+) -> Campaign:
+    """
+    Add a campaign (status 'sending') and its recipients to the session; launch it after committing.
+
+    `timezone` is the sending-window timezone of recruiters without a valid 'timezone' of their own.
+    """
+    now = datetime.utcnow()
+    campaign = Campaign(
+        name=name or f"{', '.join(job_titles) or 'Outreach'} ({len(recruiters)} recruiters)",
+        audience_query=json.dumps({"recruiters": len(recruiters), "job_titles": job_titles, "job_type": job_type}),
+        status=SENDING,
+        owner_id=user_id,
+        channels=",".join(channel for channel in CHANNELS if channel in channels),
+        parameters={"job_titles": job_titles, "job_type": job_type, "timezone": timezone},
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(campaign)
+    await db.flush()
+    recipients = [
+        _recipient(recruiter, position, job_titles, timezone, now) for position, recruiter in enumerate(recruiters)
+    ]
+    for recipient in recipients:
+        recipient.campaign_id = campaign.id
+    db.add_all(recipients)
+    return campaign
+
+
+async def campaigns_progress(db: AsyncSession, campaigns: Sequence[Campaign]) -> List[Dict[str, Any]]:
+    """API representation of campaigns: recipients per stage and outcome, plus throughput (two queries in all)."""
+    campaign_ids = [campaign.id for campaign in campaigns]
+    rows = await db.execute(
+        select(CampaignRecipient.campaign_id, CampaignRecipient.stage, CampaignRecipient.status, func.count())
+        .where(CampaignRecipient.campaign_id.in_(campaign_ids))
+        .group_by(CampaignRecipient.campaign_id, CampaignRecipient.stage, CampaignRecipient.status)
+    )
+    by_stage = {campaign_id: {stage: 0 for stage in (*STAGES, DONE)} for campaign_id in campaign_ids}
+    by_outcome = {
+        campaign_id: {status: 0 for status in ("sent", "partial", "failed", "skipped")} for campaign_id in campaign_ids
+    }
+    for campaign_id, stage, status, count in rows.all():
+        by_stage[campaign_id][stage] = by_stage[campaign_id].get(stage, 0) + count
+        if stage == DONE:
+            by_outcome[campaign_id][status] = by_outcome[campaign_id].get(status, 0) + count
+    schedules = await campaign_schedules(db, campaign_ids)
+    return [
+        _progress(campaign, by_stage[campaign.id], by_outcome[campaign.id], schedules[campaign.id])
+        for campaign in campaigns
+    ]
+
+
+async def campaign_progress(db: AsyncSession, campaign: Campaign) -> Dict[str, Any]:
+    """API representation of a campaign: recipients per stage and outcome, plus throughput."""
+    return (await campaigns_progress(db, [campaign]))[0]
+
+
+def _progress(
+    campaign: Campaign, by_stage: Dict[str, int], by_outcome: Dict[str, int], schedule: Dict[str, Any]
+) -> Dict[str, Any]:
+    total = sum(by_stage.values())
+    parameters = campaign.parameters or {}
+    return {
+        "id": campaign.id,
+        "name": campaign.name,
+        "status": campaign.status,
+        "channels": (campaign.channels or "email").split(","),
+        "job_titles": parameters.get("job_titles", []),
+        "job_type": parameters.get("job_type"),
+        "last_error": campaign.last_error,
+        "created_at": campaign.created_at.isoformat() if campaign.created_at else None,
+        "started_at": campaign.started_at.isoformat() if campaign.started_at else None,
+        "completed_at": campaign.completed_at.isoformat() if campaign.completed_at else None,
+        "recipients": {
+            "total": total,
+            "done": by_stage[DONE],
+            "remaining": total - by_stage[DONE],
+            "by_stage": by_stage,
+            "by_outcome": by_outcome,
+        },
+        "schedule": schedule,
+        "throughput": campaign_engine.run_metrics(campaign.id),
+    }
+
+
+@dataclass
+class CampaignRun:
+    """Settings loaded once per run, plus this process's progress counters for it."""
+
+    campaign_id: int
+    user_id: str
+    channels: Sequence[str]
+    job_titles: List[str]
+    job_type: str
+    resume_digest: Any
+    email_account: Optional[EmailAccount] = None
+    unipile_account_id: Optional[str] = None
+    char_limit: int = 300
+    paused: bool = False
+    active: bool = True
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    next_plan: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+    finished: Optional[float] = None
+    in_flight: int = 0
+    completed: Deque[float] = field(default_factory=deque)
+    stage_seconds: Dict[str, float] = field(default_factory=lambda: {stage: 0.0 for stage in STAGES})
+    stage_runs: Dict[str, int] = field(default_factory=lambda: {stage: 0 for stage in STAGES})
+    counters: Dict[str, int] = field(default_factory=lambda: {
+        "done": 0, "sent": 0, "partial": 0, "failed": 0, "skipped": 0, "retried": 0,
+    })
+
+    def wants(self, recipient: CampaignRecipient, channel: str) -> bool:
+        """The campaign uses `channel` and the recipient's part on it is not settled yet."""
+        return channel in self.channels and getattr(recipient, f"{channel}_status") is None
+
+
+class CampaignEngine:
+    """Runs campaigns as staged, resumable async pipelines."""
+
+    def __init__(
+        self,
+        enrich_concurrency: int,
+        generate_concurrency: int,
+        send_concurrency: int,
+        claim_batch: int,
+        lock_timeout: float,
+        poll_interval: float,
+        max_attempts: int,
+        retry_backoff: float,
+        schedule_interval: float,
+    ):
+        self.limits = {
+            ENRICH: max(1, enrich_concurrency),
+            GENERATE: max(1, generate_concurrency),
+            SEND: max(1, send_concurrency),
+        }
+        self.claim_batch = max(1, claim_batch)
+        self.lock_timeout = lock_timeout
+        self.poll_interval = max(0.1, poll_interval)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.schedule_interval = max(self.poll_interval, schedule_interval)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._active: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._runs: "OrderedDict[int, CampaignRun]" = OrderedDict()
+        self._resume_task: Optional[asyncio.Task] = None
+        self._started = False
+        self.counters = {"launched": 0, "completed": 0, "paused": 0, "claimed": 0, "reclaimed": 0}
+
+    def start(self) -> None:
+        """Create the stage limits on the running event loop and resume interrupted campaigns."""
+        if self._started:
+            return
+        self._slots = {stage: asyncio.Semaphore(limit) for stage, limit in self.limits.items()}
+        self._started = True
+        self._resume_task = asyncio.create_task(self._resume_interrupted(), name="campaign-resume")
+        print(
+            f"🚀 Campaign engine started (enrich {self.limits[ENRICH]}, "
+            f"generate {self.limits[GENERATE]}, send {self.limits[SEND]})"
+        )
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop at the next stage boundary; campaigns stay 'sending' and resume on the next start."""
+        for run in self._runs.values():
+            run.paused = True
+            run.wakeup.set()
+        tasks = list(self._tasks.values())
+        if self._resume_task is not None:
+            tasks.append(self._resume_task)
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = {}
+        self._resume_task = None
+        self._started = False
+        await self._release_claims()
+
+    def launch(self, campaign_id: int) -> None:
+        """Run a campaign whose status is 'sending' (call after committing it)."""
+        self.start()
+        previous = self._tasks.get(campaign_id)
+        if previous is not None and not previous.done():
+            run = self._runs.get(campaign_id)
+            if run is not None and run.active and not run.paused:
+                return
+            # Still winding down from a pause: run again once it has stopped
+            task = asyncio.create_task(self._run_after(previous, campaign_id), name=f"campaign-{campaign_id}")
+        else:
+            task = asyncio.create_task(self._run_campaign(campaign_id), name=f"campaign-{campaign_id}")
+        self._tasks[campaign_id] = task
+        task.add_done_callback(lambda done, cid=campaign_id: self._forget(cid, done))
+        self.counters["launched"] += 1
+
+    def pause(self, campaign_id: int) -> None:
+        """Stop a campaign running in this process at the next stage boundary (set the status first)."""
+        run = self._runs.get(campaign_id)
+        if run is not None:
+            run.paused = True
+            run.wakeup.set()
+
+    def _forget(self, campaign_id: int, task: asyncio.Task) -> None:
+        if self._tasks.get(campaign_id) is task:
+            del self._tasks[campaign_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ Campaign {campaign_id} run failed: {task.exception()}")
+
+    async def _run_after(self, previous: asyncio.Task, campaign_id: int) -> None:
+        await asyncio.wait([previous])
+        await self._run_campaign(campaign_id)
+
+    async def _resume_interrupted(self) -> None:
+        from app.db.base import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(Campaign.id).where(Campaign.status == SENDING))
+                campaign_ids = list(result.scalars().all())
+        except Exception as e:
+            logger.error(f"❌ Could not load interrupted campaigns: {e}")
+            return
+        for campaign_id in campaign_ids:
+            if campaign_id not in self._tasks:
+                self.launch(campaign_id)
+        if campaign_ids:
+            print(f"🔁 Resumed {len(campaign_ids)} campaign(s)")
+
+    async def _release_claims(self) -> None:
+        """Hand this process's claimed recipients back so another process resumes them at once."""
+        from app.db.base import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(CampaignRecipient)
+                    .where(CampaignRecipient.locked_by == self.worker_id)
+                    .values(locked_at=None, locked_by=None)
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release campaign claims: {e}")
+
+    # Run
+
+    async def _run_campaign(self, campaign_id: int) -> None:
+        try:
+            run = await self._prepare(campaign_id)
+        except CampaignError as e:
+            logger.warning(f"⚠️ Campaign {campaign_id} paused: {e}")
+            await self._set_status(campaign_id, PAUSED, last_error=str(e))
+            self.counters["paused"] += 1
+            return
+        if run is None:
+            return
+
+        self._runs[campaign_id] = run
+        self._runs.move_to_end(campaign_id)
+        while len(self._runs) > _KEPT_RUNS:
+            oldest = next(iter(self._runs))
+            if self._runs[oldest].active:
+                break
+            del self._runs[oldest]
+
+        print(f"📣 Campaign {campaign_id} running ({', '.join(run.channels)})")
+        try:
+            await self._drive(run)
+        finally:
+            run.active = False
+            run.finished = time.monotonic()
+        elapsed = run.finished - run.started
+        print(
+            f"📊 Campaign {campaign_id}: {run.counters['done']} recipient(s) in {elapsed:.1f}s "
+            f"({run.counters['done'] / elapsed * 60 if elapsed else 0.0:.1f}/min)"
+        )
+
+    async def _prepare(self, campaign_id: int) -> Optional[CampaignRun]:
+        """Load the campaign's settings, resume digest and sending accounts once for the run."""
+        from app.db.base import AsyncSessionLocal
+        from app.services.outbox import get_sending_account, get_unipile_account_id
+        from app.services.resume_digest_service import get_resume_digest
+        from app.services.unified_messenger.adapter import get_linkedin_char_limit
+        from app.services.user_settings_service import get_or_create_user_stats
+
+        async with AsyncSessionLocal() as db:
+            campaign = await db.get(Campaign, campaign_id)
+            if campaign is None or campaign.status != SENDING:
+                return None
+
+            parameters = campaign.parameters or {}
+            run = CampaignRun(
+                campaign_id=campaign.id,
+                user_id=campaign.owner_id,
+                channels=tuple((campaign.channels or "email").split(",")),
+                job_titles=list(parameters.get("job_titles") or []),
+                job_type=parameters.get("job_type") or "full_time",
+                resume_digest=await get_resume_digest(campaign.owner_id, db),
+            )
+            if run.resume_digest is None:
+                raise CampaignError("No resume content found. Please upload a resume first.")
+            if "email" in run.channels:
+                run.email_account = await get_sending_account(run.user_id, db)
+                if run.email_account is None:
+                    raise CampaignError("No linked email account found. Please link an email account in Settings.")
+            if "linkedin" in run.channels:
+                run.unipile_account_id = await get_unipile_account_id(run.user_id, db)
+                if not run.unipile_account_id:
+                    raise CampaignError(
+                        "No Unipile account configured. Please connect your LinkedIn account in Settings > LinkedIn Accounts."
+                    )
+                run.char_limit = await get_linkedin_char_limit(run.user_id, db)
+            # Sends increment the stats row in SQL; make sure it exists
+            await get_or_create_user_stats(run.user_id, db)
+            # Plan this campaign's sends together with the user's other running campaigns
+            await send_scheduler.reschedule(db, run.user_id)
+            run.next_plan = time.monotonic() + self.schedule_interval
+
+            now = datetime.utcnow()
+            campaign.started_at = campaign.started_at or now
+            campaign.last_error = None
+            campaign.updated_at = now
+            await db.commit()
+        return run
+
+    async def _drive(self, run: CampaignRun) -> None:
+        """Keep up to `claim_batch` recipients in flight until none are left or the campaign is paused."""
+        in_flight: Set[asyncio.Task] = set()
+        next_check = 0.0
+        try:
+            while True:
+                if time.monotonic() >= next_check:
+                    # Picks up a pause requested through another process
+                    if not await self._still_sending(run.campaign_id):
+                        run.paused = True
+                    next_check = time.monotonic() + self.poll_interval
+                if run.paused:
+                    break
+                if time.monotonic() >= run.next_plan:
+                    await self._reschedule(run)
+
+                # Refill in batches rather than one claim query per finished recipient
+                if len(in_flight) <= self.claim_batch // 2:
+                    for recipient_id in await self._claim(run.campaign_id, self.claim_batch - len(in_flight)):
+                        in_flight.add(asyncio.create_task(self._process(run, recipient_id)))
+
+                if not in_flight:
+                    if await self._finish_if_done(run.campaign_id):
+                        break
+                    # Waiting for send slots, or the remaining recipients are held by another process
+                    await self._idle(run)
+                    continue
+
+                done, in_flight = await asyncio.wait(
+                    in_flight, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        logger.error(f"❌ Campaign {run.campaign_id} recipient failed: {task.exception()}")
+        except asyncio.CancelledError:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            raise
+        if in_flight:
+            # Paused: in-flight recipients stop at their next stage boundary
+            await asyncio.wait(in_flight)
+
+    async def _reschedule(self, run: CampaignRun) -> None:
+        from app.db.base import AsyncSessionLocal
+
+        run.next_plan = time.monotonic() + self.schedule_interval
+        try:
+            async with AsyncSessionLocal() as db:
+                await send_scheduler.reschedule(db, run.user_id)
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not replan sends of campaign {run.campaign_id}: {e}")
+
+    async def _idle(self, run: CampaignRun) -> None:
+        """Sleep until the campaign's next planned send (woken early by a pause)."""
+        from app.db.base import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            next_send_at = await db.scalar(
+                select(func.min(CampaignRecipient.scheduled_at))
+                .where(CampaignRecipient.campaign_id == run.campaign_id)
+                .where(CampaignRecipient.stage != DONE)
+            )
+        delay = self.poll_interval
+        if next_send_at is not None:
+            delay = (next_send_at - datetime.utcnow()).total_seconds()
+        # Wake up for the replan and the cross-process pause check in any case
+        delay = min(max(delay, self.poll_interval), self.schedule_interval)
+        try:
+            await asyncio.wait_for(run.wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _still_sending(self, campaign_id: int) -> bool:
+        from app.db.base import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(Campaign.status).where(Campaign.id == campaign_id)) == SENDING
+
+    async def _set_status(self, campaign_id: int, status: str, **values: Any) -> None:
+        from app.db.base import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Campaign).where(Campaign.id == campaign_id)
+                .values(status=status, updated_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def _claim(self, campaign_id: int, limit: int) -> List[int]:
+        """Lock unfinished recipients nobody holds (or whose holder went away) for this process.
+
+        Recipients waiting to send are only claimed once their planned slot has passed.
+        """
+        from app.db.base import AsyncSessionLocal
+
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lock_timeout)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CampaignRecipient)
+                .where(CampaignRecipient.campaign_id == campaign_id)
+                .where(CampaignRecipient.stage != DONE)
+                .where(or_(CampaignRecipient.stage != SEND, CampaignRecipient.scheduled_at <= now))
+                .where(or_(CampaignRecipient.locked_at.is_(None), CampaignRecipient.locked_at < stale))
+                .order_by(CampaignRecipient.position)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            recipients = result.scalars().all()
+            for recipient in recipients:
+                if recipient.locked_at is not None:
+                    self.counters["reclaimed"] += 1
+                recipient.locked_at = now
+                recipient.locked_by = self.worker_id
+            await db.commit()
+        self.counters["claimed"] += len(recipients)
+        return [recipient.id for recipient in recipients]
+
+    async def _finish_if_done(self, campaign_id: int) -> bool:
+        from app.db.base import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            remaining = await db.scalar(
+                select(func.count())
+                .select_from(CampaignRecipient)
+                .where(CampaignRecipient.campaign_id == campaign_id)
+                .where(CampaignRecipient.stage != DONE)
+            )
+            if remaining:
+                return False
+            now = datetime.utcnow()
+            result = await db.execute(
+                update(Campaign)
+                .where(Campaign.id == campaign_id)
+                .where(Campaign.status == SENDING)
+                .values(status=COMPLETED, completed_at=now, updated_at=now)
+            )
+            await db.commit()
+        if result.rowcount:
+            self.counters["completed"] += 1
+            print(f"✅ Campaign {campaign_id} completed")
+        return True
+
+    # Recipients
+
+    async def _process(self, run: CampaignRun, recipient_id: int) -> None:
+        """Run a claimed recipient's remaining stages, committing after each one."""
+        from app.db.base import AsyncSessionLocal
+
+        stages = {ENRICH: self._enrich, GENERATE: self._generate, SEND: self._send}
+        run.in_flight += 1
+        try:
+            async with AsyncSessionLocal() as db:
+                recipient = await db.get(CampaignRecipient, recipient_id)
+                if recipient is None or recipient.locked_by != self.worker_id:
+                    return
+
+                while recipient.stage != DONE and not run.paused:
+                    stage = recipient.stage
+                    if stage == SEND and not await self._slot_reached(run, recipient):
+                        # Release it; it is claimed again once its slot has passed
+                        break
+                    started = time.monotonic()
+                    try:
+                        async with self._slots[stage]:
+                            self._active[stage] += 1
+                            try:
+                                await stages[stage](run, recipient, db)
+                            finally:
+                                self._active[stage] -= 1
+                    except asyncio.CancelledError:
+                        raise
+                    except ClaimLost:
+                        await db.rollback()
+                        logger.warning(f"⚠️ Campaign recipient {recipient_id} was taken over by another process")
+                        return
+                    except Exception as e:
+                        await db.rollback()
+                        recipient = await db.get(CampaignRecipient, recipient_id)
+                        recipient.attempts = (recipient.attempts or 0) + 1
+                        recipient.error = f"{stage}: {e}"[:2000]
+                        if recipient.attempts < self.max_attempts:
+                            logger.warning(f"⚠️ Campaign recipient {recipient_id} {stage} failed, retrying: {e}")
+                            run.counters["retried"] += 1
+                            recipient.updated_at = recipient.locked_at = datetime.utcnow()
+                            await db.commit()
+                            await asyncio.sleep(self.retry_backoff * (2 ** (recipient.attempts - 1)))
+                            continue
+                        self._finish(run, recipient, "failed")
+                    run.stage_seconds[stage] += time.monotonic() - started
+                    run.stage_runs[stage] += 1
+                    # Committing also renews the claim
+                    recipient.updated_at = recipient.locked_at = datetime.utcnow()
+                    await db.commit()
+
+                recipient.locked_at = None
+                recipient.locked_by = None
+                await db.commit()
+        finally:
+            run.in_flight -= 1
+
+    async def _slot_reached(self, run: CampaignRun, recipient: CampaignRecipient) -> bool:
+        """True once the recipient's planned send slot has passed; waits for a slot less than a poll away."""
+        if recipient.scheduled_at is None:
+            return False
+        delay = (recipient.scheduled_at - datetime.utcnow()).total_seconds()
+        if delay > self.poll_interval:
+            return False
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return not run.paused
+
+    def _finish(self, run: CampaignRun, recipient: CampaignRecipient, status: str) -> None:
+        recipient.stage = DONE
+        recipient.status = status
+        recipient.completed_at = datetime.utcnow()
+        run.counters["done"] += 1
+        run.counters[status] += 1
+        run.completed.append(time.monotonic())
+
+    async def _enrich(self, run: CampaignRun, recipient: CampaignRecipient, db: AsyncSession) -> None:
+        from app.services.executors import UPSTREAM_IO, run_in_executor
+        from app.services.unified_messenger.clients import get_messenger
+
+        if run.wants(recipient, "email") and not recipient.email and recipient.linkedin_url:
+            email, _ = await run_in_executor(
+                UPSTREAM_IO, get_messenger().extract_email_from_linkedin, recipient.linkedin_url
+            )
+            if email and email != 'Not found':
+                recipient.email = email
+
+        if run.wants(recipient, "email") and not recipient.email:
+            recipient.email_status = "skipped"
+        if run.wants(recipient, "linkedin") and not recipient.linkedin_url:
+            recipient.linkedin_status = "skipped"
+        if not any(run.wants(recipient, channel) for channel in CHANNELS):
+            recipient.error = "No email address or LinkedIn profile found"
+            self._finish(run, recipient, "skipped")
+            return
+        recipient.stage = GENERATE
+
+    async def _generate(self, run: CampaignRun, recipient: CampaignRecipient, db: AsyncSession) -> None:
+        from app.services.unified_messenger.adapter import generate_email, generate_linkedin_message
+
+        recruiter = dict(recipient.recruiter or {})
+        job_title = recipient.job_title or ", ".join(run.job_titles) or "Position"
+        company_name = recipient.company_name or "your company"
+        if recipient.job_url:
+            recruiter['job_url'] = recipient.job_url
+        recruiter['company'] = recruiter.get('company') or company_name
+
+        parts = {}
+        if run.wants(recipient, "email") and not recipient.email_body:
+            parts["email"] = generate_email(
+                run.job_titles, run.job_type, recruiter, None, recipient.job_url, resume_digest=run.resume_digest
+            )
+        if run.wants(recipient, "linkedin") and not recipient.linkedin_message:
+            parts["linkedin"] = generate_linkedin_message(
+                recruiter,
+                job_title,
+                company_name,
+                user_id=run.user_id,
+                resume_digest=run.resume_digest,
+                char_limit=run.char_limit,
+            )
+        # Both parts of one recipient hold one generate slot
+        results = dict(zip(parts, await asyncio.gather(*parts.values())))
+        if "email" in results:
+            recipient.email_subject = results["email"]["subject"]
+            recipient.email_body = results["email"]["body"]
+        if "linkedin" in results:
+            recipient.linkedin_message = results["linkedin"]
+        recipient.stage = SEND
+
+    async def _claim_send(self, run: CampaignRun, recipient: CampaignRecipient, channels: Sequence[str], db: AsyncSession) -> None:
+        """Re-assert the claim and commit the parts as in flight before any of them is sent."""
+        now = datetime.utcnow()
+        held = await db.scalar(
+            update(CampaignRecipient)
+            .where(CampaignRecipient.id == recipient.id)
+            .where(CampaignRecipient.locked_by == self.worker_id)
+            .values(locked_at=now, updated_at=now, **{f"{channel}_status": IN_FLIGHT for channel in channels})
+            .returning(CampaignRecipient.id)
+            .execution_options(synchronize_session=False)
+        )
+        if held is None:
+            raise ClaimLost(recipient.id)
+        for channel in channels:
+            set_committed_value(recipient, f"{channel}_status", IN_FLIGHT)
+        set_committed_value(recipient, "locked_at", now)
+        set_committed_value(recipient, "updated_at", now)
+        await db.commit()
+
+    async def _send(self, run: CampaignRun, recipient: CampaignRecipient, db: AsyncSession) -> None:
+        """
+        Send the unsent parts concurrently, commit the outcome, then record history and stats.
+
+        Parts already sent (their recording failed) are only recorded on a retry, never sent again.
+        """
+        errors = []
+        for channel in CHANNELS:
+            if getattr(recipient, f"{channel}_status") == IN_FLIGHT:
+                # Its process died mid-send; it may have gone out
+                setattr(recipient, f"{channel}_status", "failed")
+                errors.append(f"{channel}: Interrupted while sending; not retried to avoid a duplicate")
+
+        channels = [channel for channel in CHANNELS if run.wants(recipient, channel)]
+        if channels:
+            await self._claim_send(run, recipient, channels, db)
+            parts = {}
+            if "email" in channels:
+                parts["email"] = self._send_email(run, recipient)
+            if "linkedin" in channels:
+                parts["linkedin"] = self._send_linkedin(run, recipient)
+            outcomes = dict(zip(parts, await asyncio.gather(*parts.values())))
+            for channel, outcome in outcomes.items():
+                if outcome.get("success"):
+                    setattr(recipient, f"{channel}_status", "sent")
+                else:
+                    setattr(recipient, f"{channel}_status", "failed")
+                    errors.append(f"{channel}: {outcome.get('error') or 'Send failed'}")
+        if errors or channels:
+            recipient.error = "; ".join(errors)[:2000] or None
+            # Delivered parts are settled before the bookkeeping below can fail
+            recipient.updated_at = recipient.locked_at = datetime.utcnow()
+            await db.commit()
+
+        # The recipient is still at SEND, so every 'sent' part is not recorded yet
+        now = datetime.utcnow()
+        sent = [channel for channel in CHANNELS if getattr(recipient, f"{channel}_status") == "sent"]
+        history = [self._history(run, recipient, channel, now) for channel in sent]
+        if len(sent) == 2:
+            history.append(self._history(run, recipient, "both", now))
+        await record_history(db, history)
+        stats: Dict[str, Any] = {}
+        if "email" in sent:
+            stats.update(emails_sent=UserStats.emails_sent + 1, last_email_sent_at=now)
+            await db.execute(
+                update(EmailAccount).where(EmailAccount.id == run.email_account.id).values(last_used_at=now)
+            )
+        if "linkedin" in sent:
+            stats.update(linkedin_invites_sent=UserStats.linkedin_invites_sent + 1, last_linkedin_invite_at=now)
+        if stats:
+            await db.execute(
+                update(UserStats).where(UserStats.user_id == run.user_id).values(updated_at=now, **stats)
+            )
+
+        attempted = [
+            channel for channel in run.channels if getattr(recipient, f"{channel}_status") != "skipped"
+        ]
+        if len(sent) == len(attempted):
+            self._finish(run, recipient, "sent")
+        elif sent:
+            self._finish(run, recipient, "partial")
+        else:
+            self._finish(run, recipient, "failed")
+
+    async def _send_email(self, run: CampaignRun, recipient: CampaignRecipient) -> Dict[str, Any]:
+        from app.services.unified_messenger.adapter import send_email
+
+        try:
+            return await send_email(
+                recipient.email,
+                recipient.email_subject,
+                recipient.email_body,
+                email_account=run.email_account
+            )
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def _send_linkedin(self, run: CampaignRun, recipient: CampaignRecipient) -> Dict[str, Any]:
+        from app.services.executors import UPSTREAM_IO, run_in_executor
+        from app.services.unified_messenger.adapter import linkedin_url_to_provider_id
+        from app.services.unified_messenger.clients import get_messenger
+
+        try:
+            provider_result = await linkedin_url_to_provider_id(recipient.linkedin_url, account_id=run.unipile_account_id)
+            provider_id = provider_result.get("provider_id")
+            if not provider_id:
+                error_msg = provider_result.get("error", "Could not convert LinkedIn URL to Provider ID")
+                return {"success": False, "error": f"{error_msg}. Please check the LinkedIn URL is valid and try again."}
+            success, result = await run_in_executor(
+                UPSTREAM_IO, get_messenger().send_invitation, provider_id, recipient.linkedin_message, run.unipile_account_id
+            )
+            return {"success": True, "result": result} if success else {"success": False, "error": result}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _history(self, run: CampaignRun, recipient: CampaignRecipient, channel: str, sent_at: datetime) -> OutreachHistory:
+        email = channel in ("email", "both")
+        linkedin = channel in ("linkedin", "both")
+        return OutreachHistory(
+            user_id=run.user_id,
+            recipient_name=recipient.name,
+            recipient_email=recipient.email if email else None,
+            recipient_linkedin_url=recipient.linkedin_url if linkedin else None,
+            job_title=recipient.job_title,
+            company_name=recipient.company_name,
+            channel=channel,
+            email_subject=recipient.email_subject if email else None,
+            email_body=recipient.email_body if email else None,
+            linkedin_message=recipient.linkedin_message if linkedin else None,
+            sent_at=sent_at
+        )
+
+    # Metrics
+
+    def run_metrics(self, campaign_id: int) -> Dict[str, Any]:
+        """Throughput of the campaign's latest run in this process (empty if it ran elsewhere)."""
+        run = self._runs.get(campaign_id)
+        if run is None:
+            return {"running_here": False}
+        now = time.monotonic()
+        horizon = now - _THROUGHPUT_WINDOW_SECONDS
+        while run.completed and run.completed[0] < horizon:
+            run.completed.popleft()
+        elapsed = (run.finished or now) - run.started
+        return {
+            "running_here": run.active,
+            "in_flight": run.in_flight,
+            "elapsed_seconds": round(elapsed, 1),
+            "recipients_per_minute": round(run.counters["done"] / elapsed * 60, 2) if elapsed else 0.0,
+            "done_last_minute": len(run.completed),
+            "avg_stage_seconds": {
+                stage: round(run.stage_seconds[stage] / run.stage_runs[stage], 3) if run.stage_runs[stage] else 0.0
+                for stage in STAGES
+            },
+            **run.counters,
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": [campaign_id for campaign_id, run in self._runs.items() if run.active],
+            "limits": self.limits,
+            "active": dict(self._active),
+            "scheduler": send_scheduler.metrics(),
+            **self.counters,
+        }
+
+
+def _create_engine() -> CampaignEngine:
+    from app.core.config import settings
+    return CampaignEngine(
+        enrich_concurrency=settings.campaign_enrich_concurrency,
+        generate_concurrency=settings.campaign_generate_concurrency,
+        send_concurrency=settings.campaign_send_concurrency,
+        claim_batch=settings.campaign_claim_batch,
+        lock_timeout=settings.campaign_lock_timeout_seconds,
+        poll_interval=settings.campaign_poll_interval_seconds,
+        max_attempts=settings.campaign_max_attempts,
+        retry_backoff=settings.campaign_retry_backoff_seconds,
+        schedule_interval=settings.campaign_schedule_interval_seconds,
+    )
+
+
+campaign_engine = _create_engine()
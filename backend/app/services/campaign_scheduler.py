@@ -0,0 +1,377 @@
+"""Send scheduling for background campaigns.
+
+The campaign engine (see app.services.campaign_engine) enriches and writes
+messages as fast as its stage limits allow, but sends only when a recipient's
+``scheduled_at`` has passed. This module assigns those slots so that every
+sending account stays within:
+
+- a daily cap per channel (UTC day), counting sends already in the outreach
+  history (outbox and direct sends included)
+- hourly pacing: sends from one account are spaced ``3600 / hourly cap`` apart
+- a sending window in the recipient's local time (``CampaignRecipient.timezone``)
+
+A user's email account and LinkedIn account are shared by all of their
+running campaigns, so slots are planned per user across those campaigns.
+Planning is a single pass over a priority queue keyed on the next eligible
+time. Recipients that share an account set, a timezone and channels form a
+lane: their eligibility only depends on the clock, so the queue holds one
+entry per lane rather than one per recipient, and planning thousands of
+recipients costs O(n log lanes). The latest slot of a campaign is its
+projected completion time.
+"""
+import heapq
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.campaign import Campaign
+from app.db.models.campaign_recipient import CampaignRecipient
+from app.db.models.outreach_history import OutreachHistory
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "linkedin")
+
+# A window check can move a slot to the next opening at most once per day, and
+# each move is a day at most: bound the search so a bad policy cannot spin
+_MAX_SLOT_SEARCH = 400
+
+
+@lru_cache(maxsize=512)
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def resolve_timezone(name: Optional[str]) -> Optional[str]:
+    """`name` if it is a known IANA timezone, else None."""
+    if not name or not isinstance(name, str):
+        return None
+    try:
+        _zone(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+    return name
+
+
+@dataclass(frozen=True)
+class SendPolicy:
+    """Per-account caps per channel (0 = unlimited) and the local sending window."""
+
+    daily_caps: Dict[str, int]
+    hourly_caps: Dict[str, int]
+    window_start_hour: int = 9
+    window_end_hour: int = 17
+    default_timezone: str = "UTC"
+
+    def spacing(self, channel: str) -> timedelta:
+        cap = self.hourly_caps.get(channel, 0)
+        return timedelta(seconds=3600 / cap) if cap > 0 else timedelta(0)
+
+    def window_open(self, at: datetime, timezone_name: str) -> datetime:
+        """The earliest time >= `at` (naive UTC) inside the sending window of `timezone_name`."""
+        start, end = self.window_start_hour % 24, self.window_end_hour % 24
+        if start == end:
+            return at
+        zone = _zone(timezone_name)
+        local = at.replace(tzinfo=dt_timezone.utc).astimezone(zone)
+        if start < end:
+            inside = start <= local.hour < end
+        else:
+            # Overnight window, e.g. 22-6
+            inside = local.hour >= start or local.hour < end
+        if inside:
+            return at
+        opening = local.replace(hour=start, minute=0, second=0, microsecond=0)
+        if opening <= local:
+            # Wall-clock arithmetic: the offset of the next day is applied on conversion
+            opening += timedelta(days=1)
+        return opening.astimezone(dt_timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class AccountState:
+    """Sending budget of one account on one channel while a plan is built."""
+
+    daily_cap: int
+    spacing: timedelta
+    day: date
+    sent_today: int = 0
+    next_free: datetime = datetime.min
+
+    def earliest(self, at: datetime) -> datetime:
+        """The earliest slot >= `at` that keeps pacing and the daily cap."""
+        at = max(at, self.next_free)
+        if self.daily_cap > 0 and at.date() == self.day and self.sent_today >= self.daily_cap:
+            at = datetime.combine(self.day + timedelta(days=1), datetime.min.time())
+        return at
+
+    def take(self, at: datetime) -> None:
+        if at.date() != self.day:
+            self.day = at.date()
+            self.sent_today = 0
+        self.sent_today += 1
+        self.next_free = at + self.spacing
+
+
+@dataclass
+class QueuedRecipient:
+    """What planning needs to know about an unsent recipient."""
+
+    id: int
+    campaign_id: int
+    position: int
+    user_id: str
+    channels: Tuple[str, ...]
+    timezone: str
+
+
+@dataclass
+class _Lane:
+    accounts: Tuple[Tuple[str, str], ...]
+    timezone: str
+    recipients: Deque[QueuedRecipient] = field(default_factory=deque)
+    eligible: Optional[datetime] = None
+
+
+def plan_send_slots(
+    queue: Iterable[QueuedRecipient],
+    accounts: Dict[Tuple[str, str], AccountState],
+    policy: SendPolicy,
+    now: datetime,
+) -> Dict[int, datetime]:
+    """
+    Assign each recipient the earliest send slot its accounts and window allow.
+
+    Recipients are served in (campaign id, position) order within a lane and in
+    order of eligible time across lanes. `accounts` maps (user_id, channel) to
+    the account's state and is updated as slots are taken; a missing entry is
+    created with the policy's limits and no prior sends.
+    """
+    lanes: Dict[Tuple[Any, ...], _Lane] = {}
+    for recipient in sorted(queue, key=lambda r: (r.campaign_id, r.position)):
+        key = (recipient.user_id, recipient.channels, recipient.timezone)
+        lane = lanes.get(key)
+        if lane is None:
+            lane = lanes[key] = _Lane(
+                accounts=tuple((recipient.user_id, channel) for channel in recipient.channels),
+                timezone=recipient.timezone,
+            )
+            for account in lane.accounts:
+                if account not in accounts:
+                    accounts[account] = AccountState(
+                        daily_cap=policy.daily_caps.get(account[1], 0),
+                        spacing=policy.spacing(account[1]),
+                        day=now.date(),
+                    )
+        lane.recipients.append(recipient)
+
+    heap: List[Tuple[datetime, int, int, int]] = []
+    lane_list = list(lanes.values())
+    for number, lane in enumerate(lane_list):
+        lane.eligible = policy.window_open(now, lane.timezone)
+        head = lane.recipients[0]
+        heap.append((lane.eligible, head.campaign_id, head.position, number))
+    heapq.heapify(heap)
+
+    slots: Dict[int, datetime] = {}
+    while heap:
+        key_time, _, _, number = heapq.heappop(heap)
+        lane = lane_list[number]
+        head = lane.recipients[0]
+
+        slot = max(key_time, lane.eligible)
+        for _ in range(_MAX_SLOT_SEARCH):
+            free = max(accounts[account].earliest(slot) for account in lane.accounts)
+            opened = policy.window_open(free, lane.timezone)
+            if opened == slot:
+                break
+            slot = opened
+        else:
+            logger.warning(f"⚠️ No send slot found for campaign recipient {head.id}; leaving it unscheduled")
+            lane.recipients.popleft()
+            slot = None
+
+        if slot is not None and slot > key_time:
+            # Another lane of the same user took the slot first (or the window
+            # closed): requeue at the new time so earlier lanes go first
+            lane.eligible = slot
+            heapq.heappush(heap, (slot, head.campaign_id, head.position, number))
+            continue
+
+        if slot is not None:
+            for account in lane.accounts:
+                accounts[account].take(slot)
+            slots[lane.recipients.popleft().id] = slot
+            lane.eligible = max(accounts[account].earliest(slot) for account in lane.accounts)
+        if lane.recipients:
+            head = lane.recipients[0]
+            heapq.heappush(heap, (lane.eligible, head.campaign_id, head.position, number))
+    return slots
+
+
+class SendScheduler:
+    """Plans campaign send slots from the database and keeps planning metrics."""
+
+    def __init__(self, policy: SendPolicy):
+        self.policy = policy
+        self.counters = {"plans": 0, "recipients_planned": 0}
+        self._last_plan_seconds = 0.0
+        self._max_plan_seconds = 0.0
+
+    async def reschedule(self, db: AsyncSession, user_id: str) -> Dict[int, datetime]:
+        """Replan the unsent recipients of the user's running campaigns and store their slots (caller commits)."""
+        from app.services.campaign_engine import DONE, SENDING
+
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        result = await db.execute(
+            select(
+                CampaignRecipient.id,
+                CampaignRecipient.campaign_id,
+                CampaignRecipient.position,
+                CampaignRecipient.timezone,
+                CampaignRecipient.email_status,
+                CampaignRecipient.linkedin_status,
+                Campaign.channels,
+            )
+            .join(Campaign, Campaign.id == CampaignRecipient.campaign_id)
+            .where(Campaign.owner_id == user_id)
+            .where(Campaign.status == SENDING)
+            .where(CampaignRecipient.stage != DONE)
+        )
+        queue = []
+        for row in result.all():
+            settled = {"email": row.email_status, "linkedin": row.linkedin_status}
+            channels = tuple(
+                channel for channel in (row.channels or "email").split(",")
+                if channel in CHANNELS and settled[channel] is None
+            )
+            if channels:
+                queue.append(QueuedRecipient(
+                    id=row.id,
+                    campaign_id=row.campaign_id,
+                    position=row.position,
+                    user_id=user_id,
+                    channels=channels,
+                    timezone=resolve_timezone(row.timezone) or self.policy.default_timezone,
+                ))
+        if not queue:
+            return {}
+
+        accounts = await self.account_usage(db, [user_id], now)
+        slots = plan_send_slots(queue, accounts, self.policy, now)
+        if slots:
+            await db.execute(
+                update(CampaignRecipient),
+                [{"id": recipient_id, "scheduled_at": slot} for recipient_id, slot in slots.items()],
+            )
+
+        elapsed = time.perf_counter() - started
+        self.counters["plans"] += 1
+        self.counters["recipients_planned"] += len(slots)
+        self._last_plan_seconds = elapsed
+        self._max_plan_seconds = max(self._max_plan_seconds, elapsed)
+        return slots
+
+    async def account_usage(
+        self, db: AsyncSession, user_ids: Sequence[str], now: datetime
+    ) -> Dict[Tuple[str, str], AccountState]:
+        """Today's sends and the last send time per (user, channel), from the outreach history."""
+        midnight = datetime.combine(now.date(), datetime.min.time())
+        longest_spacing = max((self.policy.spacing(channel) for channel in CHANNELS), default=timedelta(0))
+        since = min(midnight, now - longest_spacing)
+        result = await db.execute(
+            select(
+                OutreachHistory.user_id,
+                OutreachHistory.channel,
+                func.count().filter(OutreachHistory.sent_at >= midnight),
+                func.max(OutreachHistory.sent_at),
+            )
+            .where(and_(OutreachHistory.user_id.in_(user_ids), OutreachHistory.channel.in_(CHANNELS)))
+            .where(OutreachHistory.sent_at >= since)
+            .group_by(OutreachHistory.user_id, OutreachHistory.channel)
+        )
+        accounts: Dict[Tuple[str, str], AccountState] = {}
+        for user_id, channel, sent_today, last_sent in result.all():
+            spacing = self.policy.spacing(channel)
+            accounts[(user_id, channel)] = AccountState(
+                daily_cap=self.policy.daily_caps.get(channel, 0),
+                spacing=spacing,
+                day=now.date(),
+                sent_today=sent_today or 0,
+                next_free=last_sent + spacing if last_sent else datetime.min,
+            )
+        return accounts
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "policy": {
+                "daily_caps": self.policy.daily_caps,
+                "hourly_caps": self.policy.hourly_caps,
+                "window": [self.policy.window_start_hour, self.policy.window_end_hour],
+                "default_timezone": self.policy.default_timezone,
+            },
+            "last_plan_ms": round(self._last_plan_seconds * 1000, 2),
+            "max_plan_ms": round(self._max_plan_seconds * 1000, 2),
+            **self.counters,
+        }
+
+
+async def campaign_schedules(db: AsyncSession, campaign_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Next planned send and projected completion (latest planned send) of each campaign, in one query."""
+    from app.services.campaign_engine import DONE
+
+    result = await db.execute(
+        select(
+            CampaignRecipient.campaign_id,
+            func.min(CampaignRecipient.scheduled_at),
+            func.max(CampaignRecipient.scheduled_at),
+            func.count(CampaignRecipient.scheduled_at),
+        )
+        .where(CampaignRecipient.campaign_id.in_(list(campaign_ids)))
+        .where(CampaignRecipient.stage != DONE)
+        .group_by(CampaignRecipient.campaign_id)
+    )
+    rows = {campaign_id: (next_send_at, last, scheduled) for campaign_id, next_send_at, last, scheduled in result.all()}
+    schedules = {}
+    for campaign_id in campaign_ids:
+        next_send_at, projected_completion_at, scheduled = rows.get(campaign_id, (None, None, 0))
+        schedules[campaign_id] = {
+            "scheduled": scheduled,
+            "next_send_at": next_send_at.isoformat() if next_send_at else None,
+            "projected_completion_at": projected_completion_at.isoformat() if projected_completion_at else None,
+        }
+    return schedules
+
+
+async def campaign_schedule(db: AsyncSession, campaign_id: int) -> Dict[str, Any]:
+    """Next planned send and projected completion (latest planned send) of a campaign."""
+    return (await campaign_schedules(db, [campaign_id]))[campaign_id]
+
+
+def _create_scheduler() -> SendScheduler:
+    from app.core.config import settings
+    return SendScheduler(SendPolicy(
+        daily_caps={
+            "email": settings.campaign_email_daily_cap,
+            "linkedin": settings.campaign_linkedin_daily_cap,
+        },
+        hourly_caps={
+            "email": settings.campaign_email_hourly_cap,
+            "linkedin": settings.campaign_linkedin_hourly_cap,
+        },
+        window_start_hour=settings.campaign_send_window_start_hour,
+        window_end_hour=settings.campaign_send_window_end_hour,
+        default_timezone=resolve_timezone(settings.campaign_default_timezone) or "UTC",
+    ))
+
+
+send_scheduler = _create_scheduler()
@@ -0,0 +1,222 @@
+"""Process pool for CPU-bound work (HTML parsing, PDF extraction, regex passes).
+
+Work submitted here runs in separate processes so it cannot hold the GIL
+against the thread pools that wait on network I/O. Functions and arguments
+must be picklable, i.e. module-level functions taking plain data.
+
+The pool is started and warmed in the app lifespan (see ``app.main``). When
+it is not running (CLI scripts, one-off jobs) calls run inline so callers
+never need to care.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules imported by every worker during warm-up so the first real task
+# does not pay the import cost
+WARM_MODULES = (
+    "app.services.unified_messenger.job_page_parser",
+    "app.services.unified_messenger.job_context_tracker",
+    "app.services.unified_messenger.job_filter",
+    "app.services.unified_messenger.resume_message_generator",
+)
+
+
+def _warm_worker(modules: Iterable[str]) -> int:
+    """Import the given modules in a worker process."""
+    import importlib
+    import os
+
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+    return os.getpid()
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict, submitted_at: float):
+    """Run ``fn`` in the worker and report queue wait and run time."""
+    started_at = time.time()
+    result = fn(*args, **kwargs)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class CPUPool:
+    """Size-configurable process pool with a small async API and metrics."""
+
+    def __init__(self, max_workers: int = 2, start_method: str = "spawn", history_size: int = 500):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+
+        # Metrics
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._durations: deque = deque(maxlen=history_size)
+        self._waits: deque = deque(maxlen=history_size)
+        self._per_task: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Create the worker processes (no-op if already running or disabled)."""
+        if self._executor is not None or self.max_workers <= 0:
+            return
+        context = multiprocessing.get_context(self.start_method)
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        logger.info(f"🧮 CPU pool started with {self.max_workers} worker process(es)")
+
+    async def warm(self, modules: Iterable[str] = WARM_MODULES) -> None:
+        """Spin up every worker and pre-import the modules tasks will need."""
+        if self._executor is None:
+            return
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        pids = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _warm_worker, tuple(modules))
+            for _ in range(self.max_workers)
+        ], return_exceptions=True)
+        ready = len({pid for pid in pids if isinstance(pid, int)})
+        logger.info(f"🔥 CPU pool warmed: {ready} worker(s) ready in {time.perf_counter() - started:.2f}s")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes, cancelling anything still queued."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logger.info("🧮 CPU pool shut down")
+
+    def _record(self, name: str, wait: Optional[float], duration: Optional[float], failed: bool) -> None:
+        with self.lock:
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+            else:
+                self._completed += 1
+            if duration is not None:
+                self._durations.append(duration)
+                stats = self._per_task.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                stats["count"] += 1
+                stats["total_seconds"] += duration
+                stats["max_seconds"] = max(stats["max_seconds"], duration)
+            if wait is not None:
+                self._waits.append(wait)
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Submit ``fn(*args, **kwargs)`` and return a future with its result."""
+        if self._executor is None:
+            raise RuntimeError("CPU pool is not running")
+
+        name = getattr(fn, "__qualname__", repr(fn))
+        with self.lock:
+            self._pending += 1
+            self._submitted += 1
+
+        try:
+            inner = self._executor.submit(_timed_call, fn, args, kwargs, time.time())
+        except Exception:
+            self._record(name, None, None, failed=True)
+            raise
+
+        outer: Future = Future()
+
+        def _done(f: Future):
+            try:
+                result, wait, duration = f.result()
+            except BaseException as exc:
+                self._record(name, None, None, failed=True)
+                outer.set_exception(exc)
+                return
+            self._record(name, wait, duration, failed=False)
+            outer.set_result(result)
+
+        inner.add_done_callback(_done)
+        return outer
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Await ``fn(*args, **kwargs)`` in the pool (inline if the pool is not running)."""
+        if self._executor is None:
+            return fn(*args, **kwargs)
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def run_blocking(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Synchronous variant for code already running in a worker thread.
+
+        Never call this from the event loop thread; use :meth:`run` there.
+        """
+        if self._executor is None:
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth and task timings for sizing the pool."""
+        with self.lock:
+            pending = self._pending
+            durations = list(self._durations)
+            waits = list(self._waits)
+            per_task = {
+                name: {
+                    "count": int(stats["count"]),
+                    "avg_seconds": round(stats["total_seconds"] / stats["count"], 4) if stats["count"] else None,
+                    "max_seconds": round(stats["max_seconds"], 4),
+                }
+                for name, stats in self._per_task.items()
+            }
+            submitted, completed, failed = self._submitted, self._completed, self._failed
+
+        workers = self.max_workers if self._executor is not None else 0
+        active = min(pending, workers)
+
+        def _round(value):
+            return round(value, 4) if value is not None else None
+
+        return {
+            "running": self._executor is not None,
+            "workers": workers,
+            "active": active,
+            "queue_depth": max(0, pending - active),
+            "submitted": submitted,
+            "completed": completed,
+            "failed": failed,
+            "duration_seconds": {
+                "avg": _round(sum(durations) / len(durations)) if durations else None,
+                "p50": _round(_percentile(durations, 0.5)),
+                "p95": _round(_percentile(durations, 0.95)),
+            },
+            "wait_seconds": {
+                "avg": _round(sum(waits) / len(waits)) if waits else None,
+                "p95": _round(_percentile(waits, 0.95)),
+            },
+            "tasks": per_task,
+        }
+
+
+def _create_pool() -> CPUPool:
+    from app.core.config import settings
+
+    return CPUPool(max_workers=settings.cpu_pool_workers, start_method=settings.cpu_pool_start_method)
+
+
+# Global CPU pool instance
+cpu_pool = _create_pool()
@@ -0,0 +1,278 @@
+"""Batch generation of outreach drafts for mapped job/recruiter pairs.
+
+Generating drafts one pair at a time costs three requests per pair (email,
+LinkedIn message, save draft), and each of them reloads the resume and the
+job context. The batch path loads everything a batch needs once - the
+user's resume digest, the LinkedIn character limit and every stored job
+context - then generates all messages concurrently
+(bounded by DRAFT_BATCH_CONCURRENCY) and saves the drafts with one multi-row
+INSERT.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.draft import Draft
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "linkedin")
+
+
+@dataclass
+class DraftBatchContext:
+    """Everything shared by the pairs of one batch, loaded once."""
+
+    resume_digest: Any  # ResumeDigest (prompt-ready resume, sender name)
+    char_limit: int = 300
+    job_contexts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+def pair_mapping_with_recruiters(
+    mapping: Sequence[Dict[str, Any]],
+    recruiters: Sequence[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Join /search/map mapping entries with the full recruiter objects.
+
+    Recruiters are matched by profile URL, then by name; a mapping entry
+    without a match gets a minimal recruiter built from the entry itself.
+
+    Returns:
+        One dict per mapping entry with recruiter, job_title, company_name and job_url
+    """
+    by_url = {r.get('profile_url'): r for r in recruiters if r.get('profile_url')}
+    by_name = {r.get('name'): r for r in recruiters if r.get('name')}
+
+    pairs = []
+    for entry in mapping:
+        recruiter = (
+            by_url.get(entry.get('recruiter_profile_url'))
+            or by_name.get(entry.get('recruiter_name'))
+            or {
+                'name': entry.get('recruiter_name'),
+                'company': entry.get('recruiter_company'),
+                'profile_url': entry.get('recruiter_profile_url'),
+            }
+        )
+        recruiter = dict(recruiter)
+        job_url = entry.get('job_url') or recruiter.get('job_url')
+        company_name = (
+            entry.get('job_company')
+            or recruiter.get('company')
+            or recruiter.get('company_name')
+            or entry.get('recruiter_company')
+        )
+        # The email prompt reads job_url and company from the recruiter
+        if job_url:
+            recruiter['job_url'] = recruiter.get('job_url') or job_url
+        recruiter['company'] = recruiter.get('company') or recruiter.get('company_name') or company_name
+
+        pairs.append({
+            'recruiter': recruiter,
+            'mapping': dict(entry),
+            'job_title': entry.get('job_title') or recruiter.get('job_title') or 'Position',
+            'company_name': company_name or 'your company',
+            'job_url': job_url,
+        })
+    return pairs
+
+
+async def load_batch_context(
+    user_id: str,
+    db: AsyncSession,
+    resume_digest: Any,
+    job_urls: Sequence[Optional[str]],
+    channels: Sequence[str],
+) -> DraftBatchContext:
+    """Load the LinkedIn limit and job contexts for a batch."""
+    from app.services.job_context_service import get_job_contexts_by_urls, job_context_to_dict
+    from app.services.unified_messenger.adapter import get_linkedin_char_limit
+    from app.services.unified_messenger.clients import get_messenger
+
+    ctx = DraftBatchContext(resume_digest=resume_digest)
+
+    if 'email' in channels:
+        records = await get_job_contexts_by_urls(db, [url for url in job_urls if url])
+        ctx.job_contexts = {url: job_context_to_dict(record) for url, record in records.items()}
+        logger.info(f"📚 Loaded {len(ctx.job_contexts)} job contexts for {len(set(job_urls))} job URLs")
+
+    if 'linkedin' in channels:
+        messenger = get_messenger()
+        if not messenger.resume_generator:
+            raise ValueError("Resume generator not available")
+        ctx.char_limit = await get_linkedin_char_limit(user_id, db)
+
+    return ctx
+
+
+async def _generate_pair(
+    pair: Dict[str, Any],
+    job_type: str,
+    channels: Sequence[str],
+    ctx: DraftBatchContext,
+    slots: asyncio.Semaphore,
+) -> Dict[str, Any]:
+    """Generate the email and/or LinkedIn message for one pair (both concurrently)."""
+    from app.services.unified_messenger.clients import get_messenger
+
+    messenger = get_messenger()
+    recruiter = pair['recruiter']
+    result: Dict[str, Any] = {'errors': {}}
+
+    async def email():
+        async with slots:
+            subject, body = await messenger.generate_email_content(
+                [pair['job_title']],
+                job_type,
+                recruiter,
+                ctx.resume_digest.short_form,
+                pair['job_url'],
+                job_context=ctx.job_contexts.get(pair['job_url'], {}),
+                resume_digest=ctx.resume_digest,
+            )
+        result['email_subject'] = subject
+        result['email_body'] = body
+
+    async def linkedin():
+        async with slots:
+            generated = await messenger.resume_generator.agenerate_message_detailed(
+                ctx.resume_digest.short_form,
+                recruiter.get('name') or 'Hiring Manager',
+                pair['job_title'],
+                pair['company_name'],
+                ctx.char_limit,
+                resume_prepared=True,
+            )
+        result['linkedin_message'] = generated.text
+        result['linkedin_attempts'] = generated.attempts
+
+    tasks = {name: fn for name, fn in (('email', email), ('linkedin', linkedin)) if name in channels}
+    outcomes = await asyncio.gather(*(fn() for fn in tasks.values()), return_exceptions=True)
+    for name, outcome in zip(tasks, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            logger.warning(f"⚠️ {name} generation failed for {recruiter.get('name')}: {outcome}")
+            result['errors'][name] = str(outcome) or type(outcome).__name__
+    return result
+
+
+def _draft_row(user_id: str, pair: Dict[str, Any], generated: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Draft column values for a generated pair, or None if nothing was generated."""
+    has_email = bool(generated.get('email_subject') or generated.get('email_body'))
+    has_linkedin = bool(generated.get('linkedin_message'))
+    if not (has_email or has_linkedin):
+        return None
+
+    if has_email and has_linkedin:
+        draft_type = 'both'
+    elif has_linkedin:
+        draft_type = 'linkedin'
+    else:
+        draft_type = 'email'
+
+    recruiter = pair['recruiter']
+    return {
+        'owner_id': user_id,
+        'draft_type': draft_type,
+        'recipient_name': recruiter.get('name') or pair['mapping'].get('recruiter_name'),
+        'recipient_email': recruiter.get('extracted_email') or recruiter.get('email'),
+        'recipient_linkedin_url': recruiter.get('profile_url') or pair['mapping'].get('recruiter_profile_url'),
+        'email_subject': generated.get('email_subject'),
+        'email_body': generated.get('email_body'),
+        'linkedin_message': generated.get('linkedin_message'),
+        'job_title': pair['job_title'],
+        'company_name': pair['company_name'],
+        'recruiter_info': {**recruiter, **pair['mapping']},
+    }
+
+
+async def insert_drafts(db: AsyncSession, rows: List[Dict[str, Any]]) -> List[int]:
+    """Insert drafts with a single multi-row INSERT and return their ids in row order."""
+    if not rows:
+        return []
+    result = await db.execute(
+        insert(Draft).returning(Draft.id, sort_by_parameter_order=True),
+        rows,
+    )
+    ids = [row[0] for row in result.all()]
+    await db.commit()
+    return ids
+
+
+async def generate_drafts_batch(
+    user_id: str,
+    pairs: List[Dict[str, Any]],
+    job_type: str,
+    channels: Sequence[str],
+    ctx: DraftBatchContext,
+    concurrency: Optional[int] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate drafts for every pair, yielding one event per pair as it completes.
+
+    Events:
+        {"type": "item", "index", "success", "draft", "errors", "linkedin_attempts"} - per pair, in completion order
+        {"type": "done", "total", "saved", "failed", "drafts": [{"index", "id"}]} - after the INSERT
+        {"type": "error", "error"} - if saving the drafts failed
+
+    If the consumer stops iterating (client disconnected), outstanding
+    generations are cancelled and nothing is saved.
+    """
+    from app.core.config import settings
+    from app.db.base import AsyncSessionLocal
+
+    limit = max(1, min(concurrency or settings.draft_batch_concurrency, settings.draft_batch_max_concurrency))
+    slots = asyncio.Semaphore(limit)
+    logger.info(f"🧵 Generating {len(pairs)} drafts ({', '.join(channels)}) with concurrency {limit}")
+
+    async def run(index: int):
+        return index, await _generate_pair(pairs[index], job_type, channels, ctx, slots)
+
+    tasks = [asyncio.ensure_future(run(i)) for i in range(len(pairs))]
+    rows: List[Dict[str, Any]] = []
+    row_indices: List[int] = []
+    failed = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, generated = await next_done
+            row = _draft_row(user_id, pairs[index], generated)
+            if row is None:
+                failed += 1
+            else:
+                rows.append(row)
+                row_indices.append(index)
+            yield {
+                'type': 'item',
+                'index': index,
+                'success': row is not None and not generated['errors'],
+                'draft': {k: v for k, v in row.items() if k not in ('owner_id', 'recruiter_info')} if row else None,
+                'errors': generated['errors'] or None,
+                'linkedin_attempts': generated.get('linkedin_attempts'),
+            }
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    try:
+        async with AsyncSessionLocal() as session:
+            ids = await insert_drafts(session, rows)
+    except Exception as e:
+        logger.error(f"❌ Failed to save {len(rows)} batch drafts: {e}")
+        yield {'type': 'error', 'error': f"Failed to save drafts: {e}"}
+        return
+
+    logger.info(f"✅ Saved {len(ids)} drafts ({failed} pairs produced no content)")
+    yield {
+        'type': 'done',
+        'total': len(pairs),
+        'saved': len(ids),
+        'failed': failed,
+        'drafts': [{'index': index, 'id': draft_id} for index, draft_id in zip(row_indices, ids)],
+    }
@@ -0,0 +1,538 @@
+"""Batch sending of saved drafts.
+
+Sending N drafts one ``/drafts/{id}/send`` call at a time repeats, per draft,
+the account lookups, the token check, the history insert, the stats update
+and the commit. The batch path loads the drafts, the in-flight outbox rows
+and the user's email and LinkedIn accounts once, checks the OAuth token once,
+then sends every draft part concurrently - at most
+DRAFT_SEND_EMAIL_CONCURRENCY emails and DRAFT_SEND_LINKEDIN_CONCURRENCY
+invitations in flight for the account. Through a Gmail account the emails go
+out in Gmail HTTP batch requests (GMAIL_BATCH_SIZE messages per request).
+
+Parts are claimed before anything is sent: :func:`claim_drafts` locks the
+drafts (``FOR UPDATE SKIP LOCKED``) and, in the same transaction, writes an
+outbox row in state ``sending`` owned by the batch for every part it will
+send. Other batches, ``/drafts/{id}/send`` and the outbox workers treat those
+parts as in flight. Each claim is re-asserted just before its send, so a claim
+the outbox workers took over (after OUTBOX_LOCK_TIMEOUT_SECONDS) is not sent
+twice.
+
+Results are recorded while the batch runs: a recorder commits everything that
+finished since its last commit (outbox rows, history, draft flags, stats and
+``last_used_at``) in one transaction. If the process dies, claims that were
+never recorded are delivered by the outbox workers once their lock times out;
+like the outbox itself, a part whose send completed just before the crash may
+go out twice.
+
+Sends run in a task of their own: a client that disconnects mid-batch stops
+receiving results, but the sends in flight complete and are recorded.
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.draft import Draft
+from app.db.models.email_account import EmailAccount
+from app.db.models.linkedin_account import LinkedInAccount
+from app.db.models.outbox_message import OutboxMessage
+from app.db.models.outreach_history import OutreachHistory
+from app.db.models.user_stats import UserStats
+from app.services.outreach_stats_service import record_history
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ("email", "linkedin")
+
+BUSY_ERROR = "Draft is being sent by another request"
+TAKEN_OVER_ERROR = "Already being sent by the outbox"
+
+# Batches whose client went away keep running; hold references until they finish
+_running: Set[asyncio.Task] = set()
+
+
+@dataclass
+class DraftSendContext:
+    """Everything a batch send needs, loaded and claimed once."""
+
+    drafts: List[Draft]
+    claim_id: str = ""  # locked_by of the batch's outbox rows
+    email_account: Optional[EmailAccount] = None
+    linkedin_account: Optional[LinkedInAccount] = None
+    linkedin_error: Optional[str] = None  # why LinkedIn parts cannot be sent (no connected account)
+    queued: Dict[int, Set[str]] = field(default_factory=dict)  # draft id -> channels already in the outbox
+    claims: Dict[Tuple[int, str], int] = field(default_factory=dict)  # (draft id, channel) -> claimed outbox row
+    unsent: Dict[int, Dict[str, Dict[str, Any]]] = field(default_factory=dict)  # draft id -> channel -> result
+    missing: List[int] = field(default_factory=list)  # requested ids that are not the user's drafts
+    busy: List[int] = field(default_factory=list)  # drafts another request holds locked
+    statuses: Dict[int, Dict[str, Any]] = field(default_factory=dict)  # draft id -> status after recording
+    token_refreshed: bool = False  # the email account's token was refreshed for this batch
+
+
+def _claim_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}/batch-{uuid.uuid4().hex[:12]}"
+
+
+def _parts_to_send(draft: Draft, channels: Sequence[str], ctx: DraftSendContext) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Channel -> None (send it) or the result reported instead, for each requested channel."""
+    parts: Dict[str, Optional[Dict[str, Any]]] = {}
+    queued = ctx.queued.get(draft.id, set())
+
+    def skipped(reason: str) -> Dict[str, Any]:
+        return {"success": False, "skipped": True, "error": reason}
+
+    if "email" in channels and draft.email_subject and draft.email_body and draft.recipient_email:
+        if draft.email_sent:
+            parts["email"] = skipped("Email has already been sent")
+        elif "email" in queued:
+            parts["email"] = skipped("Email is already queued for sending")
+        elif ctx.email_account is None:
+            parts["email"] = {"success": False, "error": "No linked email account found. Please link an email account in Settings."}
+        else:
+            parts["email"] = None
+    if "linkedin" in channels and draft.linkedin_message and draft.recipient_linkedin_url:
+        if draft.linkedin_sent:
+            parts["linkedin"] = skipped("LinkedIn message has already been sent")
+        elif "linkedin" in queued:
+            parts["linkedin"] = skipped("LinkedIn message is already queued for sending")
+        elif ctx.linkedin_error:
+            parts["linkedin"] = {"success": False, "error": ctx.linkedin_error}
+        else:
+            parts["linkedin"] = None
+    return parts
+
+
+async def claim_drafts(
+    user_id: str,
+    db: AsyncSession,
+    draft_ids: Sequence[int],
+    channels: Sequence[str],
+) -> DraftSendContext:
+    """
+    Load the drafts (in request order) and the sending accounts, and claim every part to send.
+
+    Commits the claims: one outbox row per part, in state 'sending' and locked
+    by the batch. Drafts another request holds locked are reported busy.
+    """
+    from app.services.outbox import PENDING, SENDING, enqueue_email, enqueue_linkedin, get_sending_account
+    from app.services.unified_messenger.adapter import linkedin_account_error
+
+    owned = set((await db.execute(
+        select(Draft.id).where(Draft.owner_id == user_id).where(Draft.id.in_(draft_ids))
+    )).scalars().all())
+    result = await db.execute(
+        select(Draft)
+        .where(Draft.owner_id == user_id)
+        .where(Draft.id.in_(draft_ids))
+        .order_by(Draft.id)
+        .with_for_update(skip_locked=True)
+    )
+    by_id = {draft.id: draft for draft in result.scalars().all()}
+    requested = list(dict.fromkeys(draft_ids))
+    ctx = DraftSendContext(
+        drafts=[by_id[draft_id] for draft_id in requested if draft_id in by_id],
+        claim_id=_claim_id(),
+        missing=[draft_id for draft_id in draft_ids if draft_id not in owned],
+        busy=[draft_id for draft_id in requested if draft_id in owned and draft_id not in by_id],
+    )
+
+    result = await db.execute(
+        select(OutboxMessage.draft_id, OutboxMessage.channel)
+        .where(OutboxMessage.draft_id.in_(list(by_id)))
+        .where(OutboxMessage.status.in_([PENDING, SENDING]))
+    )
+    for draft_id, channel in result.all():
+        ctx.queued.setdefault(draft_id, set()).add(channel)
+
+    if "email" in channels:
+        ctx.email_account = await get_sending_account(user_id, db)
+    if "linkedin" in channels:
+        result = await db.execute(
+            select(LinkedInAccount)
+            .where(LinkedInAccount.owner_id == user_id)
+            .where(LinkedInAccount.is_active == True)
+            .where(LinkedInAccount.unipile_account_id.isnot(None))
+            .order_by(LinkedInAccount.is_default.desc(), LinkedInAccount.created_at.desc())
+            .limit(1)
+        )
+        ctx.linkedin_account = result.scalar_one_or_none()
+        if ctx.linkedin_account is None:
+            # Same errors as a single send; never fall back to the operator's account
+            any_account = await db.scalar(select(LinkedInAccount).where(LinkedInAccount.owner_id == user_id).limit(1))
+            ctx.linkedin_error = linkedin_account_error(any_account)
+
+    now = datetime.utcnow()
+    claimed: List[Tuple[int, str, OutboxMessage]] = []
+    for draft in ctx.drafts:
+        for channel, unsent in _parts_to_send(draft, channels, ctx).items():
+            if unsent is not None:
+                ctx.unsent.setdefault(draft.id, {})[channel] = unsent
+                continue
+            details = dict(
+                draft_id=draft.id,
+                recipient_name=draft.recipient_name,
+                job_title=draft.job_title,
+                company_name=draft.company_name,
+            )
+            if channel == "email":
+                message = enqueue_email(
+                    db, user_id, draft.recipient_email, draft.email_subject, draft.email_body,
+                    email_account_id=ctx.email_account.id, **details
+                )
+            else:
+                message = enqueue_linkedin(db, user_id, draft.recipient_linkedin_url, draft.linkedin_message, **details)
+            message.status = SENDING
+            message.locked_at = now
+            message.locked_by = ctx.claim_id
+            message.attempts = 1
+            claimed.append((draft.id, channel, message))
+
+    # Releases the draft locks; from here on the outbox rows mark the parts in flight
+    await db.flush()
+    ctx.claims = {(draft_id, channel): message.id for draft_id, channel, message in claimed}
+    await db.commit()
+    return ctx
+
+
+async def _reassert_claims(ctx: DraftSendContext, message_ids: Iterable[int]) -> Set[int]:
+    """Refresh the batch's lock on outbox rows; returns the ids it still holds."""
+    from app.db.base import AsyncSessionLocal
+    from app.services.outbox import SENDING
+
+    message_ids = list(message_ids)
+    if not message_ids:
+        return set()
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(message_ids))
+            .where(OutboxMessage.status == SENDING)
+            .where(OutboxMessage.locked_by == ctx.claim_id)
+            .values(locked_at=datetime.utcnow())
+            .returning(OutboxMessage.id)
+            .execution_options(synchronize_session=False)
+        )
+        held = set(result.scalars().all())
+        await db.commit()
+    return held
+
+
+async def _send_email_part(draft: Draft, ctx: DraftSendContext, token_error: Optional[str]) -> Dict[str, Any]:
+    from app.services.unified_messenger.clients import get_messenger
+
+    if token_error:
+        return {"success": False, "error": f"Failed to refresh access token: {token_error}. Please re-link your email account."}
+    success, result = await get_messenger().asend_email_with_account(
+        draft.recipient_email, draft.email_subject, draft.email_body, ctx.email_account
+    )
+    return {"success": True, "result": result} if success else {"success": False, "error": result}
+
+
+async def _send_linkedin_part(draft: Draft, ctx: DraftSendContext) -> Dict[str, Any]:
+    from app.services.executors import UPSTREAM_IO, run_in_executor
+    from app.services.unified_messenger.adapter import invitation_error, linkedin_url_to_provider_id
+    from app.services.unified_messenger.clients import get_messenger
+
+    unipile_account_id = ctx.linkedin_account.unipile_account_id
+    provider_result = await linkedin_url_to_provider_id(draft.recipient_linkedin_url, account_id=unipile_account_id)
+    provider_id = provider_result.get("provider_id")
+    if not provider_id:
+        error_msg = provider_result.get("error", "Could not convert LinkedIn URL to Provider ID")
+        return {"success": False, "error": f"{error_msg}. Please check the LinkedIn URL is valid and try again."}
+    success, result = await run_in_executor(
+        UPSTREAM_IO, get_messenger().send_invitation, provider_id, draft.linkedin_message, unipile_account_id
+    )
+    return {"success": True, "result": result} if success else {"success": False, "error": invitation_error(result)}
+
+
+def _history_row(draft: Draft, channel: str, sent_at: datetime) -> Dict[str, Any]:
+    return {
+        "user_id": draft.owner_id,
+        "recipient_name": draft.recipient_name,
+        "recipient_email": draft.recipient_email if channel in ("email", "both") else None,
+        "recipient_linkedin_url": draft.recipient_linkedin_url if channel in ("linkedin", "both") else None,
+        "job_title": draft.job_title,
+        "company_name": draft.company_name,
+        "channel": channel,
+        "email_subject": draft.email_subject if channel in ("email", "both") else None,
+        "email_body": draft.email_body if channel in ("email", "both") else None,
+        "linkedin_message": draft.linkedin_message if channel in ("linkedin", "both") else None,
+        "sent_at": sent_at,
+        "created_at": sent_at,
+        "draft_id": draft.id,
+    }
+
+
+def _draft_status(draft: Draft) -> Dict[str, Any]:
+    return {
+        "id": draft.id,
+        "is_sent": draft.is_sent,
+        "email_sent": draft.email_sent,
+        "linkedin_sent": draft.linkedin_sent,
+    }
+
+
+async def record_batch(user_id: str, ctx: DraftSendContext, outcomes: Sequence[Tuple[int, Dict[str, Dict[str, Any]]]]) -> None:
+    """
+    Record finished parts in one transaction: their outbox rows (sent / failed),
+    history, draft flags, stats and account usage.
+
+    `outcomes` holds (draft id, {channel: result}); parts the batch did not
+    claim, or whose claim the outbox workers took over, are left alone.
+    """
+    from app.db.base import AsyncSessionLocal
+    from app.services.outbox import FAILED, SENT, update_draft_sent_status
+    from app.services.user_settings_service import get_or_create_user_stats
+
+    now = datetime.utcnow()
+    outbox_rows: List[Dict[str, Any]] = []
+    sent: Dict[int, Set[str]] = {}
+    for draft_id, results in outcomes:
+        for channel, result in results.items():
+            message_id = ctx.claims.get((draft_id, channel))
+            if message_id is None or result.get("taken_over"):
+                continue
+            success = bool(result.get("success"))
+            if success:
+                sent.setdefault(draft_id, set()).add(channel)
+            outbox_rows.append({
+                "id": message_id,
+                "status": SENT if success else FAILED,
+                "sent_at": now if success else None,
+                "locked_at": None,
+                "last_error": None if success else str(result.get("error") or "Send failed")[:2000],
+            })
+    if not outbox_rows and not ctx.token_refreshed:
+        return
+
+    emails = sum(1 for channels in sent.values() if "email" in channels)
+    invites = sum(1 for channels in sent.values() if "linkedin" in channels)
+
+    account_values: Dict[str, Any] = {}
+    if emails:
+        account_values["last_used_at"] = now
+    if ctx.token_refreshed:
+        account = ctx.email_account
+        account_values.update(
+            access_token=account.access_token,
+            token_expires_at=account.token_expires_at,
+            refresh_token=account.refresh_token,
+            updated_at=now,
+        )
+
+    async with AsyncSessionLocal() as db:
+        if sent:
+            # Commits on first use, so it runs before any row is locked
+            await get_or_create_user_stats(user_id, db)
+        if outbox_rows:
+            # Bulk UPDATE by primary key (one executemany)
+            await db.execute(update(OutboxMessage), outbox_rows)
+        if sent:
+            # Lock and re-read the drafts: the outbox may record another part of them concurrently
+            result = await db.execute(
+                select(Draft)
+                .where(Draft.id.in_(list(sent)))
+                .order_by(Draft.id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            history: List[OutreachHistory] = []
+            for draft in result.scalars().all():
+                for channel in CHANNELS:
+                    if channel in sent[draft.id]:
+                        setattr(draft, f"{channel}_sent", True)
+                        setattr(draft, f"{channel}_sent_at", now)
+                        history.append(OutreachHistory(**_history_row(draft, channel, now)))
+                update_draft_sent_status(draft)
+                if draft.draft_type == 'both' and draft.email_sent and draft.linkedin_sent:
+                    history.append(OutreachHistory(**_history_row(draft, "both", draft.sent_at or now)))
+                ctx.statuses[draft.id] = _draft_status(draft)
+            await record_history(db, history)
+            stats = {"updated_at": now}
+            if emails:
+                stats.update(emails_sent=UserStats.emails_sent + emails, last_email_sent_at=now)
+            if invites:
+                stats.update(linkedin_invites_sent=UserStats.linkedin_invites_sent + invites, last_linkedin_invite_at=now)
+            await db.execute(update(UserStats).where(UserStats.user_id == user_id).values(**stats))
+        if account_values and ctx.email_account is not None:
+            await db.execute(
+                update(EmailAccount).where(EmailAccount.id == ctx.email_account.id).values(**account_values)
+            )
+        if invites and ctx.linkedin_account is not None:
+            await db.execute(
+                update(LinkedInAccount).where(LinkedInAccount.id == ctx.linkedin_account.id).values(last_used_at=now)
+            )
+        await db.commit()
+    ctx.token_refreshed = False
+
+
+async def _run_batch(
+    user_id: str,
+    channels: Sequence[str],
+    ctx: DraftSendContext,
+    events: asyncio.Queue,
+) -> None:
+    from app.core.config import settings
+    from app.services import email_providers
+    from app.services.token_refresh import token_refresher
+
+    email_slots = asyncio.Semaphore(max(1, settings.draft_send_email_concurrency))
+    linkedin_slots = asyncio.Semaphore(max(1, settings.draft_send_linkedin_concurrency))
+    taken_over = {"success": False, "skipped": True, "taken_over": True, "error": TAKEN_OVER_ERROR}
+
+    token_error = None
+    if ctx.email_account is not None and email_providers.is_oauth_account(ctx.email_account):
+        token_before = ctx.email_account.access_token
+        _, token_error = await token_refresher.ensure_fresh("email", ctx.email_account)
+        ctx.token_refreshed = ctx.email_account.access_token != token_before
+
+    # Gmail: every claimed email of the batch in HTTP batch requests, one result per draft
+    gmail_batch = None
+    batched = [draft for draft in ctx.drafts if (draft.id, "email") in ctx.claims]
+    if len(batched) > 1 and ctx.email_account.provider == 'gmail' and not token_error \
+            and email_providers.is_oauth_account(ctx.email_account):
+
+        async def send_gmail_batch() -> Dict[int, Dict[str, Any]]:
+            held = await _reassert_claims(ctx, (ctx.claims[(draft.id, "email")] for draft in batched))
+            to_send = [draft for draft in batched if ctx.claims[(draft.id, "email")] in held]
+            sends = await email_providers.send_many_with_account(
+                ctx.email_account,
+                [(draft.recipient_email, draft.email_subject, draft.email_body) for draft in to_send],
+                concurrency=settings.draft_send_email_concurrency,
+            )
+            results = {draft.id: taken_over for draft in batched}
+            for draft, (success, result) in zip(to_send, sends):
+                results[draft.id] = {"success": True, "result": result} if success else {"success": False, "error": result}
+            return results
+
+        gmail_batch = asyncio.ensure_future(send_gmail_batch())
+
+    async def send_part(draft: Draft, channel: str) -> Dict[str, Any]:
+        try:
+            if channel == "email" and gmail_batch is not None:
+                return (await gmail_batch)[draft.id]
+            slots = email_slots if channel == "email" else linkedin_slots
+            async with slots:
+                if not await _reassert_claims(ctx, [ctx.claims[(draft.id, channel)]]):
+                    return taken_over
+                if channel == "email":
+                    return await _send_email_part(draft, ctx, token_error)
+                return await _send_linkedin_part(draft, ctx)
+        except Exception as e:
+            logger.error(f"❌ Batch send of draft {draft.id} ({channel}) failed: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def send_draft(index: int, draft: Draft):
+        results = dict(ctx.unsent.get(draft.id, {}))
+        to_send = [channel for channel in CHANNELS if (draft.id, channel) in ctx.claims]
+        outcomes = await asyncio.gather(*(send_part(draft, channel) for channel in to_send))
+        results.update(zip(to_send, outcomes))
+        return index, draft, results
+
+    # Records whatever finished since its last commit; None ends it
+    finished: asyncio.Queue = asyncio.Queue()
+    record_errors: List[str] = []
+
+    async def recorder():
+        done = False
+        while not done:
+            group = [await finished.get()]
+            while not finished.empty():
+                group.append(finished.get_nowait())
+            done = group[-1] is None
+            outcomes = [outcome for outcome in group if outcome is not None]
+            try:
+                await record_batch(user_id, ctx, outcomes)
+            except Exception as e:
+                # The messages went out; only the bookkeeping is missing
+                logger.error(f"❌ Failed to record batch sends of {len(outcomes)} drafts: {e}")
+                record_errors.append(str(e))
+
+    recording = asyncio.ensure_future(recorder())
+    sent: Dict[int, Set[str]] = {}
+    failed = 0
+    tasks = [asyncio.ensure_future(send_draft(i, draft)) for i, draft in enumerate(ctx.drafts)]
+    for draft_id in ctx.missing:
+        await events.put({'type': 'item', 'draft_id': draft_id, 'success': False, 'error': "Draft not found"})
+    for draft_id in ctx.busy:
+        await events.put({'type': 'item', 'draft_id': draft_id, 'success': False, 'error': BUSY_ERROR})
+    for next_done in asyncio.as_completed(tasks):
+        index, draft, results = await next_done
+        finished.put_nowait((draft.id, results))
+        sent_channels = {channel for channel, result in results.items() if result.get("success")}
+        if sent_channels:
+            sent[draft.id] = sent_channels
+        success = bool(results) and all(result.get("success") for result in results.values())
+        if not success:
+            failed += 1
+        await events.put({
+            'type': 'item',
+            'index': index,
+            'draft_id': draft.id,
+            'success': success,
+            'results': {channel: {k: v for k, v in result.items() if k != "taken_over"} for channel, result in results.items()},
+            'error': " | ".join(
+                f"{'Email' if channel == 'email' else 'LinkedIn'}: {result.get('error')}"
+                for channel, result in results.items() if not result.get("success")
+            ) or (None if results else "Draft has no content for the requested channels"),
+        })
+
+    finished.put_nowait(None)
+    await recording
+    if record_errors:
+        await events.put({'type': 'error', 'error': f"Messages were sent but recording them failed: {record_errors[0]}"})
+        return
+
+    logger.info(f"✅ Batch sent {len(sent)} of {len(ctx.drafts)} drafts")
+    await events.put({
+        'type': 'done',
+        'total': len(ctx.drafts) + len(ctx.missing) + len(ctx.busy),
+        'sent': len(sent),
+        'failed': failed + len(ctx.missing) + len(ctx.busy),
+        'emails_sent': sum(1 for channels in sent.values() if "email" in channels),
+        'linkedin_sent': sum(1 for channels in sent.values() if "linkedin" in channels),
+        'drafts': [ctx.statuses.get(draft.id) or _draft_status(draft) for draft in ctx.drafts if draft.id in sent],
+    })
+
+
+async def send_drafts_batch(
+    user_id: str,
+    channels: Sequence[str],
+    ctx: DraftSendContext,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Send the parts claimed in `ctx`, yielding one event per draft as its sends complete.
+
+    Events:
+        {"type": "item", "index", "draft_id", "success", "results": {channel: result}, "error"} - per draft
+        {"type": "done", "total", "sent", "failed", "emails_sent", "linkedin_sent", "drafts"} - after recording
+        {"type": "error", "error"} - if recording the sends failed
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(_run_batch(user_id, channels, ctx, events))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+
+    while True:
+        get_event = asyncio.ensure_future(events.get())
+        done, _ = await asyncio.wait({get_event, task}, return_when=asyncio.FIRST_COMPLETED)
+        if get_event in done:
+            event = get_event.result()
+            yield event
+            if event['type'] in ('done', 'error'):
+                return
+            continue
+        get_event.cancel()
+        if task.exception() is not None:
+            logger.error(f"❌ Batch send failed: {task.exception()}")
+            yield {'type': 'error', 'error': f"Batch send failed: {task.exception()}"}
+        while not events.empty():
+            yield events.get_nowait()
+        return
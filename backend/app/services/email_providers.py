@@ -0,0 +1,356 @@
+"""Async sending through the Gmail API and Microsoft Graph.
+
+Provider sends used to call module-level ``httpx.post`` on executor threads,
+which builds a client - and a fresh TLS connection - for every message. This
+module keeps one pooled ``httpx.AsyncClient`` per provider (HTTP/2 when the
+``h2`` package is installed, so concurrent sends share one connection) and
+exposes coroutine senders that request handlers await directly:
+
+- :func:`send_with_account` sends one message through an OAuth account
+- :func:`send_many_with_account` sends several: Gmail messages go out in HTTP
+  batch requests (up to ``GMAIL_BATCH_SIZE`` per request), Graph messages are
+  sent concurrently (bounded by ``PROVIDER_SEND_CONCURRENCY``)
+- :func:`refresh_access_token` refreshes an OAuth token on the same clients
+  (:func:`token_request_params` builds the request for blocking callers)
+
+``POST /drafts/send-batch`` sends the email parts of a batch through a Gmail
+account with :func:`send_many_with_account`.
+
+Results use the messenger's ``(success, result_or_error)`` convention.
+"""
+import asyncio
+import base64
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+GMAIL_SEND_URL = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
+GMAIL_BATCH_URL = "https://www.googleapis.com/batch/gmail/v1"
+GMAIL_BATCH_SEND_PATH = "/gmail/v1/users/me/messages/send"
+GRAPH_SEND_URL = "https://graph.microsoft.com/v1.0/me/sendMail"
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+MICROSOFT_TOKEN_URL = "https://login.microsoftonline.com/common/oauth2/v2.0/token"
+
+# Gmail accepts up to 100 calls per batch but recommends staying well below
+GMAIL_MAX_BATCH_SIZE = 100
+
+OAUTH_PROVIDERS = ("gmail", "outlook")
+
+SendResult = Tuple[bool, Any]
+OutgoingMessage = Tuple[str, str, str]  # (to_email, subject, body)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    from app.core.config import settings
+    return httpx.Limits(
+        max_connections=settings.provider_http_max_connections,
+        max_keepalive_connections=settings.provider_http_max_connections,
+        keepalive_expiry=60.0,
+    )
+
+
+def get_provider_client(provider: str) -> httpx.AsyncClient:
+    """The shared async client for a provider ('gmail', 'outlook'), created on first use."""
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        client = _clients[provider] = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=_limits(),
+            timeout=httpx.Timeout(30.0, connect=10.0),
+        )
+    return client
+
+
+def get_sync_provider_client() -> httpx.Client:
+    """Shared blocking client for the threaded send paths (campaign workers)."""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        with _sync_lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    limits=_limits(),
+                    timeout=httpx.Timeout(30.0, connect=10.0),
+                )
+    return _sync_client
+
+
+async def close_provider_clients() -> None:
+    """Close the shared clients (app shutdown)."""
+    global _sync_client
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+def gmail_raw_message(from_email: str, to_email: str, subject: str, body: str) -> str:
+    """Base64url-encoded RFC 2822 message for the Gmail API."""
+    message = MIMEText(body)
+    message['To'] = to_email
+    message['From'] = from_email
+    message['Subject'] = subject
+    return base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+
+
+def graph_message(to_email: str, subject: str, body: str) -> Dict[str, Any]:
+    """Microsoft Graph sendMail payload."""
+    return {
+        'message': {
+            'subject': subject,
+            'body': {
+                'contentType': 'Text',
+                'content': body
+            },
+            'toRecipients': [
+                {
+                    'emailAddress': {
+                        'address': to_email
+                    }
+                }
+            ]
+        }
+    }
+
+
+def _bearer(access_token: str) -> Dict[str, str]:
+    return {'Authorization': f'Bearer {access_token}', 'Content-Type': 'application/json'}
+
+
+async def send_gmail(access_token: str, from_email: str, to_email: str, subject: str, body: str) -> SendResult:
+    """Send one message via the Gmail API."""
+    try:
+        response = await get_provider_client('gmail').post(
+            GMAIL_SEND_URL,
+            headers=_bearer(access_token),
+            json={'raw': gmail_raw_message(from_email, to_email, subject, body)},
+        )
+        if response.status_code == 200:
+            return True, {"message": "Email sent successfully via Gmail API"}
+        return False, f"Gmail API error: {response.status_code} - {response.text}"
+    except Exception as e:
+        return False, f"Gmail API error: {str(e)}"
+
+
+def _gmail_batch_body(boundary: str, raws: Sequence[str]) -> str:
+    parts = []
+    for index, raw in enumerate(raws):
+        parts.append(
+            f"--{boundary}\r\n"
+            "Content-Type: application/http\r\n"
+            f"Content-ID: <item{index}>\r\n"
+            "\r\n"
+            f"POST {GMAIL_BATCH_SEND_PATH}\r\n"
+            "Content-Type: application/json\r\n"
+            "\r\n"
+            f"{json.dumps({'raw': raw})}\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n")
+    return "".join(parts)
+
+
+def parse_batch_response(content_type: str, text: str) -> Dict[int, Tuple[int, str]]:
+    """
+    Split a multipart/mixed batch response into {item index: (status, body)}.
+
+    Parts are matched to requests by their Content-ID (``<response-itemN>``).
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type or "")
+    if not match:
+        raise ValueError(f"Batch response is not multipart: {content_type}")
+    results: Dict[int, Tuple[int, str]] = {}
+    for part in text.split(f"--{match.group(1)}"):
+        part = part.strip()
+        if not part or part == "--":
+            continue
+        sections = re.split(r"\r?\n\r?\n", part, maxsplit=2)
+        if len(sections) < 2:
+            continue
+        content_id = re.search(r"Content-ID:\s*<response-item(\d+)>", sections[0], re.IGNORECASE)
+        status_line = sections[1].lstrip().split("\n", 1)[0]
+        status = re.match(r"HTTP/[\d.]+\s+(\d{3})", status_line)
+        if not content_id or not status:
+            continue
+        results[int(content_id.group(1))] = (int(status.group(1)), sections[2].strip() if len(sections) > 2 else "")
+    return results
+
+
+async def send_gmail_batch(access_token: str, from_email: str, messages: Sequence[OutgoingMessage]) -> List[SendResult]:
+    """
+    Send several messages in one Gmail HTTP batch request (at most GMAIL_MAX_BATCH_SIZE).
+
+    Returns one result per message, in order. A failed batch request fails every message in it.
+    """
+    if not messages:
+        return []
+    if len(messages) > GMAIL_MAX_BATCH_SIZE:
+        raise ValueError(f"Gmail batches hold at most {GMAIL_MAX_BATCH_SIZE} messages")
+
+    boundary = f"batch_{uuid.uuid4().hex}"
+    raws = [gmail_raw_message(from_email, to, subject, body) for to, subject, body in messages]
+    try:
+        response = await get_provider_client('gmail').post(
+            GMAIL_BATCH_URL,
+            headers={
+                'Authorization': f'Bearer {access_token}',
+                'Content-Type': f'multipart/mixed; boundary={boundary}',
+            },
+            content=_gmail_batch_body(boundary, raws).encode('utf-8'),
+        )
+        if response.status_code != 200:
+            error = f"Gmail API error: {response.status_code} - {response.text}"
+            return [(False, error)] * len(messages)
+        parts = parse_batch_response(response.headers.get('content-type', ''), response.text)
+    except Exception as e:
+        return [(False, f"Gmail API error: {str(e)}")] * len(messages)
+
+    results: List[SendResult] = []
+    for index in range(len(messages)):
+        status, body = parts.get(index, (0, "missing from batch response"))
+        if status == 200:
+            results.append((True, {"message": "Email sent successfully via Gmail API (batch)"}))
+        else:
+            results.append((False, f"Gmail API error: {status} - {body}"))
+    return results
+
+
+async def send_outlook(access_token: str, to_email: str, subject: str, body: str) -> SendResult:
+    """Send one message via Microsoft Graph."""
+    try:
+        response = await get_provider_client('outlook').post(
+            GRAPH_SEND_URL,
+            headers=_bearer(access_token),
+            json=graph_message(to_email, subject, body),
+        )
+        if response.status_code in [200, 202]:
+            return True, {"message": "Email sent successfully via Outlook API"}
+        return False, f"Outlook API error: {response.status_code} - {response.text}"
+    except Exception as e:
+        return False, f"Outlook API error: {str(e)}"
+
+
+def is_oauth_account(email_account: Any) -> bool:
+    return email_account.provider in OAUTH_PROVIDERS and bool(email_account.access_token)
+
+
+async def send_with_account(email_account: Any, to_email: str, subject: str, body: str) -> SendResult:
+    """Send one message through an OAuth (Gmail / Outlook) account."""
+    if email_account.provider == 'gmail':
+        return await send_gmail(email_account.access_token, email_account.email, to_email, subject, body)
+    if email_account.provider == 'outlook':
+        return await send_outlook(email_account.access_token, to_email, subject, body)
+    return False, f"Unsupported provider: {email_account.provider}"
+
+
+async def send_many_with_account(
+    email_account: Any,
+    messages: Sequence[OutgoingMessage],
+    concurrency: Optional[int] = None,
+) -> List[SendResult]:
+    """
+    Send several messages through an OAuth account, results in order.
+
+    Gmail: HTTP batch requests of GMAIL_BATCH_SIZE messages, sent concurrently.
+    Outlook: one request per message, PROVIDER_SEND_CONCURRENCY at a time.
+    """
+    from app.core.config import settings
+
+    limit = max(1, concurrency or settings.provider_send_concurrency)
+    slots = asyncio.Semaphore(limit)
+
+    if email_account.provider == 'gmail':
+        size = max(1, min(settings.gmail_batch_size, GMAIL_MAX_BATCH_SIZE))
+        chunks = [messages[i:i + size] for i in range(0, len(messages), size)]
+
+        async def send_chunk(chunk):
+            async with slots:
+                if len(chunk) == 1:
+                    return [await send_with_account(email_account, *chunk[0])]
+                return await send_gmail_batch(email_account.access_token, email_account.email, chunk)
+
+        results = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def send_one(message: OutgoingMessage):
+        async with slots:
+            return await send_with_account(email_account, *message)
+
+    return list(await asyncio.gather(*(send_one(message) for message in messages)))
+
+
+def token_request_params(provider: str, refresh_token: str) -> Tuple[Optional[str], Optional[Dict[str, str]], Optional[str]]:
+    """(token URL, form data, error) for refreshing a provider token."""
+    if provider == 'gmail':
+        client_id = os.getenv('GOOGLE_CLIENT_ID')
+        client_secret = os.getenv('GOOGLE_CLIENT_SECRET')
+        if not client_id or not client_secret:
+            return None, None, "Google OAuth not configured"
+        return GOOGLE_TOKEN_URL, {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token"
+        }, None
+    if provider == 'outlook':
+        client_id = os.getenv('MICROSOFT_CLIENT_ID')
+        client_secret = os.getenv('MICROSOFT_CLIENT_SECRET')
+        if not client_id or not client_secret:
+            return None, None, "Microsoft OAuth not configured"
+        return MICROSOFT_TOKEN_URL, {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token",
+            "scope": "https://graph.microsoft.com/.default offline_access"
+        }, None
+    return None, None, f"Unsupported provider: {provider}"
+
+
+async def refresh_access_token(email_account: Any):
+    """
+    Refresh an OAuth access token.
+
+    Returns:
+        (success, new_access_token, new_expires_at, error, new_refresh_token) -
+        the same tuple as UnifiedMessenger.refresh_access_token
+    """
+    if not email_account.refresh_token:
+        return False, None, None, "No refresh token available", None
+
+    url, data, error = token_request_params(email_account.provider, email_account.refresh_token)
+    if error:
+        return False, None, None, error, None
+
+    try:
+        response = await get_provider_client(email_account.provider).post(url, data=data)
+        if response.status_code != 200:
+            return False, None, None, f"Token refresh failed: {response.status_code} - {response.text}", None
+        tokens = response.json()
+        new_expires_at = datetime.utcnow() + timedelta(seconds=tokens.get('expires_in', 3600))
+        # Gmail doesn't return a new refresh token; Outlook may
+        return True, tokens.get('access_token'), new_expires_at, None, tokens.get('refresh_token')
+    except Exception as e:
+        return False, None, None, f"Token refresh error: {str(e)}", None
@@ -0,0 +1,243 @@
+"""Named, instrumented thread pools per workload class.
+
+Blocking work used to go through ``loop.run_in_executor(None, ...)``, so a long
+campaign (LLM + SMTP) could occupy every thread of the default pool and stall
+interactive searches. Each workload class now gets its own pool:
+
+- ``upstream-io``: Unipile / Apollo / LinkedIn HTTP calls, scraping
+- ``llm``: OpenAI calls (message generation, job ranking, condensing)
+- ``smtp``: email delivery and OAuth token refresh for it
+- ``cpu``: in-process CPU work that cannot be pickled for the process pool
+  (e.g. recruiter mapping on the shared UnifiedMessenger)
+
+Each pool has a worker count, a queue limit (tasks admitted beyond the busy
+workers) and a rejection policy for when both are full:
+
+- ``wait``: the caller awaits a free slot (backpressure)
+- ``reject``: :class:`ExecutorRejectedError` is raised (served as HTTP 503)
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+UPSTREAM_IO = "upstream-io"
+LLM = "llm"
+SMTP = "smtp"
+CPU = "cpu"
+
+REJECTION_POLICIES = ("wait", "reject")
+
+
+class ExecutorRejectedError(RuntimeError):
+    """Raised when a pool with the ``reject`` policy is saturated."""
+
+    def __init__(self, name: str, limit: int):
+        super().__init__(f"Executor '{name}' is saturated ({limit} tasks in flight)")
+        self.name = name
+        self.limit = limit
+
+
+def _percentile(values, pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))
+    return round(ordered[index], 4)
+
+
+class NamedExecutor:
+    """Thread pool with admission control and active/queued/wait metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        queue_limit: int,
+        rejection_policy: str = "wait",
+        history_size: int = 500,
+    ):
+        if rejection_policy not in REJECTION_POLICIES:
+            raise ValueError(f"Unknown rejection policy '{rejection_policy}' (expected one of {REJECTION_POLICIES})")
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.queue_limit = max(0, queue_limit)
+        self.rejection_policy = rejection_policy
+        self.capacity = self.max_workers + self.queue_limit
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.Lock()
+
+        # Metrics
+        self._in_flight = 0
+        self._active = 0
+        self._waiting_for_slot = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._waits: deque = deque(maxlen=history_size)
+        self._durations: deque = deque(maxlen=history_size)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self.lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"exec-{self.name}",
+                    )
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.capacity)
+            self._slots_loop = loop
+        return self._slots
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict, submitted_at: float) -> Any:
+        started_at = time.perf_counter()
+        with self.lock:
+            self._active += 1
+            self._waits.append(started_at - submitted_at)
+        failed = True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            with self.lock:
+                self._active -= 1
+                self._durations.append(time.perf_counter() - started_at)
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` on this pool and await the result."""
+        slots = self._get_slots()
+        submitted_at = time.perf_counter()
+
+        if slots.locked():
+            if self.rejection_policy == "reject":
+                with self.lock:
+                    self._rejected += 1
+                raise ExecutorRejectedError(self.name, self.capacity)
+            with self.lock:
+                self._waiting_for_slot += 1
+            try:
+                await slots.acquire()
+            finally:
+                with self.lock:
+                    self._waiting_for_slot -= 1
+        else:
+            await slots.acquire()
+
+        with self.lock:
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), self._call, fn, args, kwargs, submitted_at
+            )
+        finally:
+            with self.lock:
+                self._in_flight -= 1
+            slots.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            waits = list(self._waits)
+            durations = list(self._durations)
+            active = self._active
+            in_flight = self._in_flight
+            snapshot = {
+                "max_workers": self.max_workers,
+                "queue_limit": self.queue_limit,
+                "rejection_policy": self.rejection_policy,
+                "active": active,
+                "queued": max(0, in_flight - active),
+                "waiting_for_slot": self._waiting_for_slot,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+        snapshot["wait_seconds"] = {
+            "avg": round(sum(waits) / len(waits), 4) if waits else None,
+            "p95": _percentile(waits, 0.95),
+        }
+        snapshot["duration_seconds"] = {
+            "avg": round(sum(durations) / len(durations), 4) if durations else None,
+            "p95": _percentile(durations, 0.95),
+        }
+        return snapshot
+
+    def shutdown(self, wait: bool = True) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _build_executors() -> Dict[str, NamedExecutor]:
+    from app.core.config import settings
+
+    return {
+        UPSTREAM_IO: NamedExecutor(
+            UPSTREAM_IO,
+            settings.upstream_io_workers,
+            settings.upstream_io_queue_limit,
+            settings.upstream_io_rejection_policy,
+        ),
+        LLM: NamedExecutor(
+            LLM,
+            settings.llm_workers,
+            settings.llm_queue_limit,
+            settings.llm_rejection_policy,
+        ),
+        SMTP: NamedExecutor(
+            SMTP,
+            settings.smtp_workers,
+            settings.smtp_queue_limit,
+            settings.smtp_rejection_policy,
+        ),
+        CPU: NamedExecutor(
+            CPU,
+            settings.cpu_workers,
+            settings.cpu_queue_limit,
+            settings.cpu_rejection_policy,
+        ),
+    }
+
+
+executors: Dict[str, NamedExecutor] = _build_executors()
+
+
+def get_executor(name: str) -> NamedExecutor:
+    """Return the named executor (raises KeyError for unknown names)."""
+    return executors[name]
+
+
+async def run_in_executor(name: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking callable on the named executor and await its result."""
+    return await executors[name].run(fn, *args, **kwargs)
+
+
+def executor_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every named executor, keyed by name."""
+    return {name: executor.metrics() for name, executor in executors.items()}
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down every named executor (called from the app lifespan)."""
+    for executor in executors.values():
+        executor.shutdown(wait=wait)
+    logger.info("🧵 Named executors shut down")
@@ -64,6 +64,31 @@ async def get_job_context_by_url(
     return result.scalar_one_or_none()
 
 
+async def get_job_contexts_by_urls(
+    db: AsyncSession, job_urls: List[str]
+) -> Dict[str, JobContext]:
+    """Fetch the stored job contexts for many URLs in one query, keyed by URL."""
+    urls = sorted({url for url in job_urls if url})
+    if not urls:
+        return {}
+    stmt = select(JobContext).where(JobContext.job_url.in_(urls))
+    result = await db.execute(stmt)
+    return {record.job_url: record for record in result.scalars().all()}
+
+
+def job_context_to_dict(record: JobContext) -> Dict[str, Any]:
+    """Plain-dict view of a job context, as used by the message prompts."""
+    return {
+        "title": record.title,
+        "company": record.company,
+        "employment_type": record.employment_type,
+        "requirements": list(record.requirements or []),
+        "technologies": list(record.technologies or []),
+        "responsibilities": list(record.responsibilities or []),
+        "condensed_description": record.condensed_description,
+    }
+
+
 async def delete_job_context_by_url(db: AsyncSession, job_url: str) -> None:
     """Delete a stored job context."""
     stmt = delete(JobContext).where(JobContext.job_url == job_url)
@@ -0,0 +1,173 @@
+"""Async helpers for chat model calls made while serving a request.
+
+Generation used to call ``llm.invoke`` / ``LLMChain.invoke`` from executor
+threads, so a burst of requests held one thread each for the whole model
+round trip. These helpers use the chat model's async API instead, so a call
+costs one coroutine:
+
+- :func:`ainvoke_text` bounds each model call with a timeout
+  (``LLM_CALL_TIMEOUT_SECONDS``) and returns the response text
+- :func:`agenerate_texts` / :func:`generate_texts` ask for ``n`` completions
+  of one prompt in a single request
+- :func:`astream_text` yields the response text as the model produces it
+- :func:`cancel_on_disconnect` runs a handler's work as a task and cancels it
+  (and the model call it is awaiting) when the HTTP client goes away
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when a single model call exceeds its timeout."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"LLM call timed out after {timeout:g}s")
+        self.timeout = timeout
+
+
+class ClientDisconnectedError(Exception):
+    """Raised when the HTTP client disconnected before the work finished."""
+
+
+def result_text(result: Any) -> str:
+    """Text of a chat model / chain result (AIMessage, dict or plain value)."""
+    if hasattr(result, 'content'):
+        return result.content.strip()
+    if isinstance(result, dict):
+        return result.get('text', result.get('content', str(result))).strip()
+    return str(result).strip()
+
+
+def _resolve_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Timeout for a model call: settings default when None, None when disabled (<= 0)."""
+    if timeout is None:
+        from app.core.config import settings
+        timeout = settings.llm_call_timeout_seconds
+    return timeout if timeout and timeout > 0 else None
+
+
+async def _with_timeout(call: Awaitable[T], timeout: Optional[float]) -> T:
+    """Await a model call, bounded by timeout (settings default; <= 0 disables)."""
+    timeout = _resolve_timeout(timeout)
+    if timeout is None:
+        return await call
+    try:
+        return await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError as e:
+        raise LLMTimeoutError(timeout) from e
+
+
+async def ainvoke_text(llm: Any, prompt: Any, timeout: Optional[float] = None) -> str:
+    """
+    Call ``llm.ainvoke(prompt)`` with a timeout and return the response text.
+
+    Args:
+        llm: LangChain chat model
+        prompt: Prompt string or messages
+        timeout: Seconds for this call (defaults to settings.llm_call_timeout_seconds; <= 0 disables)
+
+    Raises:
+        LLMTimeoutError: If the call does not finish in time (the request is cancelled)
+    """
+    return result_text(await _with_timeout(llm.ainvoke(prompt), timeout))
+
+
+def _prompt_messages(prompt: Any) -> List[Any]:
+    from langchain_core.messages import HumanMessage
+    return [HumanMessage(content=prompt)] if isinstance(prompt, str) else list(prompt)
+
+
+def generation_texts(result: Any) -> List[str]:
+    """Texts of every completion of the first prompt in an LLMResult."""
+    return [generation.text.strip() for generation in result.generations[0]]
+
+
+def generate_texts(llm: Any, prompt: Any, n: int = 1) -> List[str]:
+    """Blocking: request ``n`` completions of one prompt in a single call."""
+    return generation_texts(llm.generate([_prompt_messages(prompt)], n=n))
+
+
+async def agenerate_texts(llm: Any, prompt: Any, n: int = 1, timeout: Optional[float] = None) -> List[str]:
+    """
+    Request ``n`` completions of one prompt in a single call (OpenAI ``n``).
+
+    Raises:
+        LLMTimeoutError: If the call does not finish in time
+    """
+    result = await _with_timeout(llm.agenerate([_prompt_messages(prompt)], n=n), timeout)
+    return generation_texts(result)
+
+
+async def astream_text(llm: Any, prompt: Any, timeout: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    Yield the response text of ``llm.astream(prompt)`` chunk by chunk.
+
+    The timeout bounds the whole stream, not each chunk. Closing the iterator
+    (e.g. the client disconnected) closes the underlying request.
+
+    Raises:
+        LLMTimeoutError: If the stream does not finish in time
+    """
+    timeout = _resolve_timeout(timeout)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+    stream = llm.astream(prompt).__aiter__()
+    try:
+        while True:
+            try:
+                if deadline is None:
+                    chunk = await stream.__anext__()
+                else:
+                    chunk = await asyncio.wait_for(stream.__anext__(), max(deadline - loop.time(), 0))
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError as e:
+                raise LLMTimeoutError(timeout) from e
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                yield text
+    finally:
+        aclose = getattr(stream, 'aclose', None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+
+
+async def cancel_on_disconnect(request: Any, work: Awaitable[T], poll_interval: Optional[float] = None) -> T:
+    """
+    Await ``work`` while polling ``request.is_disconnected()``.
+
+    If the client disconnects first, the task is cancelled (propagating into
+    any in-flight ``ainvoke``) and ClientDisconnectedError is raised.
+    """
+    if poll_interval is None:
+        from app.core.config import settings
+        poll_interval = settings.llm_disconnect_poll_seconds
+
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                logger.info("🔌 Client disconnected, cancelling generation")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                except Exception:
+                    pass
+                raise ClientDisconnectedError()
+    finally:
+        if not task.done():
+            # Our own caller was cancelled
+            task.cancel()
@@ -0,0 +1,576 @@
+"""Durable outbox for outreach sends.
+
+The send endpoints used to talk to SMTP / Gmail / Unipile inside the HTTP
+request: the client waited for upstream latency and a restart lost in-flight
+sends. Now an endpoint only writes ``OutboxMessage`` rows (one transaction,
+with :func:`enqueue_email` / :func:`enqueue_linkedin`) and answers 202.
+
+``OutboxWorkerPool`` runs async workers that claim due rows with
+``SELECT ... FOR UPDATE SKIP LOCKED`` - any number of API or worker processes
+can poll the same table without handing a row to two of them. A claimed row
+is marked ``sending``; one whose worker died is reclaimed after
+``OUTBOX_LOCK_TIMEOUT_SECONDS``. The rows a worker claims are delivered
+concurrently, so the email and LinkedIn parts of a 'both' draft take as long
+as the slower channel. Each send is spaced per email account /
+LinkedIn user (pacing is per process), failures are retried with exponential
+backoff up to ``OUTBOX_MAX_ATTEMPTS``, and a successful send records
+``OutreachHistory``, updates the source draft and increments the user stats.
+
+Run workers outside the API with ``python -m app.services.outbox``.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.draft import Draft
+from app.db.models.email_account import EmailAccount
+from app.db.models.linkedin_account import LinkedInAccount
+from app.db.models.outbox_message import OutboxMessage
+from app.db.models.outreach_history import OutreachHistory
+from app.services.outreach_stats_service import record_history
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+_THROUGHPUT_WINDOW_SECONDS = 60.0
+
+
+class PermanentSendError(Exception):
+    """A send that retrying cannot fix (no account, invalid LinkedIn URL, ...)."""
+
+
+async def get_sending_account(user_id: str, db: AsyncSession) -> Optional[EmailAccount]:
+    """The user's default active email account, else any active one."""
+    result = await db.execute(
+        select(EmailAccount)
+        .where(EmailAccount.owner_id == user_id)
+        .where(EmailAccount.is_active == True)
+        .order_by(EmailAccount.is_default.desc().nulls_last())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_unipile_account_id(user_id: str, db: AsyncSession) -> Optional[str]:
+    """The user's active Unipile account ID, else the configured default."""
+    from app.core.config import settings
+
+    result = await db.execute(
+        select(LinkedInAccount)
+        .where(LinkedInAccount.owner_id == user_id)
+        .where(LinkedInAccount.is_active == True)
+        .where(LinkedInAccount.unipile_account_id.isnot(None))
+        .order_by(LinkedInAccount.is_default.desc(), LinkedInAccount.created_at.desc())
+        .limit(1)
+    )
+    linkedin_account = result.scalar_one_or_none()
+    if linkedin_account and linkedin_account.unipile_account_id:
+        return linkedin_account.unipile_account_id
+    return settings.unipile_account_id
+
+
+def enqueue_email(
+    db: AsyncSession,
+    user_id: str,
+    to_email: str,
+    subject: str,
+    body: str,
+    email_account_id: Optional[int] = None,
+    draft_id: Optional[int] = None,
+    recipient_name: Optional[str] = None,
+    job_title: Optional[str] = None,
+    company_name: Optional[str] = None,
+) -> OutboxMessage:
+    """Add an email send to the session; it is queued when the caller commits."""
+    message = OutboxMessage(
+        user_id=user_id,
+        channel="email",
+        status=PENDING,
+        recipient_name=recipient_name,
+        recipient_email=to_email,
+        job_title=job_title,
+        company_name=company_name,
+        email_subject=subject,
+        email_body=body,
+        email_account_id=email_account_id,
+        draft_id=draft_id,
+        available_at=datetime.utcnow(),
+    )
+    db.add(message)
+    return message
+
+
+def enqueue_linkedin(
+    db: AsyncSession,
+    user_id: str,
+    linkedin_url: str,
+    message_text: str,
+    draft_id: Optional[int] = None,
+    recipient_name: Optional[str] = None,
+    job_title: Optional[str] = None,
+    company_name: Optional[str] = None,
+) -> OutboxMessage:
+    """Add a LinkedIn invitation to the session; it is queued when the caller commits."""
+    message = OutboxMessage(
+        user_id=user_id,
+        channel="linkedin",
+        status=PENDING,
+        recipient_name=recipient_name,
+        recipient_linkedin_url=linkedin_url,
+        job_title=job_title,
+        company_name=company_name,
+        linkedin_message=message_text,
+        draft_id=draft_id,
+        available_at=datetime.utcnow(),
+    )
+    db.add(message)
+    return message
+
+
+async def queued_channels(db: AsyncSession, draft_id: int) -> List[str]:
+    """Channels of a draft with a send still pending or in progress."""
+    result = await db.execute(
+        select(OutboxMessage.channel)
+        .where(OutboxMessage.draft_id == draft_id)
+        .where(OutboxMessage.status.in_([PENDING, SENDING]))
+    )
+    return list(set(result.scalars().all()))
+
+
+def outbox_status(message: OutboxMessage) -> Dict[str, Any]:
+    """API representation of a queued send."""
+    return {
+        "id": message.id,
+        "channel": message.channel,
+        "status": message.status,
+        "attempts": message.attempts,
+        "draft_id": message.draft_id,
+        "last_error": message.last_error,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+        "available_at": message.available_at.isoformat() if message.available_at else None,
+        "sent_at": message.sent_at.isoformat() if message.sent_at else None,
+    }
+
+
+def update_draft_sent_status(draft: Draft) -> None:
+    """Mark a draft fully sent once every part it has content for is sent."""
+    email_needed = draft.draft_type in ['email', 'both'] and draft.email_subject and draft.email_body and draft.recipient_email
+    linkedin_needed = draft.draft_type in ['linkedin', 'both'] and draft.linkedin_message and draft.recipient_linkedin_url
+
+    if email_needed and linkedin_needed:
+        draft.is_sent = draft.email_sent and draft.linkedin_sent
+    elif email_needed:
+        draft.is_sent = draft.email_sent
+    elif linkedin_needed:
+        draft.is_sent = draft.linkedin_sent
+    else:
+        draft.is_sent = False
+
+    if draft.is_sent and not draft.sent_at:
+        draft.sent_at = datetime.utcnow()
+    draft.updated_at = datetime.utcnow()
+
+
+async def _deliver_email(db: AsyncSession, message: OutboxMessage) -> Dict[str, Any]:
+    from app.services.unified_messenger.adapter import send_email
+
+    email_account = None
+    if message.email_account_id is not None:
+        email_account = await db.get(EmailAccount, message.email_account_id)
+        if email_account is not None and not email_account.is_active:
+            email_account = None
+    if email_account is None:
+        email_account = await get_sending_account(message.user_id, db)
+    if email_account is None:
+        raise PermanentSendError("No linked email account found. Please link an email account in Settings.")
+
+    email_account.last_used_at = datetime.utcnow()
+    result = await send_email(
+        message.recipient_email,
+        message.email_subject,
+        message.email_body,
+        email_account=email_account,
+        db=db
+    )
+    if not result.get("success") and "re-link your email account" in str(result.get("error", "")):
+        raise PermanentSendError(result.get("error"))
+    return result
+
+
+async def _deliver_linkedin(db: AsyncSession, message: OutboxMessage) -> Dict[str, Any]:
+    from app.services.unified_messenger.adapter import linkedin_url_to_provider_id, send_invitation
+
+    unipile_account_id = await get_unipile_account_id(message.user_id, db)
+    provider_result = await linkedin_url_to_provider_id(message.recipient_linkedin_url, account_id=unipile_account_id)
+    provider_id = provider_result.get("provider_id")
+    if not provider_id:
+        error_msg = provider_result.get("error", "Could not convert LinkedIn URL to Provider ID")
+        raise PermanentSendError(f"{error_msg}. Please check the LinkedIn URL is valid and try again.")
+
+    return await send_invitation(
+        provider_id=provider_id,
+        text=message.linkedin_message,
+        user_id=message.user_id,
+        db=db,
+        linkedin_url=message.recipient_linkedin_url
+    )
+
+
+async def _record_sent(db: AsyncSession, message: OutboxMessage, result: Dict[str, Any]) -> None:
+    """Mark the row sent, write history, update the source draft and the stats."""
+    from app.services.user_settings_service import increment_emails_sent, increment_linkedin_invites
+
+    now = datetime.utcnow()
+    message.status = SENT
+    message.sent_at = now
+    message.last_error = None
+    message.locked_at = None
+    message.result = {k: v for k, v in result.items() if isinstance(v, (str, int, float, bool, type(None)))}
+
+    await record_history(db, [OutreachHistory(
+        user_id=message.user_id,
+        recipient_name=message.recipient_name,
+        recipient_email=message.recipient_email,
+        recipient_linkedin_url=message.recipient_linkedin_url,
+        job_title=message.job_title,
+        company_name=message.company_name,
+        channel=message.channel,
+        email_subject=message.email_subject,
+        email_body=message.email_body,
+        linkedin_message=message.linkedin_message,
+        sent_at=now,
+        draft_id=message.draft_id
+    )])
+
+    draft = None
+    if message.draft_id is not None:
+        # The other channel of a 'both' draft may be recorded concurrently: lock the
+        # draft row and re-read it so neither update is lost and exactly one of
+        # them sees both parts sent
+        result = await db.execute(
+            select(Draft)
+            .where(Draft.id == message.draft_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        draft = result.scalar_one_or_none()
+    if draft is not None and draft.owner_id == message.user_id:
+        if message.channel == "email":
+            draft.email_sent = True
+            draft.email_sent_at = now
+        else:
+            draft.linkedin_sent = True
+            draft.linkedin_sent_at = now
+        update_draft_sent_status(draft)
+        # Both parts of a 'both' draft are now sent: add the combined record
+        if draft.draft_type == 'both' and draft.email_sent and draft.linkedin_sent:
+            await record_history(db, [OutreachHistory(
+                user_id=draft.owner_id,
+                recipient_name=draft.recipient_name,
+                recipient_email=draft.recipient_email,
+                recipient_linkedin_url=draft.recipient_linkedin_url,
+                job_title=draft.job_title,
+                company_name=draft.company_name,
+                channel="both",
+                email_subject=draft.email_subject,
+                email_body=draft.email_body,
+                linkedin_message=draft.linkedin_message,
+                sent_at=draft.sent_at or now,
+                draft_id=draft.id
+            )])
+
+    await db.commit()
+
+    try:
+        if message.channel == "email":
+            await increment_emails_sent(message.user_id, db)
+        else:
+            await increment_linkedin_invites(message.user_id, db)
+    except Exception as e:
+        logger.warning(f"Failed to increment {message.channel} stats: {e}")
+
+
+class OutboxWorkerPool:
+    """Async workers draining the outbox table."""
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        poll_interval: float,
+        lock_timeout: float,
+        max_attempts: int,
+        retry_backoff: float,
+        email_interval: float,
+        linkedin_interval: float,
+        send_concurrency: int = 8,
+    ):
+        self.workers = max(0, workers)
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = max(0.1, poll_interval)
+        self.lock_timeout = lock_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.intervals = {"email": email_interval, "linkedin": linkedin_interval}
+        self.send_concurrency = max(1, send_concurrency)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._next_slot: Dict[Tuple[str, Any], float] = {}
+        self._completed = deque()
+        self._delivery_seconds = 0.0
+        self.counters = {"claimed": 0, "sent": 0, "failed": 0, "retried": 0, "paced": 0, "reclaimed": 0}
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self.running or self.workers == 0:
+            return
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.send_concurrency)
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self.worker_id}/{i}"), name=f"outbox-worker-{i}")
+            for i in range(self.workers)
+        ]
+        print(f"📤 Outbox workers started: {self.workers} (batch {self.batch_size})")
+
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop polling; sends in flight get `timeout` seconds, then are reclaimed later."""
+        if not self._tasks:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        done, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """Let idle workers poll now (call after committing new rows)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self, name: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = await self._claim(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Outbox claim failed: {e}")
+                claimed = []
+
+            # Rows of one batch are independent (e.g. the email and LinkedIn parts
+            # of a 'both' draft): deliver them concurrently; pacing still spaces
+            # rows of the same account
+            outcomes = await asyncio.gather(
+                *(self._process(message_id, name) for message_id in claimed), return_exceptions=True
+            )
+            for message_id, outcome in zip(claimed, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"❌ Outbox message {message_id} could not be processed: {outcome}")
+
+            if len(claimed) < self.batch_size:
+                await self._idle()
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        if not self._stopping.is_set():
+            self._wakeup.clear()
+
+    async def _claim(self, name: str) -> List[int]:
+        """Lock a batch of due rows (skipping rows other workers hold) and mark them sending."""
+        from app.db.base import AsyncSessionLocal
+
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.lock_timeout)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(OutboxMessage)
+                .where(or_(
+                    and_(OutboxMessage.status == PENDING, OutboxMessage.available_at <= now),
+                    and_(OutboxMessage.status == SENDING, OutboxMessage.locked_at < stale),
+                ))
+                .order_by(OutboxMessage.available_at, OutboxMessage.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            messages = result.scalars().all()
+            for message in messages:
+                if message.status == SENDING:
+                    self.counters["reclaimed"] += 1
+                message.status = SENDING
+                message.locked_at = now
+                message.locked_by = name
+                message.attempts = (message.attempts or 0) + 1
+            await db.commit()
+        self.counters["claimed"] += len(messages)
+        return [message.id for message in messages]
+
+    def _pacing_key(self, message: OutboxMessage) -> Tuple[str, Any]:
+        if message.channel == "email":
+            return ("email", message.email_account_id or message.user_id)
+        return ("linkedin", message.user_id)
+
+    def _take_slot(self, key: Tuple[str, Any]) -> float:
+        """Seconds until `key` may send again; 0 means the slot is taken now."""
+        now = time.monotonic()
+        ready = self._next_slot.get(key, 0.0)
+        if ready > now:
+            return ready - now
+        self._next_slot[key] = now + self.intervals.get(key[0], 0.0)
+        return 0.0
+
+    async def _process(self, message_id: int, name: str) -> None:
+        from app.db.base import AsyncSessionLocal
+
+        # Each delivery holds a database connection; bound them across workers
+        async with self._slots, AsyncSessionLocal() as db:
+            message = await db.get(OutboxMessage, message_id)
+            if message is None or message.status != SENDING or message.locked_by != name:
+                return
+
+            # Per-account pacing: wait for a near slot, hand a distant one back to the queue
+            key = self._pacing_key(message)
+            while (wait := self._take_slot(key)) > 0:
+                if wait > self.poll_interval:
+                    message.status = PENDING
+                    message.attempts -= 1
+                    message.locked_at = None
+                    message.available_at = datetime.utcnow() + timedelta(seconds=wait)
+                    await db.commit()
+                    self.counters["paced"] += 1
+                    return
+                await asyncio.sleep(wait)
+
+            started = time.monotonic()
+            try:
+                if message.channel == "email":
+                    result = await _deliver_email(db, message)
+                else:
+                    result = await _deliver_linkedin(db, message)
+                error, retryable = (None, False) if result.get("success") else (result.get("error") or "Send failed", True)
+            except asyncio.CancelledError:
+                raise
+            except PermanentSendError as e:
+                error, retryable = str(e), False
+            except Exception as e:
+                logger.error(f"❌ Outbox send {message_id} raised: {e}")
+                await db.rollback()
+                message = await db.get(OutboxMessage, message_id)
+                error, retryable = str(e), True
+            self._delivery_seconds += time.monotonic() - started
+
+            if error is None:
+                await _record_sent(db, message, result)
+                self._completed.append(time.monotonic())
+                self.counters["sent"] += 1
+                return
+
+            message.last_error = str(error)[:2000]
+            message.locked_at = None
+            if retryable and message.attempts < self.max_attempts:
+                message.status = PENDING
+                message.available_at = datetime.utcnow() + timedelta(
+                    seconds=self.retry_backoff * (2 ** (message.attempts - 1))
+                )
+                self.counters["retried"] += 1
+            else:
+                message.status = FAILED
+                self.counters["failed"] += 1
+                logger.warning(f"⚠️ Outbox send {message_id} failed after {message.attempts} attempt(s): {error}")
+            await db.commit()
+
+    async def metrics(self, db: AsyncSession) -> Dict[str, Any]:
+        """Queue depth per status, oldest due row and this process's throughput."""
+        rows = await db.execute(
+            select(OutboxMessage.status, func.count()).group_by(OutboxMessage.status)
+        )
+        depth = {status: count for status, count in rows.all()}
+        oldest = await db.scalar(
+            select(func.min(OutboxMessage.available_at)).where(OutboxMessage.status == PENDING)
+        )
+
+        horizon = time.monotonic() - _THROUGHPUT_WINDOW_SECONDS
+        while self._completed and self._completed[0] < horizon:
+            self._completed.popleft()
+        deliveries = self.counters["sent"] + self.counters["failed"] + self.counters["retried"]
+        return {
+            "queue": {status: depth.get(status, 0) for status in (PENDING, SENDING, SENT, FAILED)},
+            "oldest_pending_seconds": (
+                max(0.0, (datetime.utcnow() - oldest).total_seconds()) if oldest else 0.0
+            ),
+            "workers": self.workers,
+            "running": self.running,
+            "sent_last_minute": len(self._completed),
+            "avg_delivery_seconds": self._delivery_seconds / deliveries if deliveries else 0.0,
+            **self.counters,
+        }
+
+
+def _create_pool(workers: Optional[int] = None) -> OutboxWorkerPool:
+    from app.core.config import settings
+    return OutboxWorkerPool(
+        workers=settings.outbox_workers if workers is None else workers,
+        batch_size=settings.outbox_batch_size,
+        poll_interval=settings.outbox_poll_interval_seconds,
+        lock_timeout=settings.outbox_lock_timeout_seconds,
+        max_attempts=settings.outbox_max_attempts,
+        retry_backoff=settings.outbox_retry_backoff_seconds,
+        email_interval=settings.outbox_email_interval_seconds,
+        linkedin_interval=settings.outbox_linkedin_interval_seconds,
+        send_concurrency=settings.outbox_send_concurrency,
+    )
+
+
+outbox_workers = _create_pool()
+
+
+async def run_workers() -> None:
+    """Drain the outbox in a dedicated process until interrupted."""
+    from app.core.config import settings
+    from app.services.email_providers import close_provider_clients
+    from app.services.smtp_pool import smtp_pool
+    from app.services.token_refresh import token_refresher
+
+    pool = _create_pool(max(1, settings.outbox_workers))
+    smtp_pool.start()
+    token_refresher.start()
+    pool.start()
+    try:
+        await asyncio.gather(*pool._tasks)
+    finally:
+        await pool.shutdown()
+        await token_refresher.shutdown()
+        await close_provider_clients()
+        smtp_pool.shutdown()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_workers())
+    except KeyboardInterrupt:
+        pass
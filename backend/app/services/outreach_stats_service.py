@@ -0,0 +1,308 @@
+"""Dashboard aggregates over the outreach history, maintained incrementally.
+
+Sent messages are consolidated per (recipient, job, company), compared
+case-insensitively and ignoring surrounding whitespace, so an email and a
+LinkedIn invitation to the same recruiter for the same role are one entry.
+Instead of aggregating the history on every dashboard load, three small
+tables are updated in the transaction that records the history:
+
+- outreach_summary_entries: one merged row per (recipient, job, company)
+- outreach_reached: distinct companies and (role, company) pairs
+- outreach_daily_counts: history rows per user, UTC day and channel
+
+Every writer of ``OutreachHistory`` goes through ``record_history``, so GET
+/user-stats reads a few indexed rows. Existing history (or a summary that
+drifted) is backfilled one user at a time with::
+
+    python -m app.services.outreach_stats_service [--user USER_ID] [--batch-size N]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, delete, func, or_, select, tuple_, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.outreach_daily_count import OutreachDailyCount
+from app.db.models.outreach_history import OutreachHistory
+from app.db.models.outreach_reached import OutreachReached
+from app.db.models.outreach_summary_entry import OutreachSummaryEntry
+
+logger = logging.getLogger(__name__)
+
+# Display placeholders for missing values; entries using them do not count as reached
+UNKNOWN_RECRUITER = "Unknown"
+UNKNOWN_COMPANY = "Company"
+UNKNOWN_TITLE = "Position"
+
+DEFAULT_REBUILD_BATCH = 5000
+
+# Advisory lock namespace of a user's summary: writers hold it shared, a rebuild exclusively
+_SUMMARY_LOCK = 0x5E17
+
+
+def _key(value: Optional[str]) -> str:
+    return (value or "").strip().lower()
+
+
+def channel_display(email: bool, linkedin: bool) -> str:
+    if email and linkedin:
+        return "Email + LinkedIn"
+    if email:
+        return "Email"
+    if linkedin:
+        return "LinkedIn"
+    return ""
+
+
+# Maintenance
+
+def _in_key_order(rows: Dict[Tuple, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Concurrent writers of one user's summary lock its rows in the same order (no deadlocks)
+    return [rows[key] for key in sorted(rows)]
+
+
+async def record_history(db: AsyncSession, records: Sequence[OutreachHistory]) -> None:
+    """Add history records to the session and fold them into the summary, in the caller's transaction."""
+    if not records:
+        return
+    db.add_all(records)
+    # Assigns ids; the latest row of an entry is picked by (sent_at, id)
+    await db.flush()
+    await apply_to_summary(db, records)
+
+
+def summarize(records: Sequence[OutreachHistory]) -> Tuple[Dict[Tuple, Dict[str, Any]], Dict[Tuple, Dict[str, Any]], Dict[Tuple, Dict[str, Any]]]:
+    """
+    Group history records into summary rows: (entries, reached, daily), each keyed like its table.
+
+    Entries keep the display fields of their latest record by (sent_at, id) and
+    merge the channels of all of them.
+    """
+    entries: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
+    reached: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    daily: Dict[Tuple[str, date], Dict[str, Any]] = {}
+
+    for record in records:
+        sent_at = record.sent_at or datetime.utcnow()
+        email = record.channel in ("email", "both")
+        linkedin = record.channel in ("linkedin", "both")
+        key = (record.user_id, _key(record.recipient_name), _key(record.job_title), _key(record.company_name))
+        entry = entries.get(key)
+        if entry is None or (sent_at, record.id) > (entry["last_sent_at"], entry["history_id"]):
+            entries[key] = {
+                "user_id": record.user_id,
+                "recipient_key": key[1],
+                "job_key": key[2],
+                "company_key": key[3],
+                "history_id": record.id,
+                "recipient_name": record.recipient_name,
+                "job_title": record.job_title,
+                "company_name": record.company_name,
+                "last_sent_at": sent_at,
+                "email": email or bool(entry and entry["email"]),
+                "linkedin": linkedin or bool(entry and entry["linkedin"]),
+            }
+        else:
+            entry["email"] = entry["email"] or email
+            entry["linkedin"] = entry["linkedin"] or linkedin
+
+        company, title = record.company_name, record.job_title
+        if key[3] and company != UNKNOWN_COMPANY:
+            reached.setdefault((record.user_id, key[3], ""), {
+                "user_id": record.user_id, "company_key": key[3], "role_key": "", "company_name": company, "role": "",
+            })
+            if key[2] and title != UNKNOWN_TITLE:
+                reached.setdefault((record.user_id, key[3], key[2]), {
+                    "user_id": record.user_id, "company_key": key[3], "role_key": key[2],
+                    "company_name": company, "role": title,
+                })
+
+        counts = daily.setdefault((record.user_id, sent_at.date()), {
+            "user_id": record.user_id, "day": sent_at.date(), "emails": 0, "linkedin": 0, "combined": 0,
+        })
+        column = {"email": "emails", "linkedin": "linkedin", "both": "combined"}.get(record.channel)
+        if column:
+            counts[column] += 1
+    return entries, reached, daily
+
+
+async def _lock_summaries(db: AsyncSession, user_ids: Sequence[str], exclusive: bool = False) -> None:
+    """Take the users' summary locks until the end of the transaction."""
+    lock = func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    for user_id in sorted(set(user_ids)):
+        await db.execute(select(lock(_SUMMARY_LOCK, func.hashtext(user_id))))
+
+
+async def apply_to_summary(db: AsyncSession, records: Sequence[OutreachHistory]) -> None:
+    """Merge flushed history records into the summary tables (one upsert per table)."""
+    entries, reached, daily = summarize(records)
+    # Waits while one of the users' summaries is being rebuilt
+    await _lock_summaries(db, [counts["user_id"] for counts in daily.values()])
+    if entries:
+        stmt = pg_insert(OutreachSummaryEntry)
+        newer = tuple_(stmt.excluded.last_sent_at, stmt.excluded.history_id) > tuple_(
+            OutreachSummaryEntry.last_sent_at, OutreachSummaryEntry.history_id
+        )
+        latest = {
+            column: case((newer, getattr(stmt.excluded, column)), else_=getattr(OutreachSummaryEntry, column))
+            for column in ("history_id", "recipient_name", "job_title", "company_name", "last_sent_at")
+        }
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_outreach_summary_entries_key",
+            set_={
+                **latest,
+                "email": or_(OutreachSummaryEntry.email, stmt.excluded.email),
+                "linkedin": or_(OutreachSummaryEntry.linkedin, stmt.excluded.linkedin),
+            },
+        )
+        await db.execute(stmt, _in_key_order(entries))
+    if reached:
+        stmt = pg_insert(OutreachReached).on_conflict_do_nothing(constraint="uq_outreach_reached_key")
+        await db.execute(stmt, _in_key_order(reached))
+    if daily:
+        stmt = pg_insert(OutreachDailyCount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OutreachDailyCount.user_id, OutreachDailyCount.day],
+            set_={
+                "emails": OutreachDailyCount.emails + stmt.excluded.emails,
+                "linkedin": OutreachDailyCount.linkedin + stmt.excluded.linkedin,
+                "combined": OutreachDailyCount.combined + stmt.excluded.combined,
+            },
+        )
+        await db.execute(stmt, _in_key_order(daily))
+
+
+async def rebuild_summary(db: AsyncSession, user_id: Optional[str] = None, batch_size: int = DEFAULT_REBUILD_BATCH) -> int:
+    """
+    Recompute the summary (of one user, or everyone) from the history, one transaction per user.
+
+    Returns the number of history rows replayed.
+    """
+    if user_id:
+        user_ids = [user_id]
+    else:
+        # Users with a summary but no history left are rebuilt too (their rows are dropped)
+        result = await db.execute(union(
+            select(OutreachHistory.user_id),
+            select(OutreachSummaryEntry.user_id),
+            select(OutreachReached.user_id),
+            select(OutreachDailyCount.user_id),
+        ))
+        user_ids = sorted(result.scalars().all())
+        await db.commit()
+
+    replayed = 0
+    for number, user in enumerate(user_ids, 1):
+        replayed += await _rebuild_user(db, user, batch_size)
+        print(f"🔁 Outreach summary: rebuilt {number}/{len(user_ids)} user(s), {replayed} history row(s)")
+    return replayed
+
+
+async def _rebuild_user(db: AsyncSession, user_id: str, batch_size: int) -> int:
+    """
+    Delete a user's summary and replay their history in one transaction.
+
+    Readers see the old summary until the commit. The exclusive summary lock
+    waits for transactions recording history of the user to commit and holds
+    new ones off until the rebuild commits, so the replay sees exactly the
+    history the summary should contain.
+    """
+    await _lock_summaries(db, [user_id], exclusive=True)
+    for model in (OutreachSummaryEntry, OutreachReached, OutreachDailyCount):
+        await db.execute(delete(model).where(model.user_id == user_id))
+
+    replayed = 0
+    after = 0
+    while True:
+        result = await db.execute(
+            select(OutreachHistory)
+            .where(OutreachHistory.user_id == user_id, OutreachHistory.id > after)
+            .order_by(OutreachHistory.id)
+            .limit(batch_size)
+        )
+        records = result.scalars().all()
+        if not records:
+            break
+        await apply_to_summary(db, records)
+        db.expunge_all()
+        after = records[-1].id
+        replayed += len(records)
+    await db.commit()
+    return replayed
+
+
+# Reads
+
+async def latest_attempts(db: AsyncSession, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """The user's `limit` most recently contacted (recipient, job, company) entries, newest first."""
+    result = await db.execute(
+        select(OutreachSummaryEntry)
+        .where(OutreachSummaryEntry.user_id == user_id)
+        .order_by(OutreachSummaryEntry.last_sent_at.desc(), OutreachSummaryEntry.history_id.desc())
+        .limit(limit)
+    )
+    return [
+        {
+            "id": entry.history_id,
+            "time": entry.last_sent_at.isoformat(),
+            "recruiter": entry.recipient_name or UNKNOWN_RECRUITER,
+            "company": entry.company_name or UNKNOWN_COMPANY,
+            "title": entry.job_title or UNKNOWN_TITLE,
+            "channel": channel_display(entry.email, entry.linkedin),
+            "status": "sent"
+        }
+        for entry in result.scalars().all()
+    ]
+
+
+async def reached_companies(db: AsyncSession, user_id: str) -> List[str]:
+    """Distinct companies the user has contacted (case-insensitive), sorted."""
+    result = await db.execute(
+        select(OutreachReached.company_name)
+        .where(OutreachReached.user_id == user_id, OutreachReached.role_key == "")
+    )
+    return sorted(result.scalars().all())
+
+
+async def reached_roles(db: AsyncSession, user_id: str) -> List[Dict[str, str]]:
+    """Distinct (role, company) pairs the user has contacted (case-insensitive)."""
+    result = await db.execute(
+        select(OutreachReached.role, OutreachReached.company_name)
+        .where(OutreachReached.user_id == user_id, OutreachReached.role_key != "")
+        .order_by(OutreachReached.id)
+    )
+    return [{"role": role, "company": company} for role, company in result.all()]
+
+
+async def daily_activity(db: AsyncSession, user_id: str, days: int = 30) -> List[Dict[str, Any]]:
+    """History rows per day and channel over the last `days` days (days without sends omitted)."""
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    result = await db.execute(
+        select(OutreachDailyCount)
+        .where(OutreachDailyCount.user_id == user_id, OutreachDailyCount.day >= since)
+        .order_by(OutreachDailyCount.day)
+    )
+    return [
+        {"day": row.day.isoformat(), "emails": row.emails, "linkedin": row.linkedin, "both": row.combined}
+        for row in result.scalars().all()
+    ]
+
+
+async def _main(user_id: Optional[str], batch_size: int) -> None:
+    from app.db.base import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        replayed = await rebuild_summary(db, user_id=user_id, batch_size=batch_size)
+    print(f"✅ Outreach summary rebuilt from {replayed} history row(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the outreach summary tables from the outreach history.")
+    parser.add_argument("--user", help="only this user id (default: everyone)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_REBUILD_BATCH, help="history rows read per query")
+    args = parser.parse_args()
+    asyncio.run(_main(args.user, max(1, args.batch_size)))
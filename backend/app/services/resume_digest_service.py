@@ -0,0 +1,221 @@
+"""Per-user resume digest, derived once per resume content hash.
+
+Generation and ranking used to re-derive resume material on every call: the
+LinkedIn path ran the bullet heuristic and could make a full LLM parse, the
+email path re-scanned the text for the sender's name (falling back to another
+LLM parse), and job ranking loaded the resume again. The digest holds all of
+that - prompt-ready short form, bullets, structured data, name, details and a
+skills vector - and is stored on the ``resume_content`` row next to the hash
+of the content it was built from. It is rebuilt only when the content hash
+changes (and cleared by ``PUT /resume/content`` and uploads).
+"""
+import hashlib
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.resume_content import ResumeContent
+
+logger = logging.getLogger(__name__)
+
+# Bump when the digest layout or derivation changes; older digests are rebuilt
+DIGEST_VERSION = 1
+
+# Skills recognised in resume text for the skills vector (whole words, see KeywordMatcher)
+SKILL_KEYWORDS = (
+    "python", "java", "javascript", "typescript", "golang", "rust", "scala", "kotlin", "swift",
+    "ruby", "php", "sql", "nosql", "matlab", "html", "css", "bash",
+    "react", "angular", "vue", "node", "nodejs", "next.js", "django", "flask", "fastapi", "spring",
+    "rails", "graphql", "grpc",
+    "aws", "gcp", "azure", "docker", "kubernetes", "terraform", "linux", "git", "ci/cd",
+    "postgresql", "postgres", "mysql", "mongodb", "redis", "kafka", "spark", "hadoop", "airflow",
+    "snowflake", "elasticsearch",
+    "machine learning", "deep learning", "nlp", "computer vision", "llm", "tensorflow", "pytorch",
+    "scikit-learn", "pandas", "numpy", "data analysis", "statistics",
+    "distributed systems", "microservices", "embedded", "figma",
+)
+
+_NAME_HEADER_WORDS = {'email', 'phone', 'address', 'linkedin', 'github', 'resume', 'cv'}
+
+
+@dataclass
+class ResumeDigest:
+    """Everything prompts and ranking need from a resume, derived once."""
+
+    content_hash: str
+    short_form: str  # prompt-ready resume (LinkedIn notes, job ranking)
+    bullets: List[str] = field(default_factory=list)
+    name: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)  # education, graduation, experience lines
+    skills: Dict[str, int] = field(default_factory=dict)  # skill -> number of lines mentioning it
+    structured_data: Optional[Dict[str, Any]] = None
+    version: int = DIGEST_VERSION
+
+    def to_json(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: Optional[Dict[str, Any]]) -> Optional["ResumeDigest"]:
+        if not isinstance(data, dict) or data.get('version') != DIGEST_VERSION:
+            return None
+        try:
+            return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+        except TypeError:
+            return None
+
+
+def resume_content_hash(content: str) -> str:
+    """SHA-256 of the resume text with line endings and outer whitespace normalised."""
+    normalized = "\n".join(line.rstrip() for line in (content or "").strip().splitlines())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+_SKILL_MATCHER = None
+
+
+def _skill_matcher():
+    from app.services.unified_messenger.keyword_matcher import KeywordMatcher
+    global _SKILL_MATCHER
+    if _SKILL_MATCHER is None:
+        _SKILL_MATCHER = KeywordMatcher({'skills': SKILL_KEYWORDS})
+    return _SKILL_MATCHER
+
+
+def extract_skills(content: str, structured_data: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Skills vector: known skills per line of the resume, plus the parser's key technologies."""
+    matcher = _skill_matcher()
+    skills: Dict[str, int] = {}
+    for line in (content or "").splitlines():
+        for skill in matcher.match(line)['skills']:
+            skills[skill] = skills.get(skill, 0) + 1
+    for tech in (structured_data or {}).get('key_technologies') or []:
+        key = str(tech).strip().lower()
+        if key:
+            skills[key] = max(skills.get(key, 0), 1)
+    return dict(sorted(skills.items(), key=lambda item: (-item[1], item[0])))
+
+
+def extract_name(content: str, structured_data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Sender name from a 'Name:' bullet, the structured data, or a name-like line at the top."""
+    lines = [line.strip() for line in (content or "").splitlines() if line.strip()]
+    for line in lines:
+        normalized = line.lstrip('•').strip()
+        if normalized.lower().startswith('name:'):
+            name = normalized.split(':', 1)[1].strip()
+            if name and name != "Not Available":
+                return name
+
+    name = (structured_data or {}).get('name')
+    if name and name != "Not Available":
+        return name
+
+    for line in lines[:5]:
+        words = line.split()
+        if 2 <= len(words) <= 4 and all(word[0].isupper() for word in words):
+            if not any(word.lower() in _NAME_HEADER_WORDS for word in words):
+                return line
+    return None
+
+
+def extract_details(content: str) -> Dict[str, Any]:
+    """Education, graduation and experience lines from bullet-formatted content."""
+    details: Dict[str, Any] = {'education': None, 'graduation': None, 'experience': []}
+    for line in (content or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        normalized = line.lstrip('•').strip()
+        if normalized.lower().startswith('education') and not details['education']:
+            details['education'] = normalized
+        if 'graduation' in normalized.lower() and not details['graduation']:
+            details['graduation'] = normalized
+        if normalized.startswith('-'):
+            details['experience'].append(normalized.lstrip('-').strip())
+    return details
+
+
+def build_resume_digest(content: str, structured_data: Optional[Dict[str, Any]] = None) -> ResumeDigest:
+    """
+    Derive the digest for resume content (blocking: may make one LLM parse for
+    raw, unparsed text and one structured-data parse if none is stored).
+    """
+    from app.services.unified_messenger.clients import get_messenger
+
+    generator = None
+    try:
+        generator = get_messenger().resume_generator
+    except Exception as e:
+        logger.warning(f"⚠️ Resume generator unavailable for digest: {e}")
+
+    if generator:
+        short_form = generator._prepare_resume(content)
+        if structured_data is None and generator.resume_parser:
+            try:
+                structured_data = generator.resume_parser.extract_structured_data(content)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not parse structured resume data for digest: {e}")
+    else:
+        short_form = content[:1500] + "..." if len(content) > 1500 else content
+
+    bullets = [
+        line.strip().lstrip('•-*').strip()
+        for line in short_form.splitlines()
+        if line.strip().startswith(('•', '-', '*'))
+    ]
+    return ResumeDigest(
+        content_hash=resume_content_hash(content),
+        short_form=short_form,
+        bullets=bullets,
+        name=extract_name(content, structured_data),
+        details=extract_details(short_form),
+        skills=extract_skills(content, structured_data),
+        structured_data=structured_data,
+    )
+
+
+async def get_resume_digest(owner_id: str, db: AsyncSession) -> Optional[ResumeDigest]:
+    """
+    The user's resume digest, rebuilt and persisted if the content changed.
+
+    Returns:
+        ResumeDigest, or None if the user has no resume content
+    """
+    from app.services.executors import LLM, run_in_executor
+
+    result = await db.execute(select(ResumeContent).where(ResumeContent.owner_id == owner_id))
+    row = result.scalar_one_or_none()
+    if not row or not row.content:
+        return None
+
+    content_hash = resume_content_hash(row.content)
+    if row.content_hash == content_hash:
+        digest = ResumeDigest.from_json(row.digest)
+        if digest and digest.content_hash == content_hash:
+            return digest
+
+    logger.info(f"🧾 Building resume digest for user {owner_id} ({content_hash[:12]})")
+    digest = await run_in_executor(LLM, build_resume_digest, row.content, row.structured_data)
+
+    try:
+        # Only store it if the content is still what the digest was built from
+        await db.execute(
+            update(ResumeContent)
+            .where(ResumeContent.id == row.id)
+            .where(ResumeContent.content == row.content)
+            # Keep updated_at: a derived cache is not an edit
+            .values(content_hash=content_hash, digest=digest.to_json(), updated_at=ResumeContent.updated_at)
+        )
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"⚠️ Could not persist resume digest: {e}")
+    return digest
+
+
+def clear_resume_digest(resume_content: ResumeContent) -> None:
+    """Drop the stored digest of a row whose content is being replaced."""
+    resume_content.content_hash = None
+    resume_content.digest = None
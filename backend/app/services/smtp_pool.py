@@ -0,0 +1,456 @@
+"""Pooled, authenticated SMTP sessions for sending many messages.
+
+Every send used to open a connection, run STARTTLS, log in, send one message
+and quit, so a 50-email campaign paid 50 TCP + TLS + AUTH handshakes - most
+of the time spent sending. Sessions are now kept per (server, port, username)
+and reused:
+
+- an idle session is closed after ``SMTP_POOL_IDLE_TIMEOUT_SECONDS`` (by the
+  reaper thread, or when it is next picked)
+- a session that has been idle longer than ``SMTP_POOL_NOOP_AFTER_SECONDS``
+  is checked with NOOP before reuse; a reused session the server dropped is
+  replaced and the message retried once on a fresh connection
+- a session is retired after ``SMTP_POOL_MAX_MESSAGES_PER_SESSION`` messages
+- at most ``SMTP_POOL_MAX_SESSIONS_PER_KEY`` sessions per key are open at once,
+  which also keeps us under providers' concurrent-connection limits
+
+Sessions only serve callers presenting the same password they were opened
+with, so a shared username never hands one caller's login to another.
+
+:meth:`SMTPPool.send` is blocking (executor threads, campaign threads).
+:meth:`SMTPPool.asend` is the async interface: with ``aiosmtplib`` installed
+the sessions are non-blocking and live on the event loop; without it the
+blocking send runs on the SMTP executor.
+"""
+import asyncio
+import hashlib
+import logging
+import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import aiosmtplib
+    AIOSMTPLIB_AVAILABLE = True
+except ImportError:
+    aiosmtplib = None
+    AIOSMTPLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, int, str]  # (server, port, username)
+
+_IMPLICIT_TLS_PORT = 465
+
+
+@dataclass
+class _Session:
+    conn: Any
+    secret: str  # fingerprint of the password the session logged in with
+    is_async: bool = False
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    messages: int = 0
+
+
+def _fingerprint(password: str) -> str:
+    return hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+
+
+class SMTPPool:
+    """Reusable authenticated SMTP sessions keyed by (server, port, username)."""
+
+    def __init__(
+        self,
+        idle_timeout: float = 60.0,
+        max_messages_per_session: int = 50,
+        noop_after: float = 15.0,
+        max_sessions_per_key: int = 4,
+        connect_timeout: float = 30.0,
+    ):
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_session = max(1, max_messages_per_session)
+        self.noop_after = noop_after
+        self.max_sessions_per_key = max(1, max_sessions_per_key)
+        self.connect_timeout = connect_timeout
+
+        self.lock = threading.Lock()
+        self._idle: Dict[Tuple[bool, PoolKey], List[_Session]] = {}
+        self._thread_slots: Dict[PoolKey, threading.BoundedSemaphore] = {}
+        self._async_slots: Dict[PoolKey, asyncio.Semaphore] = {}
+        self._async_slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # Metrics
+        self._opened = 0
+        self._reused = 0
+        self._closed = 0
+        self._health_check_failures = 0
+        self._retries = 0
+        self._sent = 0
+        self._handshake_seconds = 0.0
+
+    # --- bookkeeping shared by both transports -------------------------------
+
+    def _expired(self, session: _Session, now: float) -> bool:
+        return (
+            now - session.last_used > self.idle_timeout
+            or session.messages >= self.max_messages_per_session
+        )
+
+    def _take_idle(self, key: PoolKey, secret: str, is_async: bool) -> Tuple[Optional[_Session], List[_Session]]:
+        """Most recently used reusable session for key, plus expired sessions for the caller to close."""
+        now = time.monotonic()
+        chosen = None
+        expired: List[_Session] = []
+        with self.lock:
+            idle = self._idle.get((is_async, key), [])
+            keep = []
+            while idle:
+                session = idle.pop()
+                if self._expired(session, now):
+                    expired.append(session)
+                elif chosen is None and session.secret == secret:
+                    chosen = session
+                else:
+                    keep.append(session)
+            idle.extend(reversed(keep))
+        return chosen, expired
+
+    def _give_back(self, key: PoolKey, session: _Session) -> bool:
+        """Return a healthy session to the pool; False if it should be closed instead."""
+        session.last_used = time.monotonic()
+        if session.messages >= self.max_messages_per_session:
+            return False
+        with self.lock:
+            idle = self._idle.setdefault((session.is_async, key), [])
+            if len(idle) >= self.max_sessions_per_key:
+                return False
+            idle.append(session)
+        return True
+
+    def _record_open(self, started: float):
+        with self.lock:
+            self._opened += 1
+            self._handshake_seconds += time.perf_counter() - started
+
+    def _count(self, name: str, amount: int = 1):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _thread_slot(self, key: PoolKey) -> threading.BoundedSemaphore:
+        with self.lock:
+            slot = self._thread_slots.get(key)
+            if slot is None:
+                slot = self._thread_slots[key] = threading.BoundedSemaphore(self.max_sessions_per_key)
+            return slot
+
+    def _async_slot(self, key: PoolKey) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self._async_slots_loop is not loop:
+                self._async_slots = {}
+                self._async_slots_loop = loop
+            slot = self._async_slots.get(key)
+            if slot is None:
+                slot = self._async_slots[key] = asyncio.Semaphore(self.max_sessions_per_key)
+            return slot
+
+    # --- blocking transport (smtplib) -------------------------------------
+
+    def _connect(self, key: PoolKey, password: str) -> _Session:
+        server, port, username = key
+        started = time.perf_counter()
+        if port == _IMPLICIT_TLS_PORT:
+            conn = smtplib.SMTP_SSL(server, port, timeout=self.connect_timeout)
+        else:
+            conn = smtplib.SMTP(server, port, timeout=self.connect_timeout)
+        try:
+            if port != _IMPLICIT_TLS_PORT:
+                conn.starttls()  # Enable encryption
+            conn.login(username, password)
+        except Exception:
+            self._close(_Session(conn, ""))
+            raise
+        self._record_open(started)
+        return _Session(conn, _fingerprint(password))
+
+    def _close(self, session: _Session):
+        try:
+            if session.is_async:
+                if session.loop is not None and not session.loop.is_closed():
+                    session.loop.call_soon_threadsafe(session.conn.close)
+            else:
+                try:
+                    session.conn.quit()
+                except Exception:
+                    session.conn.close()
+        except Exception:
+            pass
+        self._count("_closed")
+
+    def _healthy(self, session: _Session) -> bool:
+        if time.monotonic() - session.last_used < self.noop_after:
+            return True
+        try:
+            return session.conn.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _checkout(self, key: PoolKey, password: str) -> Tuple[_Session, bool]:
+        secret = _fingerprint(password)
+        while True:
+            session, expired = self._take_idle(key, secret, False)
+            for stale in expired:
+                self._close(stale)
+            if session is None:
+                return self._connect(key, password), False
+            if self._healthy(session):
+                self._count("_reused")
+                return session, True
+            self._count("_health_check_failures")
+            self._close(session)
+
+    def send(
+        self,
+        server: str,
+        port: int,
+        username: str,
+        password: str,
+        from_addr: str,
+        to_addrs: Union[str, Sequence[str]],
+        message: str,
+    ) -> None:
+        """
+        Send one message on a pooled session (blocking).
+
+        Raises:
+            smtplib.SMTPException (incl. SMTPAuthenticationError) or OSError on failure
+        """
+        key = (server, int(port), username)
+        with self._thread_slot(key):
+            session, reused = self._checkout(key, password)
+            try:
+                session.conn.sendmail(from_addr, to_addrs, message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                self._close(session)
+                if not reused:
+                    raise
+                # The server dropped an idle session; retry once on a new one
+                logger.info(f"🔁 Pooled SMTP session to {server} dropped ({e}); reconnecting")
+                self._count("_retries")
+                session = self._connect(key, password)
+                try:
+                    session.conn.sendmail(from_addr, to_addrs, message)
+                except Exception:
+                    self._close(session)
+                    raise
+            except smtplib.SMTPRecipientsRefused:
+                # The session itself is fine
+                self._release(key, session)
+                raise
+            except Exception:
+                self._close(session)
+                raise
+            session.messages += 1
+            self._count("_sent")
+            self._release(key, session)
+
+    def _release(self, key: PoolKey, session: _Session):
+        if not self._give_back(key, session):
+            self._close(session)
+
+    # --- async transport (aiosmtplib, or the blocking one on an executor) ------
+
+    async def _aconnect(self, key: PoolKey, password: str) -> _Session:
+        server, port, username = key
+        started = time.perf_counter()
+        conn = aiosmtplib.SMTP(
+            hostname=server,
+            port=port,
+            timeout=self.connect_timeout,
+            use_tls=port == _IMPLICIT_TLS_PORT,
+            start_tls=False,
+        )
+        await conn.connect()
+        try:
+            if port != _IMPLICIT_TLS_PORT:
+                await conn.starttls()
+            await conn.login(username, password)
+        except Exception:
+            conn.close()
+            raise
+        self._record_open(started)
+        return _Session(conn, _fingerprint(password), is_async=True, loop=asyncio.get_running_loop())
+
+    async def _acheckout(self, key: PoolKey, password: str) -> Tuple[_Session, bool]:
+        secret = _fingerprint(password)
+        while True:
+            session, expired = self._take_idle(key, secret, True)
+            for stale in expired:
+                stale.conn.close()
+                self._count("_closed")
+            if session is None:
+                return await self._aconnect(key, password), False
+            if time.monotonic() - session.last_used < self.noop_after:
+                self._count("_reused")
+                return session, True
+            try:
+                code, _ = await session.conn.noop()
+                if code == 250:
+                    self._count("_reused")
+                    return session, True
+            except Exception:
+                pass
+            self._count("_health_check_failures")
+            session.conn.close()
+            self._count("_closed")
+
+    async def _asend_native(self, key: PoolKey, password: str, from_addr: str, to_addrs: List[str], message: str):
+        async with self._async_slot(key):
+            session, reused = await self._acheckout(key, password)
+            try:
+                await session.conn.sendmail(from_addr, to_addrs, message)
+            except aiosmtplib.SMTPServerDisconnected:
+                session.conn.close()
+                self._count("_closed")
+                if not reused:
+                    raise
+                self._count("_retries")
+                session = await self._aconnect(key, password)
+                try:
+                    await session.conn.sendmail(from_addr, to_addrs, message)
+                except BaseException:
+                    session.conn.close()
+                    self._count("_closed")
+                    raise
+            except aiosmtplib.SMTPRecipientsRefused:
+                if not self._give_back(key, session):
+                    session.conn.close()
+                    self._count("_closed")
+                raise
+            except BaseException:
+                session.conn.close()
+                self._count("_closed")
+                raise
+            session.messages += 1
+            self._count("_sent")
+            if not self._give_back(key, session):
+                try:
+                    await session.conn.quit()
+                except Exception:
+                    session.conn.close()
+                self._count("_closed")
+
+    async def asend(
+        self,
+        server: str,
+        port: int,
+        username: str,
+        password: str,
+        from_addr: str,
+        to_addrs: Union[str, Sequence[str]],
+        message: str,
+    ) -> None:
+        """
+        Async send on a pooled session.
+
+        Raises:
+            smtplib.SMTPException (incl. SMTPAuthenticationError) or OSError on failure;
+            aiosmtplib errors are re-raised as their smtplib equivalents
+        """
+        if not AIOSMTPLIB_AVAILABLE:
+            from app.services.executors import SMTP, run_in_executor
+            await run_in_executor(SMTP, self.send, server, port, username, password, from_addr, to_addrs, message)
+            return
+
+        key = (server, int(port), username)
+        recipients = [to_addrs] if isinstance(to_addrs, str) else list(to_addrs)
+        try:
+            await self._asend_native(key, password, from_addr, recipients, message)
+        except aiosmtplib.SMTPAuthenticationError as e:
+            raise smtplib.SMTPAuthenticationError(e.code, e.message) from e
+        except aiosmtplib.SMTPServerDisconnected as e:
+            raise smtplib.SMTPServerDisconnected(str(e)) from e
+        except aiosmtplib.SMTPException as e:
+            raise smtplib.SMTPException(str(e)) from e
+
+    # --- lifecycle --------------------------------------------------------
+
+    def close_idle(self) -> int:
+        """Close sessions idle past the timeout. Returns how many were closed."""
+        now = time.monotonic()
+        expired: List[_Session] = []
+        with self.lock:
+            for idle in self._idle.values():
+                keep = [s for s in idle if not self._expired(s, now)]
+                expired.extend(s for s in idle if self._expired(s, now))
+                idle[:] = keep
+        for session in expired:
+            self._close(session)
+        return len(expired)
+
+    def close_all(self):
+        with self.lock:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+        for session in sessions:
+            self._close(session)
+
+    def _reap(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._stop.wait(interval):
+            try:
+                closed = self.close_idle()
+                if closed:
+                    logger.info(f"🧹 Closed {closed} idle SMTP session(s)")
+            except Exception as e:
+                logger.warning(f"⚠️ SMTP pool reaper error: {e}")
+
+    def start(self):
+        """Start the reaper thread that closes idle sessions."""
+        if self._reaper is None or not self._reaper.is_alive():
+            self._stop.clear()
+            self._reaper = threading.Thread(target=self._reap, name="smtp-pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def shutdown(self):
+        self._stop.set()
+        self.close_all()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Sessions opened/reused and average handshake time, for sizing the pool."""
+        with self.lock:
+            return {
+                "backend": "aiosmtplib" if AIOSMTPLIB_AVAILABLE else "smtplib",
+                "idle_sessions": {
+                    f"{'async' if is_async else 'sync'}:{key[2]}@{key[0]}:{key[1]}": len(idle)
+                    for (is_async, key), idle in self._idle.items()
+                    if idle
+                },
+                "opened": self._opened,
+                "reused": self._reused,
+                "closed": self._closed,
+                "sent": self._sent,
+                "retries": self._retries,
+                "health_check_failures": self._health_check_failures,
+                "avg_handshake_ms": round(self._handshake_seconds / self._opened * 1000, 1) if self._opened else None,
+            }
+
+
+def _create_pool() -> SMTPPool:
+    from app.core.config import settings
+    return SMTPPool(
+        idle_timeout=settings.smtp_pool_idle_timeout_seconds,
+        max_messages_per_session=settings.smtp_pool_max_messages_per_session,
+        noop_after=settings.smtp_pool_noop_after_seconds,
+        max_sessions_per_key=settings.smtp_pool_max_sessions_per_key,
+        connect_timeout=settings.smtp_connect_timeout_seconds,
+    )
+
+
+smtp_pool = _create_pool()
@@ -0,0 +1,296 @@
+"""Deterministic email rendering from saved EmailTemplates (mail merge).
+
+Every generated email used to cost a model call. A saved template renders
+without one: ``{{ variable }}`` placeholders (optionally ``{{ variable |
+default text }}``) in the subject and ``body_markdown`` are filled from the
+recruiter, the stored job context and the sender's resume digest.
+
+Templates are parsed once into literal/field parts and cached by
+``(id, updated_at)``, so an edited template is recompiled and an unchanged
+one never is. Rendering is a join over the parts - thousands of drafts take
+milliseconds. The only model call left is optional: a template may contain a
+single ``{{ personalized_sentence }}`` slot, filled with one generated
+sentence per recipient when the caller asks for it.
+"""
+import asyncio
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PERSONALIZED_SLOT = "personalized_sentence"
+
+# Variables available to templates (see recipient_variables / resume_variables)
+TEMPLATE_VARIABLES = (
+    "recruiter_name", "recruiter_first_name", "recruiter_title", "company_name",
+    "job_title", "job_type", "job_url", "requirements", "technologies", "top_technology",
+    "responsibilities", "matching_skills", "sender_name", "education", "graduation",
+    "skills", PERSONALIZED_SLOT,
+)
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*(?:\|\s*(.*?)\s*)?\}\}")
+
+_BLANK_LINES = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)+")
+
+_CACHE_SIZE = 512
+
+
+@dataclass(frozen=True)
+class Field:
+    """A placeholder: variable name and the text used when it is empty."""
+
+    name: str
+    default: str = ""
+
+
+Part = Union[str, Field]
+
+
+def _parse(text: str) -> Tuple[Part, ...]:
+    parts: List[Part] = []
+    position = 0
+    for match in _PLACEHOLDER.finditer(text or ""):
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        parts.append(Field(match.group(1).lower(), match.group(2) or ""))
+        position = match.end()
+    if position < len(text or ""):
+        parts.append(text[position:])
+    return tuple(parts)
+
+
+def _render_parts(parts: Sequence[Part], values: Dict[str, str], missing: List[str]) -> str:
+    out = []
+    for part in parts:
+        if isinstance(part, str):
+            out.append(part)
+            continue
+        value = values.get(part.name)
+        if not value:
+            if not part.default and part.name not in missing:
+                missing.append(part.name)
+            value = part.default
+        out.append(value)
+    return "".join(out)
+
+
+@dataclass
+class RenderedEmail:
+    subject: str
+    body: str
+    missing: List[str] = field(default_factory=list)  # placeholders left empty (no value, no default)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template parsed into literal and placeholder parts."""
+
+    subject_parts: Tuple[Part, ...]
+    body_parts: Tuple[Part, ...]
+    defaults: Dict[str, str] = field(default_factory=dict, compare=False, hash=False)
+
+    @property
+    def variables(self) -> List[str]:
+        names = []
+        for part in self.subject_parts + self.body_parts:
+            if isinstance(part, Field) and part.name not in names:
+                names.append(part.name)
+        return names
+
+    @property
+    def has_personalized_slot(self) -> bool:
+        return PERSONALIZED_SLOT in self.variables
+
+    def render(self, values: Dict[str, str]) -> RenderedEmail:
+        """Fill the placeholders; template-level defaults apply under recipient values."""
+        if self.defaults:
+            values = {**self.defaults, **{k: v for k, v in values.items() if v}}
+        missing: List[str] = []
+        subject = _render_parts(self.subject_parts, values, missing)
+        body = _render_parts(self.body_parts, values, missing)
+        # An empty slot on a line of its own must not leave a gap between paragraphs
+        body = _BLANK_LINES.sub("\n\n", body).strip()
+        return RenderedEmail(" ".join(subject.split()), body, missing)
+
+
+def parse_template_variables(raw: Optional[str]) -> Dict[str, str]:
+    """Default values stored in EmailTemplate.variables (a JSON object)."""
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        logger.warning("⚠️ Ignoring template variables that are not valid JSON")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(k).lower(): str(v) for k, v in data.items() if v is not None}
+
+
+def compile_template(subject: str, body: str, variables: Optional[str] = None) -> CompiledTemplate:
+    """Parse a subject/body pair into a CompiledTemplate."""
+    return CompiledTemplate(_parse(subject), _parse(body), parse_template_variables(variables))
+
+
+_compiled: "OrderedDict[Tuple[int, Any], CompiledTemplate]" = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_template(template: Any) -> CompiledTemplate:
+    """Compiled form of an EmailTemplate row, cached by (id, updated_at)."""
+    key = (template.id, template.updated_at)
+    with _compiled_lock:
+        compiled = _compiled.get(key)
+        if compiled is not None:
+            _compiled.move_to_end(key)
+            return compiled
+
+    compiled = compile_template(template.subject, template.body_markdown, template.variables)
+    with _compiled_lock:
+        _compiled[key] = compiled
+        while len(_compiled) > _CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def _join(items: Any, limit: int = 3) -> str:
+    if not items:
+        return ""
+    if isinstance(items, str):
+        return items
+    return ", ".join(str(item) for item in list(items)[:limit])
+
+
+def resume_variables(resume_digest: Any) -> Dict[str, str]:
+    """Sender variables from the resume digest; computed once per merge."""
+    if resume_digest is None:
+        return {}
+    details = resume_digest.details or {}
+    return {
+        "sender_name": resume_digest.name or "",
+        "education": (details.get("education") or "").split(":", 1)[-1].strip(),
+        "graduation": (details.get("graduation") or "").split(":", 1)[-1].strip(),
+        "skills": _join(list((resume_digest.skills or {}).keys()), 5),
+    }
+
+
+def recipient_variables(
+    recruiter: Dict[str, Any],
+    job_context: Optional[Dict[str, Any]] = None,
+    resume_skills: Optional[Dict[str, int]] = None,
+    job_title: Optional[str] = None,
+    job_type: Optional[str] = None,
+) -> Dict[str, str]:
+    """Per-recipient variables from the recruiter and the job context."""
+    job_context = job_context or {}
+    name = (recruiter.get("name") or "").strip()
+    technologies = list(job_context.get("technologies") or [])
+    matching = [tech for tech in technologies if str(tech).lower() in (resume_skills or {})]
+    return {
+        "recruiter_name": name or "Hiring Manager",
+        "recruiter_first_name": name.split()[0] if name else "there",
+        "recruiter_title": recruiter.get("title") or recruiter.get("headline") or "",
+        "company_name": (
+            recruiter.get("company") or recruiter.get("company_name") or job_context.get("company") or ""
+        ),
+        "job_title": job_title or recruiter.get("job_title") or job_context.get("title") or "",
+        "job_type": {"full_time": "full-time"}.get(job_type or "", job_type or ""),
+        "job_url": recruiter.get("job_url") or "",
+        "requirements": _join(job_context.get("requirements")),
+        "technologies": _join(technologies),
+        "top_technology": str(technologies[0]) if technologies else "",
+        "responsibilities": _join(job_context.get("responsibilities")),
+        "matching_skills": _join(matching),
+    }
+
+
+def _personalization_prompt(values: Dict[str, str], resume_short_form: str) -> str:
+    return f"""
+Write ONE sentence (max 35 words) for an outreach email to {values.get('recruiter_name')} at {values.get('company_name')}
+about the {values.get('job_title') or 'open'} role. Connect one specific item from the resume to the job.
+Use ASCII characters only. Return only the sentence, no quotes.
+
+JOB REQUIREMENTS: {values.get('requirements') or 'Not specified'}
+JOB TECHNOLOGIES: {values.get('technologies') or 'Not specified'}
+
+RESUME:
+{resume_short_form[:1200]}
+"""
+
+
+async def personalize_sentences(
+    values: Sequence[Dict[str, str]],
+    resume_short_form: str,
+    concurrency: int,
+) -> List[Optional[str]]:
+    """One generated sentence per recipient (None where generation failed)."""
+    from app.services.llm_runtime import ainvoke_text
+    from app.services.unified_messenger.clients import get_messenger
+
+    generator = get_messenger().resume_generator
+    if not generator:
+        raise ValueError("Resume generator not available")
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(recipient_values: Dict[str, str]) -> Optional[str]:
+        async with slots:
+            try:
+                text = await ainvoke_text(generator.llm, _personalization_prompt(recipient_values, resume_short_form))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Personalized sentence failed for {recipient_values.get('recruiter_name')}: {e}")
+                return None
+        text = " ".join(text.strip().strip('"').split())
+        return text or None
+
+    return await asyncio.gather(*(one(v) for v in values))
+
+
+async def merge_template(
+    compiled: CompiledTemplate,
+    recipients: Sequence[Dict[str, Any]],
+    job_contexts: Dict[str, Dict[str, Any]],
+    resume_digest: Any = None,
+    job_title: Optional[str] = None,
+    job_type: Optional[str] = None,
+    personalize: bool = False,
+    concurrency: int = 4,
+) -> List[RenderedEmail]:
+    """
+    Render the template for every recipient, in order.
+
+    With personalize set (and a personalized_sentence slot in the template),
+    one sentence per recipient is generated first; everything else is
+    deterministic.
+    """
+    sender = resume_variables(resume_digest)
+    resume_skills = resume_digest.skills if resume_digest is not None else None
+    values = [
+        {
+            **sender,
+            **recipient_variables(
+                recipient,
+                job_contexts.get(recipient.get("job_url") or ""),
+                resume_skills,
+                recipient.get("job_title") or job_title,
+                job_type,
+            ),
+        }
+        for recipient in recipients
+    ]
+
+    if personalize and compiled.has_personalized_slot:
+        sentences = await personalize_sentences(
+            values, resume_digest.short_form if resume_digest is not None else "", concurrency
+        )
+        for recipient_values, sentence in zip(values, sentences):
+            if sentence:
+                recipient_values[PERSONALIZED_SLOT] = sentence
+
+    return [compiled.render(recipient_values) for recipient_values in values]
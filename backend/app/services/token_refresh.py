@@ -0,0 +1,324 @@
+"""Proactive OAuth token refresh for Gmail, Outlook and LinkedIn accounts.
+
+Sends used to notice an expired access token on the send path and refresh it
+inline, so the send waited on the provider's token endpoint, and concurrent
+sends from one account each started their own refresh.
+
+``TokenRefresher`` fixes both:
+
+- a background scheduler refreshes every token that expires within
+  ``TOKEN_REFRESH_LEAD_SECONDS``, claiming due accounts with
+  ``FOR UPDATE SKIP LOCKED`` so several processes never refresh the same one
+- refreshes are single-flight per account: callers that arrive while one is
+  in progress await the same result instead of starting another
+- refreshed tokens are kept in memory, so send workers holding an account row
+  loaded before the refresh still use the new token
+
+On the send path :meth:`TokenRefresher.ensure_fresh` only waits when the
+token has actually expired (the scheduler was not running); a token that is
+merely close to expiry is used as is and refreshed in the background.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.db.models.email_account import EmailAccount
+from app.db.models.linkedin_account import LinkedInAccount
+
+logger = logging.getLogger(__name__)
+
+LINKEDIN_TOKEN_URL = "https://www.linkedin.com/oauth/v2/accessToken"
+
+# A token this close to expiry is treated as expired on the send path
+_EXPIRY_MARGIN = timedelta(seconds=30)
+
+_FAILURE_BACKOFF_SECONDS = 900.0
+
+# (success, new_access_token, new_expires_at, error, new_refresh_token)
+RefreshResult = Tuple[bool, Optional[str], Optional[datetime], Optional[str], Optional[str]]
+
+_MODELS = {"email": EmailAccount, "linkedin": LinkedInAccount}
+
+
+async def refresh_linkedin_token(linkedin_account: Any) -> RefreshResult:
+    """Refresh a LinkedIn OAuth access token (same result tuple as email_providers.refresh_access_token)."""
+    from app.services.email_providers import get_provider_client
+
+    if not linkedin_account.refresh_token:
+        return False, None, None, "No refresh token available", None
+
+    client_id = os.getenv('LINKEDIN_CLIENT_ID')
+    client_secret = os.getenv('LINKEDIN_CLIENT_SECRET')
+    if not client_id or not client_secret:
+        return False, None, None, "LinkedIn OAuth not configured", None
+
+    try:
+        response = await get_provider_client('linkedin').post(
+            LINKEDIN_TOKEN_URL,
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": linkedin_account.refresh_token,
+                "client_id": client_id,
+                "client_secret": client_secret,
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        if response.status_code != 200:
+            return False, None, None, f"Token refresh failed: {response.status_code} - {response.text}", None
+        tokens = response.json()
+        new_expires_at = datetime.utcnow() + timedelta(seconds=tokens.get('expires_in', 5184000))
+        return True, tokens.get('access_token'), new_expires_at, None, tokens.get('refresh_token')
+    except Exception as e:
+        return False, None, None, f"Token refresh error: {str(e)}", None
+
+
+async def _refresh_account(kind: str, account: Any) -> RefreshResult:
+    if kind == "linkedin":
+        return await refresh_linkedin_token(account)
+    from app.services.email_providers import refresh_access_token
+    return await refresh_access_token(account)
+
+
+@dataclass
+class CachedToken:
+    access_token: str
+    expires_at: Optional[datetime]
+    refresh_token: Optional[str] = None
+
+
+def apply_refresh(account: Any, result: RefreshResult) -> None:
+    """Copy a successful refresh onto an account row."""
+    _, new_access_token, new_expires_at, _, new_refresh_token = result
+    account.access_token = new_access_token
+    account.token_expires_at = new_expires_at
+    if new_refresh_token:
+        account.refresh_token = new_refresh_token
+    account.updated_at = datetime.utcnow()
+
+
+class TokenRefresher:
+    """Single-flight token refresh, an in-memory token cache and the refresh scheduler."""
+
+    def __init__(self, interval: float, lead: float, concurrency: int):
+        self.interval = interval
+        self.lead = timedelta(seconds=max(0.0, lead))
+        self.concurrency = max(1, concurrency)
+        self._tokens: Dict[Tuple[str, int], CachedToken] = {}
+        self._inflight: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._retry_after: Dict[Tuple[str, int], float] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[datetime] = None
+        self.counters = {"refreshed": 0, "failed": 0, "joined": 0, "waited": 0, "background": 0, "scheduled": 0}
+
+    # Cache
+
+    def apply_cached(self, kind: str, account: Any) -> None:
+        """Replace a stale token on `account` with a newer one refreshed by this process."""
+        cached = self._tokens.get((kind, account.id))
+        if cached is None:
+            return
+        if account.token_expires_at is None or (
+            cached.expires_at is not None and cached.expires_at > account.token_expires_at
+        ):
+            account.access_token = cached.access_token
+            account.token_expires_at = cached.expires_at
+            if cached.refresh_token:
+                account.refresh_token = cached.refresh_token
+
+    # Single flight
+
+    async def refresh(self, kind: str, account: Any) -> RefreshResult:
+        """Refresh an account's token; concurrent callers for one account share one request."""
+        key = (kind, account.id)
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.counters["joined"] += 1
+            return await asyncio.shield(flight)
+
+        flight = asyncio.get_running_loop().create_future()
+        self._inflight[key] = flight
+        try:
+            result = await _refresh_account(kind, account)
+        except asyncio.CancelledError:
+            self._inflight.pop(key, None)
+            flight.cancel()
+            raise
+        except Exception as e:
+            result = (False, None, None, f"Token refresh error: {str(e)}", None)
+        self._inflight.pop(key, None)
+
+        if result[0] and result[1]:
+            self._tokens[key] = CachedToken(result[1], result[2], result[4])
+            self._retry_after.pop(key, None)
+            self.counters["refreshed"] += 1
+        else:
+            self._retry_after[key] = time.monotonic() + _FAILURE_BACKOFF_SECONDS
+            self.counters["failed"] += 1
+            logger.warning(f"⚠️ Token refresh failed for {kind} account {account.id}: {result[3]}")
+        flight.set_result(result)
+        return result
+
+    async def ensure_fresh(self, kind: str, account: Any, db: Optional[Any] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Make sure `account` carries a usable access token before a send.
+
+        Returns (usable, error). Waits for a refresh only when the token has
+        expired; a token inside the lead window is refreshed in the background.
+        """
+        self.apply_cached(kind, account)
+        expires_at = account.token_expires_at
+        if not account.access_token or not account.refresh_token or expires_at is None:
+            return True, None
+
+        now = datetime.utcnow()
+        if expires_at - now > _EXPIRY_MARGIN:
+            if expires_at - now <= self.lead:
+                self._refresh_in_background(kind, account.id)
+            return True, None
+
+        print(f"Access token expired for {getattr(account, 'email', account.id)}, refreshing...")
+        self.counters["waited"] += 1
+        result = await self.refresh(kind, account)
+        if not result[0] or not result[1]:
+            return False, result[3]
+        apply_refresh(account, result)
+        if db is not None:
+            await db.commit()
+        return True, None
+
+    def _refresh_in_background(self, kind: str, account_id: int) -> None:
+        key = (kind, account_id)
+        if key in self._inflight or self._retry_after.get(key, 0.0) > time.monotonic():
+            return
+        self.counters["background"] += 1
+        task = asyncio.create_task(self._refresh_by_id(kind, account_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _refresh_by_id(self, kind: str, account_id: int) -> None:
+        from app.db.base import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as db:
+                account = await db.get(_MODELS[kind], account_id)
+                if account is None:
+                    return
+                result = await self.refresh(kind, account)
+                if result[0] and result[1]:
+                    apply_refresh(account, result)
+                    await db.commit()
+        except Exception as e:
+            logger.error(f"❌ Background token refresh failed for {kind} account {account_id}: {e}")
+
+    # Scheduler
+
+    def start(self) -> None:
+        """Start the refresh scheduler on the running event loop (interval 0 disables it)."""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(), name="token-refresh-scheduler")
+        print(f"🔑 Token refresh scheduler started (every {self.interval:.0f}s, lead {self.lead.total_seconds():.0f}s)")
+
+    async def shutdown(self) -> None:
+        tasks = list(self._background)
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh_due()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Token refresh run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def refresh_due(self) -> int:
+        """Refresh every active OAuth token expiring within the lead window. Returns the number refreshed."""
+        refreshed = 0
+        for kind, query in (
+            ("email", select(EmailAccount).where(EmailAccount.provider.in_(["gmail", "outlook"]))),
+            ("linkedin", select(LinkedInAccount)),
+        ):
+            refreshed += await self._refresh_due_accounts(kind, query)
+        self.last_run = datetime.utcnow()
+        return refreshed
+
+    async def _refresh_due_accounts(self, kind: str, query) -> int:
+        from app.db.base import AsyncSessionLocal
+
+        model = _MODELS[kind]
+        horizon = datetime.utcnow() + self.lead
+        now = time.monotonic()
+        async with AsyncSessionLocal() as db:
+            # Rows stay locked until the commit, so other processes skip them
+            result = await db.execute(
+                query
+                .where(model.is_active == True)
+                .where(model.refresh_token.isnot(None))
+                .where(model.token_expires_at.isnot(None))
+                .where(model.token_expires_at <= horizon)
+                .order_by(model.token_expires_at)
+                .with_for_update(skip_locked=True)
+            )
+            accounts = [
+                account for account in result.scalars().all()
+                if self._retry_after.get((kind, account.id), 0.0) <= now
+            ]
+            if not accounts:
+                await db.commit()
+                return 0
+
+            slots = asyncio.Semaphore(self.concurrency)
+
+            async def one(account):
+                async with slots:
+                    return account, await self.refresh(kind, account)
+
+            refreshed = 0
+            for account, outcome in await asyncio.gather(*(one(account) for account in accounts)):
+                if outcome[0] and outcome[1]:
+                    apply_refresh(account, outcome)
+                    refreshed += 1
+            await db.commit()
+
+        self.counters["scheduled"] += refreshed
+        if refreshed:
+            logger.info(f"🔑 Refreshed {refreshed} {kind} OAuth token(s) ahead of expiry")
+        return refreshed
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_seconds": self.interval,
+            "lead_seconds": self.lead.total_seconds(),
+            "cached_tokens": len(self._tokens),
+            "in_flight": len(self._inflight),
+            "backing_off": sum(1 for t in self._retry_after.values() if t > time.monotonic()),
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            **self.counters,
+        }
+
+
+def _create_refresher() -> TokenRefresher:
+    from app.core.config import settings
+    return TokenRefresher(
+        interval=settings.token_refresh_interval_seconds,
+        lead=settings.token_refresh_lead_seconds,
+        concurrency=settings.token_refresh_concurrency,
+    )
+
+
+token_refresher = _create_refresher()
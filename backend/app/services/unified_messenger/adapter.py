@@ -1,8 +1,10 @@
 """Adapter layer for UnifiedMessenger - wraps methods as async functions."""
 import asyncio
 import os
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from .clients import get_messenger
+from .message_length import GeneratedMessage
+from app.services.executors import CPU, LLM, UPSTREAM_IO, run_in_executor
 
 # Import verbose logger
 try:
@@ -32,9 +34,8 @@ async def linkedin_url_to_provider_id(url: str, account_id: Optional[str] = None
     messenger = get_messenger()
     
     # Run in thread pool since this is synchronous code
-    loop = asyncio.get_event_loop()
-    provider_id, user_info = await loop.run_in_executor(
-        None,
+    provider_id, user_info = await run_in_executor(
+        UPSTREAM_IO,
         messenger.get_provider_id_from_linkedin_url,
         url,
         account_id
@@ -65,9 +66,8 @@ async def find_existing_chat(name: str) -> Dict[str, Any]:
     """
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    chat_id, user_id = await loop.run_in_executor(
-        None,
+    chat_id, user_id = await run_in_executor(
+        UPSTREAM_IO,
         messenger.find_existing_chat_by_name,
         name
     )
@@ -91,9 +91,8 @@ async def send_message_existing(chat_id: str, text: str) -> Dict[str, Any]:
     """
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    success, result = await loop.run_in_executor(
-        None,
+    success, result = await run_in_executor(
+        UPSTREAM_IO,
         messenger.send_message_to_existing_chat,
         chat_id,
         text
@@ -125,9 +124,8 @@ async def send_message_new(provider_id: str, text: str, inmail: bool = False) ->
     """
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    success, result = await loop.run_in_executor(
-        None,
+    success, result = await run_in_executor(
+        UPSTREAM_IO,
         messenger.send_message_to_new_user,
         provider_id,
         text,
@@ -146,6 +144,38 @@ async def send_message_new(provider_id: str, text: str, inmail: bool = False) ->
         }
 
 
+def linkedin_account_error(account: Optional[Any]) -> str:
+    """Error for a user without an active, Unipile-connected LinkedIn account (`account`: any of theirs, or None)."""
+    if account is None:
+        return "No LinkedIn account connected. Please connect your LinkedIn account in Settings > LinkedIn Accounts."
+    if not account.is_active:
+        return "Your LinkedIn account is not active. Please enable it in Settings > LinkedIn Accounts."
+    return "Your LinkedIn account is not properly connected to Unipile. Please reconnect your LinkedIn account in Settings > LinkedIn Accounts."
+
+
+def invitation_error(result: Any) -> str:
+    """User-friendly error for a failed Unipile invitation result."""
+    if not isinstance(result, dict):
+        return result if isinstance(result, str) else str(result)
+
+    error_detail = result.get("detail", result.get("error", result.get("message", str(result))))
+    error_type = result.get("type", "")
+    
+    # Convert technical errors to user-friendly messages
+    if "cannot_resend_yet" in error_type.lower() or "temporary provider limit" in error_detail.lower():
+        return "You have hit your LinkedIn monthly cap for connection requests. The limit will reset at the start of next month."
+    if "too_many_characters" in error_type.lower() or "character limit" in error_detail.lower():
+        return "Your LinkedIn message is too long. LinkedIn connection requests have a character limit of 300 characters (or 200 for free accounts). Please shorten your message and try again."
+    if "not_connected" in error_type.lower() or "connection" in error_detail.lower():
+        return "Unable to connect with this person. They may have restricted connection requests or you may already be connected."
+    if "rate_limit" in error_type.lower() or "too many" in error_detail.lower():
+        return "You've sent too many LinkedIn requests recently. Please wait a few minutes before trying again."
+    if "invalid" in error_type.lower() or "not found" in error_detail.lower():
+        return "This LinkedIn profile could not be found or is invalid. Please check the profile URL and try again."
+    # Default: use the error detail but remove technical jargon
+    return error_detail.replace("errors/", "").replace("error:", "").strip()
+
+
 async def send_invitation(provider_id: str, text: str, user_id: Optional[str] = None, db: Optional[Any] = None, linkedin_url: Optional[str] = None) -> Dict[str, Any]:
     """
     Send LinkedIn connection invitation via Unipile API.
@@ -210,23 +240,14 @@ async def send_invitation(provider_id: str, text: str, user_id: Optional[str] =
                 if any_account:
                     if not any_account.is_active:
                         print(f"⚠️  User has LinkedIn account but it's not active (ID: {any_account.id})")
-                        return {
-                            "success": False,
-                            "error": "Your LinkedIn account is not active. Please enable it in Settings > LinkedIn Accounts.",
-                            "method": "unipile"
-                        }
                     elif not any_account.unipile_account_id:
                         print(f"⚠️  User has LinkedIn account but no Unipile account ID (ID: {any_account.id})")
-                        return {
-                            "success": False,
-                            "error": "Your LinkedIn account is not properly connected to Unipile. Please reconnect your LinkedIn account in Settings > LinkedIn Accounts.",
-                            "method": "unipile"
-                        }
                 else:
                     print(f"⚠️  User has no LinkedIn accounts")
+                if not any_account or not any_account.is_active or not any_account.unipile_account_id:
                     return {
                         "success": False,
-                        "error": "No LinkedIn account connected. Please connect your LinkedIn account in Settings > LinkedIn Accounts.",
+                        "error": linkedin_account_error(any_account),
                         "method": "unipile"
                     }
         
@@ -244,9 +265,8 @@ async def send_invitation(provider_id: str, text: str, user_id: Optional[str] =
         # Use Unipile API to send invitation
         messenger = get_messenger()
         
-        loop = asyncio.get_event_loop()
-        success, result = await loop.run_in_executor(
-            None,
+        success, result = await run_in_executor(
+            UPSTREAM_IO,
             messenger.send_invitation,
             provider_id,
             text,
@@ -269,29 +289,7 @@ async def send_invitation(provider_id: str, text: str, user_id: Optional[str] =
         else:
             error_msg = result if isinstance(result, str) else str(result)
             print(f"❌ Failed to send LinkedIn invitation via Unipile: {error_msg}")
-            # Try to extract more details from the error
-            if isinstance(result, dict):
-                error_detail = result.get("detail", result.get("error", result.get("message", str(result))))
-                error_type = result.get("type", "")
-                
-                # Convert technical errors to user-friendly messages
-                if "cannot_resend_yet" in error_type.lower() or "temporary provider limit" in error_detail.lower():
-                    user_friendly_error = "You have hit your LinkedIn monthly cap for connection requests. The limit will reset at the start of next month."
-                elif "too_many_characters" in error_type.lower() or "character limit" in error_detail.lower():
-                    user_friendly_error = "Your LinkedIn message is too long. LinkedIn connection requests have a character limit of 300 characters (or 200 for free accounts). Please shorten your message and try again."
-                elif "not_connected" in error_type.lower() or "connection" in error_detail.lower():
-                    user_friendly_error = "Unable to connect with this person. They may have restricted connection requests or you may already be connected."
-                elif "rate_limit" in error_type.lower() or "too many" in error_detail.lower():
-                    user_friendly_error = "You've sent too many LinkedIn requests recently. Please wait a few minutes before trying again."
-                elif "invalid" in error_type.lower() or "not found" in error_detail.lower():
-                    user_friendly_error = "This LinkedIn profile could not be found or is invalid. Please check the profile URL and try again."
-                else:
-                    # Default: use the error detail but remove technical jargon
-                    user_friendly_error = error_detail
-                    # Remove common technical prefixes
-                    user_friendly_error = user_friendly_error.replace("errors/", "").replace("error:", "").strip()
-                
-                error_msg = user_friendly_error
+            error_msg = invitation_error(result)
             return {
                 "success": False,
                 "error": error_msg,
@@ -350,9 +348,8 @@ async def search_company(name: str, db: Optional[Any] = None) -> Dict[str, Any]:
     # Not in cache, call API
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    company_id, company_info = await loop.run_in_executor(
-        None,
+    company_id, company_info = await run_in_executor(
+        UPSTREAM_IO,
         messenger.search_company,
         name
     )
@@ -420,9 +417,8 @@ async def search_jobs(
     """
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    jobs = await loop.run_in_executor(
-        None,
+    jobs = await run_in_executor(
+        UPSTREAM_IO,
         messenger.search_jobs,
         company_ids,
         job_titles,
@@ -493,9 +489,10 @@ async def filter_jobs(
         await emit_verbose_log("Extracting job requirements and qualifications", "info", "📝")
         logger.info(f"🔍 DEBUG: Running filter_jobs in executor...")
         logger.info(f"🔍 DEBUG: Resume content provided: {resume_content is not None}")
+        # filter_jobs schedules DB writes back onto this loop
         loop = asyncio.get_event_loop()
-        ranking_result, top_urls = await loop.run_in_executor(
-            None,
+        ranking_result, top_urls = await run_in_executor(
+            LLM,
             job_filter.filter_jobs,
             jobs,
             resume_file,
@@ -611,9 +608,8 @@ async def search_recruiters(company_ids: List[str]) -> List[Dict[str, Any]]:
     """
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    recruiters = await loop.run_in_executor(
-        None,
+    recruiters = await run_in_executor(
+        UPSTREAM_IO,
         messenger.search_recruiters,
         company_ids,
         "recruiter"
@@ -674,12 +670,11 @@ async def store_job_contexts_for_jobs(jobs: List[Dict[str, Any]], db) -> int:
                     await emit_verbose_log(f"   Scraping: {job_title}", "info", "🔍")
                     
                     # Run scraping in executor since it's synchronous
-                    loop = asyncio.get_event_loop()
-                    scraped = await loop.run_in_executor(None, scrape_job, job_url)
+                    scraped = await run_in_executor(UPSTREAM_IO, scrape_job, job_url)
                     
                     if scraped and scraped.get('description'):
                         logger.info(f"✅ Scraped successfully, condensing...")
-                        condensed = await loop.run_in_executor(None, condenser.condense_job, scraped)
+                        condensed = await run_in_executor(LLM, condenser.condense_job, scraped)
                         if condensed and condensed.get('condensed_description'):
                             job['condensed_description'] = condensed.get('condensed_description', '')
                             logger.info(f"✅ Condensed successfully")
@@ -717,7 +712,10 @@ async def store_job_contexts_for_jobs(jobs: List[Dict[str, Any]], db) -> int:
 async def map_jobs_to_recruiters(
     jobs: List[Dict[str, Any]],
     recruiters: List[Dict[str, Any]],
-    max_pairs: int = 5
+    max_pairs: int = 5,
+    debug_scoring: bool = False,
+    assignment: str = "greedy",
+    scoring_spec: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Map jobs to best recruiters.
@@ -726,6 +724,9 @@ async def map_jobs_to_recruiters(
         jobs: List of job dictionaries
         recruiters: List of recruiter dictionaries
         max_pairs: Maximum number of pairs
+        debug_scoring: Log every (job, recruiter) score with its inputs
+        assignment: "greedy" (job by job) or "optimal" (global max-weight matching)
+        scoring_spec: CompiledScoringSpec to score with (None = configured default)
         
     Returns:
         Dict with mapping and selected_recruiters
@@ -748,13 +749,15 @@ async def map_jobs_to_recruiters(
     try:
         messenger = get_messenger()
         
-        loop = asyncio.get_event_loop()
-        selected_recruiters, mapping = await loop.run_in_executor(
-            None,
+        selected_recruiters, mapping = await run_in_executor(
+            CPU,
             messenger.map_jobs_to_recruiters,
             jobs,
             recruiters,
-            max_pairs
+            max_pairs,
+            debug_scoring or None,
+            assignment,
+            scoring_spec
         )
         
         logger.info(f"🔍 DEBUG: map_jobs_to_recruiters returned {len(mapping)} mappings and {len(selected_recruiters)} selected recruiters")
@@ -795,9 +798,8 @@ async def extract_emails_for_recruiters(recruiters: List[Dict[str, Any]]) -> Lis
     """
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    recruiters_with_emails = await loop.run_in_executor(
-        None,
+    recruiters_with_emails = await run_in_executor(
+        UPSTREAM_IO,
         messenger.extract_emails_for_recruiters,
         recruiters
     )
@@ -805,12 +807,29 @@ async def extract_emails_for_recruiters(recruiters: List[Dict[str, Any]]) -> Lis
     return recruiters_with_emails
 
 
+async def _email_resume_content(messenger, resume_content: Optional[str], resume_digest: Optional[Any]) -> Optional[str]:
+    """Resume text for an email prompt: the digest's short form, the given content, or the PDF."""
+    if resume_digest:
+        return resume_digest.short_form
+    
+    # Use provided resume content, or fallback to loading from PDF
+    if not resume_content and messenger.resume_generator:
+        try:
+            resume_file = "Resume-Tulsi,Shreyas.pdf"
+            if os.path.exists(resume_file):
+                resume_content = await run_in_executor(CPU, messenger.resume_generator.load_resume, resume_file)
+        except Exception:
+            pass
+    return resume_content
+
+
 async def generate_email(
     job_titles: List[str],
     job_type: str,
     recruiter: Dict[str, Any],
     resume_content: Optional[str] = None,
     job_url: Optional[str] = None,
+    resume_digest: Optional[Any] = None,
 ) -> Dict[str, str]:
     """
     Generate email content for recruiter.
@@ -820,6 +839,7 @@ async def generate_email(
         job_type: "full_time" or "internship"
         recruiter: Recruiter dictionary
         resume_content: Resume content from database (preferred over PDF)
+        resume_digest: User's ResumeDigest; its short form replaces resume_content
         
     Returns:
         Dict with subject and body
@@ -831,22 +851,16 @@ async def generate_email(
     
     await verbose_logger.log(f"Constructing email for {recruiter_name}", "info", "✉️")
     
-    # Use provided resume content, or fallback to loading from PDF
-    if not resume_content and messenger.resume_generator:
-        try:
-            resume_file = "Resume-Tulsi,Shreyas.pdf"
-            if os.path.exists(resume_file):
-                resume_content = messenger.resume_generator.load_resume(resume_file)
-        except Exception:
-            pass
+    resume_content = await _email_resume_content(messenger, resume_content, resume_digest)
     
-    # Now we can call async method directly - no executor needed! 🎉
+    # Async end to end - the model call is awaited, not run on an executor thread
     subject, body = await messenger.generate_email_content(
         job_titles,
         job_type,
         recruiter,
         resume_content,
         job_url,
+        resume_digest=resume_digest,
     )
     
     await verbose_logger.log(f"Email content generated for {recruiter_name}", "success", "✅")
@@ -857,6 +871,40 @@ async def generate_email(
     }
 
 
+async def stream_email(
+    job_titles: List[str],
+    job_type: str,
+    recruiter: Dict[str, Any],
+    resume_content: Optional[str] = None,
+    job_url: Optional[str] = None,
+    resume_digest: Optional[Any] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming generate_email: yields token events as the model writes and a
+    final event with the subject and body (see UnifiedMessenger.stream_email_content).
+    """
+    from app.services.verbose_logger import verbose_logger
+    
+    messenger = get_messenger()
+    recruiter_name = recruiter.get('name', 'recruiter')
+    
+    await verbose_logger.log(f"Constructing email for {recruiter_name} (streaming)", "info", "✉️")
+    
+    resume_content = await _email_resume_content(messenger, resume_content, resume_digest)
+    
+    async for event in messenger.stream_email_content(
+        job_titles,
+        job_type,
+        recruiter,
+        resume_content,
+        job_url,
+        resume_digest=resume_digest,
+    ):
+        yield event
+    
+    await verbose_logger.log(f"Email content generated for {recruiter_name}", "success", "✅")
+
+
 async def send_email(
     to_email: str,
     subject: str,
@@ -877,55 +925,30 @@ async def send_email(
     Returns:
         Dict with success status and result/error
     """
-    from datetime import datetime
+    from app.services import email_providers
+    from app.services.token_refresh import token_refresher
     messenger = get_messenger()
     
-    loop = asyncio.get_event_loop()
-    
     # If email_account provided, use it; otherwise use default SMTP from env
     if email_account:
-        # Check if token is expired and refresh if needed
-        if (email_account.provider in ['gmail', 'outlook'] and 
-            email_account.access_token and 
-            email_account.token_expires_at and 
-            email_account.token_expires_at < datetime.utcnow() and
-            email_account.refresh_token):
-            
-            # Token expired - refresh it
-            print(f"Access token expired for {email_account.email}, refreshing...")
-            success_refresh, new_access_token, new_expires_at, error, new_refresh_token = await loop.run_in_executor(
-                None,
-                messenger.refresh_access_token,
-                email_account
-            )
-            
-            if success_refresh and new_access_token and db:
-                # Update the account in database
-                email_account.access_token = new_access_token
-                email_account.token_expires_at = new_expires_at
-                if new_refresh_token:
-                    email_account.refresh_token = new_refresh_token
-                email_account.updated_at = datetime.utcnow()
-                await db.commit()
-                print(f"Token refreshed successfully for {email_account.email}")
-            elif not success_refresh:
+        # Tokens are refreshed ahead of expiry by the scheduler; this only waits if one has expired
+        if email_providers.is_oauth_account(email_account):
+            usable, error = await token_refresher.ensure_fresh("email", email_account, db)
+            if not usable:
                 return {
                     "success": False,
                     "error": f"Failed to refresh access token: {error}. Please re-link your email account."
                 }
         
-        success, result = await loop.run_in_executor(
-            None,
-            messenger.send_email_with_account,
+        success, result = await messenger.asend_email_with_account(
             to_email,
             subject,
             body,
             email_account
         )
     else:
-        success, result = await loop.run_in_executor(
-            None,
-            messenger.send_email,
+        # Pooled SMTP session (see smtp_pool)
+        success, result = await messenger.asend_email(
             to_email,
             subject,
             body
@@ -943,109 +966,15 @@ async def send_email(
         }
 
 
-async def email_only_outreach(
-    recruiters: List[Dict[str, Any]],
-    job_titles: List[str],
-    job_type: str
-) -> Dict[str, Any]:
-    """
-    Execute email-only outreach campaign.
-    
-    Args:
-        recruiters: List of recruiter dictionaries
-        job_titles: List of job titles
-        job_type: "full_time" or "internship"
-        
-    Returns:
-        Summary dictionary
-    """
-    messenger = get_messenger()
-    
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(
-        None,
-        messenger.email_only_outreach,
-        recruiters,
-        job_titles,
-        job_type
-    )
-    
-    # Return summary - in production, track actual results
-    return {
-        "status": "completed",
-        "message": "Email-only outreach completed"
-    }
-
-
-async def enhanced_dual_outreach(
-    recruiters: List[Dict[str, Any]],
-    job_titles: List[str],
-    job_type: str
-) -> Dict[str, Any]:
-    """
-    Execute enhanced dual outreach campaign (LinkedIn + Email).
-    
-    Args:
-        recruiters: List of recruiter dictionaries
-        job_titles: List of job titles
-        job_type: "full_time" or "internship"
-        
-    Returns:
-        Summary dictionary
-    """
-    messenger = get_messenger()
-    
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(
-        None,
-        messenger.enhanced_dual_outreach,
-        recruiters,
-        job_titles,
-        job_type
-    )
-    
-    # Return summary - in production, track actual results
-    return {
-        "status": "completed",
-        "message": "Enhanced dual outreach completed"
-    }
-
-
-async def generate_linkedin_message(
-    recruiter: Dict[str, Any],
-    job_title: str,
-    company_name: str,
-    resume_content: Optional[str] = None,
-    resume_file: str = "Resume-Tulsi,Shreyas.pdf",
-    user_id: Optional[str] = None,
-    db: Optional[Any] = None
-) -> str:
+async def get_linkedin_char_limit(user_id: Optional[str] = None, db: Optional[Any] = None) -> int:
     """
-    Generate personalized LinkedIn message for a recruiter-job pair.
+    LinkedIn invitation note limit for the user's active LinkedIn account.
     
-    Args:
-        recruiter: Recruiter dictionary with name and company
-        job_title: Job title string
-        company_name: Company name string
-        resume_content: Resume content from database (preferred over PDF)
-        resume_file: Path to resume file (fallback if resume_content not provided)
-        user_id: Optional user ID to fetch LinkedIn account premium status
-        db: Optional database session to fetch LinkedIn account premium status
-        
-    Returns:
-        Generated LinkedIn message (targets close to character limit based on premium status)
+    Default to 300 (premium) if unknown, 200 if the account is known to be free.
     """
     import logging
     logger = logging.getLogger(__name__)
-    from app.services.verbose_logger import verbose_logger
-    
-    messenger = get_messenger()
-    recruiter_name = recruiter.get('name', 'recruiter')
-    
-    await verbose_logger.log(f"Constructing LinkedIn message for {recruiter_name}", "info", "💼")
     
-    # Determine character limit based on user's LinkedIn account premium status
-    # Default to 300 (premium) if unknown, 200 if free account
     char_limit = 300  # Default to premium limit
     if user_id and db:
         try:
@@ -1070,12 +999,17 @@ async def generate_linkedin_message(
         except Exception as e:
             logger.warning(f"Could not fetch LinkedIn account premium status: {e}, defaulting to premium limit")
             # Continue with default premium limit
+    return char_limit
+
+
+async def ensure_job_context(job_url: Optional[str], job_title: str, company_name: Any) -> None:
+    """
+    Make sure a job context is stored for job_url, scraping and condensing the
+    posting if it is missing. Never raises: messages can be generated without it.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
     
-    if not messenger.resume_generator:
-        raise ValueError("Resume generator not available")
-    
-    # Check if job_url is available and ensure context is stored
-    job_url = recruiter.get('job_url')
     if job_url:
         logger.info(f"🔍 Checking job context for URL: {job_url}")
         try:
@@ -1101,8 +1035,7 @@ async def generate_linkedin_message(
                     from app.services.unified_messenger.scraper import scrape_job
                     from app.services.unified_messenger.job_condenser import JobCondenser
                     
-                    loop = asyncio.get_event_loop()
-                    scraped = await loop.run_in_executor(None, scrape_job, job_url)
+                    scraped = await run_in_executor(UPSTREAM_IO, scrape_job, job_url)
                     
                     if scraped and scraped.get('description'):
                         logger.info(f"✅ Scraped job successfully, condensing...")
@@ -1111,8 +1044,8 @@ async def generate_linkedin_message(
                         # Use condense_job_description method
                         description = scraped.get('description', '')
                         title = scraped.get('title', job_title)
-                        condensed_desc = await loop.run_in_executor(
-                            None, 
+                        condensed_desc = await run_in_executor(
+                            LLM,
                             condenser.condense_job_description,
                             description,
                             title
@@ -1137,47 +1070,176 @@ async def generate_linkedin_message(
             import traceback
             logger.error(traceback.format_exc())
             # Continue anyway - message generation can still work without context
+
+
+def _generic_linkedin_message(recruiter: Dict[str, Any], job_title: str, company_name: str) -> str:
+    """Note used when the resume cannot be loaded."""
+    recruiter_name = recruiter.get('name', 'Hiring Manager')
+    return f"Dear {recruiter_name}, I'm interested in {job_title} opportunities at {company_name}. I'd love to connect and discuss potential roles that align with my background."
+
+
+async def _load_resume_file(messenger, resume_file: str, user_id: Optional[str] = None) -> Optional[str]:
+    """Text of the resume PDF, searched for in the usual locations (None if not found)."""
+    # Try multiple paths for resume file
+    resume_paths = [
+        resume_file,
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), resume_file),
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "ananya", resume_file),
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), resume_file),
+    ]
+    
+    for path in resume_paths:
+        if os.path.exists(path):
+            return await run_in_executor(CPU, messenger.resume_generator.load_resume, path, user_id)
+    return None
+
+
+async def generate_linkedin_message(
+    recruiter: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    resume_content: Optional[str] = None,
+    resume_file: str = "Resume-Tulsi,Shreyas.pdf",
+    user_id: Optional[str] = None,
+    db: Optional[Any] = None,
+    return_details: bool = False,
+    resume_digest: Optional[Any] = None,
+    char_limit: Optional[int] = None
+) -> Any:
+    """
+    Generate personalized LinkedIn message for a recruiter-job pair.
+    
+    Args:
+        recruiter: Recruiter dictionary with name and company
+        job_title: Job title string
+        company_name: Company name string
+        resume_content: Resume content from database (preferred over PDF)
+        resume_file: Path to resume file (fallback if resume_content not provided)
+        user_id: Optional user ID to fetch LinkedIn account premium status
+        db: Optional database session to fetch LinkedIn account premium status
+        return_details: Return a GeneratedMessage (text, model calls, candidates, local edits)
+        resume_digest: User's ResumeDigest; its prepared short form is used as-is
+        char_limit: Note limit if already known (skips the LinkedIn account lookup)
+        
+    Returns:
+        Generated LinkedIn message (targets close to character limit based on premium status),
+        or a GeneratedMessage if return_details is set
+    """
+    from app.services.verbose_logger import verbose_logger
+    
+    messenger = get_messenger()
+    recruiter_name = recruiter.get('name', 'recruiter')
+    
+    await verbose_logger.log(f"Constructing LinkedIn message for {recruiter_name}", "info", "💼")
+    
+    # Determine character limit based on user's LinkedIn account premium status
+    if char_limit is None:
+        char_limit = await get_linkedin_char_limit(user_id, db)
+    
+    if not messenger.resume_generator:
+        raise ValueError("Resume generator not available")
+    
+    # Check if job_url is available and ensure context is stored
+    await ensure_job_context(recruiter.get('job_url'), job_title, company_name)
+    
+    if resume_digest:
+        resume_content = resume_digest.short_form
     
     # Use provided resume content, or fallback to loading from PDF
     if not resume_content:
         try:
-            # Try multiple paths for resume file
-            resume_paths = [
-                resume_file,
-                os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), resume_file),
-                os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "ananya", resume_file),
-                os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), resume_file),
-            ]
-            
-            resume_path = None
-            for path in resume_paths:
-                if os.path.exists(path):
-                    resume_path = path
-                    break
-            
-            if resume_path:
-                resume_content = messenger.resume_generator.load_resume(resume_path)
+            resume_content = await _load_resume_file(messenger, resume_file, user_id)
         except Exception as e:
             # If resume can't be loaded, use generic message
-            recruiter_name = recruiter.get('name', 'Hiring Manager')
-            return f"Dear {recruiter_name}, I'm interested in {job_title} opportunities at {company_name}. I'd love to connect and discuss potential roles that align with my background."
+            message = _generic_linkedin_message(recruiter, job_title, company_name)
+            return GeneratedMessage(message) if return_details else message
     
     recruiter_name_for_generation = recruiter.get('name', 'Hiring Manager')
     
-    loop = asyncio.get_event_loop()
-    message = await loop.run_in_executor(
-        None,
-        messenger.resume_generator.generate_message,
+    result = await messenger.resume_generator.agenerate_message_detailed(
         resume_content,
         recruiter_name_for_generation,
         job_title,
         company_name,
-        char_limit  # Pass character limit based on premium status
+        char_limit,  # Pass character limit based on premium status
+        resume_prepared=resume_digest is not None
     )
+    message = result.text
     
-    await verbose_logger.log(f"LinkedIn message generated for {recruiter_name} ({len(message) if message else 0}/{char_limit} chars)", "success", "✅")
+    await verbose_logger.log(
+        f"LinkedIn message generated for {recruiter_name} ({len(message) if message else 0}/{char_limit} chars, "
+        f"{result.attempts} model call{'s' if result.attempts != 1 else ''})",
+        "success",
+        "✅"
+    )
     
-    return message
+    return result if return_details else message
+
+
+async def stream_linkedin_message(
+    recruiter: Dict[str, Any],
+    job_title: str,
+    company_name: str,
+    resume_content: Optional[str] = None,
+    resume_file: str = "Resume-Tulsi,Shreyas.pdf",
+    user_id: Optional[str] = None,
+    db: Optional[Any] = None,
+    resume_digest: Optional[Any] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming generate_linkedin_message: yields token events as the model
+    writes and a final event with the length-checked message (see
+    ResumeMessageGenerator.astream_message).
+    
+    Storing the job context does not feed the note, so it runs alongside
+    generation instead of before it and never delays the first token.
+    """
+    from app.services.verbose_logger import verbose_logger
+    
+    messenger = get_messenger()
+    recruiter_name = recruiter.get('name', 'recruiter')
+    
+    await verbose_logger.log(f"Constructing LinkedIn message for {recruiter_name} (streaming)", "info", "💼")
+    
+    char_limit = await get_linkedin_char_limit(user_id, db)
+    
+    if not messenger.resume_generator:
+        raise ValueError("Resume generator not available")
+    
+    context_task = asyncio.ensure_future(ensure_job_context(recruiter.get('job_url'), job_title, company_name))
+    try:
+        if resume_digest:
+            resume_content = resume_digest.short_form
+        
+        if not resume_content:
+            try:
+                resume_content = await _load_resume_file(messenger, resume_file, user_id)
+            except Exception:
+                message = _generic_linkedin_message(recruiter, job_title, company_name)
+                yield {'type': 'final', 'message': message, 'length': len(message), 'attempts': 0, 'candidates': 0, 'adjustments': []}
+                return
+        
+        async for event in messenger.resume_generator.astream_message(
+            resume_content,
+            recruiter.get('name', 'Hiring Manager'),
+            job_title,
+            company_name,
+            char_limit,
+            resume_prepared=resume_digest is not None
+        ):
+            if event['type'] == 'final':
+                await verbose_logger.log(
+                    f"LinkedIn message generated for {recruiter_name} ({event['length']}/{char_limit} chars, "
+                    f"{event['attempts']} model call{'s' if event['attempts'] != 1 else ''})",
+                    "success",
+                    "✅"
+                )
+            yield event
+        
+        await context_task
+    finally:
+        if not context_task.done():
+            context_task.cancel()
 
 
 async def send_linkedin_invitation(
@@ -1197,9 +1259,8 @@ async def send_linkedin_invitation(
     messenger = get_messenger()
     
     # Convert LinkedIn URL to Provider ID
-    loop = asyncio.get_event_loop()
-    provider_id, user_info = await loop.run_in_executor(
-        None,
+    provider_id, user_info = await run_in_executor(
+        UPSTREAM_IO,
         messenger.get_provider_id_from_linkedin_url,
         linkedin_url
     )
@@ -1211,8 +1272,8 @@ async def send_linkedin_invitation(
         }
     
     # Send invitation
-    success, result = await loop.run_in_executor(
-        None,
+    success, result = await run_in_executor(
+        UPSTREAM_IO,
         messenger.send_invitation,
         provider_id,
         message
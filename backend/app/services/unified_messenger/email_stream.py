@@ -0,0 +1,83 @@
+"""
+Incremental parsing of the outreach email template while it streams.
+
+The email prompt asks the model for
+
+    <<<BEGIN>>>
+    SUBJECT: ...
+
+    BODY:
+    ...
+    <<<END>>>
+
+When the response is streamed, clients should see the subject and body
+text, not the markers. EmailStreamParser re-parses the text received so far
+on every chunk (responses are a few hundred tokens) and returns what was
+added to each field since the last call. A chunk ending in what may be the
+start of a marker ("<<<EN", "BOD") is held back until the next chunk decides.
+"""
+
+from typing import Dict, List, Tuple
+
+BEGIN_MARKER = "<<<BEGIN>>>"
+END_MARKER = "<<<END>>>"
+SUBJECT_MARKER = "SUBJECT:"
+BODY_MARKER = "BODY:"
+_MARKERS = (BEGIN_MARKER, END_MARKER, SUBJECT_MARKER, BODY_MARKER)
+
+
+def _partial_marker_length(text: str) -> int:
+    """Length of the longest suffix of text that is a proper prefix of a marker."""
+    longest = 0
+    for marker in _MARKERS:
+        for k in range(min(len(marker) - 1, len(text)), longest, -1):
+            if text.endswith(marker[:k]):
+                longest = k
+                break
+    return longest
+
+
+def split_email_output(text: str) -> Dict[str, str]:
+    """Subject and body of (possibly partial) templated model output; markers removed."""
+    if BEGIN_MARKER in text:
+        text = text.split(BEGIN_MARKER, 1)[1]
+    text = text.split(END_MARKER, 1)[0]
+
+    if SUBJECT_MARKER in text or BODY_MARKER in text:
+        head, has_body, body = text.partition(BODY_MARKER)
+        subject = head.split(SUBJECT_MARKER, 1)[1] if SUBJECT_MARKER in head else ""
+        return {"subject": subject.strip(), "body": body.strip() if has_body else ""}
+
+    # No template markers (yet): anything that cannot become "SUBJECT:" is body text
+    stripped = text.strip()
+    if not stripped or SUBJECT_MARKER.startswith(stripped) or BEGIN_MARKER.startswith(stripped):
+        return {"subject": "", "body": ""}
+    return {"subject": "", "body": stripped}
+
+
+class EmailStreamParser:
+    """Turns streamed chunks of the email template into (field, text) deltas."""
+
+    def __init__(self):
+        self.buffer = ""
+        self.sent = {"subject": "", "body": ""}
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        """Add a chunk; returns the new subject/body text it made visible."""
+        self.buffer += chunk
+        held = _partial_marker_length(self.buffer)
+        return self._deltas(self.buffer[:len(self.buffer) - held] if held else self.buffer)
+
+    def close(self) -> List[Tuple[str, str]]:
+        """End of stream: flush anything held back."""
+        return self._deltas(self.buffer)
+
+    def _deltas(self, text: str) -> List[Tuple[str, str]]:
+        deltas = []
+        for field, value in split_email_output(text).items():
+            previous = self.sent[field]
+            # The final event corrects any field whose earlier text was re-interpreted
+            if len(value) > len(previous) and value.startswith(previous):
+                deltas.append((field, value[len(previous):]))
+                self.sent[field] = value
+        return deltas
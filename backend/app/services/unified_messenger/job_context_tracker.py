@@ -14,8 +14,56 @@ from app.services.job_context_service import (
     upsert_job_context,
     get_job_context_by_url,
 )
+from app.services.cpu_pool import cpu_pool
 from app.services.unified_messenger.resume_message_generator import ResumeMessageGenerator
 
+_SECTION_HEADER_RE = re.compile(
+    r"^[\s\*`_~:-]*?(responsibilities|requirements|key\s+technologies)\s*:?[\s\*`_~:-]*",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def parse_sections(text: str) -> Dict[str, List[str]]:
+    """Split a condensed description into responsibilities/requirements/technologies.
+
+    Module-level (and free of DB state) so it can run in the CPU process pool.
+    """
+    if not text:
+        return {}
+
+    normalized_text = text.replace('\r\n', '\n')
+    matches = list(_SECTION_HEADER_RE.finditer(normalized_text))
+    if not matches:
+        return {}
+
+    sections: Dict[str, List[str]] = {
+        'responsibilities': [],
+        'requirements': [],
+        'technologies': [],
+    }
+
+    for index, match in enumerate(matches):
+        header = match.group(1).lower().replace('key ', '')  # map 'key technologies' -> 'technologies'
+        start = match.end()
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(normalized_text)
+        section_text = normalized_text[start:end]
+
+        bullets: List[str] = []
+        for line in section_text.split('\n'):
+            stripped = line.strip()
+            if not stripped:
+                continue
+            while stripped and stripped[0] in {'•', '-', '*', '–', '—', '·', '`'}:
+                stripped = stripped[1:].strip()
+            bullet = stripped.rstrip('*` ').strip()
+            if bullet and not bullet.lower().startswith(tuple(['responsibilities', 'requirements', 'key technologies'])):
+                bullets.append(bullet)
+
+        if header in sections:
+            sections[header] = bullets[:3]
+
+    return sections
+
 
 class JobContextTracker:
     def __init__(self, db: AsyncSession):
@@ -24,7 +72,7 @@ class JobContextTracker:
     async def store_job_context(self, job_url: str, condensed_job: Dict) -> None:
         condensed_desc = condensed_job.get('condensed_description', '')
 
-        sections = self.parse_sections(condensed_desc)
+        sections = await cpu_pool.run(parse_sections, condensed_desc)
 
         print(f"🗂️ Storing context for {job_url}")
         print(f"   • Title: {condensed_job.get('title')}")
@@ -91,7 +139,7 @@ class JobContextTracker:
 
         if record.condensed_description and (not requirements or not technologies or not responsibilities):
             print(f"⚠️ Some fields are empty, re-parsing condensed description...")
-            reparsed = self.parse_sections(record.condensed_description)
+            reparsed = await cpu_pool.run(parse_sections, record.condensed_description)
             updated = False
             if not requirements and reparsed.get('requirements'):
                 requirements = reparsed['requirements']
@@ -210,46 +258,7 @@ class JobContextTracker:
             return None
 
     def parse_sections(self, text: str) -> Dict[str, List[str]]:
-        if not text:
-            return {}
-
-        normalized_text = text.replace('\r\n', '\n')
-        pattern = re.compile(
-            r"^[\s\*`_~:-]*?(responsibilities|requirements|key\s+technologies)\s*:?[\s\*`_~:-]*",
-            re.IGNORECASE | re.MULTILINE,
-        )
-
-        matches = list(pattern.finditer(normalized_text))
-        if not matches:
-            return {}
-
-        sections: Dict[str, List[str]] = {
-            'responsibilities': [],
-            'requirements': [],
-            'technologies': [],
-        }
-
-        for index, match in enumerate(matches):
-            header = match.group(1).lower().replace('key ', '')  # map 'key technologies' -> 'technologies'
-            start = match.end()
-            end = matches[index + 1].start() if index + 1 < len(matches) else len(normalized_text)
-            section_text = normalized_text[start:end]
-
-            bullets: List[str] = []
-            for line in section_text.split('\n'):
-                stripped = line.strip()
-                if not stripped:
-                    continue
-                while stripped and stripped[0] in {'•', '-', '*', '–', '—', '·', '`'}:
-                    stripped = stripped[1:].strip()
-                bullet = stripped.rstrip('*` ').strip()
-                if bullet and not bullet.lower().startswith(tuple(['responsibilities', 'requirements', 'key technologies'])):
-                    bullets.append(bullet)
-
-            if header in sections:
-                sections[header] = bullets[:3]
-
-        return sections
+        return parse_sections(text)
 
     def get_employment_type(self, job: Dict) -> Optional[str]:
         criteria = job.get('criteria')
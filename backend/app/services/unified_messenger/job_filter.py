@@ -4,6 +4,7 @@ Job Filter Framework - Uses LLM to rank jobs by relevance to resume
 """
 
 import os
+import re
 import json
 import asyncio
 from pathlib import Path
@@ -13,6 +14,7 @@ from .resume_message_generator import ResumeMessageGenerator
 from .job_condenser import JobCondenser
 from .job_context_tracker import JobContextTracker
 from app.db.base import AsyncSessionLocal
+from app.services.cpu_pool import cpu_pool
 
 load_dotenv()
 
@@ -37,6 +39,42 @@ except ImportError:
     def emit_verbose_log_sync(message: str, level: str = "info", emoji: str = ""):
         pass
 
+# Pattern 1: "1. [Job #3] Title at Company"
+_RANK_BRACKET_RE = re.compile(r'(\d+)\.\s*\[Job\s*#(\d+)\]', re.IGNORECASE)
+# Pattern 2: "1. Job #3: Title at Company"
+_RANK_PLAIN_RE = re.compile(r'(\d+)\.\s*Job\s*#(\d+)', re.IGNORECASE)
+# Pattern 3: Just find job numbers in order
+_JOB_NUMBER_RE = re.compile(r'Job\s*#(\d+)', re.IGNORECASE)
+_RANK_PREFIX_RE = re.compile(r'^(\d+)\.')
+
+
+def find_ranked_job_numbers(ranking_str):
+    """Parse (rank, job number) pairs out of the LLM ranking text, sorted by rank.
+
+    Module-level so it can run in the CPU process pool.
+    """
+    found_jobs = []
+    for line in ranking_str.split('\n'):
+        line_clean = line.strip()
+        if not line_clean:
+            continue
+
+        match = _RANK_BRACKET_RE.search(line_clean) or _RANK_PLAIN_RE.search(line_clean)
+        if match:
+            found_jobs.append((int(match.group(1)), int(match.group(2))))
+            continue
+
+        # Pattern 3 only if the line starts with a rank number
+        rank_match = _RANK_PREFIX_RE.match(line_clean)
+        if rank_match:
+            match = _JOB_NUMBER_RE.search(line_clean)
+            if match:
+                found_jobs.append((int(rank_match.group(1)), int(match.group(1))))
+
+    found_jobs.sort(key=lambda x: x[0])  # Sort by rank
+    return found_jobs
+
+
 class JobFilter:
     def __init__(self):
         self.resume_generator = ResumeMessageGenerator()
@@ -207,63 +245,13 @@ class JobFilter:
             logger.info(f"🔍 DEBUG: Extracting URLs from ranking result (length: {len(ranking_str)} chars)")
             logger.info(f"🔍 DEBUG: Ranking result preview:\n{ranking_str[:500]}")
             
-            lines = ranking_str.split('\n')
-            logger.info(f"🔍 DEBUG: Split into {len(lines)} lines")
-            
-            # Try multiple patterns to find job numbers
-            import re
-            
-            # Pattern 1: "1. [Job #3] Title at Company"
-            pattern1 = r'(\d+)\.\s*\[Job\s*#(\d+)\]'
-            # Pattern 2: "1. Job #3: Title at Company"
-            pattern2 = r'(\d+)\.\s*Job\s*#(\d+)'
-            # Pattern 3: Just find job numbers in order
-            pattern3 = r'Job\s*#(\d+)'
-            
-            found_jobs = []
-            
-            for line in lines:
-                line_clean = line.strip()
-                if not line_clean:
-                    continue
-                    
-                logger.info(f"🔍 DEBUG: Processing line: {line_clean[:100]}")
-                
-                # Try pattern 1
-                match = re.search(pattern1, line_clean, re.IGNORECASE)
-                if match:
-                    rank_num = int(match.group(1))
-                    job_num = int(match.group(2))
-                    logger.info(f"🔍 DEBUG: Pattern 1 match - Rank: {rank_num}, Job: {job_num}")
-                    found_jobs.append((rank_num, job_num))
-                    continue
-                
-                # Try pattern 2
-                match = re.search(pattern2, line_clean, re.IGNORECASE)
-                if match:
-                    rank_num = int(match.group(1))
-                    job_num = int(match.group(2))
-                    logger.info(f"🔍 DEBUG: Pattern 2 match - Rank: {rank_num}, Job: {job_num}")
-                    found_jobs.append((rank_num, job_num))
-                    continue
-                
-                # Try pattern 3 if line starts with number
-                if re.match(r'^\d+\.', line_clean):
-                    match = re.search(pattern3, line_clean, re.IGNORECASE)
-                    if match:
-                        job_num = int(match.group(1))
-                        # Extract rank from beginning of line
-                        rank_match = re.match(r'^(\d+)\.', line_clean)
-                        rank_num = int(rank_match.group(1)) if rank_match else len(found_jobs) + 1
-                        logger.info(f"🔍 DEBUG: Pattern 3 match - Rank: {rank_num}, Job: {job_num}")
-                        found_jobs.append((rank_num, job_num))
-                        continue
+            # Regex pass over the ranking text runs in the CPU process pool
+            found_jobs = cpu_pool.run_blocking(find_ranked_job_numbers, ranking_str)
+            for rank_num, job_num in found_jobs:
+                logger.info(f"🔍 DEBUG: Ranking match - Rank: {rank_num}, Job: {job_num}")
             
             logger.info(f"🔍 DEBUG: Found {len(found_jobs)} job references")
             
-            # Sort by rank number and extract URLs
-            found_jobs.sort(key=lambda x: x[0])  # Sort by rank
-            
             for rank_num, job_num in found_jobs[:5]:  # Top 5
                 try:
                     job_idx = job_num - 1  # Convert to 0-based index
@@ -0,0 +1,570 @@
+"""Fast-path extraction of LinkedIn job pages.
+
+The scraper only needs a handful of nodes from a ~300KB page: the top card
+(title, company, location, applicants, salary), the description and the
+criteria list. Instead of building a full BeautifulSoup tree for every page,
+this module:
+
+1. Parses the top card, description and criteria with the fastest installed
+   backend: ``selectolax`` (lexbor) > ``lxml`` > ``html.parser``
+   (BeautifulSoup). Only those subtrees are parsed: the BeautifulSoup fallback
+   uses a ``SoupStrainer``, and the selectolax and lxml backends parse the
+   elements cut out of the page by :func:`job_node_fragments` (the whole page
+   only when the cut fails, e.g. on unbalanced markup).
+2. Reads the ``JobPosting`` JSON-LD block (a regex and ``json.loads``) to fill
+   fields the DOM pass did not find. The DOM pass is skipped only when the
+   JSON-LD block covers every field; LinkedIn's block has no applicant count
+   and only the employment type criterion, so on job-view pages the DOM pass
+   normally runs and its values are kept.
+
+The backend can be forced with the ``JOB_PARSER_BACKEND`` environment variable
+or the ``backend`` argument of :func:`parse_job_page`.
+"""
+import html as html_lib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        # selectolax < 1.0 (the Modest backend was removed in 1.0)
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        _SelectolaxParser = None
+        SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html as _lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    _lxml_html = None
+    LXML_AVAILABLE = False
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+BACKEND_SELECTOLAX = "selectolax"
+BACKEND_LXML = "lxml"
+BACKEND_HTML_PARSER = "html.parser"
+
+# Preference order when no backend is forced
+_BACKEND_PREFERENCE = [BACKEND_SELECTOLAX, BACKEND_LXML, BACKEND_HTML_PARSER]
+
+COMPANY_LINK_SELECTOR = '[data-tracking-control-name="public_jobs_topcard-org-name"]'
+LOCATION_SELECTOR = ".topcard__flavor--bullet"
+APPLICANTS_SELECTOR = ".num-applicants__caption"
+SALARY_SELECTOR = ".salary"
+DESCRIPTION_SELECTOR = ".description__text .show-more-less-html"
+CRITERIA_ITEM_SELECTOR = ".description__job-criteria-list li"
+CRITERIA_NAME_SELECTOR = ".description__job-criteria-subheader"
+CRITERIA_VALUE_SELECTOR = ".description__job-criteria-text"
+
+# Classes whose subtrees the strainer keeps (everything else is skipped)
+_STRAINER_CLASSES = {
+    "topcard__flavor--bullet",
+    "num-applicants__caption",
+    "salary",
+    "description__text",
+    "description__job-criteria-list",
+}
+
+# Text that marks those subtrees' root elements in the raw HTML (besides <h1>);
+# every hit is checked against the enclosing tag
+_FRAGMENT_MARKERS = sorted(_STRAINER_CLASSES) + ['public_jobs_topcard-org-name']
+_TAG_NAME_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9]*)")
+_CLASS_ATTR_RE = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+_VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "wbr", "source", "area", "base", "col", "embed", "track"}
+
+_JSON_LD_RE = re.compile(
+    r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>',
+    re.IGNORECASE | re.DOTALL,
+)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.])\s+')
+
+
+def available_backends() -> List[str]:
+    """Return the parser backends importable in this environment, fastest first."""
+    backends = []
+    if SELECTOLAX_AVAILABLE:
+        backends.append(BACKEND_SELECTOLAX)
+    if LXML_AVAILABLE:
+        backends.append(BACKEND_LXML)
+    backends.append(BACKEND_HTML_PARSER)
+    return backends
+
+
+def default_backend() -> str:
+    """Pick the backend to use (``JOB_PARSER_BACKEND`` env var wins if available)."""
+    available = available_backends()
+    forced = os.getenv("JOB_PARSER_BACKEND", "").strip().lower()
+    if forced in available:
+        return forced
+    for backend in _BACKEND_PREFERENCE:
+        if backend in available:
+            return backend
+    return BACKEND_HTML_PARSER
+
+
+def format_description(description_raw: Optional[str]) -> Optional[str]:
+    """Re-flow description text into paragraphs of three sentences."""
+    if not description_raw:
+        return None
+
+    formatted_description = ""
+    sentences = _SENTENCE_SPLIT_RE.split(description_raw)
+    for i, sentence in enumerate(sentences, 1):
+        formatted_description += sentence.strip() + " "
+        # After every 3 sentences, add a double newline
+        if i % 3 == 0:
+            formatted_description += "\n\n"
+    return formatted_description.strip()
+
+
+# ---------------------------------------------------------------------------
+# JSON-LD
+# ---------------------------------------------------------------------------
+
+def _iter_json_ld_nodes(data: Any):
+    if isinstance(data, list):
+        for item in data:
+            yield from _iter_json_ld_nodes(item)
+    elif isinstance(data, dict):
+        yield data
+        if "@graph" in data:
+            yield from _iter_json_ld_nodes(data["@graph"])
+
+
+def _html_fragment_to_text(fragment: str) -> str:
+    """Convert the HTML description embedded in JSON-LD into plain text."""
+    fragment = html_lib.unescape(fragment)
+    if "<" not in fragment:
+        return " ".join(fragment.split())
+    soup = BeautifulSoup(fragment, "html.parser")
+    return soup.get_text(separator=" ", strip=True)
+
+
+def _format_json_ld_location(job_location: Any) -> Optional[str]:
+    if isinstance(job_location, list):
+        job_location = job_location[0] if job_location else None
+    if not isinstance(job_location, dict):
+        return None
+    address = job_location.get("address") or {}
+    if isinstance(address, str):
+        return address or None
+    parts = [
+        address.get("addressLocality"),
+        address.get("addressRegion"),
+        address.get("addressCountry"),
+    ]
+    parts = [p if isinstance(p, str) else (p or {}).get("name") for p in parts]
+    location = ", ".join(p for p in parts if p)
+    return location or None
+
+
+def _format_json_ld_salary(base_salary: Any) -> Optional[str]:
+    if not isinstance(base_salary, dict):
+        return None
+    currency = base_salary.get("currency") or ""
+    value = base_salary.get("value")
+    if not isinstance(value, dict):
+        return f"{currency} {value}".strip() if value else None
+    unit = value.get("unitText")
+    low = value.get("minValue")
+    high = value.get("maxValue")
+    amount = value.get("value")
+    if low is not None and high is not None:
+        text = f"{currency}{low} - {currency}{high}"
+    elif amount is not None:
+        text = f"{currency}{amount}"
+    else:
+        return None
+    return f"{text}/{unit.lower()}" if unit else text
+
+
+def extract_json_ld_job(html: str) -> Optional[Dict[str, Any]]:
+    """Extract the ``JobPosting`` JSON-LD block without parsing the DOM.
+
+    Returns:
+        Dict with the same field names the DOM extractors produce (values
+        that the JSON-LD block does not carry are omitted), or None.
+    """
+    for match in _JSON_LD_RE.finditer(html):
+        try:
+            data = json.loads(match.group(1).strip())
+        except (ValueError, TypeError):
+            continue
+
+        for node in _iter_json_ld_nodes(data):
+            node_type = node.get("@type")
+            types = node_type if isinstance(node_type, list) else [node_type]
+            if "JobPosting" not in types:
+                continue
+
+            fields: Dict[str, Any] = {}
+            if node.get("title"):
+                fields["title"] = html_lib.unescape(node["title"]).strip()
+
+            org = node.get("hiringOrganization")
+            if isinstance(org, dict):
+                if org.get("name"):
+                    fields["company_name"] = html_lib.unescape(org["name"]).strip()
+                if org.get("sameAs") or org.get("url"):
+                    fields["company_url"] = org.get("sameAs") or org.get("url")
+
+            location = _format_json_ld_location(node.get("jobLocation"))
+            if location:
+                fields["location"] = location
+
+            salary = _format_json_ld_salary(node.get("baseSalary"))
+            if salary:
+                fields["salary"] = salary
+
+            if node.get("description"):
+                fields["description_raw"] = _html_fragment_to_text(node["description"])
+
+            criteria = []
+            employment_type = node.get("employmentType")
+            if isinstance(employment_type, list):
+                employment_type = ", ".join(employment_type)
+            if employment_type:
+                criteria.append({
+                    "name": "Employment type",
+                    "value": employment_type.replace("_", " ").title(),
+                })
+            if criteria:
+                fields["criteria"] = criteria
+
+            return fields
+
+    return None
+
+
+# ---------------------------------------------------------------------------
+# DOM backends
+# ---------------------------------------------------------------------------
+
+def _wanted_tag(tag: str) -> bool:
+    if tag.startswith("<h1") and not tag[3:4].isalnum():
+        return True
+    if 'data-tracking-control-name="public_jobs_topcard-org-name"' in tag:
+        return True
+    match = _CLASS_ATTR_RE.search(tag)
+    if not match:
+        return False
+    return any(c in _STRAINER_CLASSES for c in (match.group(1) or match.group(2) or "").split())
+
+
+def _element_end(html: str, start: int, name: str) -> int:
+    """Index just past the element starting at `start`, or -1 if its end tag is missing."""
+    tag_end = html.find(">", start)
+    if tag_end < 0:
+        return -1
+    if name in _VOID_TAGS or html[tag_end - 1] == "/":
+        return tag_end + 1
+    depth = 1
+    for match in re.finditer(rf"<(/?){name}(?=[\s/>])", html[tag_end + 1:], re.IGNORECASE):
+        depth += -1 if match.group(1) else 1
+        if depth == 0:
+            close = html.find(">", tag_end + 1 + match.end())
+            return close + 1 if close >= 0 else -1
+    return -1
+
+
+def job_node_fragments(html: str) -> Optional[str]:
+    """Cut the elements the extractors read (see ``_STRAINER_CLASSES``) out of the page.
+
+    Returns the outer HTML of each such element in page order (nested ones
+    stay inside their ancestor), or None when none is found or one of them
+    has no matching end tag.
+    """
+    starts = set()
+    for marker in _FRAGMENT_MARKERS:
+        position = html.find(marker)
+        while position >= 0:
+            tag_start = html.rfind("<", 0, position)
+            if tag_start >= 0:
+                starts.add(tag_start)
+            position = html.find(marker, position + len(marker))
+    position = html.find("<h1")
+    while position >= 0:
+        starts.add(position)
+        position = html.find("<h1", position + 3)
+
+    fragments = []
+    covered = 0
+    for start in sorted(starts):
+        if start < covered:
+            continue
+        tag_end = html.find(">", start)
+        if tag_end < 0 or not _wanted_tag(html[start:tag_end + 1]):
+            continue
+        name = _TAG_NAME_RE.match(html, start)
+        if name is None:
+            continue
+        end = _element_end(html, start, name.group(1).lower())
+        if end < 0:
+            return None
+        fragments.append(html[start:end])
+        covered = end
+    return "".join(fragments) or None
+
+
+def _strainer_filter(name: str, attrs: Any = None) -> bool:
+    """SoupStrainer predicate keeping only the nodes the scraper reads."""
+    if name == "h1":
+        return True
+    if not attrs:
+        return False
+    if isinstance(attrs, dict):
+        if attrs.get("data-tracking-control-name") == "public_jobs_topcard-org-name":
+            return True
+        classes = attrs.get("class") or ""
+    else:
+        return False
+    if isinstance(classes, str):
+        classes = classes.split()
+    return any(c in _STRAINER_CLASSES for c in classes)
+
+
+class _JobNodeStrainer(SoupStrainer):
+    """Strainer that sees tag attributes on every supported bs4 version.
+
+    bs4 < 4.13 calls the ``name`` predicate with ``(name, attrs)``; newer
+    releases only pass the name and consult ``allow_tag_creation`` instead.
+    """
+
+    def __init__(self):
+        super().__init__(_strainer_filter)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return _strainer_filter(name, attrs)
+
+
+def _extract_with_bs4(html: str, whole_page: bool = False) -> Dict[str, Any]:
+    soup = BeautifulSoup(html, "html.parser", parse_only=None if whole_page else _JobNodeStrainer())
+
+    def safe_text(selector):
+        el = soup.select_one(selector)
+        return el.get_text(strip=True) if el else None
+
+    company_el = soup.select_one(COMPANY_LINK_SELECTOR)
+    desc_container = soup.select_one(DESCRIPTION_SELECTOR)
+
+    criteria = []
+    for li in soup.select(CRITERIA_ITEM_SELECTOR):
+        name_el = li.select_one(CRITERIA_NAME_SELECTOR)
+        val_el = li.select_one(CRITERIA_VALUE_SELECTOR)
+        if name_el and val_el:
+            criteria.append({
+                "name": name_el.get_text(strip=True),
+                "value": val_el.get_text(strip=True),
+            })
+
+    return {
+        "title": safe_text("h1"),
+        "company_name": company_el.get_text(strip=True) if company_el else None,
+        "company_url": company_el.get("href") if company_el else None,
+        "location": safe_text(LOCATION_SELECTOR),
+        "applicants": safe_text(APPLICANTS_SELECTOR),
+        "salary": safe_text(SALARY_SELECTOR),
+        "description_raw": desc_container.get_text(separator=" ", strip=True) if desc_container else None,
+        "criteria": criteria,
+    }
+
+
+def _selectolax_text(el, separator: str = "") -> str:
+    # Like bs4's get_text(separator, strip=True): empty text nodes are dropped
+    texts = (node.text(deep=False).strip() for node in el.traverse(include_text=True) if node.tag == "-text")
+    return separator.join(text for text in texts if text)
+
+
+def _extract_with_selectolax(html: str, whole_page: bool = False) -> Dict[str, Any]:
+    tree = _SelectolaxParser(html if whole_page else job_node_fragments(html) or html)
+
+    def safe_text(selector):
+        el = tree.css_first(selector)
+        return el.text(strip=True) if el else None
+
+    company_el = tree.css_first(COMPANY_LINK_SELECTOR)
+    desc_container = tree.css_first(DESCRIPTION_SELECTOR)
+
+    criteria = []
+    for li in tree.css(CRITERIA_ITEM_SELECTOR):
+        name_el = li.css_first(CRITERIA_NAME_SELECTOR)
+        val_el = li.css_first(CRITERIA_VALUE_SELECTOR)
+        if name_el and val_el:
+            criteria.append({
+                "name": name_el.text(strip=True),
+                "value": val_el.text(strip=True),
+            })
+
+    return {
+        "title": safe_text("h1"),
+        "company_name": company_el.text(strip=True) if company_el else None,
+        "company_url": company_el.attributes.get("href") if company_el else None,
+        "location": safe_text(LOCATION_SELECTOR),
+        "applicants": safe_text(APPLICANTS_SELECTOR),
+        "salary": safe_text(SALARY_SELECTOR),
+        "description_raw": _selectolax_text(desc_container, " ") if desc_container else None,
+        "criteria": criteria,
+    }
+
+
+def _class_xpath(class_name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+# XPath equivalents of the CSS selectors (lxml.cssselect is an extra dependency)
+_LXML_XPATHS = {
+    "title": "//h1",
+    "company": "//*[@data-tracking-control-name='public_jobs_topcard-org-name']",
+    "location": f"//*[{_class_xpath('topcard__flavor--bullet')}]",
+    "applicants": f"//*[{_class_xpath('num-applicants__caption')}]",
+    "salary": f"//*[{_class_xpath('salary')}]",
+    "description": f"//*[{_class_xpath('description__text')}]//*[{_class_xpath('show-more-less-html')}]",
+    "criteria_items": f"//*[{_class_xpath('description__job-criteria-list')}]//li",
+    "criteria_name": f".//*[{_class_xpath('description__job-criteria-subheader')}]",
+    "criteria_value": f".//*[{_class_xpath('description__job-criteria-text')}]",
+}
+
+
+def _lxml_text(el, separator: str = "") -> str:
+    return separator.join(s.strip() for s in el.itertext() if s.strip())
+
+
+def _extract_with_lxml(html: str, whole_page: bool = False) -> Dict[str, Any]:
+    fragments = None if whole_page else job_node_fragments(html)
+    if fragments:
+        tree = _lxml_html.fragment_fromstring(fragments, create_parent="div")
+    else:
+        tree = _lxml_html.fromstring(html)
+
+    def first(key, root=None):
+        found = (root if root is not None else tree).xpath(_LXML_XPATHS[key])
+        return found[0] if found else None
+
+    def safe_text(key):
+        el = first(key)
+        return _lxml_text(el) if el is not None else None
+
+    company_el = first("company")
+    desc_container = first("description")
+
+    criteria = []
+    for li in tree.xpath(_LXML_XPATHS["criteria_items"]):
+        name_el = first("criteria_name", li)
+        val_el = first("criteria_value", li)
+        if name_el is not None and val_el is not None:
+            criteria.append({
+                "name": _lxml_text(name_el),
+                "value": _lxml_text(val_el),
+            })
+
+    return {
+        "title": safe_text("title"),
+        "company_name": _lxml_text(company_el) if company_el is not None else None,
+        "company_url": company_el.get("href") if company_el is not None else None,
+        "location": safe_text("location"),
+        "applicants": safe_text("applicants"),
+        "salary": safe_text("salary"),
+        "description_raw": _lxml_text(desc_container, " ") if desc_container is not None else None,
+        "criteria": criteria,
+    }
+
+
+_EXTRACTORS: Dict[str, Callable[[str, bool], Dict[str, Any]]] = {
+    BACKEND_SELECTOLAX: _extract_with_selectolax,
+    BACKEND_LXML: _extract_with_lxml,
+    BACKEND_HTML_PARSER: _extract_with_bs4,
+}
+
+
+def extract_dom_fields(html: str, backend: Optional[str] = None, whole_page: bool = False) -> Dict[str, Any]:
+    """Extract the raw job fields from the DOM with the given (or default) backend.
+
+    `whole_page` parses the full page instead of only the extracted subtrees
+    (used to compare the two in the benchmark).
+    """
+    backend = backend or default_backend()
+    if backend not in available_backends():
+        raise ValueError(f"Parser backend '{backend}' is not available (installed: {available_backends()})")
+    return _EXTRACTORS[backend](html, whole_page)
+
+
+DOM_KEYS = ("title", "company_name", "company_url", "location", "applicants", "salary", "description_raw", "criteria")
+
+# Criteria labels of a job-view page's criteria list; JSON-LD alone only
+# covers the criteria when it carries all of them
+_CRITERIA_LABELS = ("seniority level", "employment type", "job function", "industries")
+
+
+def _criteria_label(criterion: Dict[str, Any]) -> str:
+    return " ".join((criterion.get("name") or "").split()).lower()
+
+
+def merge_criteria(primary: List[Dict[str, Any]], extra: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """`primary` criteria in order, plus the `extra` ones whose label is not already there."""
+    merged = list(primary or [])
+    labels = {_criteria_label(c) for c in merged}
+    for criterion in extra or []:
+        label = _criteria_label(criterion)
+        if label not in labels:
+            merged.append(criterion)
+            labels.add(label)
+    return merged
+
+
+def json_ld_is_complete(fields: Dict[str, Any]) -> bool:
+    """True when the JSON-LD fields cover everything the DOM pass would extract."""
+    if any(not fields.get(key) for key in DOM_KEYS):
+        return False
+    labels = {_criteria_label(c) for c in fields["criteria"]}
+    return all(label in labels for label in _CRITERIA_LABELS)
+
+
+def parse_job_page(html: str, job_url: str, backend: Optional[str] = None, use_json_ld: bool = True) -> Dict[str, Any]:
+    """Turn a LinkedIn job page into the job dict returned by ``scrape_job``.
+
+    DOM values win when present; JSON-LD fills the fields the DOM pass did not
+    find, and its criteria are merged by label. The DOM pass is skipped when
+    the JSON-LD block covers every field.
+
+    Args:
+        html: Raw page HTML
+        job_url: URL the page was fetched from
+        backend: Force a parser backend (see :func:`available_backends`)
+        use_json_ld: Read the JobPosting JSON-LD block first
+
+    Returns:
+        Dict with url, title, company, location, applications, salary,
+        description and criteria keys
+    """
+    json_ld = (extract_json_ld_job(html) if use_json_ld else None) or {}
+
+    if json_ld_is_complete(json_ld):
+        fields = json_ld
+    else:
+        fields = extract_dom_fields(html, backend)
+        for key in DOM_KEYS:
+            if key != "criteria" and not fields.get(key) and json_ld.get(key):
+                fields[key] = json_ld[key]
+        fields["criteria"] = merge_criteria(fields.get("criteria"), json_ld.get("criteria"))
+
+    company_url = fields.get("company_url")
+    if company_url and company_url.startswith("/"):
+        company_url = "https://www.linkedin.com" + company_url
+
+    return {
+        "url": job_url,
+        "title": fields.get("title"),
+        "company": {"name": fields.get("company_name"), "url": company_url},
+        "location": fields.get("location"),
+        "applications": fields.get("applicants"),
+        "salary": fields.get("salary"),
+        "description": format_description(fields.get("description_raw")),
+        "criteria": fields.get("criteria") or [],
+    }
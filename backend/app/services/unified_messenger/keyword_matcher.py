@@ -0,0 +1,111 @@
+"""
+Compiled whole-word keyword matcher for recruiter/job scoring.
+
+The old scorer ran ``any(k in text for k in [...])`` once per keyword list per
+(job, recruiter) pair. Plain substring tests also fire inside unrelated words
+('ta' in "data", 'ai' in "maintain", 'ml' in "html"). KeywordMatcher instead
+compiles several named keyword sets into one phrase table and finds every hit
+of every set in a single pass over the text:
+
+- the text is tokenised once into lowercase words (``[a-z0-9]+``)
+- every run of up to N consecutive words (N = longest phrase) is looked up in
+  the table, so hits are whole words and overlapping phrases are all found
+  ("technical recruiter" and "recruiter" both hit)
+- a trailing plural 's' is accepted ("recruiters", "engineers")
+- a keyword also hits through the variants listed in ``KEYWORD_VARIANTS``
+  ("tech" via "technology"/"technical", "design" via "designer"); a variant
+  hit reports the keyword itself, so overlap counts are unchanged
+
+Results are cached per distinct text, since headlines and titles repeat a lot
+across a recruiter search.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Mapping, Sequence, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Word forms the old substring test matched and whole-word matching would
+# otherwise drop. Keys are normalised keywords; a variant hit counts as the key.
+KEYWORD_VARIANTS: Dict[str, Tuple[str, ...]] = {
+    "tech": ("technology", "technologies", "technical"),
+    "design": ("designer", "designing"),
+    "engineer": ("engineering",),
+    "data": ("database", "dataset"),
+    "backend": ("back end",),
+    "frontend": ("front end",),
+    "full stack": ("fullstack",),
+    "lead": ("leader", "leadership"),
+    "new grad": ("new graduate",),
+}
+
+
+def normalize_phrase(phrase: str) -> str:
+    """Lowercase a phrase and collapse separators to single spaces."""
+    return " ".join(_WORD_RE.findall(phrase.lower()))
+
+
+class KeywordMatcher:
+    """Match several named keyword sets against a text in one pass."""
+
+    def __init__(self, keyword_sets: Mapping[str, Sequence[str]], cache_size: int = 4096):
+        self.keyword_sets: Dict[str, Tuple[str, ...]] = {name: tuple(kws) for name, kws in keyword_sets.items()}
+        self.set_names: Tuple[str, ...] = tuple(self.keyword_sets)
+
+        # normalised phrase -> ((set name, original keyword), ...)
+        table: Dict[str, list] = {}
+        for name, keywords in self.keyword_sets.items():
+            for keyword in keywords:
+                phrase = normalize_phrase(keyword)
+                if not phrase:
+                    continue
+                for form in (phrase,) + KEYWORD_VARIANTS.get(phrase, ()):
+                    entries = table.setdefault(form, [])
+                    if (name, keyword) not in entries:
+                        entries.append((name, keyword))
+        self._table: Dict[str, Tuple[Tuple[str, str], ...]] = {k: tuple(v) for k, v in table.items()}
+        self._max_words = max((len(p.split(" ")) for p in self._table), default=0)
+        self._empty = {name: frozenset() for name in self.set_names}
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _lookup(self, phrase: str):
+        entries = self._table.get(phrase)
+        if entries is None and phrase.endswith("s"):
+            entries = self._table.get(phrase[:-1])
+        return entries
+
+    def _match(self, text: str) -> Dict[str, FrozenSet[str]]:
+        """
+        Hits of every keyword set in ``text``.
+
+        Returns:
+            Dict mapping set name -> frozenset of the original keywords that hit
+        """
+        if not text:
+            return self._empty
+        words = _WORD_RE.findall(text.lower())
+        if not words:
+            return self._empty
+
+        hits: Dict[str, set] = {}
+        for start in range(len(words)):
+            phrase = ""
+            for end in range(start, min(start + self._max_words, len(words))):
+                phrase = words[end] if end == start else f"{phrase} {words[end]}"
+                entries = self._lookup(phrase)
+                if entries:
+                    for name, keyword in entries:
+                        hits.setdefault(name, set()).add(keyword)
+
+        if not hits:
+            return self._empty
+        return {name: frozenset(hits.get(name, ())) for name in self.set_names}
+
+    def cache_info(self):
+        return self.match.cache_info()
+
+
+def keywords_in_order(keywords: Iterable[str], hits: FrozenSet[str]):
+    """Hits ordered as in the source keyword list (stable log output)."""
+    return [kw for kw in keywords if kw in hits]
@@ -0,0 +1,265 @@
+"""
+Length control for LinkedIn connection notes.
+
+LinkedIn notes have a hard character limit (300 premium / 200 free) and we
+aim just under it. Re-prompting the model until a message lands in range
+cost up to ten sequential round trips, so length is now controlled locally:
+
+- the model is asked for several candidates in one call and the best fit wins
+- a candidate that misses the range is adjusted without another model call,
+  using sentence-level edits that keep the text grammatical: parenthetical
+  asides and non-restrictive clauses (", including ...", ", which ...") are
+  removed, whole middle sentences are dropped (never the opening or the
+  closing), or stock sentences are inserted before the closing
+- the best combination of edits is found by dynamic programming over the
+  running length (fewest edits per length, every length past the hard limit
+  merged into one state), so the cost is linear in the number of sentences;
+  the chosen text is assembled once
+
+Only when no candidate can be fitted locally does the caller re-prompt.
+"""
+
+import re
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Stock sentences used to lengthen a short note, inserted before the closing
+FILLER_SENTENCES = (
+    "I bring strong problem-solving skills and a passion for building reliable software.",
+    "I'm eager to contribute to your team's success and grow professionally.",
+    "My technical expertise and collaborative approach would be valuable.",
+    "I would value the opportunity to connect.",
+)
+
+# Words ending in '.' that do not end a sentence
+_ABBREVIATIONS = {
+    "e.g", "i.e", "etc", "vs", "mr", "mrs", "ms", "dr", "jr", "sr", "st",
+    "inc", "co", "corp", "ltd", "u.s", "b.s", "m.s", "b.a", "m.a", "ph.d", "m.eng", "b.tech",
+}
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]?\s+(?=["\'(\[]?[A-Z0-9])')
+_PARENTHETICAL = re.compile(r"\s*\([^()]*\)")
+_ASIDE_CLAUSE = re.compile(
+    r",\s+(?:which|who|where|including|such as|especially|particularly|primarily|mainly)\b[^,.;!?]*(?=[,.;!?])",
+    re.IGNORECASE,
+)
+_DASH_ASIDE = re.compile(r"\s+(?:--|—|–)\s+[^.!?]*?(?=[.!?]$)")
+_CLOSING_HINTS = ("discuss", "connect", "love to", "happy to", "chat", "learn more", "look forward")
+
+
+@dataclass(frozen=True)
+class LengthTarget:
+    """Target character range for a note plus the hard limit."""
+
+    minimum: int
+    maximum: int
+    limit: int
+
+    @property
+    def midpoint(self) -> int:
+        return (self.minimum + self.maximum) // 2
+
+    def fits(self, length: int) -> bool:
+        return self.minimum <= length <= self.maximum
+
+    def acceptable(self, length: int) -> bool:
+        """Under the hard limit and at most one range-width short - not worth another model call."""
+        return self.minimum - (self.maximum - self.minimum) <= length <= self.limit
+
+    def distance(self, length: int) -> int:
+        """0 inside the range; going over the hard limit is much worse than being short."""
+        if length > self.limit:
+            return 1000 + (length - self.limit)
+        if length > self.maximum:
+            return length - self.maximum
+        if length < self.minimum:
+            return self.minimum - length
+        return 0
+
+
+def length_target(char_limit: int) -> LengthTarget:
+    """Target range for a character limit: 180-195 for 200 (free), 280-295 for 300 (premium)."""
+    if char_limit <= 200:
+        return LengthTarget(180, 195, char_limit)
+    return LengthTarget(280, 295, char_limit)
+
+
+@dataclass
+class FittedMessage:
+    """A message after length fitting."""
+
+    text: str
+    adjustments: List[str] = field(default_factory=list)
+    candidate_index: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+
+@dataclass
+class GeneratedMessage:
+    """Final note plus how it was produced."""
+
+    text: str
+    attempts: int = 0  # model calls made
+    candidates: int = 0  # completions considered
+    adjustments: List[str] = field(default_factory=list)  # local edits applied to the winner
+
+
+def clean_candidate(text: str) -> str:
+    """Strip whitespace, wrapping quotes and a leading 'Message:' label from model output."""
+    text = (text or "").strip()
+    text = re.sub(r"^(?:message|linkedin message)\s*:\s*", "", text, flags=re.IGNORECASE)
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        text = text[1:-1].strip()
+    return re.sub(r"\s+", " ", text)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences, ignoring periods in common abbreviations (e.g., Ph.D., U.S.)."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        head = text[start:match.start()]
+        last_word = head.rsplit(None, 1)[-1] if head.split() else ""
+        if last_word.rstrip(".\"')]").lower() in _ABBREVIATIONS:
+            continue
+        sentences.append(text[start:match.start()].strip())
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return [s for s in sentences if s]
+
+
+def shortened_variants(sentence: str) -> List[Tuple[str, str]]:
+    """Grammatical shorter forms of a sentence as (text, description), shortest last."""
+    variants = []
+    seen = {sentence}
+
+    def add(text: str, what: str):
+        text = re.sub(r"\s+([,.;!?])", r"\1", re.sub(r"\s{2,}", " ", text)).strip()
+        if text and text not in seen and len(text) < len(sentence):
+            seen.add(text)
+            variants.append((text, what))
+
+    no_parens = _PARENTHETICAL.sub("", sentence)
+    add(no_parens, "removed parenthetical")
+    no_clauses = _ASIDE_CLAUSE.sub("", no_parens)
+    add(no_clauses, "removed clause")
+    add(_DASH_ASIDE.sub("", no_clauses), "removed aside")
+    variants.sort(key=lambda v: -len(v[0]))
+    return variants
+
+
+def _is_closing(sentence: str) -> bool:
+    lowered = sentence.lower()
+    return any(hint in lowered for hint in _CLOSING_HINTS)
+
+
+def fit_to_target(text: str, target: LengthTarget, fillers: Sequence[str] = FILLER_SENTENCES) -> FittedMessage:
+    """
+    Adjust a message toward the target range with sentence-level edits.
+
+    Every sentence may keep its text or use a shortened variant; middle
+    sentences may also be dropped; and up to two filler sentences may be
+    inserted before the closing. The combination closest to the range wins,
+    preferring fewer edits and then lengths near the middle of the range.
+    """
+    text = clean_candidate(text)
+    if target.fits(len(text)):
+        return FittedMessage(text)
+
+    sentences = split_sentences(text)
+    if not sentences:
+        return FittedMessage(text)
+
+    closing_index = len(sentences) - 1 if len(sentences) > 1 and _is_closing(sentences[-1]) else None
+    options: List[List[Tuple[Optional[str], Optional[str]]]] = []
+    for i, sentence in enumerate(sentences):
+        choices: List[Tuple[Optional[str], Optional[str]]] = [(sentence, None)]
+        if len(text) > target.minimum:
+            choices += shortened_variants(sentence)
+            if 0 < i < len(sentences) - 1 or (i > 0 and closing_index is None):
+                choices.append((None, f"dropped sentence {i + 1}"))
+        options.append(choices)
+
+    # Dynamic programming over sentences. A state is the running length (one
+    # separator counted per kept sentence) mapped to (edits, length, previous
+    # state, choice), keeping the fewest edits per length. Past the hard limit
+    # the shortest state always wins, so all those lengths share one state.
+    over = target.limit + 2
+    states: Dict[int, Tuple[int, int, int, int]] = {0: (0, 0, -1, -1)}
+    trail: List[Dict[int, Tuple[int, int, int, int]]] = []
+    for choices in options:
+        following: Dict[int, Tuple[int, int, int, int]] = {}
+        for state, (edits, length, _, _) in states.items():
+            for index, (sentence, what) in enumerate(choices):
+                total = length + (len(sentence) + 1 if sentence is not None else 0)
+                cost = edits + (what is not None)
+                bucket = min(total, over)
+                kept = following.get(bucket)
+                if kept is None or (total, cost) < (kept[1], kept[0]):
+                    following[bucket] = (cost, total, state, index)
+        trail.append(following)
+        states = following
+
+    # Fillers can also top up a text that had to drop a long sentence
+    usable = [f for f in fillers if f not in text]
+    filler_sets: List[Tuple[str, ...]] = [()] + [(f,) for f in usable] + list(combinations(usable, 2))
+
+    best_key = None
+    best: Optional[Tuple[int, Tuple[str, ...]]] = None
+    for state, (edits, base, _, _) in states.items():
+        for extra in filler_sets:
+            length = base - 1 + sum(len(f) + 1 for f in extra)
+            key = (target.distance(length), edits + len(extra), abs(length - target.midpoint))
+            if best_key is None or key < best_key:
+                best_key, best = key, (state, extra)
+
+    state, extra = best
+    combo: List[Tuple[Optional[str], Optional[str]]] = []
+    for choices, step in zip(reversed(options), reversed(trail)):
+        _, _, previous, index = step[state]
+        combo.append(choices[index])
+        state = previous
+    combo.reverse()
+
+    kept = [c[0] for c in combo if c[0] is not None]
+    adjustments = [c[1] for c in combo if c[1] is not None]
+    if extra:
+        insert_at = len(kept) - 1 if closing_index is not None and combo[closing_index][0] is not None else len(kept)
+        kept[insert_at:insert_at] = list(extra)
+        adjustments.append(f"added {len(extra)} sentence{'s' if len(extra) > 1 else ''}")
+    return FittedMessage(" ".join(kept), adjustments)
+
+
+def enforce_limit(text: str, limit: int) -> Tuple[str, bool]:
+    """Hard-trim text to the limit at a sentence, else word, boundary. Returns (text, trimmed)."""
+    if len(text) <= limit:
+        return text, False
+    kept = []
+    for sentence in split_sentences(text):
+        if len(" ".join(kept + [sentence])) > limit:
+            break
+        kept.append(sentence)
+    if kept:
+        return " ".join(kept), True
+    cut = text[:limit - 1].rsplit(" ", 1)[0].rstrip(",;:-")
+    return cut + ".", True
+
+
+def pick_best_candidate(candidates: Sequence[str], target: LengthTarget) -> Optional[FittedMessage]:
+    """Fit every candidate and return the one closest to the target (ties: fewer edits, earlier)."""
+    best = None
+    best_key = None
+    for index, candidate in enumerate(candidates):
+        if not candidate or not candidate.strip():
+            continue
+        fitted = fit_to_target(candidate, target)
+        fitted.candidate_index = index
+        key = (target.distance(len(fitted)), len(fitted.adjustments), abs(len(fitted) - target.midpoint))
+        if best_key is None or key < best_key:
+            best, best_key = fitted, key
+    return best
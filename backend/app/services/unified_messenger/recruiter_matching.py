@@ -0,0 +1,419 @@
+"""
+Recruiter matching helpers - precomputed features, company index and scoring
+used by UnifiedMessenger.map_jobs_to_recruiters.
+
+Every recruiter is normalised exactly once (lowercased headline, company name,
+company_id, keywords_match) and indexed by company_id and normalised company
+name, so each job only scores the recruiters in its company bucket instead of
+re-scanning and re-lowercasing the whole list. The scoring rules themselves
+live in scoring_spec (keyword lists below are the built-in defaults).
+
+For "optimal" assignment the same rules are evaluated as a (jobs x recruiters)
+numpy score matrix and solved as a maximum-weight bipartite matching, so an
+early job can no longer take the recruiter a later job needed.
+"""
+
+import logging
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:
+    linear_sum_assignment = None
+    SCIPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ASSIGNMENT_GREEDY = "greedy"
+ASSIGNMENT_OPTIMAL = "optimal"
+ASSIGNMENT_MODES = (ASSIGNMENT_GREEDY, ASSIGNMENT_OPTIMAL)
+
+# Keyword lists used by the scoring heuristic
+RECRUITING_HEADLINE_KEYWORDS = ['recruiter', 'talent', 'ta', 'sourcer', 'acquisition', 'people', 'hr']
+TECH_TITLE_KEYWORDS = ['software', 'engineer', 'developer', 'data', 'ml', 'ai', 'product', 'design']
+TECH_HEADLINE_KEYWORDS = ['technical recruiter', 'engineering', 'tech', 'data', 'ml', 'ai', 'product', 'design']
+OVERLAP_KEYWORDS = ['software', 'engineer', 'data', 'science', 'ml', 'ai', 'backend', 'frontend', 'full stack', 'product', 'designer']
+SENIOR_SIGNALS = ['senior', 'lead', 'staff', 'principal']
+NEWGRAD_SIGNALS = ['new grad', 'university', 'campus', 'early career', 'college']
+
+
+def job_company_name(job: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Safely extract company name from a job object returned by LinkedIn search."""
+    if not job:
+        return None
+    company = job.get('company') if isinstance(job, dict) else None
+    if isinstance(company, dict):
+        return company.get('name')
+    if isinstance(company, str):
+        return company
+    return None
+
+
+def job_company_id(job: Optional[Dict[str, Any]]) -> Optional[Any]:
+    """Safely extract company ID from a job object returned by LinkedIn search."""
+    if not job:
+        return None
+    company = job.get('company') if isinstance(job, dict) else None
+    if isinstance(company, dict):
+        return company.get('id') or company.get('company_id')
+    return None
+
+
+def recruiter_company_name(recruiter: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Resolve the recruiter's company from enriched fields or keywords_match."""
+    if not recruiter:
+        return None
+    company = recruiter.get('company')
+    if company:
+        return company if isinstance(company, str) else company.get('name') if isinstance(company, dict) else None
+    km = recruiter.get('keywords_match') or ''
+    if 'Current:' in km and ' at ' in km:
+        try:
+            return km.split('Current:')[1].split(' at ')[-1].strip()
+        except Exception:
+            return None
+    return None
+
+
+def job_url_of(job: Dict[str, Any]) -> Optional[str]:
+    return job.get('job_url') or job.get('url') or job.get('link') or job.get('canonical_url')
+
+
+@dataclass
+class RecruiterFeatures:
+    """Everything the scorer needs from one recruiter, computed once."""
+    index: int
+    name: str
+    headline: str
+    company: str                 # lowercased, used for the exact-match rule
+    company_normalized: str      # lowercased + stripped, used for bucketing
+    has_company: bool
+    company_id: Optional[str]
+    keywords_match: str
+    followers: int
+
+    @classmethod
+    def from_recruiter(cls, index: int, recruiter: Dict[str, Any]) -> "RecruiterFeatures":
+        headline = (recruiter.get('headline') or '').lower()
+        company_raw = recruiter_company_name(recruiter)
+        company_id = recruiter.get('company_id')
+        return cls(
+            index=index,
+            name=recruiter.get('name', 'Unknown'),
+            headline=headline,
+            company=(company_raw or '').lower(),
+            company_normalized=str(company_raw).lower().strip() if company_raw else '',
+            has_company=bool(company_raw),
+            company_id=str(company_id) if company_id else None,
+            keywords_match=(recruiter.get('keywords_match') or '').lower(),
+            followers=recruiter.get('followers_count', 0) or 0,
+        )
+
+
+@dataclass
+class JobFeatures:
+    """Everything the scorer needs from one job, computed once."""
+    title: str
+    company: str                 # lowercased
+    company_label: str           # display name ('Unknown' when missing)
+    company_normalized: str
+    company_id: Optional[str]
+
+    @classmethod
+    def from_job(cls, job: Dict[str, Any]) -> "JobFeatures":
+        title = (job.get('title') or '').lower()
+        company_raw = job_company_name(job)
+        company_label = company_raw or 'Unknown'
+        company_id = job_company_id(job)
+        return cls(
+            title=title,
+            company=(company_raw or '').lower(),
+            company_label=company_label,
+            company_normalized=str(company_label).lower().strip(),
+            company_id=str(company_id) if company_id else None,
+        )
+
+
+def score_features(job_f: JobFeatures, rec_f: RecruiterFeatures, events: Optional[List[str]] = None, spec=None) -> int:
+    """
+    Heuristic suitability score of a recruiter for a job.
+
+    Args:
+        job_f: Precomputed job features
+        rec_f: Precomputed recruiter features
+        events: Optional list that receives a description of each contribution
+        spec: CompiledScoringSpec to apply (defaults to the configured spec)
+
+    Returns:
+        Integer score (higher is better)
+    """
+    if spec is None:
+        from .scoring_spec import get_default_spec
+        spec = get_default_spec()
+    score, _ = spec.score_pair(job_f, rec_f, events)
+    return score
+
+
+class RecruiterIndex:
+    """Recruiter features plus company_id / normalised-name buckets."""
+
+    def __init__(self, recruiters: List[Dict[str, Any]]):
+        self.recruiters = recruiters
+        self.features = [RecruiterFeatures.from_recruiter(i, r) for i, r in enumerate(recruiters)]
+        self.by_company_id: Dict[str, List[int]] = {}
+        self.by_company_name: Dict[str, List[int]] = {}
+        for feat in self.features:
+            if feat.company_id:
+                self.by_company_id.setdefault(feat.company_id, []).append(feat.index)
+            if feat.has_company:
+                self.by_company_name.setdefault(feat.company_normalized, []).append(feat.index)
+        # Recruiter indices by followers (desc, stable) for the no-score fallback
+        self.by_followers = sorted(range(len(self.features)), key=lambda i: self.features[i].followers, reverse=True)
+        self._bucket_cache: Dict[tuple, List[int]] = {}
+        # Per-spec recruiter arrays, filled by CompiledScoringSpec.prepare
+        self.prepared_specs: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def company_bucket(self, job_f: JobFeatures) -> List[int]:
+        """
+        Indices (ascending) of recruiters at the job's company: same company_id,
+        or normalised names equal / contained in one another (e.g. "NVIDIA"
+        vs "NVIDIA Corporation"). Scans distinct company names, not recruiters.
+        """
+        key = (job_f.company_id, job_f.company_normalized)
+        cached = self._bucket_cache.get(key)
+        if cached is not None:
+            return cached
+
+        matched = set()
+        if job_f.company_id:
+            matched.update(self.by_company_id.get(job_f.company_id, ()))
+
+        job_name = job_f.company_normalized
+        for name, indices in self.by_company_name.items():
+            if name == job_name or job_name in name or name in job_name:
+                matched.update(indices)
+
+        bucket = sorted(matched)
+        self._bucket_cache[key] = bucket
+        return bucket
+
+    def first_unused_by_followers(self, used: set) -> Optional[int]:
+        for idx in self.by_followers:
+            if idx not in used:
+                return idx
+        return None
+
+
+def log_pair_score(job: Dict[str, Any], recruiter: Dict[str, Any], job_f: JobFeatures, score: int, events: List[str]) -> Dict[str, Any]:
+    """Emit the per-pair debug line and return the inputs record."""
+    recruiter_name = recruiter.get('name', 'Unknown')
+    recruiter_inputs = {
+        "recruiter_name": recruiter_name,
+        "headline": recruiter.get('headline'),
+        "recruiter_company": recruiter_company_name(recruiter) or recruiter.get('company'),
+        "keywords_match": recruiter.get('keywords_match'),
+        "job_title": job.get('title'),
+        "job_company": job_company_name(job),
+        "job_url": job_url_of(job),
+        "recruiter_profile_url": recruiter.get('profile_url'),
+    }
+    logger.info(
+        f"[RecruiterScore] {recruiter_name} | job '{job_f.title}' @ '{job_f.company}' "
+        f"| contributions: {', '.join(events) if events else 'none'} | total={score} | inputs: {recruiter_inputs}"
+    )
+    return recruiter_inputs
+
+
+def company_in_keywords_mask(job_companies: List[str], index: RecruiterIndex):
+    """(J, R) mask: job company appears as a substring of recruiter keywords_match.
+
+    All keywords_match strings are joined once and searched per distinct job
+    company, so the cost is O(distinct companies x total keyword text).
+    """
+    R = len(index)
+    mask = np.zeros((len(job_companies), R), dtype=bool)
+    separator = "\x00"
+    texts = [f.keywords_match for f in index.features]
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + len(separator)
+    haystack = separator.join(texts)
+
+    rows_by_company: Dict[str, List[int]] = {}
+    for row, company in enumerate(job_companies):
+        if company:
+            rows_by_company.setdefault(company, []).append(row)
+
+    for company, rows in rows_by_company.items():
+        hit_columns = set()
+        for match in re.finditer(re.escape(company), haystack):
+            col = bisect_right(starts, match.start()) - 1
+            # A match spanning the separator belongs to no single recruiter
+            if match.end() <= starts[col] + len(texts[col]):
+                hit_columns.add(col)
+        if hit_columns:
+            columns = np.fromiter(hit_columns, dtype=np.int64)
+            for row in rows:
+                mask[row, columns] = True
+    return mask
+
+
+# ---------------------------------------------------------------------------
+# Optimal assignment (score matrix + maximum-weight matching)
+# ---------------------------------------------------------------------------
+
+def build_score_matrix(job_features: List[JobFeatures], index: RecruiterIndex, spec=None):
+    """
+    Scores for every (job, recruiter) pair, evaluated in batch per job.
+
+    Returns:
+        int32 array of shape (len(job_features), len(index))
+    """
+    if spec is None:
+        from .scoring_spec import get_default_spec
+        spec = get_default_spec()
+    return spec.score_matrix(job_features, index)
+
+
+def build_eligibility_mask(job_features: List[JobFeatures], index: RecruiterIndex):
+    """(J, R) mask of recruiters each job may use: its company bucket, or all if empty."""
+    mask = np.zeros((len(job_features), len(index)), dtype=bool)
+    for row, job_f in enumerate(job_features):
+        bucket = index.company_bucket(job_f)
+        if bucket:
+            mask[row, bucket] = True
+        else:
+            mask[row, :] = True
+    return mask
+
+
+def _followers_tiebreak(index: RecruiterIndex, n_jobs: int):
+    """Per-recruiter bonus in [0, 1/(n_jobs+1)): more followers -> larger bonus.
+
+    Summed over all jobs it stays below 1, so it can only break ties between
+    matchings with the same total integer score.
+    """
+    followers = np.fromiter((f.followers for f in index.features), dtype=np.float64, count=len(index))
+    unique, dense_rank = np.unique(followers, return_inverse=True)
+    return dense_rank / max(len(unique), 1) / (n_jobs + 1)
+
+
+def _hungarian_min_cost(cost):
+    """Shortest augmenting path assignment for n <= m (numpy fallback for scipy).
+
+    Returns:
+        (row_indices, col_indices) like scipy.optimize.linear_sum_assignment
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)     # p[j]: row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used[1:]
+            current = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (current < minv[1:])
+            minv[1:][better] = current[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            used_cols = np.nonzero(used)[0]
+            u[p[used_cols]] += delta
+            v[used_cols] -= delta
+            minv[1:][free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    cols = np.nonzero(p[1:])[0]
+    rows = p[1:][cols] - 1
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def solve_max_weight_assignment(weights):
+    """
+    Maximum-weight matching of rows to distinct columns (pairs with weight <= 0
+    are dropped). Uses scipy's linear_sum_assignment when installed, otherwise
+    a numpy Hungarian implementation.
+
+    Returns:
+        Dict mapping row index -> column index
+    """
+    J, R = weights.shape
+    if J == 0 or R == 0:
+        return {}
+
+    # Only each row's top-J columns can appear in an optimal matching
+    # (at most J-1 of them are taken by other rows), so prune the rest.
+    if R > J:
+        top = np.argpartition(-weights, J - 1, axis=1)[:, :J]
+        columns = np.unique(top[np.take_along_axis(weights, top, axis=1) > 0])
+    else:
+        columns = np.nonzero((weights > 0).any(axis=0))[0]
+    if columns.size == 0:
+        return {}
+    reduced = weights[:, columns]
+
+    if SCIPY_AVAILABLE:
+        rows, cols = linear_sum_assignment(reduced, maximize=True)
+    elif reduced.shape[0] <= reduced.shape[1]:
+        rows, cols = _hungarian_min_cost(-reduced)
+    else:
+        cols, rows = _hungarian_min_cost(-reduced.T)
+
+    return {
+        int(row): int(columns[col])
+        for row, col in zip(rows, cols)
+        if reduced[row, col] > 0
+    }
+
+
+def optimal_assignment(job_features: List[JobFeatures], index: RecruiterIndex, spec=None) -> Dict[int, int]:
+    """
+    Globally optimal job -> recruiter assignment under the greedy mode's rules
+    (company bucket only, positive scores only), maximising the total score
+    with ties broken by followers_count.
+
+    Returns:
+        Dict mapping job position -> recruiter index (jobs with no eligible
+        recruiter are absent; the caller applies the followers fallback)
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy is required for optimal assignment")
+
+    scores = build_score_matrix(job_features, index, spec)
+    eligible = build_eligibility_mask(job_features, index) & (scores > 0)
+    weights = np.where(eligible, scores + _followers_tiebreak(index, len(job_features))[None, :], 0.0)
+    return solve_max_weight_assignment(weights)
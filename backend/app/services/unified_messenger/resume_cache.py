@@ -0,0 +1,132 @@
+"""Process-wide cache of extracted resume text, keyed by (user, file hash).
+
+``ResumeMessageGenerator`` lives on the ``UnifiedMessenger`` singleton, so a
+single cached (file, text) pair on it was shared by every user: requests for
+different resumes evicted each other, and a cache keyed only by path could
+hand one user's text to another after the file at that path was replaced.
+
+Entries here are keyed by the owning user and the SHA-256 of the PDF bytes,
+so a replaced file is a miss by construction. The cache is an LRU bounded by
+the memory held by the cached text (``RESUME_CACHE_MAX_BYTES``) and by entry
+count (``RESUME_CACHE_MAX_ENTRIES``), safe to use from executor threads.
+"""
+import hashlib
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Owner used when the caller does not know the user (CLI, legacy campaign paths)
+SHARED_OWNER = ""
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResumeTextCache:
+    """Thread-safe LRU of resume text bounded by total size and entry count."""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max(0, max_bytes)
+        self.max_entries = max(0, max_entries)
+        self.lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(user_id: Optional[str], file_hash: str) -> Tuple[str, str]:
+        return (str(user_id) if user_id is not None else SHARED_OWNER, file_hash)
+
+    def get(self, user_id: Optional[str], file_hash: str) -> Optional[str]:
+        """Cached text for the user's file, marking it most recently used."""
+        key = self._key(user_id, file_hash)
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id: Optional[str], file_hash: str, text: str) -> None:
+        """Cache text, evicting least recently used entries to stay within the bounds."""
+        key = self._key(user_id, file_hash)
+        size = sys.getsizeof(text)
+        if size > self.max_bytes or self.max_entries == 0:
+            return
+        with self.lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (text, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: Optional[str]) -> int:
+        """Drop every entry of one user. Returns the number of entries removed."""
+        owner = self._key(user_id, "")[0]
+        with self.lock:
+            keys = [key for key in self._entries if key[0] == owner]
+            for key in keys:
+                self._bytes -= self._entries.pop(key)[1]
+        return len(keys)
+
+    def clear(self) -> None:
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Entry count, memory held and hit/miss/eviction counters."""
+        with self.lock:
+            return {
+                "entries": len(self._entries),
+                "users": len({key[0] for key in self._entries}),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[ResumeTextCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_resume_cache() -> ResumeTextCache:
+    """The process-wide resume text cache, sized from settings on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from app.core.config import settings
+                _cache = ResumeTextCache(settings.resume_cache_max_bytes, settings.resume_cache_max_entries)
+    return _cache
+
+
+def invalidate_user_resume(user_id: Optional[str]) -> int:
+    """Forget the cached resume text of one user (e.g. after an upload)."""
+    removed = get_resume_cache().invalidate_user(user_id)
+    if removed:
+        logger.info(f"🔄 Dropped {removed} cached resume(s) for user {user_id}")
+    return removed
@@ -6,7 +6,7 @@ Resume Parser - Extracts structured resume data for efficient reuse
 import os
 import json
 import re
-from typing import Dict
+from typing import Dict, Tuple
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 
@@ -239,9 +239,22 @@ CRITICAL RULES:
         Extract key bullets from structured resume data for backward compatibility.
         Converts structured data into a bullet-point format.
         """
+        return self.bullets_from_structured(self.extract_structured_data(resume_content))
+    
+    def parse_resume(self, resume_content: str) -> Tuple[Dict, str]:
+        """
+        Parse a resume once: one LLM call for the structured data, bullets derived from it.
+        
+        Returns:
+            Tuple of (structured_data, bullets)
+        """
+        structured_data = self.extract_structured_data(resume_content)
+        return structured_data, self.bullets_from_structured(structured_data)
+    
+    @staticmethod
+    def bullets_from_structured(structured_data: Dict) -> str:
+        """Convert structured resume data into the bullet-point format used in prompts (no LLM call)."""
         try:
-            structured_data = self.extract_structured_data(resume_content)
-            
             bullets = []
             
             # Name
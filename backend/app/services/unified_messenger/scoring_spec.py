@@ -0,0 +1,420 @@
+"""
+Declarative recruiter scoring rules.
+
+The weights that used to be hard-coded in the scorer (+2 recruiting headline,
++5 exact company, +1 per keyword overlap, ...) are described by a JSON spec:
+
+    {
+        "rules": [
+            {"name": "recruiting_headline", "type": "recruiter_keywords", "weight": 2,
+             "keywords": ["recruiter", "talent", ...]},
+            {"name": "exact_company", "type": "company_exact", "weight": 5},
+            {"name": "company_in_keywords", "type": "company_in_keywords", "weight": 3,
+             "unless": "exact_company"},
+            ...
+        ]
+    }
+
+Rule types:
+    recruiter_keywords          recruiter headline hits any of ``keywords``
+    job_and_recruiter_keywords  job title hits ``job_keywords`` and headline hits ``recruiter_keywords``
+    company_exact               recruiter company equals the job company
+    company_in_keywords         job company appears in the recruiter's keywords_match
+    keyword_overlap             ``weight`` per keyword present in both title and headline
+
+Modifiers:
+    unless       skip the pair if the named (earlier) rule scored it
+    unless_job   skip the job if its title matched the named (earlier)
+                 job_and_recruiter_keywords rule's job side
+    label        event text for debug logs ({company} / {hits} placeholders)
+
+The spec comes from, in order: the request, the user's settings row
+(user_settings.recruiter_scoring_spec), the RECRUITER_SCORING_SPEC setting
+(inline JSON or a path to a JSON file), then DEFAULT_SCORING_SPEC, which
+reproduces the built-in rules. A spec compiles once (cached by content) into
+keyword matchers plus a numpy evaluator that scores every recruiter for a
+job at once and reports each rule's contribution.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .keyword_matcher import KeywordMatcher, keywords_in_order
+from .recruiter_matching import (
+    NEWGRAD_SIGNALS,
+    NUMPY_AVAILABLE,
+    OVERLAP_KEYWORDS,
+    RECRUITING_HEADLINE_KEYWORDS,
+    SENIOR_SIGNALS,
+    TECH_HEADLINE_KEYWORDS,
+    TECH_TITLE_KEYWORDS,
+    JobFeatures,
+    RecruiterFeatures,
+    RecruiterIndex,
+    company_in_keywords_mask,
+    np,
+)
+
+logger = logging.getLogger(__name__)
+
+RULE_RECRUITER_KEYWORDS = "recruiter_keywords"
+RULE_JOB_AND_RECRUITER_KEYWORDS = "job_and_recruiter_keywords"
+RULE_COMPANY_EXACT = "company_exact"
+RULE_COMPANY_IN_KEYWORDS = "company_in_keywords"
+RULE_KEYWORD_OVERLAP = "keyword_overlap"
+RULE_TYPES = (
+    RULE_RECRUITER_KEYWORDS,
+    RULE_JOB_AND_RECRUITER_KEYWORDS,
+    RULE_COMPANY_EXACT,
+    RULE_COMPANY_IN_KEYWORDS,
+    RULE_KEYWORD_OVERLAP,
+)
+
+DEFAULT_SCORING_SPEC: Dict[str, Any] = {
+    "rules": [
+        {"name": "recruiting_headline", "type": RULE_RECRUITER_KEYWORDS, "weight": 2,
+         "keywords": RECRUITING_HEADLINE_KEYWORDS, "label": "headline indicates recruiting role"},
+        {"name": "technical_recruiter", "type": RULE_JOB_AND_RECRUITER_KEYWORDS, "weight": 2,
+         "job_keywords": TECH_TITLE_KEYWORDS, "recruiter_keywords": TECH_HEADLINE_KEYWORDS,
+         "label": "technical recruiter headline"},
+        {"name": "exact_company", "type": RULE_COMPANY_EXACT, "weight": 5,
+         "label": "exact company match with {company}"},
+        {"name": "company_in_keywords", "type": RULE_COMPANY_IN_KEYWORDS, "weight": 3,
+         "unless": "exact_company", "label": "company appears in recruiter keywords ({company})"},
+        {"name": "keyword_overlap", "type": RULE_KEYWORD_OVERLAP, "weight": 1,
+         "keywords": OVERLAP_KEYWORDS, "label": "keyword overlap {hits}"},
+        {"name": "seniority", "type": RULE_JOB_AND_RECRUITER_KEYWORDS, "weight": 1,
+         "job_keywords": SENIOR_SIGNALS, "recruiter_keywords": SENIOR_SIGNALS,
+         "label": "seniority alignment"},
+        {"name": "early_career", "type": RULE_JOB_AND_RECRUITER_KEYWORDS, "weight": 1,
+         "job_keywords": NEWGRAD_SIGNALS, "recruiter_keywords": NEWGRAD_SIGNALS,
+         "unless_job": "seniority", "label": "university/early-career focus"},
+    ]
+}
+
+
+class ScoringSpecError(ValueError):
+    """Raised when a scoring spec is malformed."""
+
+
+@dataclass(frozen=True)
+class ScoringRule:
+    name: str
+    type: str
+    weight: int
+    label: str
+    keywords: Tuple[str, ...] = ()
+    job_keywords: Tuple[str, ...] = ()
+    recruiter_keywords: Tuple[str, ...] = ()
+    unless: Optional[str] = None
+    unless_job: Optional[str] = None
+
+
+def _keyword_list(rule: Dict[str, Any], key: str, name: str) -> Tuple[str, ...]:
+    value = rule.get(key)
+    if not isinstance(value, list) or not value or not all(isinstance(k, str) and k.strip() for k in value):
+        raise ScoringSpecError(f"Rule '{name}': '{key}' must be a non-empty list of strings")
+    return tuple(k.strip().lower() for k in value)
+
+
+def parse_scoring_spec(spec: Any) -> List[ScoringRule]:
+    """Validate a spec (dict or JSON string) and return its rules in order."""
+    if isinstance(spec, str):
+        try:
+            spec = json.loads(spec)
+        except json.JSONDecodeError as e:
+            raise ScoringSpecError(f"Scoring spec is not valid JSON: {e}") from e
+    if not isinstance(spec, dict) or not isinstance(spec.get("rules"), list):
+        raise ScoringSpecError("Scoring spec must be an object with a 'rules' list")
+
+    rules: List[ScoringRule] = []
+    seen: Dict[str, ScoringRule] = {}
+    for position, raw in enumerate(spec["rules"]):
+        if not isinstance(raw, dict):
+            raise ScoringSpecError(f"Rule #{position} must be an object")
+        name = raw.get("name")
+        if not isinstance(name, str) or not name:
+            raise ScoringSpecError(f"Rule #{position} needs a 'name'")
+        if name in seen:
+            raise ScoringSpecError(f"Duplicate rule name '{name}'")
+        rule_type = raw.get("type")
+        if rule_type not in RULE_TYPES:
+            raise ScoringSpecError(f"Rule '{name}': unknown type '{rule_type}' (expected one of {', '.join(RULE_TYPES)})")
+        weight = raw.get("weight", 1)
+        if not isinstance(weight, int) or isinstance(weight, bool):
+            raise ScoringSpecError(f"Rule '{name}': 'weight' must be an integer")
+
+        label = raw.get("label") or name.replace("_", " ")
+        try:
+            label.format(company="", hits=[])
+        except (AttributeError, KeyError, IndexError, ValueError) as e:
+            raise ScoringSpecError(f"Rule '{name}': bad label placeholder ({e})") from e
+
+        kwargs: Dict[str, Any] = {}
+        if rule_type in (RULE_RECRUITER_KEYWORDS, RULE_KEYWORD_OVERLAP):
+            kwargs["keywords"] = _keyword_list(raw, "keywords", name)
+        elif rule_type == RULE_JOB_AND_RECRUITER_KEYWORDS:
+            kwargs["job_keywords"] = _keyword_list(raw, "job_keywords", name)
+            kwargs["recruiter_keywords"] = _keyword_list(raw, "recruiter_keywords", name)
+
+        unless = raw.get("unless")
+        if unless is not None and unless not in seen:
+            raise ScoringSpecError(f"Rule '{name}': 'unless' must name an earlier rule")
+        unless_job = raw.get("unless_job")
+        if unless_job is not None and (
+            unless_job not in seen or seen[unless_job].type != RULE_JOB_AND_RECRUITER_KEYWORDS
+        ):
+            raise ScoringSpecError(
+                f"Rule '{name}': 'unless_job' must name an earlier {RULE_JOB_AND_RECRUITER_KEYWORDS} rule"
+            )
+
+        rule = ScoringRule(
+            name=name, type=rule_type, weight=weight, label=label,
+            unless=unless, unless_job=unless_job, **kwargs,
+        )
+        rules.append(rule)
+        seen[name] = rule
+    return rules
+
+
+class PreparedRecruiters:
+    """Per-spec recruiter arrays, built once per RecruiterIndex."""
+
+    def __init__(self, spec: "CompiledScoringSpec", index: RecruiterIndex):
+        self.index = index
+        features = index.features
+        R = len(features)
+        hits = [spec.headline_matcher.match(f.headline) for f in features]
+
+        self.flags: Dict[str, Any] = {}
+        self.overlap: Dict[str, Any] = {}
+        for rule in spec.rules:
+            if rule.type in (RULE_RECRUITER_KEYWORDS, RULE_JOB_AND_RECRUITER_KEYWORDS):
+                self.flags[rule.name] = np.fromiter((bool(h[rule.name]) for h in hits), dtype=bool, count=R)
+            elif rule.type == RULE_KEYWORD_OVERLAP:
+                position = {kw: i for i, kw in enumerate(rule.keywords)}
+                matrix = np.zeros((R, len(rule.keywords)), dtype=np.int32)
+                for row, h in enumerate(hits):
+                    for kw in h[rule.name]:
+                        matrix[row, position[kw]] = 1
+                self.overlap[rule.name] = matrix
+
+        self.company_codes: Dict[str, int] = {}
+        self.rec_company = np.fromiter(
+            (self.company_codes.setdefault(f.company, len(self.company_codes)) if f.company else -1 for f in features),
+            dtype=np.int64, count=R,
+        )
+        self._in_keywords_cache: Dict[str, Any] = {}
+
+    def company_in_keywords(self, company: str):
+        cached = self._in_keywords_cache.get(company)
+        if cached is None:
+            cached = company_in_keywords_mask([company], self.index)[0]
+            self._in_keywords_cache[company] = cached
+        return cached
+
+
+class CompiledScoringSpec:
+    """A validated spec with its keyword matchers and evaluators."""
+
+    def __init__(self, rules: List[ScoringRule]):
+        self.rules = rules
+        self.rule_names = [rule.name for rule in rules]
+        self.headline_matcher = KeywordMatcher({
+            rule.name: rule.keywords or rule.recruiter_keywords
+            for rule in rules
+            if rule.type in (RULE_RECRUITER_KEYWORDS, RULE_JOB_AND_RECRUITER_KEYWORDS, RULE_KEYWORD_OVERLAP)
+        })
+        self.title_matcher = KeywordMatcher({
+            rule.name: rule.keywords or rule.job_keywords
+            for rule in rules
+            if rule.type in (RULE_JOB_AND_RECRUITER_KEYWORDS, RULE_KEYWORD_OVERLAP)
+        })
+
+    # -- single pair (pure Python; used for debug logs and without numpy) --
+
+    def score_pair(
+        self,
+        job_f: JobFeatures,
+        rec_f: RecruiterFeatures,
+        events: Optional[List[str]] = None,
+    ) -> Tuple[int, Dict[str, int]]:
+        """
+        Score one (job, recruiter) pair.
+
+        Returns:
+            (total score, {rule name: points} for every rule that fired)
+        """
+        job_hits = self.title_matcher.match(job_f.title)
+        rec_hits = self.headline_matcher.match(rec_f.headline)
+        contributions: Dict[str, int] = {}
+        job_matched: Dict[str, bool] = {}
+
+        for rule in self.rules:
+            if rule.unless_job and job_matched.get(rule.unless_job):
+                continue
+
+            points = 0
+            hits_list: List[str] = []
+            if rule.type == RULE_RECRUITER_KEYWORDS:
+                if rec_hits[rule.name]:
+                    points = rule.weight
+            elif rule.type == RULE_JOB_AND_RECRUITER_KEYWORDS:
+                job_matched[rule.name] = bool(job_hits[rule.name])
+                if job_hits[rule.name] and rec_hits[rule.name]:
+                    points = rule.weight
+            elif rule.type == RULE_COMPANY_EXACT:
+                if job_f.company and rec_f.company and job_f.company == rec_f.company:
+                    points = rule.weight
+            elif rule.type == RULE_COMPANY_IN_KEYWORDS:
+                if job_f.company and job_f.company in rec_f.keywords_match:
+                    points = rule.weight
+            elif rule.type == RULE_KEYWORD_OVERLAP:
+                shared = job_hits[rule.name] & rec_hits[rule.name]
+                if shared:
+                    hits_list = keywords_in_order(rule.keywords, shared)
+                    points = rule.weight * len(shared)
+
+            if rule.unless and rule.unless in contributions:
+                points = 0
+            if points:
+                contributions[rule.name] = points
+                if events is not None:
+                    label = rule.label.format(company=job_f.company, hits=hits_list)
+                    events.append(f"{label} ({points:+d})")
+
+        return sum(contributions.values()), contributions
+
+    # -- batch (numpy) --
+
+    def prepare(self, index: RecruiterIndex) -> PreparedRecruiters:
+        """Recruiter arrays for this spec (cached on the index)."""
+        prepared = index.prepared_specs.get(self)
+        if prepared is None:
+            prepared = PreparedRecruiters(self, index)
+            index.prepared_specs[self] = prepared
+        return prepared
+
+    def score_job(self, job_f: JobFeatures, index: RecruiterIndex, columns=None):
+        """
+        Score every recruiter (or just ``columns``) for one job at once.
+
+        Returns:
+            (int32 totals array, {rule name: int32 contribution array})
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for batch scoring")
+        prepared = self.prepare(index)
+        if columns is not None:
+            columns = np.asarray(columns, dtype=np.int64)
+            size = len(columns)
+        else:
+            size = len(index)
+
+        def take(values):
+            return values if columns is None else values[columns]
+
+        job_hits = self.title_matcher.match(job_f.title)
+        totals = np.zeros(size, dtype=np.int32)
+        contributions: Dict[str, Any] = {}
+        job_matched: Dict[str, bool] = {}
+        job_code = prepared.company_codes.get(job_f.company, -2) if job_f.company else None
+
+        for rule in self.rules:
+            if rule.unless_job and job_matched.get(rule.unless_job):
+                continue
+
+            if rule.type == RULE_RECRUITER_KEYWORDS:
+                points = rule.weight * take(prepared.flags[rule.name]).astype(np.int32)
+            elif rule.type == RULE_JOB_AND_RECRUITER_KEYWORDS:
+                job_matched[rule.name] = bool(job_hits[rule.name])
+                if not job_hits[rule.name]:
+                    continue
+                points = rule.weight * take(prepared.flags[rule.name]).astype(np.int32)
+            elif rule.type == RULE_COMPANY_EXACT:
+                if job_code is None:
+                    continue
+                points = rule.weight * (take(prepared.rec_company) == job_code).astype(np.int32)
+            elif rule.type == RULE_COMPANY_IN_KEYWORDS:
+                if job_code is None:
+                    continue
+                points = rule.weight * take(prepared.company_in_keywords(job_f.company)).astype(np.int32)
+            else:  # RULE_KEYWORD_OVERLAP
+                job_vector = np.fromiter(
+                    (kw in job_hits[rule.name] for kw in rule.keywords), dtype=np.int32, count=len(rule.keywords)
+                )
+                if not job_vector.any():
+                    continue
+                points = rule.weight * (take(prepared.overlap[rule.name]) @ job_vector)
+
+            if rule.unless and rule.unless in contributions:
+                points = np.where(contributions[rule.unless] != 0, 0, points)
+            contributions[rule.name] = points.astype(np.int32, copy=False)
+            totals += contributions[rule.name]
+
+        return totals, contributions
+
+    def score_matrix(self, job_features: Sequence[JobFeatures], index: RecruiterIndex):
+        """(J, R) int32 matrix of scores, one batch evaluation per job."""
+        matrix = np.zeros((len(job_features), len(index)), dtype=np.int32)
+        for row, job_f in enumerate(job_features):
+            matrix[row], _ = self.score_job(job_f, index)
+        return matrix
+
+
+@lru_cache(maxsize=64)
+def _compile_canonical(canonical: str) -> CompiledScoringSpec:
+    return CompiledScoringSpec(parse_scoring_spec(json.loads(canonical)))
+
+
+def compile_scoring_spec(spec: Any) -> CompiledScoringSpec:
+    """Validate and compile a spec (dict or JSON string); cached by content."""
+    if isinstance(spec, str):
+        try:
+            spec = json.loads(spec)
+        except json.JSONDecodeError as e:
+            raise ScoringSpecError(f"Scoring spec is not valid JSON: {e}") from e
+    parse_scoring_spec(spec)
+    return _compile_canonical(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=8)
+def _default_spec_for(raw: str) -> CompiledScoringSpec:
+    configured: Optional[str] = None
+    if raw.startswith("{"):
+        configured = raw
+    elif raw:
+        if os.path.exists(raw):
+            with open(raw, "r", encoding="utf-8") as f:
+                configured = f.read()
+        else:
+            logger.warning(f"⚠️ RECRUITER_SCORING_SPEC file not found: {raw}")
+
+    if configured is not None:
+        try:
+            return compile_scoring_spec(configured)
+        except ScoringSpecError as e:
+            logger.error(f"❌ Invalid RECRUITER_SCORING_SPEC, using built-in rules: {e}")
+    return compile_scoring_spec(DEFAULT_SCORING_SPEC)
+
+
+def get_default_spec() -> CompiledScoringSpec:
+    """
+    Spec from the RECRUITER_SCORING_SPEC setting (inline JSON or a path to a
+    JSON file), falling back to the built-in rules if it is missing or invalid.
+    """
+    from app.core.config import settings
+
+    return _default_spec_for((settings.recruiter_scoring_spec or "").strip())
+
+
+def resolve_scoring_spec(*candidates: Any) -> CompiledScoringSpec:
+    """First non-empty candidate (request override, user row, ...) or the default spec."""
+    for candidate in candidates:
+        if candidate:
+            return compile_scoring_spec(candidate)
+    return get_default_spec()
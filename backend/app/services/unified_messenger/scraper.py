@@ -1,8 +1,17 @@
 # linkedin_job_scraper_sentencebreaks.py
-from bs4 import BeautifulSoup
 import requests
 import json
-import re
+
+try:
+    from .job_page_parser import parse_job_page
+except ImportError:
+    # Allow running this file directly as a script
+    from job_page_parser import parse_job_page
+
+try:
+    from app.services.cpu_pool import cpu_pool
+except ImportError:
+    cpu_pool = None
 
 HEADERS = {
     "User-Agent": (
@@ -31,69 +40,12 @@ def scrape_job(job_url):
         print("❌ Failed to load job page. Try a public (guest) job link.")
         return None
 
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    def safe_text(selector):
-        el = soup.select_one(selector)
-        return el.get_text(strip=True) if el else None
-
-    title = safe_text("h1")
-    company_el = soup.select_one('[data-tracking-control-name="public_jobs_topcard-org-name"]')
-    if company_el:
-        company_name = company_el.get_text(strip=True)
-        company_url = company_el.get("href")
-        if company_url and company_url.startswith("/"):
-            company_url = "https://www.linkedin.com" + company_url
-    else:
-        company_name = None
-        company_url = None
-
-    location = safe_text(".topcard__flavor--bullet")
-    applicants = safe_text(".num-applicants__caption")
-    salary = safe_text(".salary")
-
-    # Capture the full description text
-    desc_container = soup.select_one(".description__text .show-more-less-html")
-    if desc_container:
-        description_raw = desc_container.get_text(separator=" ", strip=True)
-    else:
-        description_raw = None
-
-    # Split description into sentences using regex and reformat
-    formatted_description = ""
-    if description_raw:
-        # Split by periods but keep the periods
-        sentences = re.split(r'(?<=[.])\s+', description_raw)
-        for i, sentence in enumerate(sentences, 1):
-            formatted_description += sentence.strip() + " "
-            # After every 3 sentences, add a double newline
-            if i % 3 == 0:
-                formatted_description += "\n\n"
-        description = formatted_description.strip()
+    # Only the top card, description and criteria are parsed (JSON-LD first).
+    # Parsing is CPU-bound, so it runs in the process pool when available.
+    if cpu_pool is not None:
+        job = cpu_pool.run_blocking(parse_job_page, response.text, job_url)
     else:
-        description = None
-
-    # Capture job criteria
-    criteria = []
-    for li in soup.select(".description__job-criteria-list li"):
-        name_el = li.select_one(".description__job-criteria-subheader")
-        val_el = li.select_one(".description__job-criteria-text")
-        if name_el and val_el:
-            criteria.append({
-                "name": name_el.get_text(strip=True),
-                "value": val_el.get_text(strip=True)
-            })
-
-    job = {
-        "url": job_url,
-        "title": title,
-        "company": {"name": company_name, "url": company_url},
-        "location": location,
-        "applications": applicants,
-        "salary": salary,
-        "description": description,
-        "criteria": criteria
-    }
+        job = parse_job_page(response.text, job_url)
 
     print("\n✅ Job data extracted successfully!\n")
     return job
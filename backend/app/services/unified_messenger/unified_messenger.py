@@ -16,6 +16,23 @@ from dotenv import load_dotenv
 from .resume_message_generator import ResumeMessageGenerator
 from .job_filter import JobFilter
 from .job_context_tracker import JobContextTracker
+from .recruiter_matching import (
+    ASSIGNMENT_GREEDY,
+    ASSIGNMENT_OPTIMAL,
+    NUMPY_AVAILABLE,
+    JobFeatures,
+    RecruiterFeatures,
+    RecruiterIndex,
+    job_company_id,
+    job_company_name,
+    job_url_of,
+    log_pair_score,
+    optimal_assignment,
+    recruiter_company_name,
+)
+from .scoring_spec import get_default_spec
+from app.services.llm_runtime import ClientDisconnectedError, LLMTimeoutError
+from app.services.smtp_pool import smtp_pool
 from app.db.base import AsyncSessionLocal
 from typing import Optional, Dict, Any
 
@@ -784,42 +801,19 @@ class UnifiedMessenger:
         """
         Safely extract company name from a job object returned by LinkedIn search.
         """
-        if not job:
-            return None
-        company = job.get('company') if isinstance(job, dict) else None
-        if isinstance(company, dict):
-            return company.get('name')
-        if isinstance(company, str):
-            return company
-        return None
+        return job_company_name(job)
     
     def _get_company_id_from_job(self, job):
         """
         Safely extract company ID from a job object returned by LinkedIn search.
         """
-        if not job:
-            return None
-        company = job.get('company') if isinstance(job, dict) else None
-        if isinstance(company, dict):
-            return company.get('id') or company.get('company_id')
-        return None
+        return job_company_id(job)
 
     def _recruiter_company_name(self, recruiter):
         """
         Try to resolve company name for recruiter from enriched fields or keywords_match.
         """
-        if not recruiter:
-            return None
-        company = recruiter.get('company')
-        if company:
-            return company if isinstance(company, str) else company.get('name') if isinstance(company, dict) else None
-        km = recruiter.get('keywords_match') or ''
-        if 'Current:' in km and ' at ' in km:
-            try:
-                return km.split('Current:')[1].split(' at ')[-1].strip()
-            except Exception:
-                return None
-        return None
+        return recruiter_company_name(recruiter)
     
     def _recruiter_matches_company(self, recruiter, job_company, job=None):
         """
@@ -864,84 +858,34 @@ class UnifiedMessenger:
         """
         Compute a heuristic score indicating how suitable this recruiter is for the given job.
         Uses recruiter's headline/title and company alignment with the job's company/title.
+        For batches, map_jobs_to_recruiters precomputes features instead of calling this per pair.
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        score = 0
+        job_f = JobFeatures.from_job(job)
         events = []
-        job_title = (job.get('title') or '').lower()
-        job_company = (self._get_company_name_from_job(job) or '').lower()
-
-        headline = (recruiter.get('headline') or '').lower()
-        rec_company = (self._recruiter_company_name(recruiter) or '').lower()
-        keywords_match = (recruiter.get('keywords_match') or '').lower()
-
-        if any(k in headline for k in ['recruiter', 'talent', 'ta', 'sourcer', 'acquisition', 'people', 'hr']):
-            score += 2
-            events.append("headline indicates recruiting role (+2)")
-
-        if any(k in job_title for k in ['software', 'engineer', 'developer', 'data', 'ml', 'ai', 'product', 'design']):
-            if any(k in headline for k in ['technical recruiter', 'engineering', 'tech', 'data', 'ml', 'ai', 'product', 'design']):
-                score += 2
-                events.append("technical recruiter headline (+2)")
-
-        if job_company:
-            if rec_company and job_company == rec_company:
-                score += 5
-                events.append(f"exact company match with {job_company} (+5)")
-            elif job_company and job_company in keywords_match:
-                score += 3
-                events.append(f"company appears in recruiter keywords ({job_company}) (+3)")
-
-        keyword_hits = []
-        for kw in ['software', 'engineer', 'data', 'science', 'ml', 'ai', 'backend', 'frontend', 'full stack', 'product', 'designer']:
-            if kw in job_title and kw in headline:
-                score += 1
-                keyword_hits.append(kw)
-        if keyword_hits:
-            events.append(f"keyword overlap {keyword_hits} (+{len(keyword_hits)})")
-
-        senior_signals = ['senior', 'lead', 'staff', 'principal']
-        newgrad_signals = ['new grad', 'university', 'campus', 'early career', 'college']
-
-        if any(k in job_title for k in senior_signals):
-            if any(k in headline for k in senior_signals):
-                score += 1
-                events.append("seniority alignment (+1)")
-        elif any(k in job_title for k in newgrad_signals):
-            if any(k in headline for k in newgrad_signals):
-                score += 1
-                events.append("university/early-career focus (+1)")
-
-        recruiter_name = recruiter.get('name', 'Unknown')
-        recruiter_inputs = {
-            "recruiter_name": recruiter_name,
-            "headline": recruiter.get('headline'),
-            "recruiter_company": self._recruiter_company_name(recruiter) or recruiter.get('company'),
-            "keywords_match": recruiter.get('keywords_match'),
-            "job_title": job.get('title'),
-            "job_company": self._get_company_name_from_job(job),
-            "job_url": job.get('job_url') or job.get('url') or job.get('link') or job.get('canonical_url'),
-            "recruiter_profile_url": recruiter.get('profile_url'),
-        }
+        score, _ = get_default_spec().score_pair(job_f, RecruiterFeatures.from_recruiter(0, recruiter), events)
+        recruiter_inputs = log_pair_score(job, recruiter, job_f, score, events)
         if debug_logs is not None:
             debug_logs.append({
-                "recruiter": recruiter_name,
+                "recruiter": recruiter.get('name', 'Unknown'),
                 "score": score,
                 "events": events,
                 "inputs": recruiter_inputs
             })
-
-        logger.info(
-            f"[RecruiterScore] {recruiter_name} | job '{job_title}' @ '{job_company}' "
-            f"| contributions: {', '.join(events) if events else 'none'} | total={score} | inputs: {recruiter_inputs}"
-        )
-
         return score
 
-    def map_jobs_to_recruiters(self, jobs, recruiters, max_pairs=5):
+    def map_jobs_to_recruiters(self, jobs, recruiters, max_pairs=5, debug_scoring=None, assignment=ASSIGNMENT_GREEDY, scoring_spec=None):
         """
         Map up to max_pairs jobs to the best distinct recruiters (no repeats).
+        Recruiters are featurised and indexed by company once; each job only
+        scores its company bucket (or everyone, if the bucket is empty).
+        Per-pair score logging is off unless debug_scoring (or the
+        RECRUITER_SCORE_DEBUG env var) is set.
+
+        assignment="greedy" (default) picks the best unused recruiter job by job;
+        assignment="optimal" solves a maximum-weight matching over the whole
+        score matrix so an early job cannot take the recruiter a later job needed.
+        scoring_spec is a CompiledScoringSpec (defaults to the configured rules);
+        each mapping entry reports the chosen pair's score and per-rule breakdown.
         Returns (selected_recruiters_list, mapping_list).
         """
         import logging
@@ -1006,62 +950,87 @@ class UnifiedMessenger:
             "🧠"
         )
 
+        if debug_scoring is None:
+            debug_scoring = os.getenv('RECRUITER_SCORE_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+        spec = scoring_spec or get_default_spec()
+        index = RecruiterIndex(recruiters)
+        logger.info(f"🔍 DEBUG: Indexed {len(index)} recruiters into {len(index.by_company_name)} company buckets")
+
+        optimal_choices = None
+        if assignment == ASSIGNMENT_OPTIMAL:
+            if NUMPY_AVAILABLE:
+                optimal_choices = optimal_assignment([JobFeatures.from_job(job) for job in jobs_considered], index, spec)
+                logger.info(f"🔍 DEBUG: Optimal assignment matched {len(optimal_choices)}/{len(jobs_considered)} jobs")
+            else:
+                logger.warning("⚠️ DEBUG: numpy not installed, falling back to greedy assignment")
+
         used_indices = set()
         selected = []
         mapping = []
 
         for job_idx, job in enumerate(jobs_considered):
             job_title = job.get('title', 'Unknown')
-            job_company = self._get_company_name_from_job(job) or 'Unknown'
+            job_f = JobFeatures.from_job(job)
+            job_company = job_f.company_label
             logger.info(f"🔍 DEBUG: Processing job {job_idx + 1}/{len(jobs_considered)}: {job_title} at {job_company}")
 
-            # CRITICAL FIX: Filter recruiters to only those from the same company as the job
-            # This ensures that when a user selects a position from NVIDIA, only NVIDIA recruiters are considered
-            matching_recruiters = []
-            matching_indices = []
-            for idx, recruiter in enumerate(recruiters):
-                if self._recruiter_matches_company(recruiter, job_company, job):
-                    matching_recruiters.append(recruiter)
-                    matching_indices.append(idx)
-            
-            if not matching_recruiters:
-                logger.warning(f"⚠️ DEBUG: No recruiters found for company {job_company}, trying all recruiters as fallback")
-                emit_verbose_log_sync(f"No direct recruiters found for {job_company}, expanding search", "info", "🔄")
-                # Fallback: use all recruiters if no company match found
-                matching_recruiters = recruiters
-                matching_indices = list(range(len(recruiters)))
+            if optimal_choices is not None:
+                # Recruiter already picked by the global assignment
+                chosen_idx = optimal_choices.get(job_idx)
+            else:
+                # CRITICAL FIX: Filter recruiters to only those from the same company as the job
+                # This ensures that when a user selects a position from NVIDIA, only NVIDIA recruiters are considered
+                matching_indices = index.company_bucket(job_f)
             
-            # Log how many recruiters are being filtered through for this position
-            emit_verbose_log_sync(
-                f"Filtered through {len(matching_recruiters)} recruiters",
-                "info",
-                "🔍"
-            )
+                if not matching_indices:
+                    logger.warning(f"⚠️ DEBUG: No recruiters found for company {job_company}, trying all recruiters as fallback")
+                    emit_verbose_log_sync(f"No direct recruiters found for {job_company}, expanding search", "info", "🔄")
+                    # Fallback: use all recruiters if no company match found
+                    matching_indices = range(len(recruiters))
             
-            # Score only the matching recruiters
-            debug_records = []
-            scored = [(matching_indices[idx], self._score_recruiter_for_job(job, rec, debug_records)) for idx, rec in enumerate(matching_recruiters)]
-            scored.sort(key=lambda x: (x[1], recruiters[x[0]].get('followers_count', 0) or 0), reverse=True)
+                # Log how many recruiters are being filtered through for this position
+                emit_verbose_log_sync(
+                    f"Filtered through {len(matching_indices)} recruiters",
+                    "info",
+                    "🔍"
+                )
             
-            if scored:
-                top_score = scored[0][1]
-                logger.info(f"🔍 DEBUG: Top scorer for job has score: {top_score}")
-
-            chosen_idx = None
-            for idx, sc in scored:
-                if idx in used_indices:
-                    continue
-                if sc <= 0:
-                    continue
-                chosen_idx = idx
-                break
+                # Score only the matching recruiters
+                if debug_scoring:
+                    scored = []
+                    for idx in matching_indices:
+                        events = []
+                        sc, _ = spec.score_pair(job_f, index.features[idx], events)
+                        log_pair_score(job, recruiters[idx], job_f, sc, events)
+                        scored.append((idx, sc))
+                elif NUMPY_AVAILABLE:
+                    # All bucket recruiters at once
+                    totals, _ = spec.score_job(job_f, index, list(matching_indices))
+                    scored = list(zip(matching_indices, totals.tolist()))
+                else:
+                    scored = [(idx, spec.score_pair(job_f, index.features[idx])[0]) for idx in matching_indices]
+                scored.sort(key=lambda x: (x[1], index.features[x[0]].followers), reverse=True)
+            
+                if scored:
+                    top_score = scored[0][1]
+                    logger.info(f"🔍 DEBUG: Top scorer for job has score: {top_score}")
+
+                chosen_idx = None
+                for idx, sc in scored:
+                    if idx in used_indices:
+                        continue
+                    if sc <= 0:
+                        continue
+                    chosen_idx = idx
+                    break
 
             if chosen_idx is None:
                 logger.warning(f"⚠️ DEBUG: No suitable recruiter with score > 0 found, trying fallback")
-                remaining = [(idx, recruiters[idx].get('followers_count', 0) or 0) for idx in range(len(recruiters)) if idx not in used_indices]
-                if remaining:
-                    remaining.sort(key=lambda x: x[1], reverse=True)
-                    chosen_idx = remaining[0][0]
+                # In optimal mode, don't steal recruiters the assignment reserved for later jobs
+                excluded = used_indices if optimal_choices is None else used_indices | set(optimal_choices.values())
+                chosen_idx = index.first_unused_by_followers(excluded)
+                if chosen_idx is not None:
                     logger.info(f"🔍 DEBUG: Using fallback recruiter at index {chosen_idx}")
 
             if chosen_idx is None:
@@ -1072,13 +1041,15 @@ class UnifiedMessenger:
             chosen = recruiters[chosen_idx].copy()  # Make a copy to avoid modifying the original
             
             # Extract job_url from the job - try multiple possible keys
-            job_url = job.get('job_url') or job.get('url') or job.get('link') or job.get('canonical_url')
+            job_url = job_url_of(job)
             
             # CRITICAL: Attach the job_url to the recruiter so it's available during email generation
             chosen['job_url'] = job_url
             chosen['job_title'] = job_title
             chosen['job_company'] = job_company
             
+            match_score, score_breakdown = spec.score_pair(job_f, index.features[chosen_idx])
+
             recruiter_name = chosen.get('name', 'Unknown')
             recruiter_company = self._recruiter_company_name(chosen) or chosen.get('company', 'Unknown')
             logger.info(f"🔍 DEBUG: Mapped {job_title} -> {recruiter_name} ({recruiter_company})")
@@ -1098,7 +1069,9 @@ class UnifiedMessenger:
                 'job_url': job_url,  # Include job_url in mapping for reference
                 'recruiter_name': chosen.get('name'),
                 'recruiter_company': self._recruiter_company_name(chosen) or chosen.get('company'),
-                'recruiter_profile_url': chosen.get('profile_url')
+                'recruiter_profile_url': chosen.get('profile_url'),
+                'match_score': match_score,
+                'score_breakdown': score_breakdown
             })
 
             if len(selected) >= max_pairs:
@@ -1502,9 +1475,71 @@ class UnifiedMessenger:
         
         return recruiters_with_emails
     
-    async def generate_email_content(self, job_titles, job_type, recruiter, resume_content, job_url=None):
-        """Generate a longer, context-rich outreach email. Now fully async!"""
+    async def generate_email_content(self, job_titles, job_type, recruiter, resume_content, job_url=None, job_context=None, resume_digest=None):
+        """
+        Generate a longer, context-rich outreach email. Now fully async!
+        
+        job_context may be passed in when the caller already loaded it (batch
+        generation); an empty dict means "no stored context" and skips the lookup.
+        resume_digest (see resume_digest_service) supplies the sender's name
+        without re-scanning or re-parsing the resume.
+        """
+        digest_name = resume_digest.name if resume_digest else None
+        email = await self._build_email_prompt(job_titles, job_type, recruiter, resume_content, job_url, job_context)
+
+        try:
+            if self.resume_generator:
+                email_content = await self.resume_generator.ainvoke(email['prompt'])
+                return self._finish_email(email_content, email, resume_content, digest_name)
+
+            return self._fallback_email(email, resume_content, digest_name)
+
+        except (LLMTimeoutError, ClientDisconnectedError):
+            # Timeouts map to 504 and disconnects cancel the request; neither gets a template email
+            raise
+        except Exception as exc:
+            print(f"⚠️  Error generating email: {exc}")
+            return self._fallback_email(email, resume_content, digest_name)
+
+    async def stream_email_content(self, job_titles, job_type, recruiter, resume_content, job_url=None, job_context=None, resume_digest=None):
+        """
+        Streaming generate_email_content. Yields events:
+        
+            {"type": "token", "field": "subject" | "body", "text"} - as the model writes
+            {"type": "final", "subject", "body"} - the finished email (signature added)
+        
+        Token text is the raw model output with the template markers removed;
+        the final event is authoritative (it falls back to the template email
+        if generation fails part-way, except on a model timeout or client
+        disconnect, which are raised).
+        """
+        from .email_stream import EmailStreamParser
+
+        digest_name = resume_digest.name if resume_digest else None
+        email = await self._build_email_prompt(job_titles, job_type, recruiter, resume_content, job_url, job_context)
 
+        if not self.resume_generator:
+            subject, body = self._fallback_email(email, resume_content, digest_name)
+            yield {'type': 'final', 'subject': subject, 'body': body}
+            return
+
+        parser = EmailStreamParser()
+        try:
+            async for chunk in self.resume_generator.astream(email['prompt']):
+                for field, text in parser.feed(chunk):
+                    yield {'type': 'token', 'field': field, 'text': text}
+            for field, text in parser.close():
+                yield {'type': 'token', 'field': field, 'text': text}
+            subject, body = self._finish_email(parser.buffer.strip(), email, resume_content, digest_name)
+        except (LLMTimeoutError, ClientDisconnectedError):
+            raise
+        except Exception as exc:
+            print(f"⚠️  Error streaming email: {exc}")
+            subject, body = self._fallback_email(email, resume_content, digest_name)
+        yield {'type': 'final', 'subject': subject, 'body': body}
+
+    async def _build_email_prompt(self, job_titles, job_type, recruiter, resume_content, job_url=None, job_context=None):
+        """Resolve the job context and company for an outreach email and build its prompt."""
         recruiter_name = recruiter.get('name', 'Hiring Manager')
         
         # If job_url is not provided as argument, try to get it from recruiter data
@@ -1514,7 +1549,8 @@ class UnifiedMessenger:
         else:
             print(f"🔗 Using job_url from argument: {job_url}")
 
-        job_context = await self._fetch_job_context(job_url)
+        if job_context is None:
+            job_context = await self._fetch_job_context(job_url)
 
         company_name = (
             recruiter.get('company')
@@ -1608,170 +1644,131 @@ BODY:
         print(f"   • Technologies: {job_context.get('technologies') if job_context else []}")
         print(f"   • Responsibilities: {job_context.get('responsibilities') if job_context else []}")
 
-        try:
-            if self.resume_generator:
-                result = self.resume_generator.llm.invoke(email_prompt)
-                email_content = (
-                    result.content.strip()
-                    if hasattr(result, 'content')
-                    else (result.get('text', result.get('content', str(result))).strip()
-                          if isinstance(result, dict)
-                          else str(result).strip())
-                )
-
-                if '<<<BEGIN>>>' in email_content and '<<<END>>>' in email_content:
-                    email_content = email_content.split('<<<BEGIN>>>', 1)[1].split('<<<END>>>', 1)[0].strip()
-
-                if 'SUBJECT:' in email_content and 'BODY:' in email_content:
-                    parts = email_content.split('BODY:', 1)
-                    subject = parts[0].replace('SUBJECT:', '').strip()
-                    body = parts[1].strip()
-                else:
-                    subject = f"Exploring {job_titles_str} opportunities at {company_name}"
-                    body = email_content
-
-                if not subject:
-                    subject = f"Exploring {job_titles_str} opportunities at {company_name}"
+        return {
+            'prompt': email_prompt,
+            'recruiter_name': recruiter_name,
+            'company_name': company_name,
+            'job_titles_str': job_titles_str,
+        }
 
-                # Extract name from resume for signature
-                person_name = self._extract_resume_name(resume_content)
-                
-                # Check if body already has a complete signature at the end
-                body_lines = body.rstrip().split('\n')
-                # Look at last 3-4 lines for closing phrase and name
-                last_lines_text = ' '.join(body_lines[-4:] if len(body_lines) >= 4 else body_lines).lower()
-                closing_phrases = [
-                    'best regards', 'sincerely', 'regards', 'yours sincerely', 
-                    'yours truly', 'warm regards', 'kind regards', 'best'
-                ]
-                has_closing_at_end = any(closing in last_lines_text for closing in closing_phrases)
-                has_name_at_end = person_name.lower() in last_lines_text
-                
-                # Only add signature if there's no complete closing (both closing phrase AND name at the end)
-                if not (has_closing_at_end and has_name_at_end):
-                    body = body.rstrip() + f"\n\nBest regards,\n{person_name}"
+    def _finish_email(self, email_content, email, resume_content, digest_name=None):
+        """Subject and body from the model's templated output, with a signature ensured."""
+        if '<<<BEGIN>>>' in email_content and '<<<END>>>' in email_content:
+            email_content = email_content.split('<<<BEGIN>>>', 1)[1].split('<<<END>>>', 1)[0].strip()
 
-                return subject, body
+        if 'SUBJECT:' in email_content and 'BODY:' in email_content:
+            parts = email_content.split('BODY:', 1)
+            subject = parts[0].replace('SUBJECT:', '').strip()
+            body = parts[1].strip()
+        else:
+            subject = f"Exploring {email['job_titles_str']} opportunities at {email['company_name']}"
+            body = email_content
+
+        if not subject:
+            subject = f"Exploring {email['job_titles_str']} opportunities at {email['company_name']}"
+
+        # Extract name from resume for signature
+        person_name = digest_name or self._extract_resume_name(resume_content)
+        
+        # Check if body already has a complete signature at the end
+        body_lines = body.rstrip().split('\n')
+        # Look at last 3-4 lines for closing phrase and name
+        last_lines_text = ' '.join(body_lines[-4:] if len(body_lines) >= 4 else body_lines).lower()
+        closing_phrases = [
+            'best regards', 'sincerely', 'regards', 'yours sincerely', 
+            'yours truly', 'warm regards', 'kind regards', 'best'
+        ]
+        has_closing_at_end = any(closing in last_lines_text for closing in closing_phrases)
+        has_name_at_end = person_name.lower() in last_lines_text
+        
+        # Only add signature if there's no complete closing (both closing phrase AND name at the end)
+        if not (has_closing_at_end and has_name_at_end):
+            body = body.rstrip() + f"\n\nBest regards,\n{person_name}"
 
-            subject = f"Exploring {job_titles_str} opportunities at {company_name}"
-            body = self._fallback_email_body(recruiter_name, company_name, job_titles_str, resume_content)
-            return subject, body
+        return subject, body
 
-        except Exception as exc:
-            print(f"⚠️  Error generating email: {exc}")
-            subject = f"Exploring {job_titles_str} opportunities at {company_name}"
-            body = self._fallback_email_body(recruiter_name, company_name, job_titles_str, resume_content)
-            return subject, body
+    def _fallback_email(self, email, resume_content, digest_name=None):
+        """Template email used when the model is unavailable or fails."""
+        subject = f"Exploring {email['job_titles_str']} opportunities at {email['company_name']}"
+        body = self._fallback_email_body(email['recruiter_name'], email['company_name'], email['job_titles_str'], resume_content, digest_name)
+        return subject, body
     
     def send_email(self, to_email, subject, body):
         """
         Send email using SMTP (smtplib) - fallback to env credentials.
+        Sessions are pooled per (server, port, username), see smtp_pool.
         Returns (success: bool, result: dict or error message)
         """
         if not self.smtp_username or not self.smtp_password:
             return False, "SMTP not configured. Please set SMTP_USERNAME and SMTP_PASSWORD in .env file"
         
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add body to email
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Connect to SMTP server and send
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()  # Enable encryption
-                server.login(self.smtp_username, self.smtp_password)
-                text = msg.as_string()
-                server.sendmail(self.from_email, to_email, text)
-            
+            text = self._smtp_message(self.from_email, to_email, subject, body)
+            smtp_pool.send(self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password, self.from_email, to_email, text)
             return True, {"message": "Email sent successfully"}
-            
-        except smtplib.SMTPAuthenticationError as e:
-            return False, f"SMTP authentication failed: {str(e)}. Please check your username and password (use App Password for Gmail)."
-        except smtplib.SMTPException as e:
-            return False, f"SMTP error: {str(e)}"
         except Exception as e:
-            return False, f"Error sending email: {str(e)}"
+            return False, self._smtp_error(e, " Please check your username and password (use App Password for Gmail).")
+    
+    async def asend_email(self, to_email, subject, body):
+        """Async send_email on a pooled (non-blocking when aiosmtplib is installed) SMTP session."""
+        if not self.smtp_username or not self.smtp_password:
+            return False, "SMTP not configured. Please set SMTP_USERNAME and SMTP_PASSWORD in .env file"
+        
+        try:
+            text = self._smtp_message(self.from_email, to_email, subject, body)
+            await smtp_pool.asend(self.smtp_server, self.smtp_port, self.smtp_username, self.smtp_password, self.from_email, to_email, text)
+            return True, {"message": "Email sent successfully"}
+        except Exception as e:
+            return False, self._smtp_error(e, " Please check your username and password (use App Password for Gmail).")
+    
+    @staticmethod
+    def _smtp_message(from_email, to_email, subject, body):
+        """Serialized plain-text message for an SMTP send."""
+        # Create message
+        msg = MIMEMultipart()
+        msg['From'] = from_email
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        # Add body to email
+        msg.attach(MIMEText(body, 'plain'))
+        return msg.as_string()
+    
+    @staticmethod
+    def _smtp_error(error, auth_hint=""):
+        """Error message for a failed SMTP send."""
+        if isinstance(error, smtplib.SMTPAuthenticationError):
+            return f"SMTP authentication failed: {str(error)}.{auth_hint}" if auth_hint else f"SMTP authentication failed: {str(error)}"
+        if isinstance(error, smtplib.SMTPException):
+            return f"SMTP error: {str(error)}"
+        return f"Error sending email: {str(error)}"
     
     def refresh_access_token(self, email_account):
         """
-        Refresh OAuth access token using refresh token.
+        Refresh OAuth access token using refresh token (blocking; see email_providers.refresh_access_token).
         Returns (success: bool, new_access_token: str or None, new_expires_at: datetime or None, error: str or None, new_refresh_token: str or None)
         """
         from datetime import datetime, timedelta
-        import httpx
+        from app.services.email_providers import get_sync_provider_client, token_request_params
         
         if not email_account.refresh_token:
             return False, None, None, "No refresh token available", None
         
+        url, token_data, error = token_request_params(email_account.provider, email_account.refresh_token)
+        if error:
+            return False, None, None, error, None
+        
         try:
-            if email_account.provider == 'gmail':
-                client_id = os.getenv('GOOGLE_CLIENT_ID')
-                client_secret = os.getenv('GOOGLE_CLIENT_SECRET')
-                
-                if not client_id or not client_secret:
-                    return False, None, None, "Google OAuth not configured", None
-                
-                token_data = {
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": email_account.refresh_token,
-                    "grant_type": "refresh_token"
-                }
-                
-                response = httpx.post(
-                    "https://oauth2.googleapis.com/token",
-                    data=token_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    tokens = response.json()
-                    new_access_token = tokens.get('access_token')
-                    expires_in = tokens.get('expires_in', 3600)
-                    new_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-                    # Gmail doesn't return a new refresh token, use the existing one
-                    return True, new_access_token, new_expires_at, None, None
-                else:
-                    return False, None, None, f"Token refresh failed: {response.status_code} - {response.text}", None
-                    
-            elif email_account.provider == 'outlook':
-                client_id = os.getenv('MICROSOFT_CLIENT_ID')
-                client_secret = os.getenv('MICROSOFT_CLIENT_SECRET')
-                
-                if not client_id or not client_secret:
-                    return False, None, None, "Microsoft OAuth not configured", None
-                
-                token_data = {
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "refresh_token": email_account.refresh_token,
-                    "grant_type": "refresh_token",
-                    "scope": "https://graph.microsoft.com/.default offline_access"
-                }
-                
-                response = httpx.post(
-                    "https://login.microsoftonline.com/common/oauth2/v2.0/token",
-                    data=token_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    tokens = response.json()
-                    new_access_token = tokens.get('access_token')
-                    expires_in = tokens.get('expires_in', 3600)
-                    new_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
-                    # Outlook may return a new refresh token
-                    new_refresh_token = tokens.get('refresh_token')
-                    return True, new_access_token, new_expires_at, None, new_refresh_token
-                else:
-                    return False, None, None, f"Token refresh failed: {response.status_code} - {response.text}", None
+            response = get_sync_provider_client().post(url, data=token_data)
+            if response.status_code == 200:
+                tokens = response.json()
+                new_access_token = tokens.get('access_token')
+                expires_in = tokens.get('expires_in', 3600)
+                new_expires_at = datetime.utcnow() + timedelta(seconds=expires_in)
+                # Gmail doesn't return a new refresh token; Outlook may
+                return True, new_access_token, new_expires_at, None, tokens.get('refresh_token')
             else:
-                return False, None, None, f"Unsupported provider: {email_account.provider}", None
+                return False, None, None, f"Token refresh failed: {response.status_code} - {response.text}", None
                 
         except Exception as e:
             return False, None, None, f"Token refresh error: {str(e)}", None
@@ -1782,9 +1779,6 @@ BODY:
         Returns (success: bool, result: dict or error message)
         Note: This method does NOT refresh tokens automatically - caller should handle refresh
         """
-        from datetime import datetime
-        import httpx
-        
         try:
             # Check if account is OAuth-based (Gmail/Outlook)
             if email_account.provider in ['gmail', 'outlook'] and email_account.access_token:
@@ -1806,17 +1800,9 @@ BODY:
                     )
             
             # Fall back to SMTP (for custom SMTP or OAuth accounts with SMTP credentials)
-            if email_account.smtp_server and email_account.smtp_username and email_account.smtp_password:
-                return self._send_email_via_smtp(
-                    email_account.email,
-                    to_email,
-                    subject,
-                    body,
-                    email_account.smtp_server,
-                    int(email_account.smtp_port) if email_account.smtp_port else 587,
-                    email_account.smtp_username,
-                    email_account.smtp_password
-                )
+            params = self._account_smtp_params(email_account)
+            if params:
+                return self._send_email_via_smtp(email_account.email, to_email, subject, body, *params)
             
             return False, "Email account not properly configured. Please check your account settings."
             
@@ -1825,29 +1811,17 @@ BODY:
     
     def _send_email_via_gmail_api(self, email_account, to_email, subject, body):
         """Send email via Gmail API using OAuth access token."""
-        import base64
-        from email.mime.text import MIMEText
-        import httpx
+        from app.services.email_providers import GMAIL_SEND_URL, get_sync_provider_client, gmail_raw_message
         
         try:
-            # Create email message
-            message = MIMEText(body)
-            message['To'] = to_email
-            message['From'] = email_account.email
-            message['Subject'] = subject
-            
-            # Encode message
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-            
-            # Send via Gmail API
-            response = httpx.post(
-                'https://www.googleapis.com/gmail/v1/users/me/messages/send',
+            raw_message = gmail_raw_message(email_account.email, to_email, subject, body)
+            response = get_sync_provider_client().post(
+                GMAIL_SEND_URL,
                 headers={
                     'Authorization': f'Bearer {email_account.access_token}',
                     'Content-Type': 'application/json'
                 },
-                json={'raw': raw_message},
-                timeout=30.0
+                json={'raw': raw_message}
             )
             
             if response.status_code == 200:
@@ -1860,33 +1834,16 @@ BODY:
     
     def _send_email_via_outlook_api(self, email_account, to_email, subject, body):
         """Send email via Microsoft Graph API using OAuth access token."""
-        import httpx
+        from app.services.email_providers import GRAPH_SEND_URL, get_sync_provider_client, graph_message
         
         try:
-            # Send via Microsoft Graph API
-            response = httpx.post(
-                'https://graph.microsoft.com/v1.0/me/sendMail',
+            response = get_sync_provider_client().post(
+                GRAPH_SEND_URL,
                 headers={
                     'Authorization': f'Bearer {email_account.access_token}',
                     'Content-Type': 'application/json'
                 },
-                json={
-                    'message': {
-                        'subject': subject,
-                        'body': {
-                            'contentType': 'Text',
-                            'content': body
-                        },
-                        'toRecipients': [
-                            {
-                                'emailAddress': {
-                                    'address': to_email
-                                }
-                            }
-                        ]
-                    }
-                },
-                timeout=30.0
+                json=graph_message(to_email, subject, body)
             )
             
             if response.status_code in [200, 202]:
@@ -1898,32 +1855,47 @@ BODY:
             return False, f"Outlook API error: {str(e)}"
     
     def _send_email_via_smtp(self, from_email, to_email, subject, body, smtp_server, smtp_port, smtp_username, smtp_password):
-        """Send email via SMTP."""
+        """Send email via SMTP on a pooled session."""
         try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = from_email
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add body to email
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Connect to SMTP server and send
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()  # Enable encryption
-                server.login(smtp_username, smtp_password)
-                text = msg.as_string()
-                server.sendmail(from_email, to_email, text)
-            
+            text = self._smtp_message(from_email, to_email, subject, body)
+            smtp_pool.send(smtp_server, smtp_port, smtp_username, smtp_password, from_email, to_email, text)
             return True, {"message": "Email sent successfully via SMTP"}
-            
-        except smtplib.SMTPAuthenticationError as e:
-            return False, f"SMTP authentication failed: {str(e)}"
-        except smtplib.SMTPException as e:
-            return False, f"SMTP error: {str(e)}"
         except Exception as e:
-            return False, f"Error sending email: {str(e)}"
+            return False, self._smtp_error(e)
+    
+    @staticmethod
+    def _account_smtp_params(email_account):
+        """(server, port, username, password) of an account with SMTP credentials, else None."""
+        if email_account.smtp_server and email_account.smtp_username and email_account.smtp_password:
+            return (
+                email_account.smtp_server,
+                int(email_account.smtp_port) if email_account.smtp_port else 587,
+                email_account.smtp_username,
+                email_account.smtp_password,
+            )
+        return None
+    
+    async def asend_email_with_account(self, to_email, subject, body, email_account):
+        """
+        Async send_email_with_account. OAuth accounts are sent on the shared
+        async provider clients; SMTP accounts use a pooled async session.
+        Returns (success: bool, result: dict or error message)
+        """
+        from app.services import email_providers
+        
+        if email_providers.is_oauth_account(email_account):
+            return await email_providers.send_with_account(email_account, to_email, subject, body)
+        
+        params = self._account_smtp_params(email_account)
+        if not params:
+            return False, "Email account not properly configured. Please check your account settings."
+        
+        try:
+            text = self._smtp_message(email_account.email, to_email, subject, body)
+            await smtp_pool.asend(*params, email_account.email, to_email, text)
+            return True, {"message": "Email sent successfully via SMTP"}
+        except Exception as e:
+            return False, self._smtp_error(e)
     
     def email_only_outreach(self, recruiters, job_titles, job_type):
         """
@@ -2333,9 +2305,10 @@ BODY:
                 print(f"❌ No existing chat found with '{user_input}'")
                 print("💡 Try using their LinkedIn profile URL instead.")
 
-    def _fallback_email_body(self, recruiter_name: str, company_name: str, job_titles_str: str, resume_content: Optional[str] = None) -> str:
+    def _fallback_email_body(self, recruiter_name: str, company_name: str, job_titles_str: str, resume_content: Optional[str] = None, person_name: Optional[str] = None) -> str:
         # Extract name from resume if available
-        person_name = self._extract_resume_name(resume_content) if resume_content else "Shreyas Tulsi"
+        if not person_name:
+            person_name = self._extract_resume_name(resume_content) if resume_content else "Shreyas Tulsi"
         return (
             f"Dear {recruiter_name},\n\n"
             f"I hope you're doing well. I'm reaching out to express my interest in {job_titles_str} opportunities at {company_name}. "
@@ -118,3 +118,14 @@ async def increment_total_attempts(user_id: str, db: AsyncSession) -> UserStats:
     await db.refresh(user_stats)
     return user_stats
 
+
+
+async def set_recruiter_scoring_spec(user_id: str, spec: Optional[dict], db: AsyncSession) -> UserSettings:
+    """Store the user's recruiter scoring spec (None reverts to the default rules)."""
+    user_settings = await get_or_create_user_settings(user_id, db)
+    user_settings.recruiter_scoring_spec = spec
+    user_settings.updated_at = datetime.utcnow()
+    await db.commit()
+    await db.refresh(user_settings)
+    logger.info(f"{'Set' if spec else 'Cleared'} recruiter scoring spec for user {user_id}")
+    return user_settings
@@ -0,0 +1,69 @@
+"""Benchmark campaign send-slot planning.
+
+Builds synthetic queues (one user, a mix of email-only and dual campaigns,
+recipients spread over a few timezones) and times plan_send_slots with the
+default caps and window, reporting the projected completion of the queue.
+
+Usage (from backend/):
+    python -m benchmarks.bench_campaign_scheduler [--sizes 100 1000 5000 20000] [--seed N]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.campaign_scheduler import QueuedRecipient, plan_send_slots, send_scheduler  # noqa: E402
+
+TIMEZONES = ["America/Los_Angeles", "America/New_York", "Europe/London", "Asia/Kolkata"]
+
+
+def _make_queue(rng: random.Random, n: int):
+    return [
+        QueuedRecipient(
+            id=i,
+            campaign_id=1 + i % 4,
+            position=i,
+            user_id="bench-user",
+            channels=("email", "linkedin") if i % 4 == 0 else ("email",),
+            timezone=rng.choice(TIMEZONES),
+        )
+        for i in range(n)
+    ]
+
+
+def run(n: int, seed: int):
+    rng = random.Random(seed)
+    queue = _make_queue(rng, n)
+    now = datetime.utcnow()
+    start = time.perf_counter()
+    slots = plan_send_slots(queue, {}, send_scheduler.policy, now)
+    elapsed = time.perf_counter() - start
+    completion = max(slots.values()) if slots else now
+    print(
+        f"{n:>7} {elapsed * 1000:>9.1f} {elapsed / max(n, 1) * 1e6:>9.2f} "
+        f"{len(slots):>8} {(completion - now).total_seconds() / 86400:>10.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", type=int, default=[100, 1000, 5000, 20000],
+                        help="queued recipients")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    header = f"{'queued':>7} {'plan ms':>9} {'us/rcpt':>9} {'planned':>8} {'days':>10}"
+    print(header)
+    print("-" * len(header))
+    for n in args.sizes:
+        run(n, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
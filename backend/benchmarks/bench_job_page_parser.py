@@ -0,0 +1,134 @@
+"""Benchmark LinkedIn job page extraction per parser backend.
+
+Measures parse time and peak Python memory (tracemalloc) for every backend
+installed in this environment against saved HTML pages: the extracted
+subtrees only (what the scraper does), the whole page with the same backend,
+and the old full-tree BeautifulSoup parse as a baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_page_parser [page.html | pages_dir ...] [--repeat N] [--pad-kb N]
+
+With no paths, the saved job-view page in tests/fixtures/ is used. It is only
+~6KB; ``--pad-kb`` appends that much unrelated markup (a similar-jobs list)
+to each page to approximate a full ~300KB job page. Pages that are not
+job-view pages (search results, login walls) parse to empty fields and are
+flagged in the output.
+"""
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.services.unified_messenger.job_page_parser import (  # noqa: E402
+    available_backends,
+    extract_dom_fields,
+    parse_job_page,
+)
+
+DEFAULT_PAGES = [
+    BACKEND_DIR / "tests" / "fixtures" / "linkedin_job_view.html",
+]
+
+
+def _full_tree_baseline(html: str):
+    """What scrape_job used to do: build the whole soup, then select."""
+    soup = BeautifulSoup(html, "html.parser")
+    soup.select_one("h1")
+    soup.select_one(".description__text .show-more-less-html")
+    soup.select(".description__job-criteria-list li")
+
+
+def _similar_jobs(kib: int) -> str:
+    """Unrelated page markup of about `kib` KiB, inserted before </body>."""
+    item = (
+        '<li><div class="base-card job-search-card"><a class="base-card__full-link" href="/jobs/view/{n}">'
+        '<span class="sr-only">Engineer {n}</span></a><div class="base-search-card__info">'
+        '<h3 class="base-search-card__title">Engineer {n}</h3><h4 class="base-search-card__subtitle">'
+        '<a class="hidden-nested-link" href="/company/c{n}">Company {n}</a></h4>'
+        '<div class="base-search-card__metadata"><span class="job-search-card__location">Remote</span>'
+        '<time class="job-search-card__listdate" datetime="2026-10-01">2 weeks ago</time></div></div></div></li>'
+    )
+    items = []
+    size = 0
+    n = 0
+    while size < kib * 1024:
+        items.append(item.format(n=n))
+        size += len(items[-1])
+        n += 1
+    return '<section class="similar-jobs"><ul class="similar-jobs__list">' + "".join(items) + "</ul></section>"
+
+
+def _collect_pages(paths):
+    pages = []
+    for raw in paths or DEFAULT_PAGES:
+        path = Path(raw)
+        if path.is_dir():
+            pages.extend(sorted(path.glob("*.html")))
+        elif path.exists():
+            pages.append(path)
+        else:
+            print(f"⚠️  Skipping missing page: {path}")
+    return pages
+
+
+def _measure(fn, html: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pages", nargs="*", help="HTML files or directories of saved pages")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per backend and page")
+    parser.add_argument("--pad-kb", type=int, default=0, help="append this much unrelated markup to each page")
+    args = parser.parse_args()
+
+    pages = _collect_pages(args.pages)
+    if not pages:
+        print("❌ No pages to benchmark")
+        return 1
+
+    candidates = {"bs4 full tree (baseline)": _full_tree_baseline}
+    for backend in available_backends():
+        candidates[f"{backend} (DOM only)"] = lambda html, b=backend: extract_dom_fields(html, b)
+        candidates[f"{backend} (DOM, whole page)"] = lambda html, b=backend: extract_dom_fields(html, b, whole_page=True)
+        candidates[f"{backend} (JSON-LD + DOM)"] = lambda html, b=backend: parse_job_page(html, "", backend=b)
+
+    print(f"Backends available: {', '.join(available_backends())}")
+    print(f"Pages: {len(pages)}, repeat: {args.repeat}\n")
+
+    header = f"{'page':<28} {'candidate':<32} {'median ms':>10} {'peak KiB':>10}"
+    print(header)
+    print("-" * len(header))
+    for page in pages:
+        html = page.read_text(encoding="utf-8", errors="replace")
+        if args.pad_kb:
+            html = html.replace("</body>", _similar_jobs(args.pad_kb) + "</body>", 1)
+        print(f"{page.name}: {len(html) / 1024:.0f} KiB")
+        if not parse_job_page(html, "").get("title"):
+            print(f"⚠️  {page.name}: no job title found, probably not a job-view page")
+        for name, fn in candidates.items():
+            median_s, peak = _measure(fn, html, args.repeat)
+            print(f"{page.name[:28]:<28} {name:<32} {median_s * 1000:>10.2f} {peak / 1024:>10.1f}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Benchmark recruiter scoring: per-pair substring scans vs compiled matchers.
+
+Compares three ways of scoring every (job, recruiter) pair:
+
+- legacy: the old per-pair scorer, running each ``any(k in text ...)`` list
+  scan against the lowercased headline/title for every pair
+- compiled per pair: the default scoring spec's whole-word KeywordMatchers
+  (one pass per text, cached per distinct text), scored pair by pair
+- compiled batch: the same spec scoring all recruiters for a job at once
+  with numpy arrays (what map_jobs_to_recruiters uses)
+
+It also counts the pairs whose score changed because keywords now only match
+whole words, and prints a few examples.
+
+Usage (from backend/):
+    python -m benchmarks.bench_keyword_matching [--jobs 50] [--recruiters 2000] [--examples 5]
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.unified_messenger.recruiter_matching import (  # noqa: E402
+    NEWGRAD_SIGNALS,
+    OVERLAP_KEYWORDS,
+    RECRUITING_HEADLINE_KEYWORDS,
+    SENIOR_SIGNALS,
+    TECH_HEADLINE_KEYWORDS,
+    TECH_TITLE_KEYWORDS,
+    JobFeatures,
+    RecruiterFeatures,
+    RecruiterIndex,
+    job_company_name,
+    recruiter_company_name,
+)
+from app.services.unified_messenger.scoring_spec import (  # noqa: E402
+    DEFAULT_SCORING_SPEC,
+    compile_scoring_spec,
+)
+
+COMPANIES = ["NVIDIA", "Stripe", "Databricks", "Figma", "Ramp", "Scale AI", "Notion", "Plaid"]
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Scientist", "ML Engineer",
+    "Product Designer", "Staff Backend Engineer", "New Grad Software Engineer",
+    "Frontend Developer", "Product Manager", "University Graduate - Data Engineer",
+    "Full-Stack Engineer", "Engineering Manager, AI Platform", "Maintenance Technician",
+]
+HEADLINES = [
+    "Technical Recruiter", "Senior Technical Recruiter - Engineering", "Talent Acquisition Partner",
+    "University Recruiter | Early Career", "Sourcer, ML & AI", "People Operations",
+    "Recruiting Lead, Product & Design", "HR Business Partner", "Campus Recruiter",
+    "Talent Partner - Data", "Data Center Operations", "Chairman of the Board",
+    "TA Partner, Engineering", "Sales Development Representative", "Senior Recruiters @ Stripe",
+]
+
+
+def legacy_score(job, recruiter) -> int:
+    """The per-pair scorer as it was before features were precomputed."""
+    score = 0
+    job_title = (job.get('title') or '').lower()
+    job_company = (job_company_name(job) or '').lower()
+    headline = (recruiter.get('headline') or '').lower()
+    rec_company = (recruiter_company_name(recruiter) or '').lower()
+    keywords_match = (recruiter.get('keywords_match') or '').lower()
+
+    if any(k in headline for k in RECRUITING_HEADLINE_KEYWORDS):
+        score += 2
+    if any(k in job_title for k in TECH_TITLE_KEYWORDS):
+        if any(k in headline for k in TECH_HEADLINE_KEYWORDS):
+            score += 2
+    if job_company:
+        if rec_company and job_company == rec_company:
+            score += 5
+        elif job_company in keywords_match:
+            score += 3
+    for kw in OVERLAP_KEYWORDS:
+        if kw in job_title and kw in headline:
+            score += 1
+    if any(k in job_title for k in SENIOR_SIGNALS):
+        if any(k in headline for k in SENIOR_SIGNALS):
+            score += 1
+    elif any(k in job_title for k in NEWGRAD_SIGNALS):
+        if any(k in headline for k in NEWGRAD_SIGNALS):
+            score += 1
+    return score
+
+
+def _make_data(rng: random.Random, n_jobs: int, n_recruiters: int):
+    jobs = [
+        {"title": rng.choice(TITLES), "company": {"name": rng.choice(COMPANIES), "id": None}}
+        for _ in range(n_jobs)
+    ]
+    recruiters = [
+        {
+            "name": f"Recruiter {i}",
+            "headline": rng.choice(HEADLINES),
+            "company": rng.choice(COMPANIES),
+            "followers_count": rng.randint(0, 5000),
+        }
+        for i in range(n_recruiters)
+    ]
+    return jobs, recruiters
+
+
+def _time_pairs(spec, jobs, recruiters):
+    start = time.perf_counter()
+    job_features = [JobFeatures.from_job(job) for job in jobs]
+    rec_features = [RecruiterFeatures.from_recruiter(i, rec) for i, rec in enumerate(recruiters)]
+    featurise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = [[spec.score_pair(jf, rf)[0] for rf in rec_features] for jf in job_features]
+    return scores, featurise, time.perf_counter() - start
+
+
+def _time_batch(spec, jobs, recruiters):
+    start = time.perf_counter()
+    job_features = [JobFeatures.from_job(job) for job in jobs]
+    index = RecruiterIndex(recruiters)
+    spec.prepare(index)
+    featurise = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = [spec.score_job(jf, index)[0].tolist() for jf in job_features]
+    return scores, featurise, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--recruiters", type=int, default=2000)
+    parser.add_argument("--examples", type=int, default=5, help="changed pairs to print")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    jobs, recruiters = _make_data(random.Random(args.seed), args.jobs, args.recruiters)
+    pairs = len(jobs) * len(recruiters)
+
+    start = time.perf_counter()
+    legacy = [[legacy_score(job, rec) for rec in recruiters] for job in jobs]
+    t_legacy = time.perf_counter() - start
+
+    spec = compile_scoring_spec(DEFAULT_SCORING_SPEC)
+    compiled, pair_feat, pair_score = _time_pairs(spec, jobs, recruiters)
+    spec.headline_matcher.match.cache_clear()
+    spec.title_matcher.match.cache_clear()
+    batch, batch_feat, batch_score = _time_batch(spec, jobs, recruiters)
+
+    assert batch == compiled, "batch evaluation must match per-pair scoring"
+
+    print(f"{len(jobs)} jobs x {len(recruiters)} recruiters = {pairs} pairs\n")
+    header = f"{'method':<22} {'featurise ms':>13} {'score ms':>10} {'total ms':>10} {'us/pair':>9} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = [
+        ("legacy per-pair", 0.0, t_legacy),
+        ("compiled per pair", pair_feat, pair_score),
+        ("compiled batch", batch_feat, batch_score),
+    ]
+    for name, featurise, score in rows:
+        total = featurise + score
+        print(
+            f"{name:<22} {featurise * 1000:>13.1f} {score * 1000:>10.1f} {total * 1000:>10.1f} "
+            f"{total / pairs * 1e6:>9.2f} {t_legacy / total:>7.1f}x"
+        )
+
+    print(f"\nMatcher cache: headlines {spec.headline_matcher.cache_info()}, titles {spec.title_matcher.cache_info()}")
+
+    changed = [
+        (j, r) for j in range(len(jobs)) for r in range(len(recruiters))
+        if compiled[j][r] != legacy[j][r]
+    ]
+    print(f"\nPairs whose score changed with whole-word matching: {len(changed)} / {pairs}")
+    seen = set()
+    for j, r in changed:
+        key = (jobs[j]["title"], recruiters[r]["headline"])
+        if key in seen:
+            continue
+        seen.add(key)
+        print(f"  '{key[0]}' x '{key[1]}': {legacy[j][r]} -> {compiled[j][r]}")
+        if len(seen) >= args.examples:
+            break
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
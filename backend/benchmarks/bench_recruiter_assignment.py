@@ -0,0 +1,155 @@
+"""Benchmark greedy vs optimal job -> recruiter assignment.
+
+Builds synthetic job and recruiter lists (a handful of companies, realistic
+titles and headlines), then times each stage of the optimal path - index
+build, score matrix, eligibility mask, solve - next to the greedy mapping,
+and reports the total score each mode achieves.
+
+Usage (from backend/):
+    python -m benchmarks.bench_recruiter_assignment [--sizes 5x200 100x2000 1000x10000] [--seed N]
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.unified_messenger.recruiter_matching import (  # noqa: E402
+    NUMPY_AVAILABLE,
+    SCIPY_AVAILABLE,
+    JobFeatures,
+    RecruiterIndex,
+    build_eligibility_mask,
+    build_score_matrix,
+    solve_max_weight_assignment,
+    _followers_tiebreak,
+)
+from app.services.unified_messenger.scoring_spec import get_default_spec  # noqa: E402
+
+COMPANIES = ["NVIDIA", "Stripe", "Databricks", "Figma", "Ramp", "Scale AI", "Notion", "Plaid"]
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Data Scientist", "ML Engineer",
+    "Product Designer", "Staff Backend Engineer", "New Grad Software Engineer",
+    "Frontend Developer", "Product Manager", "University Graduate - Data Engineer",
+]
+HEADLINES = [
+    "Technical Recruiter", "Senior Technical Recruiter - Engineering", "Talent Acquisition Partner",
+    "University Recruiter | Early Career", "Sourcer, ML & AI", "People Operations",
+    "Recruiting Lead, Product & Design", "HR Business Partner", "Campus Recruiter",
+    "Talent Partner - Data",
+]
+
+
+def _make_jobs(rng: random.Random, n: int):
+    return [
+        {
+            "title": rng.choice(TITLES),
+            "company": {"name": rng.choice(COMPANIES), "id": None},
+            "url": f"https://www.linkedin.com/jobs/view/{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def _make_recruiters(rng: random.Random, n: int):
+    return [
+        {
+            "name": f"Recruiter {i}",
+            "headline": rng.choice(HEADLINES),
+            "company": rng.choice(COMPANIES),
+            "followers_count": rng.randint(0, 5000),
+        }
+        for i in range(n)
+    ]
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def _greedy(job_features, index):
+    """Greedy mapping as done by UnifiedMessenger.map_jobs_to_recruiters."""
+    spec = get_default_spec()
+    used = set()
+    choices = {}
+    for row, job_f in enumerate(job_features):
+        bucket = index.company_bucket(job_f) or list(range(len(index)))
+        totals, _ = spec.score_job(job_f, index, bucket)
+        scored = sorted(
+            zip(bucket, totals.tolist()),
+            key=lambda x: (x[1], index.features[x[0]].followers),
+            reverse=True,
+        )
+        for idx, sc in scored:
+            if idx not in used and sc > 0:
+                used.add(idx)
+                choices[row] = idx
+                break
+    return choices
+
+
+def _total(scores, choices):
+    return sum(int(scores[row, idx]) for row, idx in choices.items())
+
+
+def run(n_jobs: int, n_recruiters: int, seed: int):
+    rng = random.Random(seed)
+    jobs = _make_jobs(rng, n_jobs)
+    recruiters = _make_recruiters(rng, n_recruiters)
+    job_features = [JobFeatures.from_job(job) for job in jobs]
+
+    index, t_index = _timed(RecruiterIndex, recruiters)
+    scores, t_matrix = _timed(build_score_matrix, job_features, index)
+    mask, t_mask = _timed(build_eligibility_mask, job_features, index)
+
+    start = time.perf_counter()
+    eligible = mask & (scores > 0)
+    weights = scores + _followers_tiebreak(index, n_jobs)[None, :]
+    weights[~eligible] = 0.0
+    optimal = solve_max_weight_assignment(weights)
+    t_solve = time.perf_counter() - start
+
+    greedy, t_greedy = _timed(_greedy, job_features, RecruiterIndex(recruiters))
+
+    print(
+        f"{n_jobs:>5}x{n_recruiters:<6} "
+        f"{t_index * 1000:>9.1f} {t_matrix * 1000:>9.1f} {t_mask * 1000:>9.1f} {t_solve * 1000:>9.1f} "
+        f"{(t_matrix + t_mask + t_solve) * 1000:>10.1f} {t_greedy * 1000:>10.1f} "
+        f"{_total(scores, optimal):>8} {_total(scores, greedy):>8} "
+        f"{len(optimal):>6} {len(greedy):>6}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", default=["5x200", "50x1000", "100x2000", "1000x10000"],
+                        help="JOBSxRECRUITERS problem sizes")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ numpy is not installed; optimal assignment is unavailable")
+        return 1
+
+    logging.disable(logging.INFO)
+    print(f"Solver: {'scipy linear_sum_assignment' if SCIPY_AVAILABLE else 'numpy Hungarian fallback'}\n")
+    header = (
+        f"{'size':<12} {'index ms':>9} {'matrix ms':>9} {'mask ms':>9} {'solve ms':>9} "
+        f"{'optimal ms':>10} {'greedy ms':>10} {'opt sum':>8} {'grd sum':>8} {'opt n':>6} {'grd n':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for size in args.sizes:
+        n_jobs, n_recruiters = (int(part) for part in size.lower().split("x"))
+        run(n_jobs, n_recruiters, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
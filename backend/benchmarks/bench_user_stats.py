@@ -0,0 +1,141 @@
+"""Benchmark GET /user-stats aggregation: Python consolidation vs the outreach summary.
+
+Seeds a throwaway user with N outreach history rows (a few hundred
+recruiters and companies, mixed channels) and builds its summary with the
+batched rebuild, then times the original approach (load every row,
+consolidate in Python) next to the summary reads in
+app.services.outreach_stats_service. The user and its history are deleted
+afterwards. Needs a migrated database (DATABASE_URL).
+
+Usage (from backend/):
+    python -m benchmarks.bench_user_stats [--sizes 1000 10000 100000] [--repeat N] [--seed N]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.db.base import AsyncSessionLocal  # noqa: E402
+from app.db.models.outreach_history import OutreachHistory  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.services.outreach_stats_service import (  # noqa: E402
+    daily_activity,
+    latest_attempts,
+    reached_companies,
+    reached_roles,
+    rebuild_summary,
+)
+
+COMPANIES = ["NVIDIA", "Stripe", "Databricks", "Figma", "Ramp", "Scale AI", "Notion", "Plaid"]
+TITLES = ["Software Engineer", "Data Scientist", "ML Engineer", "Product Designer", "Product Manager"]
+CHANNELS = ["email", "linkedin", "both"]
+_INSERT_BATCH = 5000
+
+
+async def _seed(db, user_id: str, n: int, rng: random.Random) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "recipient_name": f"Recruiter {rng.randint(0, 2000)}",
+            "company_name": rng.choice(COMPANIES),
+            "job_title": rng.choice(TITLES),
+            "channel": rng.choice(CHANNELS),
+            "sent_at": now - timedelta(minutes=i),
+            "created_at": now,
+        }
+        for i in range(n)
+    ]
+    for start in range(0, n, _INSERT_BATCH):
+        await db.execute(insert(OutreachHistory), rows[start:start + _INSERT_BATCH])
+    await db.commit()
+
+
+async def _python_consolidation(db, user_id: str) -> None:
+    """The original /user-stats path: every row to Python, consolidate, sort, keep 20."""
+    result = await db.execute(
+        select(OutreachHistory).where(OutreachHistory.user_id == user_id).order_by(OutreachHistory.sent_at.desc())
+    )
+    consolidated = {}
+    for record in result.scalars().all():
+        key = (
+            (record.recipient_name or "").lower().strip(),
+            (record.job_title or "").lower().strip(),
+            (record.company_name or "").lower().strip(),
+        )
+        channels = {"email", "linkedin"} if record.channel == "both" else {record.channel}
+        entry = consolidated.setdefault(key, {"sent_at": record.sent_at, "channels": set()})
+        entry["channels"] |= channels
+        entry["sent_at"] = max(entry["sent_at"], record.sent_at)
+    sorted(consolidated.values(), key=lambda x: x["sent_at"], reverse=True)[:20]
+    db.expunge_all()
+
+
+async def _summary_reads(db, user_id: str) -> None:
+    await latest_attempts(db, user_id, limit=20)
+    await reached_companies(db, user_id)
+    await reached_roles(db, user_id)
+    await daily_activity(db, user_id, days=30)
+
+
+async def _time(fn, db, user_id: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(db, user_id)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def run(n: int, repeat: int, seed: int) -> None:
+    user_id = f"bench-{uuid.uuid4()}"
+    async with AsyncSessionLocal() as db:
+        db.add(User(id=user_id, email=f"{user_id}@bench.invalid"))
+        await db.commit()
+        try:
+            await _seed(db, user_id, n, random.Random(seed))
+            start = time.perf_counter()
+            await rebuild_summary(db, user_id=user_id)
+            t_rebuild = time.perf_counter() - start
+            t_python = await _time(_python_consolidation, db, user_id, repeat)
+            t_summary = await _time(_summary_reads, db, user_id, repeat)
+            print(
+                f"{n:>8} {t_python * 1000:>11.1f} {t_summary * 1000:>11.1f} "
+                f"{t_python / t_summary:>8.1f}x {t_rebuild:>11.2f}"
+            )
+        finally:
+            await db.rollback()
+            await db.execute(delete(OutreachHistory).where(OutreachHistory.user_id == user_id))
+            await db.execute(delete(User).where(User.id == user_id))
+            await db.commit()
+
+
+async def main_async(args) -> int:
+    header = f"{'rows':>8} {'python ms':>11} {'summary ms':>11} {'speedup':>9} {'rebuild s':>11}"
+    print(header)
+    print("-" * len(header))
+    for n in args.sizes:
+        await run(n, args.repeat, args.seed)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="*", type=int, default=[1000, 10000, 100000], help="history rows")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per approach (best is reported)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
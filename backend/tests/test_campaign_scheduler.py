@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from app.services.campaign_scheduler import AccountState, QueuedRecipient, SendPolicy, plan_send_slots
+
+NOW = datetime(2026, 1, 5, 12, 0)  # a Monday, naive UTC
+
+
+def policy(daily=0, hourly=0, start=0, end=0):
+    return SendPolicy(
+        daily_caps={"email": daily, "linkedin": daily},
+        hourly_caps={"email": hourly, "linkedin": hourly},
+        window_start_hour=start,
+        window_end_hour=end,
+    )
+
+
+def recipients(count, campaign_id=1, channels=("email",), timezone="UTC", first_id=1, user_id="u1"):
+    return [
+        QueuedRecipient(
+            id=first_id + i, campaign_id=campaign_id, position=i, user_id=user_id, channels=channels, timezone=timezone
+        )
+        for i in range(count)
+    ]
+
+
+def test_sends_are_spaced_by_the_hourly_cap():
+    slots = plan_send_slots(recipients(3), {}, policy(hourly=6), NOW)
+    assert [slots[i] for i in (1, 2, 3)] == [NOW, NOW + timedelta(minutes=10), NOW + timedelta(minutes=20)]
+
+
+def test_daily_cap_moves_the_rest_to_the_next_utc_day():
+    slots = plan_send_slots(recipients(3), {}, policy(daily=2), NOW)
+    assert slots[1] == slots[2] == NOW
+    assert slots[3] == datetime(2026, 1, 6)
+
+
+def test_prior_sends_count_against_the_daily_cap():
+    accounts = {("u1", "email"): AccountState(daily_cap=2, spacing=timedelta(0), day=NOW.date(), sent_today=2)}
+    slots = plan_send_slots(recipients(1), accounts, policy(daily=2), NOW)
+    assert slots[1] == datetime(2026, 1, 6)
+    assert accounts[("u1", "email")].sent_today == 1
+
+
+def test_window_closed_waits_for_the_next_opening():
+    slots = plan_send_slots(recipients(1), {}, policy(start=9, end=17), datetime(2026, 1, 5, 18, 0))
+    assert slots[1] == datetime(2026, 1, 6, 9, 0)
+
+
+def test_window_is_in_the_recipient_timezone():
+    # 12:00 UTC is 07:00 in New York (EST): wait for 09:00 local
+    slots = plan_send_slots(recipients(1, timezone="America/New_York"), {}, policy(start=9, end=17), NOW)
+    assert slots[1] == datetime(2026, 1, 5, 14, 0)
+
+
+def test_overnight_window():
+    p = policy(start=22, end=6)
+    assert plan_send_slots(recipients(1), {}, p, NOW)[1] == datetime(2026, 1, 5, 22, 0)
+    assert plan_send_slots(recipients(1), {}, p, datetime(2026, 1, 5, 23, 30))[1] == datetime(2026, 1, 5, 23, 30)
+    assert plan_send_slots(recipients(1), {}, p, datetime(2026, 1, 6, 5, 0))[1] == datetime(2026, 1, 6, 5, 0)
+
+
+def test_window_opening_across_a_dst_change():
+    # 17:00 EST on Mar 7; clocks go forward on Mar 8, so 09:00 EDT is 13:00 UTC
+    slots = plan_send_slots(
+        recipients(1, timezone="America/New_York"), {}, policy(start=9, end=17), datetime(2026, 3, 7, 22, 0)
+    )
+    assert slots[1] == datetime(2026, 3, 8, 13, 0)
+
+
+def test_pacing_pushes_past_the_window_close():
+    # One send per hour in a 9-11 window: the third goes out the next morning
+    slots = plan_send_slots(recipients(3), {}, policy(hourly=1, start=9, end=11), datetime(2026, 1, 5, 9, 0))
+    assert [slots[i] for i in (1, 2, 3)] == [
+        datetime(2026, 1, 5, 9, 0), datetime(2026, 1, 5, 10, 0), datetime(2026, 1, 6, 9, 0),
+    ]
+
+
+def test_campaigns_of_one_user_share_the_account():
+    queue = recipients(2, campaign_id=1) + recipients(2, campaign_id=2, timezone="Europe/Berlin", first_id=10)
+    slots = plan_send_slots(queue, {}, policy(hourly=4), NOW)
+    assert sorted(slots.values()) == [NOW + timedelta(minutes=15 * i) for i in range(4)]
+    # Earlier campaigns go first when both are eligible
+    assert slots[1] == NOW and slots[2] < slots[10]
+
+
+def test_users_do_not_share_accounts():
+    queue = recipients(2) + recipients(2, user_id="u2", first_id=10)
+    slots = plan_send_slots(queue, {}, policy(hourly=1), NOW)
+    assert slots[1] == slots[10] == NOW
+    assert slots[2] == slots[11] == NOW + timedelta(hours=1)
+
+
+def test_dual_channel_recipients_wait_for_both_accounts():
+    accounts = {("u1", "linkedin"): AccountState(daily_cap=0, spacing=timedelta(0), day=NOW.date(),
+                                                 next_free=NOW + timedelta(hours=2))}
+    slots = plan_send_slots(recipients(1, channels=("email", "linkedin")), accounts, policy(), NOW)
+    assert slots[1] == NOW + timedelta(hours=2)
@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm_runtime import ClientDisconnectedError, LLMTimeoutError
+from app.services.unified_messenger.unified_messenger import UnifiedMessenger
+
+
+def _messenger(error: BaseException):
+    async def build_prompt(*args, **kwargs):
+        return {"prompt": "Write an email"}
+
+    async def ainvoke(prompt):
+        raise error
+
+    return SimpleNamespace(
+        _build_email_prompt=build_prompt,
+        resume_generator=SimpleNamespace(ainvoke=ainvoke),
+        _fallback_email=lambda email, resume_content, name: ("Fallback subject", "Fallback body"),
+    )
+
+
+def _generate(messenger):
+    return asyncio.run(UnifiedMessenger.generate_email_content(messenger, ["Engineer"], "full_time", {}, "resume"))
+
+
+@pytest.mark.parametrize("error", [LLMTimeoutError(30), ClientDisconnectedError()])
+def test_timeouts_and_disconnects_are_raised(error):
+    with pytest.raises(type(error)):
+        _generate(_messenger(error))
+
+
+def test_other_model_errors_fall_back_to_the_template():
+    assert _generate(_messenger(RuntimeError("rate limited"))) == ("Fallback subject", "Fallback body")
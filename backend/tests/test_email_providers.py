@@ -0,0 +1,87 @@
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from app.services import email_providers
+from app.services.email_providers import parse_batch_response, send_gmail_batch
+
+BOUNDARY = "batch_abc"
+
+
+def _response_part(index, status, body):
+    return (
+        f"--{BOUNDARY}\r\n"
+        "Content-Type: application/http\r\n"
+        f"Content-ID: <response-item{index}>\r\n"
+        "\r\n"
+        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+        "Content-Type: application/json; charset=UTF-8\r\n"
+        "\r\n"
+        f"{body}\r\n"
+    )
+
+
+def _batch_response(parts):
+    return "".join(parts) + f"--{BOUNDARY}--\r\n"
+
+
+def test_parse_batch_response_maps_parts_by_content_id():
+    text = _batch_response([
+        _response_part(1, 429, '{"error": "rate limited"}'),
+        _response_part(0, 200, '{"id": "m0"}'),
+    ])
+
+    results = parse_batch_response(f'multipart/mixed; boundary="{BOUNDARY}"', text)
+
+    assert results == {0: (200, '{"id": "m0"}'), 1: (429, '{"error": "rate limited"}')}
+
+
+def test_parse_batch_response_skips_parts_without_content_id():
+    part = _response_part(0, 200, "{}").replace("Content-ID: <response-item0>\r\n", "")
+
+    assert parse_batch_response(f"multipart/mixed; boundary={BOUNDARY}", _batch_response([part])) == {}
+
+
+def test_parse_batch_response_rejects_non_multipart():
+    with pytest.raises(ValueError):
+        parse_batch_response("application/json", "{}")
+
+
+@pytest.fixture
+def gmail_transport(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        body = request.content.decode()
+        count = len(re.findall(r"Content-ID: <item\d+>", body))
+        parts = [_response_part(i, 200 if i % 2 == 0 else 400, json.dumps({"i": i})) for i in range(count)]
+        return httpx.Response(
+            200,
+            headers={"content-type": f"multipart/mixed; boundary={BOUNDARY}"},
+            text=_batch_response(parts),
+        )
+
+    monkeypatch.setitem(email_providers._clients, "gmail", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+def test_send_gmail_batch_returns_one_result_per_message_in_order(gmail_transport):
+    messages = [(f"r{i}@example.com", f"Subject {i}", "Body") for i in range(3)]
+
+    results = asyncio.run(send_gmail_batch("token", "me@example.com", messages))
+
+    assert [success for success, _ in results] == [True, False, True]
+    assert "400" in results[1][1]
+    assert len(gmail_transport) == 1
+    assert gmail_transport[0].headers["authorization"] == "Bearer token"
+
+
+def test_send_gmail_batch_rejects_oversized_batches():
+    messages = [("r@example.com", "s", "b")] * (email_providers.GMAIL_MAX_BATCH_SIZE + 1)
+
+    with pytest.raises(ValueError):
+        asyncio.run(send_gmail_batch("token", "me@example.com", messages))
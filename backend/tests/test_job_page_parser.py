@@ -0,0 +1,117 @@
+import pytest
+
+from app.services.unified_messenger import job_page_parser
+from app.services.unified_messenger.job_page_parser import (
+    available_backends,
+    extract_dom_fields,
+    extract_json_ld_job,
+    job_node_fragments,
+    merge_criteria,
+    parse_job_page,
+)
+from tests.conftest import FIXTURES_DIR
+
+JOB_URL = "https://www.linkedin.com/jobs/view/123"
+
+
+@pytest.fixture(scope="module")
+def job_view_html():
+    return (FIXTURES_DIR / "linkedin_job_view.html").read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_job_view_page_keeps_every_dom_criterion(job_view_html, backend):
+    job = parse_job_page(job_view_html, JOB_URL, backend=backend)
+
+    assert job["title"] == "Software Engineer, Backend"
+    assert job["company"]["name"] == "Acme Robotics"
+    assert job["company"]["url"].startswith("https://www.linkedin.com/company/acme-robotics")
+    assert job["location"] == "San Francisco, CA"
+    assert job["applications"] == "Over 200 applicants"
+    assert job["criteria"] == [
+        {"name": "Seniority level", "value": "Mid-Senior level"},
+        {"name": "Employment type", "value": "Full-time"},
+        {"name": "Job function", "value": "Engineering and Information Technology"},
+        {"name": "Industries", "value": "Robotics Engineering"},
+    ]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_extract_the_same_fields(job_view_html, backend):
+    expected = extract_dom_fields(job_view_html, "html.parser")
+
+    assert extract_dom_fields(job_view_html, backend) == expected
+    assert extract_dom_fields(job_view_html, backend, whole_page=True) == expected
+
+
+def test_fragments_keep_only_the_extracted_nodes(job_view_html):
+    fragments = job_node_fragments(job_view_html)
+
+    assert fragments.startswith("<h1")
+    assert "application/ld+json" not in fragments
+    assert "<header" not in fragments
+    assert fragments.count("description__job-criteria-list") == 1
+    assert len(fragments) < len(job_view_html)
+
+
+def test_fragments_give_up_on_unbalanced_markup():
+    assert job_node_fragments('<div class="salary"><span>$1</span>') is None
+    assert job_node_fragments("<p>nothing to extract</p>") is None
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_unbalanced_page_falls_back_to_the_whole_page(backend):
+    html = '<html><body><h1>Engineer</h1><div class="salary">$100K<div></body></html>'
+    fields = extract_dom_fields(html, backend)
+
+    assert fields["title"] == "Engineer"
+    assert fields["salary"].startswith("$100K")
+
+
+def test_json_ld_fills_fields_missing_from_the_dom(job_view_html):
+    html = job_view_html.replace("description__job-criteria-list", "removed-list").replace(
+        "num-applicants__caption", "removed-caption"
+    )
+    job = parse_job_page(html, JOB_URL)
+
+    assert job["applications"] is None
+    assert job["criteria"] == [{"name": "Employment type", "value": "Full Time"}]
+
+
+def test_dom_parse_is_skipped_only_when_json_ld_is_complete(job_view_html, monkeypatch):
+    calls = []
+    real_extract = job_page_parser.extract_dom_fields
+    monkeypatch.setattr(
+        job_page_parser, "extract_dom_fields", lambda html, backend=None: calls.append(1) or real_extract(html, backend)
+    )
+
+    parse_job_page(job_view_html, JOB_URL)
+    assert calls == [1]
+
+    complete = dict(extract_json_ld_job(job_view_html))
+    complete["applicants"] = "Over 200 applicants"
+    complete["criteria"] = [
+        {"name": label, "value": "x"} for label in ("Seniority level", "Employment type", "Job function", "Industries")
+    ]
+    monkeypatch.setattr(job_page_parser, "extract_json_ld_job", lambda html: dict(complete))
+    job = parse_job_page(job_view_html, JOB_URL)
+    assert calls == [1]
+    assert job["applications"] == "Over 200 applicants"
+
+
+def test_merge_criteria_matches_labels_case_and_space_insensitively():
+    primary = [{"name": "Employment type", "value": "Full-time"}]
+    extra = [{"name": " employment  TYPE ", "value": "Full Time"}, {"name": "Industries", "value": "Robotics"}]
+
+    assert merge_criteria(primary, extra) == [
+        {"name": "Employment type", "value": "Full-time"},
+        {"name": "Industries", "value": "Robotics"},
+    ]
+    assert merge_criteria(None, extra[:1]) == extra[:1]
+
+
+def test_search_results_page_has_no_job_fields():
+    job = parse_job_page("<html><body><ul class='jobs-search__results-list'></ul></body></html>", JOB_URL)
+
+    assert job["title"] is None
+    assert job["criteria"] == []
@@ -0,0 +1,26 @@
+from app.services.unified_messenger.keyword_matcher import KeywordMatcher, keywords_in_order
+from app.services.unified_messenger.recruiter_matching import OVERLAP_KEYWORDS, TECH_HEADLINE_KEYWORDS
+
+
+def test_hits_are_whole_words():
+    matcher = KeywordMatcher({"recruiting": ["ta", "ai", "hr"]})
+
+    assert matcher.match("Data engineer maintaining HTML")["recruiting"] == frozenset()
+    assert matcher.match("TA partner, AI & HR")["recruiting"] == {"ta", "ai", "hr"}
+
+
+def test_plural_and_overlapping_phrases_hit():
+    matcher = KeywordMatcher({"tech": ["technical recruiter", "recruiter"]})
+
+    assert matcher.match("Technical Recruiters at Acme")["tech"] == {"technical recruiter", "recruiter"}
+
+
+def test_variants_count_as_the_keyword():
+    matcher = KeywordMatcher({"headline": TECH_HEADLINE_KEYWORDS, "overlap": OVERLAP_KEYWORDS})
+
+    assert "tech" in matcher.match("Recruiting for Technology teams")["headline"]
+    assert "tech" in matcher.match("Technical sourcing")["headline"]
+    assert "design" in matcher.match("Hiring product designers")["headline"]
+    # 'engineer' and its variant 'engineering' are one overlap keyword, not two
+    hits = matcher.match("Software engineer, engineering recruiting, back-end")["overlap"]
+    assert keywords_in_order(OVERLAP_KEYWORDS, hits) == ["software", "engineer", "backend"]
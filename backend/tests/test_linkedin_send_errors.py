@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from app.services.unified_messenger.adapter import invitation_error, linkedin_account_error
+
+
+def test_linkedin_account_error_without_account():
+    assert linkedin_account_error(None).startswith("No LinkedIn account connected")
+
+
+def test_linkedin_account_error_inactive_account():
+    account = SimpleNamespace(is_active=False, unipile_account_id="acc")
+    assert "not active" in linkedin_account_error(account)
+
+
+def test_linkedin_account_error_without_unipile_id():
+    account = SimpleNamespace(is_active=True, unipile_account_id=None)
+    assert "not properly connected to Unipile" in linkedin_account_error(account)
+
+
+def test_invitation_error_maps_provider_limit():
+    result = {"type": "errors/cannot_resend_yet", "detail": "Temporary provider limit"}
+    assert "monthly cap" in invitation_error(result)
+
+
+def test_invitation_error_strips_error_prefixes():
+    assert invitation_error({"type": "", "detail": "errors/something_else"}) == "something_else"
+
+
+def test_invitation_error_passes_strings_through():
+    assert invitation_error("Request timed out") == "Request timed out"
@@ -0,0 +1,72 @@
+import time
+
+from app.services.unified_messenger.message_length import (
+    FILLER_SENTENCES,
+    enforce_limit,
+    fit_to_target,
+    length_target,
+    split_sentences,
+)
+
+PREMIUM = length_target(300)
+FREE = length_target(200)
+
+OPENING = "Hi Dana, I'm a backend engineer (Python, Go) applying for the Platform Engineer role at Acme."
+MIDDLE = (
+    "I built a billing service, which handles two million invoices a month, on Postgres.",
+    "I led the migration of our queue workers to asyncio.",
+    "I also mentor two interns on code review.",
+)
+CLOSING = "Would love to connect and learn more about the team."
+
+
+def test_text_in_range_is_untouched():
+    text = "x" * 285 + "."
+    fitted = fit_to_target(text, PREMIUM)
+
+    assert fitted.text == text
+    assert fitted.adjustments == []
+
+
+def test_long_note_is_shortened_keeping_opening_and_closing():
+    text = " ".join((OPENING,) + MIDDLE + (CLOSING,))
+    assert len(text) > FREE.limit
+
+    fitted = fit_to_target(text, FREE)
+    sentences = split_sentences(fitted.text)
+
+    assert len(fitted) <= FREE.limit
+    assert sentences[-1] == CLOSING
+    assert sentences[0].startswith("Hi Dana")
+    assert fitted.adjustments
+
+
+def test_short_note_gets_fillers_before_the_closing():
+    text = f"{OPENING} {CLOSING}"
+
+    fitted = fit_to_target(text, PREMIUM)
+    sentences = split_sentences(fitted.text)
+
+    assert PREMIUM.fits(len(fitted))
+    assert sentences[-1] == CLOSING
+    assert any(filler in fitted.text for filler in FILLER_SENTENCES)
+
+
+def test_long_input_is_fitted_quickly():
+    middle = [f"At job {i} I shipped feature number {i} (with tests), which customers used daily." for i in range(60)]
+    text = " ".join([OPENING] + middle + [CLOSING])
+
+    start = time.perf_counter()
+    fitted = fit_to_target(text, PREMIUM)
+    elapsed = time.perf_counter() - start
+
+    assert PREMIUM.fits(len(fitted))
+    assert split_sentences(fitted.text)[-1] == CLOSING
+    assert elapsed < 1.0
+
+
+def test_enforce_limit_trims_at_a_sentence_boundary():
+    text, trimmed = enforce_limit(" ".join((OPENING,) + MIDDLE), 150)
+
+    assert trimmed
+    assert text == OPENING
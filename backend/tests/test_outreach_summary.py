@@ -0,0 +1,76 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.services.outreach_stats_service import channel_display, summarize
+
+
+def record(id, channel, sent_at, name="Jane Doe", title="Software Engineer", company="Stripe", user_id="u1"):
+    return SimpleNamespace(
+        id=id, user_id=user_id, channel=channel, sent_at=sent_at,
+        recipient_name=name, job_title=title, company_name=company,
+    )
+
+
+def test_entries_merge_channels_case_insensitively():
+    entries, _, _ = summarize([
+        record(1, "email", datetime(2026, 1, 5, 9)),
+        record(2, "linkedin", datetime(2026, 1, 5, 10), name=" jane doe ", company="STRIPE"),
+    ])
+    assert list(entries) == [("u1", "jane doe", "software engineer", "stripe")]
+    entry = entries[("u1", "jane doe", "software engineer", "stripe")]
+    assert entry["email"] and entry["linkedin"]
+    # Display fields come from the latest record
+    assert (entry["history_id"], entry["recipient_name"], entry["company_name"]) == (2, " jane doe ", "STRIPE")
+    assert channel_display(entry["email"], entry["linkedin"]) == "Email + LinkedIn"
+
+
+def test_latest_record_wins_regardless_of_order():
+    entries, _, _ = summarize([
+        record(5, "linkedin", datetime(2026, 1, 6), name="Jane D."),
+        record(3, "email", datetime(2026, 1, 4), name="jane d."),
+    ])
+    (entry,) = entries.values()
+    assert (entry["history_id"], entry["recipient_name"], entry["last_sent_at"]) == (5, "Jane D.", datetime(2026, 1, 6))
+    assert entry["email"] and entry["linkedin"]
+
+
+def test_same_sent_at_breaks_ties_by_id():
+    at = datetime(2026, 1, 5, 9)
+    entries, _, _ = summarize([record(8, "email", at, name="B"), record(7, "email", at, name="b")])
+    assert next(iter(entries.values()))["history_id"] == 8
+
+
+def test_both_channel_counts_as_email_and_linkedin():
+    entries, _, daily = summarize([record(1, "both", datetime(2026, 1, 5, 9))])
+    (entry,) = entries.values()
+    assert entry["email"] and entry["linkedin"]
+    assert daily[("u1", date(2026, 1, 5))] == {
+        "user_id": "u1", "day": date(2026, 1, 5), "emails": 0, "linkedin": 0, "combined": 1,
+    }
+
+
+def test_reached_skips_placeholders():
+    _, reached, _ = summarize([
+        record(1, "email", datetime(2026, 1, 5), company="Stripe", title="Position"),
+        record(2, "email", datetime(2026, 1, 5), company="Company", title="Data Scientist"),
+        record(3, "email", datetime(2026, 1, 5), company="Ramp", title="Data Scientist"),
+    ])
+    assert sorted(reached) == [("u1", "ramp", ""), ("u1", "ramp", "data scientist"), ("u1", "stripe", "")]
+
+
+def test_daily_counts_per_user_and_day():
+    _, _, daily = summarize([
+        record(1, "email", datetime(2026, 1, 5, 9)),
+        record(2, "email", datetime(2026, 1, 5, 23, 59)),
+        record(3, "linkedin", datetime(2026, 1, 6, 0, 1)),
+        record(4, "email", datetime(2026, 1, 5, 10), user_id="u2"),
+    ])
+    assert daily[("u1", date(2026, 1, 5))]["emails"] == 2
+    assert daily[("u1", date(2026, 1, 6))]["linkedin"] == 1
+    assert daily[("u2", date(2026, 1, 5))]["emails"] == 1
+
+
+def test_users_are_kept_apart():
+    entries, _, _ = summarize([record(1, "email", datetime(2026, 1, 5)), record(2, "linkedin", datetime(2026, 1, 5), user_id="u2")])
+    assert {key[0] for key in entries} == {"u1", "u2"}
+    assert not entries[("u2", "jane doe", "software engineer", "stripe")]["email"]
@@ -0,0 +1,20 @@
+import pytest
+from pydantic import ValidationError
+
+from app.api.v1.templates import TemplateMergeRequest
+from app.core.config import settings
+
+
+def test_concurrency_defaults_to_none():
+    assert TemplateMergeRequest(recipients=[{}]).concurrency is None
+
+
+@pytest.mark.parametrize("concurrency", [0, -1, settings.draft_batch_max_concurrency + 1, 10_000])
+def test_concurrency_outside_the_allowed_range_is_rejected(concurrency):
+    with pytest.raises(ValidationError):
+        TemplateMergeRequest(recipients=[{}], concurrency=concurrency)
+
+
+def test_concurrency_up_to_the_maximum_is_accepted():
+    request = TemplateMergeRequest(recipients=[{}], concurrency=settings.draft_batch_max_concurrency)
+    assert request.concurrency == settings.draft_batch_max_concurrency